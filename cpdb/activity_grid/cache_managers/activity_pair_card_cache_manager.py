@@ -1,14 +1,27 @@
-from django.db.models import OuterRef
+from django.db.models import OuterRef, Q, Subquery
+from django.db.models.functions import Coalesce
 
 from activity_grid.models import ActivityPairCard
-from data.models import Allegation
-from data.utils.subqueries import SQCount
+from data.models import OfficerAllegation, OfficerCoaccusal
 
 
-def cache_data():
-    allegations = Allegation.objects.filter(
-        officerallegation__officer=OuterRef('officer1')
-    ).filter(
-        officerallegation__officer=OuterRef('officer2')
-    )
-    ActivityPairCard.objects.update(coaccusal_count=SQCount(allegations.values('crid')))
+def cache_data(since=None):
+    """
+    Read pair counts from the coaccusal matrix, coaccusal_cache_manager builds it earlier in the same cache_data run.
+    """
+    pair_cards = ActivityPairCard.objects.all()
+    if since is not None:
+        changed_officer_ids = OfficerAllegation.objects.filter(updated_at__gt=since).values('officer_id')
+        # New cards have no count yet. Deleted officer allegations leave nothing updated behind, only a full run
+        # recomputes the cards of their officers.
+        pair_cards = pair_cards.filter(
+            Q(updated_at__gt=since) |
+            Q(officer1_id__in=changed_officer_ids) |
+            Q(officer2_id__in=changed_officer_ids)
+        )
+
+    coaccusal_count = OfficerCoaccusal.objects.filter(
+        officer=OuterRef('officer1'),
+        coaccused=OuterRef('officer2')
+    ).values('coaccusal_count')[:1]
+    pair_cards.update(coaccusal_count=Coalesce(Subquery(coaccusal_count), 0))
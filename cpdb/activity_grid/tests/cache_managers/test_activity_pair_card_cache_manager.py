@@ -1,9 +1,15 @@
+from datetime import datetime
+
 from django.test.testcases import TestCase
 
+from freezegun import freeze_time
 from robber import expect
+import pytz
 
 from activity_grid.factories import ActivityPairCardFactory
 from activity_grid.cache_managers import activity_pair_card_cache_manager
+from activity_grid.models import ActivityPairCard
+from data.cache_managers import coaccusal_cache_manager
 from data.factories import OfficerFactory, AllegationFactory, OfficerAllegationFactory
 
 
@@ -25,7 +31,49 @@ class ActivityPairCardCacheManagerTestCase(TestCase):
             officer1=officer_1,
             officer2=officer_2
         )
+        coaccusal_cache_manager.build_coaccusal_matrix()
         activity_pair_card_cache_manager.cache_data()
 
         pair_card.refresh_from_db()
         expect(pair_card.coaccusal_count).to.eq(2)
+
+    def test_cache_data_since(self):
+        with freeze_time('2020-01-01 12:00:00'):
+            officer_1 = OfficerFactory()
+            officer_2 = OfficerFactory()
+            officer_3 = OfficerFactory()
+            officer_4 = OfficerFactory()
+            allegation = AllegationFactory()
+            OfficerAllegationFactory(allegation=allegation, officer=officer_3)
+            OfficerAllegationFactory(allegation=allegation, officer=officer_4)
+            pair_card_1 = ActivityPairCardFactory(officer1=officer_1, officer2=officer_2)
+            pair_card_2 = ActivityPairCardFactory(officer1=officer_3, officer2=officer_4)
+        with freeze_time('2020-01-03 12:00:00'):
+            allegation = AllegationFactory()
+            OfficerAllegationFactory(allegation=allegation, officer=officer_1)
+            OfficerAllegationFactory(allegation=allegation, officer=officer_2)
+        coaccusal_cache_manager.build_coaccusal_matrix()
+        ActivityPairCard.objects.update(coaccusal_count=0)
+
+        activity_pair_card_cache_manager.cache_data(since=datetime(2020, 1, 2, tzinfo=pytz.utc))
+
+        pair_card_1.refresh_from_db()
+        pair_card_2.refresh_from_db()
+        expect(pair_card_1.coaccusal_count).to.eq(1)
+        expect(pair_card_2.coaccusal_count).to.eq(0)
+
+    def test_cache_data_since_with_new_pair_card(self):
+        with freeze_time('2020-01-01 12:00:00'):
+            officer_1 = OfficerFactory()
+            officer_2 = OfficerFactory()
+            allegation = AllegationFactory()
+            OfficerAllegationFactory(allegation=allegation, officer=officer_1)
+            OfficerAllegationFactory(allegation=allegation, officer=officer_2)
+        with freeze_time('2020-01-03 12:00:00'):
+            pair_card = ActivityPairCardFactory(officer1=officer_1, officer2=officer_2)
+        coaccusal_cache_manager.build_coaccusal_matrix()
+
+        activity_pair_card_cache_manager.cache_data(since=datetime(2020, 1, 2, tzinfo=pytz.utc))
+
+        pair_card.refresh_from_db()
+        expect(pair_card.coaccusal_count).to.eq(1)
@@ -0,0 +1,37 @@
+from django.db import migrations, models
+from django.db.models import Max, Min, Sum
+
+
+def merge_duplicated_search_trackings(apps, schema_editor):
+    SearchTracking = apps.get_model('analytics', 'SearchTracking')
+    duplicated_queries = SearchTracking.objects.values('query').annotate(
+        count=models.Count('id'),
+        first_id=Min('id'),
+        total_usages=Sum('usages'),
+        last_entered_max=Max('last_entered'),
+    ).filter(count__gt=1)
+
+    for duplicated_query in duplicated_queries:
+        SearchTracking.objects.filter(id=duplicated_query['first_id']).update(
+            usages=duplicated_query['total_usages'],
+            last_entered=duplicated_query['last_entered_max'],
+        )
+        SearchTracking.objects.filter(
+            query=duplicated_query['query']
+        ).exclude(id=duplicated_query['first_id']).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analytics', '0007_add_kind_to_attachmenttracking'),
+    ]
+
+    operations = [
+        migrations.RunPython(merge_duplicated_search_trackings, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='searchtracking',
+            name='query',
+            field=models.CharField(max_length=255, unique=True),
+        ),
+    ]
@@ -0,0 +1,106 @@
+import atexit
+import logging
+import threading
+import time
+
+from django.conf import settings
+from django.db import connection, connections
+from django.utils import timezone
+
+from .models import SearchTracking
+
+logger = logging.getLogger(__name__)
+
+QUERY_MAX_LENGTH = SearchTracking._meta.get_field('query').max_length
+
+
+class SearchTrackingBuffer(object):
+    """
+    Collect search usages in memory and write them to SearchTracking in one upsert per flush,
+    so that searches do not wait on (or lock) SearchTracking rows.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._usages = {}
+        self._flusher = None
+
+    def add(self, term, results_count, query_type='free_text'):
+        # A single over-length term would make the whole upsert fail
+        term = term[:QUERY_MAX_LENGTH]
+        with self._lock:
+            usages, _, _ = self._usages.get(term, (0, 0, query_type))
+            self._usages[term] = (usages + 1, results_count, query_type)
+
+        if settings.SEARCH_TRACKING_FLUSH_INTERVAL > 0:
+            self._start_flusher()
+        else:
+            self.flush()
+
+    def _start_flusher(self):
+        if self._flusher is not None and self._flusher.is_alive():
+            return
+        with self._lock:
+            if self._flusher is not None and self._flusher.is_alive():
+                return
+            self._flusher = threading.Thread(target=self._flush_periodically, daemon=True)
+            self._flusher.start()
+            atexit.register(self.flush)
+
+    def _flush_periodically(self):
+        while True:
+            time.sleep(settings.SEARCH_TRACKING_FLUSH_INTERVAL)
+            try:
+                self.flush()
+            except Exception:
+                logger.exception('Could not flush search trackings')
+            finally:
+                connections.close_all()
+
+    def flush(self):
+        with self._lock:
+            usages, self._usages = self._usages, {}
+        if not usages:
+            return
+
+        try:
+            self._upsert(usages)
+        except Exception:
+            self._restore(usages)
+            raise
+
+    def _restore(self, usages):
+        """
+        Put usages of a failed flush back so that the next flush writes them along with the newer ones.
+        """
+        with self._lock:
+            for term, (count, results_count, query_type) in usages.items():
+                if term in self._usages:
+                    newer_count, results_count, query_type = self._usages[term]
+                    count += newer_count
+                self._usages[term] = (count, results_count, query_type)
+
+    def _upsert(self, usages):
+        terms = list(usages.keys())
+        now = timezone.now()
+        with connection.cursor() as cursor:
+            cursor.execute(f"""
+                INSERT INTO {SearchTracking._meta.db_table}
+                    (query, usages, results, query_type, created_at, last_entered)
+                SELECT query, usages, results, query_type, %(now)s, %(now)s
+                FROM unnest(%(queries)s::varchar[], %(usages)s::int[], %(results)s::int[], %(query_types)s::varchar[])
+                    AS T(query, usages, results, query_type)
+                ON CONFLICT (query) DO UPDATE SET
+                    usages = {SearchTracking._meta.db_table}.usages + EXCLUDED.usages,
+                    results = EXCLUDED.results,
+                    query_type = EXCLUDED.query_type,
+                    last_entered = EXCLUDED.last_entered
+            """, {
+                'now': now,
+                'queries': terms,
+                'usages': [usages[term][0] for term in terms],
+                'results': [usages[term][1] for term in terms],
+                'query_types': [usages[term][2] for term in terms],
+            })
+
+
+search_tracking_buffer = SearchTrackingBuffer()
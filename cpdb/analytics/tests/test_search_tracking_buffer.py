@@ -0,0 +1,99 @@
+from django.db import DatabaseError
+from django.test import TestCase, override_settings
+
+from freezegun import freeze_time
+from mock import patch
+from robber import expect
+
+from analytics.factories import SearchTrackingFactory
+from analytics.models import SearchTracking
+from analytics.search_tracking_buffer import SearchTrackingBuffer
+
+
+class SearchTrackingBufferTestCase(TestCase):
+    @override_settings(SEARCH_TRACKING_FLUSH_INTERVAL=10)
+    @patch('analytics.search_tracking_buffer.threading.Thread')
+    def test_add_buffers_usages(self, thread_mock):
+        buffer = SearchTrackingBuffer()
+
+        buffer.add('query', 2)
+        buffer.add('query', 3)
+        buffer.add('other query', 1)
+
+        expect(SearchTracking.objects.exists()).to.be.false()
+        expect(thread_mock).to.be.called_once()
+        expect(thread_mock.return_value.start).to.be.called_once()
+
+        buffer.flush()
+
+        expect(
+            set(SearchTracking.objects.values_list('query', 'usages', 'results', 'query_type'))
+        ).to.eq({
+            ('query', 2, 3, 'free_text'),
+            ('other query', 1, 1, 'free_text'),
+        })
+
+    def test_add_without_flush_interval(self):
+        buffer = SearchTrackingBuffer()
+
+        buffer.add('query', 2)
+
+        search_tracking = SearchTracking.objects.get(query='query')
+        expect(search_tracking.usages).to.eq(1)
+        expect(search_tracking.results).to.eq(2)
+
+    @override_settings(SEARCH_TRACKING_FLUSH_INTERVAL=10)
+    @patch('analytics.search_tracking_buffer.threading.Thread')
+    def test_flush_update_existing_search_tracking(self, _):
+        with freeze_time('2020-01-01 12:00:00'):
+            SearchTrackingFactory(query='query', usages=5, results=10, query_type='free_text')
+        buffer = SearchTrackingBuffer()
+        buffer.add('query', 4)
+        buffer.add('query', 4)
+
+        with freeze_time('2020-02-01 12:00:00'):
+            buffer.flush()
+
+        search_tracking = SearchTracking.objects.get(query='query')
+        expect(search_tracking.usages).to.eq(7)
+        expect(search_tracking.results).to.eq(4)
+        expect(search_tracking.last_entered.strftime('%Y-%m-%d')).to.eq('2020-02-01')
+        expect(search_tracking.created_at.strftime('%Y-%m-%d')).to.eq('2020-01-01')
+
+    def test_flush_empty_buffer(self):
+        buffer = SearchTrackingBuffer()
+
+        with patch('analytics.search_tracking_buffer.connection.cursor') as cursor_mock:
+            buffer.flush()
+
+        expect(cursor_mock).not_to.be.called()
+
+    @override_settings(SEARCH_TRACKING_FLUSH_INTERVAL=10)
+    @patch('analytics.search_tracking_buffer.threading.Thread')
+    def test_add_truncates_long_term(self, _):
+        buffer = SearchTrackingBuffer()
+
+        buffer.add('a' * 300, 1)
+        buffer.flush()
+
+        expect(SearchTracking.objects.get().query).to.eq('a' * 255)
+
+    @override_settings(SEARCH_TRACKING_FLUSH_INTERVAL=10)
+    @patch('analytics.search_tracking_buffer.threading.Thread')
+    def test_flush_failure_keeps_usages(self, _):
+        buffer = SearchTrackingBuffer()
+        buffer.add('query', 2)
+        buffer.add('other query', 1)
+
+        with patch('analytics.search_tracking_buffer.connection.cursor', side_effect=DatabaseError):
+            expect(buffer.flush).to.throw(DatabaseError)
+
+        buffer.add('query', 5)
+        buffer.flush()
+
+        expect(
+            set(SearchTracking.objects.values_list('query', 'usages', 'results', 'query_type'))
+        ).to.eq({
+            ('query', 2, 5, 'free_text'),
+            ('other query', 1, 1, 'free_text'),
+        })
@@ -110,6 +110,10 @@ CACHES = {
     }
 }
 
+SOCIAL_GRAPH_CACHE_TIMEOUT = env.int('SOCIAL_GRAPH_CACHE_TIMEOUT', 60 * 60 * 24)
+AGGREGATION_CACHE_TIMEOUT = env.int('AGGREGATION_CACHE_TIMEOUT', 60 * 60 * 24)
+PINBOARD_RELEVANCE_ASYNC_REFRESH = env.bool('PINBOARD_RELEVANCE_ASYNC_REFRESH', True)
+
 
 # DEBUG
 # ------------------------------------------------------------------------------
@@ -278,6 +282,17 @@ TWITTER_APP_TOKEN_SECRET = env.str('TWITTER_APP_TOKEN_SECRET', default='')
 V1_URL = 'https://data.cpdp.co'
 
 ELASTICSEARCH_HOSTS = ['elasticsearch:9200']
+ES_INDEXING_PIPELINE = env.bool('ES_INDEXING_PIPELINE', False)
+ES_INDEXING_WORKERS = env.int('ES_INDEXING_WORKERS', 4)
+ES_INDEXING_WORKER_BATCH_SIZE = env.int('ES_INDEXING_WORKER_BATCH_SIZE', 500)
+ES_BULK_CHUNK_SIZE = env.int('ES_BULK_CHUNK_SIZE', 500)
+ES_BULK_THREADS = env.int('ES_BULK_THREADS', 2)
+ES_BULK_MAX_RETRIES = env.int('ES_BULK_MAX_RETRIES', 5)
+ES_INDEXING_CHUNK_SIZE = env.int('ES_INDEXING_CHUNK_SIZE', 0)
+SEARCH_WORKER_TIMEOUT = env.str('SEARCH_WORKER_TIMEOUT', '1s')
+SEARCH_RESULT_CACHE_TIMEOUT = env.int('SEARCH_RESULT_CACHE_TIMEOUT', 60 * 60)
+SEARCH_RESULT_LOCAL_CACHE_SIZE = env.int('SEARCH_RESULT_LOCAL_CACHE_SIZE', 256)
+SEARCH_TRACKING_FLUSH_INTERVAL = env.int('SEARCH_TRACKING_FLUSH_INTERVAL', 10)
 
 TEST = False
 
@@ -24,6 +24,10 @@ V1_URL = 'http://cpdb.lvh.me'
 
 ENABLE_SITEMAP = True
 
+SEARCH_TRACKING_FLUSH_INTERVAL = 0
+SEARCH_RESULT_LOCAL_CACHE_SIZE = 0
+PINBOARD_RELEVANCE_ASYNC_REFRESH = False
+
 
 # OVERRIDE PROTECTED KEYS from common
 MAILCHIMP_API_KEY = ''
@@ -3,11 +3,12 @@ from django.db import models
 from data.utils.attachment_file import filter_attachments
 from es_index import register_indexer
 from es_index.utils import timing_validate
-from es_index.indexers import BaseIndexer, PartialIndexer
+from es_index.indexers import BaseIndexer, PartialIndexer, updated_values
 from data.models import (
     Allegation, PoliceWitness, OfficerAllegation, InvestigatorAllegation,
-    AttachmentFile, Complainant, Victim
+    AttachmentFile, Complainant, Victim, Officer, Investigator
 )
+from data.utils.key_range import in_key_range
 from data.utils.subqueries import SQCount
 from .doc_types import CRDocType
 from .index_aliases import cr_index_alias
@@ -16,29 +17,42 @@ from .serializers.cr_doc_serializers import AllegationSerializer
 app_name = __name__.split('.')[0]
 
 
+def in_crid_range(queryset, crid_range):
+    return in_key_range(queryset, 'allegation_id', crid_range)
+
+
 @register_indexer(app_name)
 class CRIndexer(BaseIndexer):
     doc_type_klass = CRDocType
     index_alias = cr_index_alias
     serializer = AllegationSerializer()
+    chunk_key = 'crid'
 
     def __init__(self, *args, **kwargs):
         super(CRIndexer, self).__init__(*args, **kwargs)
-        self.populate_policewitness_dict()
-        self.populate_coaccused_dict()
-        self.populate_investigator_dict()
-        self.populate_attachments_dict()
-        self.populate_complainants_dict()
-        self.populate_victims_dict()
-
-    @timing_validate('CRIndexer: Populating policewitness dict...')
-    def populate_policewitness_dict(self):
-        self.policewitness_dict = dict()
+        if not self.chunk_size:
+            self.populate_policewitness_dict()
+            self.populate_coaccused_dict()
+            self.populate_investigator_dict()
+            self.populate_attachments_dict()
+            self.populate_complainants_dict()
+            self.populate_victims_dict()
+
+    def populate_chunk(self, crid_range):
+        self.policewitness_dict = self.get_policewitness_dict(crid_range)
+        self.coaccused_dict = self.get_coaccused_dict(crid_range)
+        self.investigator_dict = self.get_investigator_dict(crid_range)
+        self.attachments_dict = self.get_attachments_dict(crid_range)
+        self.complainants_dict = self.get_complainants_dict(crid_range)
+        self.victims_dict = self.get_victims_dict(crid_range)
+
+    def get_policewitness_dict(self, crid_range=None):
+        policewitness_dict = dict()
         sustained_count = OfficerAllegation.objects.filter(
             officer=models.OuterRef('officer_id'),
             final_finding='SU'
         )
-        queryset = PoliceWitness.objects.all().select_related('officer')\
+        queryset = in_crid_range(PoliceWitness.objects.all(), crid_range).select_related('officer')\
             .annotate(allegation_count=models.Count('officer__officerallegation'))\
             .annotate(sustained_count=SQCount(sustained_count.values('id')))
         for obj in queryset.values(
@@ -47,11 +61,15 @@ class CRIndexer(BaseIndexer):
                 'officer__complaint_percentile', 'officer__civilian_allegation_percentile',
                 'officer__internal_allegation_percentile', 'officer__trr_percentile',
                 'officer__gender', 'officer__race', 'allegation_count', 'sustained_count'):
-            self.policewitness_dict.setdefault(obj['allegation_id'], []).append(obj)
+            policewitness_dict.setdefault(obj['allegation_id'], []).append(obj)
+        return policewitness_dict
 
-    @timing_validate('CRIndexer: Populating coaccused dict...')
-    def populate_coaccused_dict(self):
-        self.coaccused_dict = dict()
+    @timing_validate('CRIndexer: Populating policewitness dict...')
+    def populate_policewitness_dict(self):
+        self.policewitness_dict = self.get_policewitness_dict()
+
+    def get_coaccused_dict(self, crid_range=None):
+        coaccused_dict = dict()
         sustained_count = OfficerAllegation.objects.filter(
             officer=models.OuterRef('officer_id'),
             final_finding='SU'
@@ -59,7 +77,8 @@ class CRIndexer(BaseIndexer):
         allegation_count = OfficerAllegation.objects.filter(
             officer=models.OuterRef('officer_id')
         )
-        queryset = OfficerAllegation.objects.all().select_related('officer', 'allegation_category')\
+        queryset = in_crid_range(OfficerAllegation.objects.all(), crid_range)\
+            .select_related('officer', 'allegation_category')\
             .annotate(allegation_count=SQCount(allegation_count.values('id')))\
             .annotate(sustained_count=SQCount(sustained_count.values('id')))\
             .values(
@@ -73,13 +92,18 @@ class CRIndexer(BaseIndexer):
                 'allegation_category_id',
             )
         for obj in queryset:
-            self.coaccused_dict.setdefault(obj['allegation_id'], []).append(obj)
+            coaccused_dict.setdefault(obj['allegation_id'], []).append(obj)
+        return coaccused_dict
 
-    @timing_validate('CRIndexer: Populating investigator dict...')
-    def populate_investigator_dict(self):
-        self.investigator_dict = dict()
+    @timing_validate('CRIndexer: Populating coaccused dict...')
+    def populate_coaccused_dict(self):
+        self.coaccused_dict = self.get_coaccused_dict()
+
+    def get_investigator_dict(self, crid_range=None):
+        investigator_dict = dict()
         num_cases = InvestigatorAllegation.objects.filter(investigator=models.OuterRef('investigator_id'))
-        queryset = InvestigatorAllegation.objects.all().select_related('investigator__officer')\
+        queryset = in_crid_range(InvestigatorAllegation.objects.all(), crid_range)\
+            .select_related('investigator__officer')\
             .annotate(num_cases=SQCount(num_cases.values('id'))).values(
                 'investigator__officer_id', 'allegation_id', 'current_rank', 'investigator__first_name',
                 'investigator__last_name', 'investigator__officer__first_name',
@@ -89,41 +113,80 @@ class CRIndexer(BaseIndexer):
                 'investigator__officer__internal_allegation_percentile', 'investigator__officer__trr_percentile',
                 'num_cases')
         for obj in queryset:
-            self.investigator_dict.setdefault(obj['allegation_id'], []).append(obj)
+            investigator_dict.setdefault(obj['allegation_id'], []).append(obj)
+        return investigator_dict
+
+    @timing_validate('CRIndexer: Populating investigator dict...')
+    def populate_investigator_dict(self):
+        self.investigator_dict = self.get_investigator_dict()
+
+    def get_attachments_dict(self, crid_range=None):
+        attachments_dict = dict()
+        queryset = in_crid_range(filter_attachments(AttachmentFile.showing), crid_range).values(
+            'allegation_id', 'title', 'url', 'preview_image_url', 'file_type',
+        )
+        for obj in queryset:
+            attachments_dict.setdefault(obj['allegation_id'], []).append(obj)
+        return attachments_dict
 
     @timing_validate('CRIndexer: Populating attachments dict...')
     def populate_attachments_dict(self):
-        self.attachments_dict = dict()
-        queryset = filter_attachments(AttachmentFile.showing).values(
-            'allegation_id', 'title', 'url', 'preview_image_url', 'file_type',
+        self.attachments_dict = self.get_attachments_dict()
+
+    def get_complainants_dict(self, crid_range=None):
+        complainants_dict = dict()
+        queryset = in_crid_range(Complainant.objects.all(), crid_range).values(
+            'allegation_id', 'race', 'gender', 'age'
         )
         for obj in queryset:
-            self.attachments_dict.setdefault(obj['allegation_id'], []).append(obj)
+            complainants_dict.setdefault(obj['allegation_id'], []).append(obj)
+        return complainants_dict
 
     @timing_validate('CRIndexer: Populating complainants dict...')
     def populate_complainants_dict(self):
-        self.complainants_dict = dict()
-        queryset = Complainant.objects.all().values(
+        self.complainants_dict = self.get_complainants_dict()
+
+    def get_victims_dict(self, crid_range=None):
+        victims_dict = dict()
+        queryset = in_crid_range(Victim.objects.all(), crid_range).values(
             'allegation_id', 'race', 'gender', 'age'
         )
         for obj in queryset:
-            self.complainants_dict.setdefault(obj['allegation_id'], []).append(obj)
+            victims_dict.setdefault(obj['allegation_id'], []).append(obj)
+        return victims_dict
 
     @timing_validate('CRIndexer: Populating victims dict...')
     def populate_victims_dict(self):
-        self.victims_dict = dict()
-        queryset = Victim.objects.all().values(
-            'allegation_id', 'race', 'gender', 'age'
-        )
-        for obj in queryset:
-            self.victims_dict.setdefault(obj['allegation_id'], []).append(obj)
+        self.victims_dict = self.get_victims_dict()
+
+    @classmethod
+    def get_updated_keys(cls, since):
+        crids = updated_values(Allegation.objects.all(), since, 'crid')
+        for model in [OfficerAllegation, PoliceWitness, InvestigatorAllegation, AttachmentFile, Complainant, Victim]:
+            crids |= updated_values(model.objects.all(), since, 'allegation_id')
+
+        # Names, counts and percentiles of officers and investigators are embedded in the complaint documents,
+        # cache_data bumps updated_at of the officers whose cached counts or percentiles it changes
+        updated_officer_ids = Officer.objects.filter(updated_at__gt=since).values('id')
+        for model in [OfficerAllegation, PoliceWitness]:
+            crids.update(
+                model.objects.filter(officer_id__in=updated_officer_ids).values_list('allegation_id', flat=True)
+            )
+        crids.update(InvestigatorAllegation.objects.filter(
+            investigator_id__in=Investigator.objects.filter(updated_at__gt=since).values('id')
+        ).values_list('allegation_id', flat=True))
+        crids.discard(None)
+        return crids
 
     def get_queryset(self):
         # Values are extracted so that we can save some 2.5Gb of memory during run
-        return Allegation.objects.all().select_related('beat').values(
+        queryset = Allegation.objects.all().select_related('beat').values(
             'crid', 'beat__name', 'summary', 'point', 'incident_date',
             'old_complaint_address', 'add1', 'add2', 'city', 'location'
         )
+        if self.chunk_size:
+            return self.chunked(queryset)
+        return queryset
 
     def extract_datum(self, datum):
         datum['coaccused'] = self.coaccused_dict.get(datum['crid'], [])
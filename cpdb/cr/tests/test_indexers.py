@@ -1,7 +1,7 @@
 from datetime import date, datetime
 from decimal import Decimal
 
-from django.test import TestCase
+from django.test import TestCase, override_settings
 from django.contrib.gis.geos import Point
 
 from robber import expect
@@ -28,6 +28,46 @@ class CRIndexerTestCase(TestCase):
         indexer = CRIndexer()
         return [indexer.extract_datum(obj) for obj in indexer.get_queryset()]
 
+    def test_get_updated_keys(self):
+        with freeze_time('2018-01-01 12:00:00', tz_offset=0):
+            officer = OfficerFactory()
+            investigator = InvestigatorFactory()
+            allegations = {crid: AllegationFactory(crid=crid) for crid in ['1', '2', '3', '4', '5', '6', '7']}
+            OfficerAllegationFactory(allegation=allegations['2'], officer=officer)
+            InvestigatorAllegationFactory(allegation=allegations['3'], investigator=investigator)
+            victim = VictimFactory(allegation=allegations['7'])
+
+        with freeze_time('2018-03-01 12:00:00', tz_offset=0):
+            AllegationFactory(crid='10')
+            allegations['1'].save()
+            officer.save()
+            investigator.save()
+            ComplainantFactory(allegation=allegations['4'])
+            AttachmentFileFactory(allegation=allegations['5'])
+            PoliceWitnessFactory(allegation=allegations['6'])
+            victim.save()
+
+        expect(CRIndexer.get_updated_keys(datetime(2018, 2, 1, tzinfo=pytz.utc))).to.eq(
+            {'1', '2', '3', '4', '5', '6', '7', '10'}
+        )
+        expect(CRIndexer.get_updated_keys(datetime(2018, 4, 1, tzinfo=pytz.utc))).to.eq(set())
+
+    @freeze_time('2018-04-04 12:00:01', tz_offset=0)
+    def test_extract_data_incremental(self):
+        for crid in ['1', '2', '3']:
+            allegation = AllegationFactory(crid=crid)
+            OfficerAllegationFactory(allegation=allegation)
+            ComplainantFactory(allegation=allegation)
+            VictimFactory(allegation=allegation)
+
+        rows = {row['crid']: row for row in self.extract_data()}
+
+        indexer = CRIndexer(updated_keys=['3', '1'])
+        incremental_rows = [indexer.extract_datum(obj) for obj in indexer.get_queryset()]
+
+        expect(incremental_rows).to.eq([rows['1'], rows['3']])
+        expect(indexer.index_name).to.eq(cr_index_alias.name)
+
     @freeze_time('2018-04-04 12:00:01', tz_offset=0)
     def test_emit_correct_format(self):
         allegation = AllegationFactory(
@@ -423,6 +463,28 @@ class CRIndexerTestCase(TestCase):
         expect(rows[-1]['involvements']).to.have.length(1)
         expect(rows[-1]['involvements'][0]['num_cases']).to.eq(4)
 
+    def test_extract_data_in_chunks(self):
+        officer = OfficerFactory()
+        for crid in ['1001', '1002', '1003', '1004', '1005']:
+            allegation = AllegationFactory(crid=crid)
+            OfficerAllegationFactory(officer=officer, allegation=allegation, final_finding='SU')
+            ComplainantFactory(allegation=allegation)
+            VictimFactory(allegation=allegation)
+            InvestigatorAllegationFactory(allegation=allegation)
+            PoliceWitnessFactory(allegation=allegation)
+            AttachmentFileFactory(allegation=allegation)
+
+        rows = sorted(self.extract_data(), key=lambda row: row['crid'])
+
+        with override_settings(ES_INDEXING_CHUNK_SIZE=2):
+            indexer = CRIndexer()
+            expect(hasattr(indexer, 'coaccused_dict')).to.be.false()
+            chunked_rows = [indexer.extract_datum(obj) for obj in indexer.get_queryset()]
+
+        expect([row['crid'] for row in chunked_rows]).to.eq(['1001', '1002', '1003', '1004', '1005'])
+        expect(chunked_rows).to.eq(rows)
+        expect(set(indexer.coaccused_dict.keys())).to.eq({'1005'})
+
 
 class CRPartialIndexerTestCase(TestCase):
     def test_get_queryset(self):
@@ -438,6 +500,15 @@ class CRPartialIndexerTestCase(TestCase):
             '456',
         })
 
+    @override_settings(ES_INDEXING_CHUNK_SIZE=2)
+    def test_populate_whole_dicts_when_chunked(self):
+        AllegationFactory(crid='123')
+
+        indexer = CRPartialIndexer(updating_keys=['123'])
+
+        expect(indexer.chunk_size).to.eq(0)
+        expect(indexer.coaccused_dict).to.eq({})
+
     def test_get_batch_querysets(self):
         AllegationFactory(crid='123')
         AllegationFactory(crid='456')
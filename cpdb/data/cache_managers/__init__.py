@@ -1,15 +1,36 @@
+from django.utils import timezone
+
 from activity_grid.cache_managers import activity_pair_card_cache_manager
-from . import allegation_cache_manager, officer_cache_manager, salary_cache_manager
+from data.models import CacheDataRun
+from data.utils.touch import touching_at
+from officers.cache_managers import officer_timeline_cache_manager
+from . import (
+    allegation_cache_manager, coaccusal_cache_manager, officer_cache_manager, officer_pair_allegation_cache_manager,
+    salary_cache_manager
+)
 
 
 managers = [
     allegation_cache_manager,
     officer_cache_manager,
     salary_cache_manager,
-    activity_pair_card_cache_manager
+    coaccusal_cache_manager,
+    officer_pair_allegation_cache_manager,
+    activity_pair_card_cache_manager,
+    officer_timeline_cache_manager
 ]
 
 
-def cache_all():
-    for manager in managers:
-        manager.cache_data()
+def cache_all(incremental=False):
+    """
+    :param incremental: only recompute rows whose source rows were updated since the last run. Deleted source rows
+    and rows moved to another officer or allegation are not detected, run a full cache_data after such changes.
+    Rows whose cached values change are touched with the start time of the run, so update_index has to run after
+    cache_data finishes to pick them up.
+    """
+    started_at = timezone.now()
+    since = CacheDataRun.last_started_at() if incremental else None
+    with touching_at(started_at):
+        for manager in managers:
+            manager.cache_data(since=since)
+    CacheDataRun.objects.create(started_at=started_at, incremental=since is not None)
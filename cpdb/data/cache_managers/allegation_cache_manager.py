@@ -1,41 +1,56 @@
-from django.db.models import OuterRef, Subquery, Count
+from django.db.models import OuterRef, Q, Subquery, Count
 
 from data.models import OfficerAllegation, Allegation
+from data.utils.touch import touching_changed_rows
 
+CACHED_COLUMNS = ['most_common_category_id', 'first_start_date', 'first_end_date', 'coaccused_count']
 
-def cache_data():
-    Allegation.objects.update(
-        most_common_category=Subquery(
-            OfficerAllegation.objects.filter(
-                allegation_id=OuterRef('crid')
-            ).values('allegation_id').annotate(
-                cat_count=Count('allegation_category__id')
-            ).order_by('-cat_count').values('allegation_category__id')[:1]
-        ),
-        first_start_date=Subquery(
-            OfficerAllegation.objects.filter(
-                allegation_id=OuterRef('crid'),
-                start_date__isnull=False
-            ).values('start_date')[:1]
-        ),
-        first_end_date=Subquery(
-            OfficerAllegation.objects.filter(
-                allegation_id=OuterRef('crid'),
-                end_date__isnull=False
-            ).values('end_date')[:1]
-        ),
-        coaccused_count=Subquery(
-            OfficerAllegation.objects.filter(
-                allegation_id=OuterRef('crid'),
-            ).values('allegation_id').annotate(
-                count=Count('id')
-            ).values('count')[:1]
+
+def cache_data(since=None):
+    """
+    Allegations whose cached values change get their updated_at bumped so that incremental indexing picks them up.
+    """
+    allegations = Allegation.objects.all()
+    if since is not None:
+        # Deleted officer allegations leave nothing updated behind, only a full run recomputes their allegation
+        allegations = allegations.filter(
+            Q(updated_at__gt=since) |
+            Q(crid__in=OfficerAllegation.objects.filter(updated_at__gt=since).values('allegation_id'))
+        )
+
+    with touching_changed_rows(allegations, CACHED_COLUMNS):
+        allegations.update(
+            most_common_category=Subquery(
+                OfficerAllegation.objects.filter(
+                    allegation_id=OuterRef('crid')
+                ).values('allegation_id').annotate(
+                    cat_count=Count('allegation_category__id')
+                ).order_by('-cat_count').values('allegation_category__id')[:1]
+            ),
+            first_start_date=Subquery(
+                OfficerAllegation.objects.filter(
+                    allegation_id=OuterRef('crid'),
+                    start_date__isnull=False
+                ).values('start_date')[:1]
+            ),
+            first_end_date=Subquery(
+                OfficerAllegation.objects.filter(
+                    allegation_id=OuterRef('crid'),
+                    end_date__isnull=False
+                ).values('end_date')[:1]
+            ),
+            coaccused_count=Subquery(
+                OfficerAllegation.objects.filter(
+                    allegation_id=OuterRef('crid'),
+                ).values('allegation_id').annotate(
+                    count=Count('id')
+                ).values('count')[:1]
+            )
         )
-    )
 
-    count_columns = [
-        'coaccused_count',
-    ]
+        count_columns = [
+            'coaccused_count',
+        ]
 
-    for column in count_columns:
-        Allegation.objects.filter(**{f'{column}__isnull': True}).update(**{column: 0})
+        for column in count_columns:
+            allegations.filter(**{f'{column}__isnull': True}).update(**{column: 0})
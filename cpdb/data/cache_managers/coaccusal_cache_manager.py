@@ -0,0 +1,117 @@
+from django.db import connection, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from data.models import CacheDataRun, OfficerAllegation, OfficerCoaccusal
+from data.utils.key_range import in_key_range
+
+
+def cache_data(since=None):
+    if since is None or not OfficerCoaccusal.objects.exists():
+        build_coaccusal_matrix()
+    else:
+        build_coaccusal_matrix(officer_ids=changed_officer_ids(since))
+
+
+def changed_officer_ids(since):
+    return list(
+        OfficerAllegation.objects.filter(updated_at__gt=since).values_list('officer_id', flat=True).distinct()
+    )
+
+
+def build_coaccusal_matrix(officer_ids=None):
+    """
+    Count allegations shared by every pair of officers with one self join of officer allegations.
+    :param officer_ids: only rebuild the pairs these officers are part of, rebuild all pairs if it is None
+    """
+    if officer_ids is not None and not officer_ids:
+        return
+
+    table = OfficerCoaccusal._meta.db_table
+    officer_filter = ''
+    if officer_ids is not None:
+        officer_filter = 'AND (A.officer_id = ANY(%(officer_ids)s) OR B.officer_id = ANY(%(officer_ids)s))'
+
+    with transaction.atomic():
+        pairs = OfficerCoaccusal.objects.all()
+        if officer_ids is not None:
+            pairs = pairs.filter(Q(officer_id__in=officer_ids) | Q(coaccused_id__in=officer_ids))
+        pairs.delete()
+
+        with connection.cursor() as cursor:
+            cursor.execute(f"""
+                INSERT INTO {table} (officer_id, coaccused_id, coaccusal_count, created_at)
+                SELECT A.officer_id, B.officer_id, COUNT(DISTINCT A.allegation_id), %(created_at)s
+                FROM data_officerallegation AS A
+                INNER JOIN data_officerallegation AS B ON A.allegation_id = B.allegation_id
+                WHERE A.officer_id <> B.officer_id
+                {officer_filter}
+                GROUP BY A.officer_id, B.officer_id
+            """, {
+                'officer_ids': list(officer_ids) if officer_ids is not None else None,
+                'created_at': timezone.now(),
+            })
+
+
+def is_coaccusal_matrix_stale():
+    # Every cache_data run builds the matrix, pair rows can not tell when it was built as a rebuild may write none
+    built_at = CacheDataRun.last_started_at()
+    if built_at is None:
+        return OfficerAllegation.objects.exists()
+    return OfficerAllegation.objects.filter(updated_at__gt=built_at).exists()
+
+
+def get_coaccusal_dict(officer_id_range=None):
+    """
+    :param officer_id_range: optional (first, last) officer id pair or list of officer ids to only load coaccusals
+    of those officers
+    :return: dict of officer_id: dict of coaccused officer_id: coaccusal count
+    """
+    coaccusal_dict = dict()
+    queryset = in_key_range(OfficerCoaccusal.objects.all(), 'officer_id', officer_id_range)
+    for officer_id, coaccused_id, coaccusal_count in queryset.values_list(
+        'officer_id', 'coaccused_id', 'coaccusal_count'
+    ):
+        coaccusal_dict.setdefault(officer_id, dict())[coaccused_id] = coaccusal_count
+    return coaccusal_dict
+
+
+def compute_coaccusal_dict(officer_id_range=None):
+    """
+    Same result as `get_coaccusal_dict` but counted from officer allegations, the matrix is left as it is.
+    """
+    officer_filter, params = '', {}
+    if isinstance(officer_id_range, list):
+        officer_filter, params = 'AND A.officer_id = ANY(%(officer_ids)s)', {'officer_ids': officer_id_range}
+    elif officer_id_range is not None:
+        officer_filter = 'AND A.officer_id BETWEEN %(first_id)s AND %(last_id)s'
+        params = {'first_id': officer_id_range[0], 'last_id': officer_id_range[1]}
+
+    coaccusal_dict = dict()
+    with connection.cursor() as cursor:
+        cursor.execute(f"""
+            SELECT A.officer_id, B.officer_id, COUNT(DISTINCT A.allegation_id)
+            FROM data_officerallegation AS A
+            INNER JOIN data_officerallegation AS B ON A.allegation_id = B.allegation_id
+            WHERE A.officer_id <> B.officer_id
+            {officer_filter}
+            GROUP BY A.officer_id, B.officer_id
+        """, params)
+        for officer_id, coaccused_id, coaccusal_count in cursor.fetchall():
+            coaccusal_dict.setdefault(officer_id, dict())[coaccused_id] = coaccusal_count
+    return coaccusal_dict
+
+
+def top_coaccusals(officer_id, limit=None):
+    """
+    :return: list of (coaccused officer_id, coaccusal count) ordered by count descending
+    """
+    queryset = OfficerCoaccusal.objects.filter(officer_id=officer_id).order_by('-coaccusal_count', 'coaccused_id')
+    if limit is not None:
+        queryset = queryset[:limit]
+    return list(queryset.values_list('coaccused_id', 'coaccusal_count'))
+
+
+def pair_count(officer_id, coaccused_id):
+    pair = OfficerCoaccusal.objects.filter(officer_id=officer_id, coaccused_id=coaccused_id).first()
+    return pair.coaccusal_count if pair else 0
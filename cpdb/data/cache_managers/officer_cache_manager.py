@@ -1,6 +1,7 @@
-from django.db import connection
+from django.db import connection, transaction
 from django.db.models import OuterRef, Subquery, Count, Exists
 from django.db.models.functions import Lower
+from django.utils import timezone
 from tqdm import tqdm
 
 from data.constants import (
@@ -9,19 +10,40 @@ from data.constants import (
 )
 
 from data.models import (
-    Officer, OfficerAllegation, Award,
+    CacheDataRun, Officer, Allegation, OfficerAllegation, Award,
     OfficerBadgeNumber, OfficerHistory, Salary,
     OfficerYearlyPercentile
 )
 from trr.models import TRR
 from data import officer_percentile
+from data.utils.key_range import in_key_range
+from data.utils.touch import touch, touch_time, touching_changed_rows
 from utils.bulk_db import build_bulk_update_sql
 
 
-def cache_data():
-    build_cached_yearly_percentiles()
-    build_cached_percentiles()
-    build_cached_columns()
+def cache_data(since=None):
+    """
+    Officers whose cached values change get their updated_at bumped so that incremental indexing picks them up.
+    """
+    if since is None or sources_changed(YEARLY_PERCENTILE_SOURCE_MODELS, since):
+        previous_yearly_percentiles = load_yearly_percentiles()
+        build_cached_yearly_percentiles()
+        touch_officers_with_changed_yearly_percentiles(previous_yearly_percentiles)
+
+    # The latest year percentiles move on to the new year even without source changes
+    if since is None or since.year != timezone.now().year or sources_changed(PERCENTILE_SOURCE_MODELS, since):
+        with touching_changed_rows(Officer.objects.all(), PERCENTILE_COLUMNS):
+            build_cached_percentiles()
+
+    officers = Officer.objects.all()
+    officer_ids = None
+    if since is not None:
+        officer_ids = changed_officer_ids(since)
+        officers = officers.filter(id__in=officer_ids)
+    with touching_changed_rows(officers, CACHED_COLUMNS):
+        build_cached_columns_set_based(officer_ids=officer_ids)
+    if since is not None:
+        build_cached_unique_names()
 
 
 def _allegation_count_subquery(**kwargs):
@@ -46,8 +68,36 @@ def _award_count_subquery(**kwargs):
     )
 
 
-def build_cached_columns():
-    Officer.objects.update(
+CACHED_COLUMNS_SOURCE_MODELS = [OfficerAllegation, Award, TRR, Salary, OfficerHistory, OfficerBadgeNumber]
+
+
+def changed_officer_ids(since):
+    """
+    Officers of rows updated since the last run. Deleted rows and the previous officer of a row moved to another
+    officer leave nothing updated behind, they are only picked up by a full run.
+    """
+    officer_ids = set(Officer.objects.filter(updated_at__gt=since).values_list('id', flat=True))
+    for model in CACHED_COLUMNS_SOURCE_MODELS:
+        officer_ids.update(
+            model.objects.filter(
+                updated_at__gt=since,
+                officer_id__isnull=False
+            ).values_list('officer_id', flat=True)
+        )
+    return officer_ids
+
+
+def build_cached_columns(officer_ids=None):
+    """
+    :param officer_ids: only update these officers, update all officers if it is None
+    """
+    officers = Officer.objects.all()
+    if officer_ids is not None:
+        if not officer_ids:
+            return
+        officers = officers.filter(id__in=officer_ids)
+
+    officers.update(
         allegation_count=_allegation_count_subquery(),
         sustained_count=_allegation_count_subquery(final_finding='SU'),
         unsustained_count=_allegation_count_subquery(final_finding='NS'),
@@ -108,10 +158,159 @@ def build_cached_columns():
     ]
 
     for column in count_columns:
-        Officer.objects.filter(**{f'{column}__isnull': True}).update(**{column: 0})
+        officers.filter(**{f'{column}__isnull': True}).update(**{column: 0})
 
 
-def build_cached_yearly_percentiles():
+CACHED_COLUMNS_STAGING_TABLE = 'officer_cached_columns_staging'
+CACHED_COLUMNS = [
+    'allegation_count',
+    'sustained_count',
+    'unsustained_count',
+    'discipline_count',
+    'honorable_mention_count',
+    'civilian_compliment_count',
+    'major_award_count',
+    'trr_count',
+    'current_badge',
+    'last_unit_id',
+    'current_salary',
+    'has_unique_name',
+]
+
+
+def _cached_columns_staging_query(officer_ids=None):
+    # CTEs are not inlined by Postgres, officer_ids has to filter each of them to not aggregate whole tables
+    officer_filter, source_filter, source_and_filter = '', '', ''
+    if officer_ids is not None:
+        officer_filter = 'WHERE officer.id = ANY(%(officer_ids)s)'
+        source_filter = 'WHERE officer_id = ANY(%(officer_ids)s)'
+        source_and_filter = 'AND officer_id = ANY(%(officer_ids)s)'
+    return f"""
+        CREATE TEMPORARY TABLE {CACHED_COLUMNS_STAGING_TABLE} ON COMMIT DROP AS
+        WITH allegation_counts AS (
+            SELECT
+                officer_id,
+                COUNT(DISTINCT allegation_id) AS allegation_count,
+                COUNT(DISTINCT allegation_id) FILTER (WHERE final_finding = 'SU') AS sustained_count,
+                COUNT(DISTINCT allegation_id) FILTER (WHERE final_finding = 'NS') AS unsustained_count,
+                COUNT(DISTINCT allegation_id) FILTER (WHERE disciplined IS TRUE) AS discipline_count
+            FROM data_officerallegation
+            {source_filter}
+            GROUP BY officer_id
+        ), award_counts AS (
+            SELECT
+                officer_id,
+                COUNT(*) FILTER (WHERE award_type LIKE %(honorable_mention)s) AS honorable_mention_count,
+                COUNT(*) FILTER (WHERE award_type = %(civilian_compliment)s) AS civilian_compliment_count,
+                COUNT(*) FILTER (WHERE LOWER(award_type) = ANY(%(major_awards)s)) AS major_award_count
+            FROM data_award
+            {source_filter}
+            GROUP BY officer_id
+        ), trr_counts AS (
+            SELECT officer_id, COUNT(*) AS trr_count
+            FROM trr_trr
+            {source_filter}
+            GROUP BY officer_id
+        ), current_badges AS (
+            SELECT DISTINCT ON (officer_id) officer_id, star
+            FROM data_officerbadgenumber
+            WHERE current IS TRUE {source_and_filter}
+            ORDER BY officer_id, id
+        ), last_units AS (
+            SELECT DISTINCT ON (officer_id) officer_id, unit_id
+            FROM data_officerhistory
+            {source_filter}
+            ORDER BY officer_id, end_date DESC
+        ), current_salaries AS (
+            SELECT DISTINCT ON (officer_id) officer_id, salary
+            FROM data_salary
+            {source_filter}
+            ORDER BY officer_id, year DESC
+        ), name_counts AS (
+            SELECT first_name, last_name, COUNT(*) AS name_count
+            FROM data_officer
+            GROUP BY first_name, last_name
+        )
+        SELECT
+            officer.id AS officer_id,
+            COALESCE(allegation_counts.allegation_count, 0) AS allegation_count,
+            COALESCE(allegation_counts.sustained_count, 0) AS sustained_count,
+            COALESCE(allegation_counts.unsustained_count, 0) AS unsustained_count,
+            COALESCE(allegation_counts.discipline_count, 0) AS discipline_count,
+            COALESCE(award_counts.honorable_mention_count, 0) AS honorable_mention_count,
+            COALESCE(award_counts.civilian_compliment_count, 0) AS civilian_compliment_count,
+            COALESCE(award_counts.major_award_count, 0) AS major_award_count,
+            COALESCE(trr_counts.trr_count, 0) AS trr_count,
+            current_badges.star AS current_badge,
+            last_units.unit_id AS last_unit_id,
+            current_salaries.salary AS current_salary,
+            name_counts.name_count = 1 AS has_unique_name
+        FROM data_officer AS officer
+        LEFT JOIN allegation_counts ON allegation_counts.officer_id = officer.id
+        LEFT JOIN award_counts ON award_counts.officer_id = officer.id
+        LEFT JOIN trr_counts ON trr_counts.officer_id = officer.id
+        LEFT JOIN current_badges ON current_badges.officer_id = officer.id
+        LEFT JOIN last_units ON last_units.officer_id = officer.id
+        LEFT JOIN current_salaries ON current_salaries.officer_id = officer.id
+        LEFT JOIN name_counts
+            ON name_counts.first_name = officer.first_name AND name_counts.last_name = officer.last_name
+        {officer_filter}
+    """
+
+
+def build_cached_columns_set_based(officer_ids=None):
+    """
+    Same result as `build_cached_columns` but every column is aggregated once with GROUP BY into a staging table
+    instead of running correlated subqueries per officer. Officers are then updated with a single UPDATE ... FROM
+    in the same transaction so reads never see half updated columns.
+    :param officer_ids: only update these officers, update all officers if it is None
+    """
+    if officer_ids is not None and not officer_ids:
+        return
+
+    params = {
+        'honorable_mention': '%Honorable Mention%',
+        'civilian_compliment': 'Complimentary Letter',
+        'major_awards': MAJOR_AWARDS,
+        'officer_ids': list(officer_ids) if officer_ids is not None else None,
+    }
+    column_assignment = ', '.join(f'{column} = staging.{column}' for column in CACHED_COLUMNS)
+
+    with transaction.atomic():
+        with connection.cursor() as cursor:
+            cursor.execute(f'DROP TABLE IF EXISTS {CACHED_COLUMNS_STAGING_TABLE}')
+            cursor.execute(_cached_columns_staging_query(officer_ids), params)
+            cursor.execute(f"""
+                UPDATE {Officer._meta.db_table} SET {column_assignment}
+                FROM {CACHED_COLUMNS_STAGING_TABLE} AS staging
+                WHERE {Officer._meta.db_table}.id = staging.officer_id
+            """)
+
+
+def build_cached_unique_names():
+    """
+    has_unique_name depends on every other officer: renaming an officer also changes the flag of its former
+    namesakes, whose rows did not change. It is recomputed for all officers in one pass, only officers whose flag
+    changes are written and get their updated_at bumped.
+    """
+    table = Officer._meta.db_table
+    with connection.cursor() as cursor:
+        cursor.execute(f"""
+            UPDATE {table} SET has_unique_name = name_counts.name_count = 1, updated_at = %(now)s
+            FROM (
+                SELECT first_name, last_name, COUNT(*) AS name_count
+                FROM {table}
+                GROUP BY first_name, last_name
+            ) AS name_counts
+            WHERE {table}.first_name = name_counts.first_name AND {table}.last_name = name_counts.last_name
+            AND {table}.has_unique_name IS DISTINCT FROM (name_counts.name_count = 1)
+        """, {'now': touch_time()})
+
+
+def compute_yearly_percentile_rows():
+    """
+    :return: unsaved OfficerYearlyPercentile of every officer and year, computed from the source tables
+    """
     percentile_groups = [
         PERCENTILE_ALLEGATION_GROUP,
         PERCENTILE_ALLEGATION_INTERNAL_CIVILIAN_GROUP,
@@ -121,26 +320,119 @@ def build_cached_yearly_percentiles():
     def _not_retired(officer):
         return not officer.resignation_date or officer.year <= officer.resignation_date.year
 
+    yearly_percentiles = officer_percentile.yearly_top_percentile(
+        range(MIN_VISUAL_TOKEN_YEAR, MAX_VISUAL_TOKEN_YEAR + 1), percentile_groups=percentile_groups
+    )
     results = []
-    for yr in tqdm(range(MIN_VISUAL_TOKEN_YEAR, MAX_VISUAL_TOKEN_YEAR + 1), desc='Prepare percentile data'):
-        officers = officer_percentile.top_percentile(yr, percentile_groups=percentile_groups)
+    for officers in yearly_percentiles.values():
         results.extend(filter(_not_retired, officers))
 
-    cursor = connection.cursor()
-    cursor.execute(f'TRUNCATE TABLE {OfficerYearlyPercentile._meta.db_table}')
-
-    OfficerYearlyPercentile.objects.bulk_create(
+    return [
         OfficerYearlyPercentile(
-            officer=result,
+            officer_id=result.id,
             year=result.year,
             percentile_trr=getattr(result, 'percentile_trr', None),
             percentile_allegation=getattr(result, 'percentile_allegation', None),
             percentile_allegation_civilian=getattr(result, 'percentile_allegation_civilian', None),
             percentile_allegation_internal=getattr(result, 'percentile_allegation_internal', None),
         ) for result in results
+    ]
+
+
+def build_cached_yearly_percentiles():
+    rows = compute_yearly_percentile_rows()
+
+    cursor = connection.cursor()
+    cursor.execute(f'TRUNCATE TABLE {OfficerYearlyPercentile._meta.db_table}')
+
+    OfficerYearlyPercentile.objects.bulk_create(rows)
+
+
+YEARLY_PERCENTILE_FIELDS = [
+    'percentile_trr',
+    'percentile_allegation',
+    'percentile_allegation_civilian',
+    'percentile_allegation_internal',
+]
+YEARLY_PERCENTILE_SOURCE_MODELS = [Officer, Allegation, OfficerAllegation, TRR]
+PERCENTILE_SOURCE_MODELS = YEARLY_PERCENTILE_SOURCE_MODELS + [Award]
+
+
+def sources_changed(models, since):
+    # Percentiles rank every officer against the others, any change is enough to recompute all of them
+    return any(
+        model.objects.filter(updated_at__gt=since).exists()
+        for model in models
     )
 
 
+def is_yearly_percentiles_stale():
+    """
+    cache_data rebuilds the table when its sources changed since the previous run, the table matches the sources
+    as they were at the start of the last run. Rows touched by that run are dated to its start.
+    """
+    built_at = CacheDataRun.last_started_at()
+    if built_at is None:
+        return True
+    return sources_changed(YEARLY_PERCENTILE_SOURCE_MODELS, built_at)
+
+
+def _yearly_percentile_dict(rows):
+    results = dict()
+    for row in rows:
+        percentile_dict = {
+            'id': row['officer_id'],
+            'year': row['year']
+        }
+        for field in YEARLY_PERCENTILE_FIELDS:
+            if row[field] is not None:
+                percentile_dict[field] = f'{row[field]:.4f}'
+        results.setdefault(row['officer_id'], []).append(percentile_dict)
+    return results
+
+
+def load_yearly_percentiles(officer_id_range=None):
+    """
+    Read the table built by cache_data as it is.
+    :param officer_id_range: optional (first, last) officer id pair or list of officer ids to only load percentiles
+    of those officers
+    :return: dict of officer_id: list of yearly percentile dicts, ordered by year
+    """
+    queryset = in_key_range(OfficerYearlyPercentile.objects.all(), 'officer_id', officer_id_range)
+    return _yearly_percentile_dict(queryset.order_by('officer_id', 'year').values(
+        'officer_id', 'year', *YEARLY_PERCENTILE_FIELDS
+    ))
+
+
+def compute_yearly_percentiles():
+    """
+    Same result as `load_yearly_percentiles` but computed from the source tables, the table is left as it is.
+    """
+    rows = sorted(compute_yearly_percentile_rows(), key=lambda row: (row.officer_id, row.year))
+    return _yearly_percentile_dict(
+        {field: getattr(row, field) for field in ['officer_id', 'year', *YEARLY_PERCENTILE_FIELDS]} for row in rows
+    )
+
+
+def touch_officers_with_changed_yearly_percentiles(previous_yearly_percentiles):
+    yearly_percentiles = load_yearly_percentiles()
+    officer_ids = [
+        officer_id for officer_id in set(previous_yearly_percentiles) | set(yearly_percentiles)
+        if previous_yearly_percentiles.get(officer_id) != yearly_percentiles.get(officer_id)
+    ]
+    if officer_ids:
+        touch(Officer.objects.filter(id__in=officer_ids))
+
+
+PERCENTILE_COLUMNS = [
+    'complaint_percentile',
+    'civilian_allegation_percentile',
+    'internal_allegation_percentile',
+    'trr_percentile',
+    'honorable_mention_percentile',
+]
+
+
 def build_cached_percentiles():
     percentile_values = officer_percentile.latest_year_percentile()
 
@@ -162,18 +454,10 @@ def build_cached_percentiles():
             'honorable_mention_percentile': getattr(officer, 'percentile_honorable_mention', None),
         } for officer in percentile_values]
 
-        update_fields = [
-            'complaint_percentile',
-            'civilian_allegation_percentile',
-            'internal_allegation_percentile',
-            'trr_percentile',
-            'honorable_mention_percentile'
-        ]
-
         cursor = connection.cursor()
 
         batch_size = 100
         for i in tqdm(range(0, len(data), batch_size)):
             batch_data = data[i:i + batch_size]
-            update_command = build_bulk_update_sql(Officer._meta.db_table, 'id', update_fields, batch_data)
+            update_command = build_bulk_update_sql(Officer._meta.db_table, 'id', PERCENTILE_COLUMNS, batch_data)
             cursor.execute(update_command)
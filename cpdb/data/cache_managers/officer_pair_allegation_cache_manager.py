@@ -0,0 +1,51 @@
+from django.db import connection, transaction
+
+from data.models import Allegation, OfficerAllegation, OfficerPairAllegation
+
+
+def cache_data(since=None):
+    if since is None or not OfficerPairAllegation.objects.exists():
+        build_officer_pair_allegations()
+    else:
+        build_officer_pair_allegations(allegation_ids=changed_allegation_ids(since))
+
+
+def changed_allegation_ids(since):
+    allegation_ids = set(
+        OfficerAllegation.objects.filter(updated_at__gt=since).values_list('allegation_id', flat=True)
+    )
+    allegation_ids.update(Allegation.objects.filter(updated_at__gt=since).values_list('crid', flat=True))
+    return list(allegation_ids)
+
+
+def build_officer_pair_allegations(allegation_ids=None):
+    """
+    Materialize one edge per allegation shared by two officers so social graph queries are index range scans.
+    :param allegation_ids: only rebuild edges of these allegations, rebuild all edges if it is None
+    """
+    if allegation_ids is not None and not allegation_ids:
+        return
+
+    allegation_filter = ''
+    if allegation_ids is not None:
+        allegation_filter = 'AND A.allegation_id = ANY(%(allegation_ids)s)'
+
+    with transaction.atomic():
+        edges = OfficerPairAllegation.objects.all()
+        if allegation_ids is not None:
+            edges = edges.filter(allegation_id__in=allegation_ids)
+        edges.delete()
+
+        with connection.cursor() as cursor:
+            cursor.execute(f"""
+                INSERT INTO {OfficerPairAllegation._meta.db_table}
+                    (officer1_id, officer2_id, allegation_id, incident_date, is_officer_complaint)
+                SELECT DISTINCT A.officer_id, B.officer_id, A.allegation_id,
+                    data_allegation.incident_date, data_allegation.is_officer_complaint
+                FROM data_officerallegation AS A
+                INNER JOIN data_officerallegation AS B ON A.allegation_id = B.allegation_id
+                INNER JOIN data_allegation ON data_allegation.crid = A.allegation_id
+                WHERE A.officer_id < B.officer_id
+                AND data_allegation.incident_date IS NOT NULL
+                {allegation_filter}
+            """, {'allegation_ids': list(allegation_ids) if allegation_ids is not None else None})
@@ -12,7 +12,8 @@ from faker import Faker
 from data.models import (
     Area, Investigator, LineArea, Officer, OfficerBadgeNumber, PoliceUnit, Allegation, OfficerAllegation,
     Complainant, OfficerHistory, AllegationCategory, Involvement, AttachmentFile, AttachmentRequest, Victim,
-    PoliceWitness, InvestigatorAllegation, RacePopulation, Award, Salary, OfficerYearlyPercentile, OfficerAlias
+    PoliceWitness, InvestigatorAllegation, RacePopulation, Award, Salary, OfficerYearlyPercentile, OfficerAlias,
+    CacheDataRun
 )
 from data.constants import ACTIVE_CHOICES
 
@@ -273,3 +274,10 @@ class OfficerAliasFactory(factory.django.DjangoModelFactory):
         model = OfficerAlias
 
     new_officer = factory.SubFactory(OfficerFactory)
+
+
+class CacheDataRunFactory(factory.django.DjangoModelFactory):
+    class Meta:
+        model = CacheDataRun
+
+    started_at = factory.LazyFunction(lambda: fake.date_time_this_decade(tzinfo=pytz.utc))
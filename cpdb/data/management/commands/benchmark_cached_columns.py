@@ -0,0 +1,100 @@
+import random
+import time
+from datetime import date
+
+from django.core.management import BaseCommand
+from django.db import transaction
+
+from data.cache_managers import officer_cache_manager
+from data.constants import MAJOR_AWARDS
+from data.models import (
+    Officer, Allegation, OfficerAllegation, Award, OfficerBadgeNumber, OfficerHistory, PoliceUnit, Salary
+)
+from trr.models import TRR
+
+FIRST_NAMES = ['James', 'John', 'Robert', 'Michael', 'William', 'David', 'Mary', 'Patricia', 'Linda', 'Barbara']
+LAST_NAMES = ['Smith', 'Johnson', 'Williams', 'Brown', 'Jones', 'Miller', 'Davis', 'Garcia', 'Wilson', 'Moore']
+AWARD_TYPES = ['Honorable Mention', 'Complimentary Letter', 'Department Commendation'] + MAJOR_AWARDS
+FINDINGS = ['SU', 'NS', 'UN', 'EX']
+
+
+class Command(BaseCommand):
+    help = 'Compare building officer cached columns with correlated subqueries and with set based queries ' \
+           'on a generated dataset. Everything is rolled back at the end.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--officers', dest='officers', type=int, default=5000)
+        parser.add_argument('--rows-per-officer', dest='rows_per_officer', type=int, default=10)
+        parser.add_argument('--seed', dest='seed', type=int, default=0)
+
+    def generate_dataset(self, num_officers, rows_per_officer):
+        units = PoliceUnit.objects.bulk_create(
+            PoliceUnit(unit_name=f'BM{i:03d}') for i in range(50)
+        )
+        officers = Officer.objects.bulk_create(
+            Officer(first_name=random.choice(FIRST_NAMES), last_name=random.choice(LAST_NAMES))
+            for _ in range(num_officers)
+        )
+        allegations = Allegation.objects.bulk_create(
+            Allegation(crid=f'BM{i}') for i in range(num_officers * rows_per_officer // 2)
+        )
+
+        officer_allegations, awards, trrs, salaries, histories, badges = [], [], [], [], [], []
+        for officer in officers:
+            num_rows = random.randint(0, rows_per_officer)
+            for _ in range(num_rows):
+                officer_allegations.append(OfficerAllegation(
+                    officer=officer,
+                    allegation=random.choice(allegations),
+                    final_finding=random.choice(FINDINGS),
+                    disciplined=random.choice([True, False, None])
+                ))
+                awards.append(Award(officer=officer, award_type=random.choice(AWARD_TYPES)))
+                trrs.append(TRR(officer=officer))
+            for year in range(2000, 2000 + num_rows):
+                salaries.append(Salary(
+                    officer=officer, year=year, salary=random.randint(40000, 120000),
+                    pay_grade='D|1', employee_status='Full Time'
+                ))
+                histories.append(OfficerHistory(
+                    officer=officer, unit=random.choice(units), end_date=date(year, 12, 31)
+                ))
+            badges.append(OfficerBadgeNumber(officer=officer, star=str(random.randint(1, 99999)), current=True))
+
+        for model, objects in [
+            (OfficerAllegation, officer_allegations), (Award, awards), (TRR, trrs), (Salary, salaries),
+            (OfficerHistory, histories), (OfficerBadgeNumber, badges)
+        ]:
+            model.objects.bulk_create(objects, batch_size=5000)
+            self.stdout.write(f'Generated {len(objects)} {model.__name__}')
+
+    def measure(self, build_cached_columns):
+        reset_values = {column: None for column in officer_cache_manager.CACHED_COLUMNS}
+        reset_values['has_unique_name'] = False
+        Officer.objects.update(**reset_values)
+        start_time = time.time()
+        build_cached_columns()
+        return time.time() - start_time
+
+    def cached_values(self):
+        return list(Officer.objects.order_by('id').values_list('id', *officer_cache_manager.CACHED_COLUMNS))
+
+    def handle(self, *args, **options):
+        random.seed(options['seed'])
+
+        with transaction.atomic():
+            self.generate_dataset(options['officers'], options['rows_per_officer'])
+
+            subquery_time = self.measure(officer_cache_manager.build_cached_columns)
+            subquery_values = self.cached_values()
+            set_based_time = self.measure(officer_cache_manager.build_cached_columns_set_based)
+            set_based_values = self.cached_values()
+
+            transaction.set_rollback(True)
+
+        self.stdout.write(f'Correlated subqueries: {subquery_time:.3f} seconds')
+        self.stdout.write(f'Set based: {set_based_time:.3f} seconds')
+        if subquery_values == set_based_values:
+            self.stdout.write('Both strategies give the same cached columns')
+        else:
+            self.stderr.write('Cached columns are different between strategies')
@@ -5,7 +5,11 @@ from data import cache_managers
 
 
 class Command(BaseCommand):
-    def handle(self, *args, **kwargs):
+    def add_arguments(self, parser):
+        parser.add_argument('--incremental', dest='incremental', action='store_true')
+        parser.set_defaults(incremental=False)
+
+    def handle(self, *args, **options):
         start_time = time.time()
-        cache_managers.cache_all()
+        cache_managers.cache_all(incremental=options['incremental'])
         self.stdout.write(f'Finished on --- {time.time() - start_time} seconds ---')
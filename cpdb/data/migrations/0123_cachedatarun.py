@@ -0,0 +1,26 @@
+# Generated by Django 2.2.10 on 2020-04-06 03:27
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('data', '0121_allow_tags_to_be_blanked'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CacheDataRun',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('started_at', models.DateTimeField()),
+                ('incremental', models.BooleanField(default=False)),
+            ],
+            options={
+                'abstract': False,
+            },
+        ),
+    ]
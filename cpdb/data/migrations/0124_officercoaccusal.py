@@ -0,0 +1,27 @@
+# Generated by Django 2.2.10 on 2020-04-08 02:14
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('data', '0123_cachedatarun'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OfficerCoaccusal',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('coaccusal_count', models.IntegerField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('coaccused', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='data.Officer')),
+                ('officer', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='coaccusal_counts', to='data.Officer')),
+            ],
+            options={
+                'unique_together': {('officer', 'coaccused')},
+            },
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 2.2.10 on 2020-04-09 04:31
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('data', '0124_officercoaccusal'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OfficerPairAllegation',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('incident_date', models.DateTimeField()),
+                ('is_officer_complaint', models.BooleanField()),
+                ('allegation', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='data.Allegation')),
+                ('officer1', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='data.Officer')),
+                ('officer2', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='data.Officer')),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='officerpairallegation',
+            index=models.Index(fields=['officer1', 'officer2', 'incident_date'], name='pair_allegation_officer1_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='officerpairallegation',
+            index=models.Index(fields=['officer2', 'officer1', 'incident_date'], name='pair_allegation_officer2_idx'),
+        ),
+    ]
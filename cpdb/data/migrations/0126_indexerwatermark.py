@@ -0,0 +1,26 @@
+# Generated by Django 2.2.10 on 2020-04-16 03:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('data', '0125_officerpairallegation'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='IndexerWatermark',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('indexer', models.CharField(max_length=255, unique=True)),
+                ('indexed_at', models.DateTimeField()),
+            ],
+            options={
+                'abstract': False,
+            },
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 2.2.10 on 2020-04-20 08:41
+
+import django.contrib.postgres.fields.jsonb
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('data', '0126_indexerwatermark'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OfficerTimeline',
+            fields=[
+                ('officer', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='+', serialize=False, to='data.Officer')),
+                ('items', django.contrib.postgres.fields.jsonb.JSONField()),
+                ('mobile_items', django.contrib.postgres.fields.jsonb.JSONField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+    ]
@@ -4,7 +4,9 @@ from .area import Area
 from .attachment_file import AttachmentFile
 from .attachment_request import AttachmentRequest
 from .award import Award
+from .cache_data_run import CacheDataRun
 from .complainant import Complainant
+from .indexer_watermark import IndexerWatermark
 from .investigator import Investigator
 from .investigator_allegation import InvestigatorAllegation
 from .involvement import Involvement
@@ -13,7 +15,10 @@ from .officer import Officer
 from .officer_alias import OfficerAlias
 from .officer_allegation import OfficerAllegation
 from .officer_badge_number import OfficerBadgeNumber
+from .officer_coaccusal import OfficerCoaccusal
 from .officer_history import OfficerHistory
+from .officer_pair_allegation import OfficerPairAllegation
+from .officer_timeline import OfficerTimeline
 from .officer_yearly_percentile import OfficerYearlyPercentile
 from .police_unit import PoliceUnit
 from .police_witness import PoliceWitness
@@ -22,8 +27,9 @@ from .salary import Salary
 from .victim import Victim
 
 __all__ = [
-    'Allegation', 'AllegationCategory', 'Area', 'AttachmentFile', 'AttachmentRequest', 'Award', 'Complainant',
-    'Investigator', 'InvestigatorAllegation', 'Involvement', 'LineArea', 'Officer', 'OfficerAlias', 'OfficerAllegation',
-    'OfficerBadgeNumber', 'OfficerHistory', 'OfficerYearlyPercentile', 'PoliceUnit', 'PoliceWitness', 'RacePopulation',
-    'Salary', 'Victim'
+    'Allegation', 'AllegationCategory', 'Area', 'AttachmentFile', 'AttachmentRequest', 'Award', 'CacheDataRun',
+    'Complainant', 'IndexerWatermark', 'Investigator', 'InvestigatorAllegation', 'Involvement', 'LineArea', 'Officer',
+    'OfficerAlias', 'OfficerAllegation', 'OfficerBadgeNumber', 'OfficerCoaccusal', 'OfficerHistory',
+    'OfficerPairAllegation', 'OfficerTimeline', 'OfficerYearlyPercentile', 'PoliceUnit', 'PoliceWitness',
+    'RacePopulation', 'Salary', 'Victim'
 ]
@@ -0,0 +1,18 @@
+from django.contrib.gis.db import models
+
+from .common import TimeStampsModel
+
+
+class CacheDataRun(TimeStampsModel):
+    started_at = models.DateTimeField()
+    incremental = models.BooleanField(default=False)
+
+    @classmethod
+    def last_started_at(cls):
+        last_run = cls.objects.order_by('-started_at').first()
+        return last_run.started_at if last_run else None
+
+    @classmethod
+    def data_version(cls):
+        last_run = cls.objects.order_by('-id').values_list('id', flat=True).first()
+        return last_run or 0
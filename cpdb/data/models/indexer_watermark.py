@@ -0,0 +1,17 @@
+from django.contrib.gis.db import models
+
+from .common import TimeStampsModel
+
+
+class IndexerWatermark(TimeStampsModel):
+    indexer = models.CharField(max_length=255, unique=True)
+    indexed_at = models.DateTimeField()
+
+    @classmethod
+    def last_indexed_at(cls, indexer_klass):
+        watermark = cls.objects.filter(indexer=indexer_klass.__name__).first()
+        return watermark.indexed_at if watermark else None
+
+    @classmethod
+    def mark(cls, indexer_klass, indexed_at):
+        cls.objects.update_or_create(indexer=indexer_klass.__name__, defaults={'indexed_at': indexed_at})
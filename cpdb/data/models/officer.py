@@ -1,14 +1,13 @@
 import json
 from datetime import datetime
-from itertools import groupby
 
 import botocore
 from django.apps import apps
 from django.conf import settings
 from django.contrib.gis.db import models
-from django.db.models import Q, Count
-from django.db.models.functions import ExtractYear
+from django.db.models import F, Q
 from django.utils import timezone
+from django.utils.functional import cached_property
 from django.utils.text import slugify
 from django_bulk_update.manager import BulkUpdateManager
 
@@ -23,7 +22,7 @@ from data.constants import (
 from shared.aws import aws
 from xlsx.constants import XLSX_FILE_NAMES
 from .common import TaggableModel
-from data.utils.aggregation import get_num_range_case
+from data.utils.aggregation import officer_aggregations
 from data.utils.interpolate import ScaleThreshold
 from data.validators import validate_race
 from .common import TimeStampsModel
@@ -125,137 +124,35 @@ class Officer(TimeStampsModel, TaggableModel):
         except IndexError:
             return None
 
-    @staticmethod
-    def _group_and_sort_aggregations(data, key_name='name'):
-        """
-        Helper to group by name, aggregate count & sustained_counts.
-        Also makes sure 'Unknown' group is always the last item.
-        """
-        groups = []
-        unknown_group = None
-        for k, g in groupby(data, lambda x: x[key_name]):
-            group = {'name': k, 'count': 0, 'sustained_count': 0, 'items': []}
-            unknown_year = None
-            for item in g:
-                if item['year']:
-                    group['items'].append(item)
-                    group['count'] += item['count']
-                    group['sustained_count'] += item['sustained_count']
-                else:
-                    unknown_year = item
-            if unknown_year:
-                group['count'] += item['count']
-                group['sustained_count'] += item['sustained_count']
-            if k != 'Unknown':
-                groups.append(group)
-            else:
-                unknown_group = group
-
-        if unknown_group is not None:
-            groups.append(unknown_group)
-        return groups
+    @cached_property
+    def complaint_aggregations(self):
+        return officer_aggregations([self.id])[self.id]
 
     @property
     def complaint_category_aggregation(self):
-        query = self.officerallegation_set.all()
-        query = query.annotate(
-            name=models.Case(
-                models.When(
-                    allegation_category__category__isnull=True, then=models.Value('Unknown')),
-                default='allegation_category__category',
-                output_field=models.CharField()),
-            year=ExtractYear('start_date'))
-        query = query.values('name', 'year').order_by('name', 'year').annotate(
-            count=models.Count('name'),
-            sustained_count=models.Sum(models.Case(
-                models.When(final_finding='SU', then=1), default=models.Value(0),
-                output_field=models.IntegerField())))
-
-        return Officer._group_and_sort_aggregations(list(query))
+        return self.complaint_aggregations['category']
 
     @property
     def complainant_race_aggregation(self):
-        query = self.officerallegation_set.all()
-        query = query.annotate(
-            name=models.Case(
-                models.When(allegation__complainant__isnull=True, then=models.Value('Unknown')),
-                models.When(allegation__complainant__race__in=['n/a', 'n/a ', 'nan', ''], then=models.Value('Unknown')),
-                default='allegation__complainant__race',
-                output_field=models.CharField()
-            ),
-            year=ExtractYear('start_date'),
-        )
-        query = query.values('name', 'year').order_by('name', 'year').annotate(
-            count=models.Count('name'),
-            sustained_count=models.Sum(
-                models.Case(
-                    models.When(final_finding='SU', then=1),
-                    default=models.Value(0),
-                    output_field=models.IntegerField()
-                )
-            )
-        )
-        return Officer._group_and_sort_aggregations(list(query))
+        return self.complaint_aggregations['race']
 
     @property
     def complainant_age_aggregation(self):
-        query = self.officerallegation_set.all()
-        query = query.annotate(
-            name=get_num_range_case('allegation__complainant__age', [0, 20, 30, 40, 50]),
-            year=ExtractYear('start_date')
-        )
-        query = query.values('name', 'year').order_by('name', 'year').annotate(
-            count=models.Count('name'),
-            sustained_count=models.Sum(
-                models.Case(
-                    models.When(final_finding='SU', then=1),
-                    default=models.Value(0),
-                    output_field=models.IntegerField()
-                )
-            )
-        )
-        return Officer._group_and_sort_aggregations(list(query))
+        return self.complaint_aggregations['age']
 
     @property
     def complainant_gender_aggregation(self):
-
-        query = self.officerallegation_set.all()
-        query = query.values('allegation__complainant__gender').annotate(
-            complainant_gender=models.Case(
-                models.When(allegation__complainant__gender='', then=models.Value('Unknown')),
-                models.When(allegation__complainant__isnull=True, then=models.Value('Unknown')),
-                default='allegation__complainant__gender',
-                output_field=models.CharField()
-            ),
-            year=ExtractYear('start_date')
-        )
-        query = query.values('complainant_gender', 'year').order_by('complainant_gender', 'year').annotate(
-            count=models.Count('complainant_gender'),
-            sustained_count=models.Sum(
-                models.Case(
-                    models.When(final_finding='SU', then=1),
-                    default=models.Value(0),
-                    output_field=models.IntegerField()
-                )
-            )
-        )
-
-        data = [
-            {
-                'name': GENDER_DICT.get(obj['complainant_gender'], 'Unknown'),
-                'sustained_count': obj['sustained_count'],
-                'count': obj['count'],
-                'year': obj['year']
-            }
-            for obj in query if obj['count'] > 0
-        ]
-        return Officer._group_and_sort_aggregations(data)
+        return self.complaint_aggregations['gender']
 
     @property
     def coaccusals(self):
+        """
+        Read from the coaccusal matrix materialized by coaccusal_cache_manager, so officers have no coaccusals
+        until cache_data has run.
+        """
         return Officer.objects.filter(
-            officerallegation__allegation__officerallegation__officer=self
-        ).distinct().exclude(id=self.id).annotate(coaccusal_count=Count('id')).order_by('-coaccusal_count')
+            coaccusal_counts__coaccused=self
+        ).annotate(coaccusal_count=F('coaccusal_counts__coaccusal_count')).order_by('-coaccusal_count')
 
     @property
     def rank_histories(self):
@@ -0,0 +1,15 @@
+from django.contrib.gis.db import models
+
+
+class OfficerCoaccusal(models.Model):
+    """
+    Materialized officer x officer coaccusal matrix, stored sparse: one row per ordered pair of officers
+    accused in at least one same allegation. Rows are kept in both directions so that lookups only filter by officer.
+    """
+    officer = models.ForeignKey('data.Officer', on_delete=models.CASCADE, related_name='coaccusal_counts')
+    coaccused = models.ForeignKey('data.Officer', on_delete=models.CASCADE, related_name='+')
+    coaccusal_count = models.IntegerField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        unique_together = ('officer', 'coaccused')
@@ -0,0 +1,19 @@
+from django.contrib.gis.db import models
+
+
+class OfficerPairAllegation(models.Model):
+    """
+    Coaccusal edges: one row per allegation shared by a pair of officers, with officer1_id < officer2_id.
+    Only allegations with an incident date are kept since social graph never shows the others.
+    """
+    officer1 = models.ForeignKey('data.Officer', on_delete=models.CASCADE, related_name='+')
+    officer2 = models.ForeignKey('data.Officer', on_delete=models.CASCADE, related_name='+')
+    allegation = models.ForeignKey('data.Allegation', on_delete=models.CASCADE, related_name='+')
+    incident_date = models.DateTimeField()
+    is_officer_complaint = models.BooleanField()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['officer1', 'officer2', 'incident_date'], name='pair_allegation_officer1_idx'),
+            models.Index(fields=['officer2', 'officer1', 'incident_date'], name='pair_allegation_officer2_idx'),
+        ]
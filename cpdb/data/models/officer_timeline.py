@@ -0,0 +1,12 @@
+from django.contrib.gis.db import models
+from django.contrib.postgres.fields import JSONField
+
+
+class OfficerTimeline(models.Model):
+    """
+    Materialized officer timeline: serialized timeline items of the desktop and mobile apps, newest first.
+    """
+    officer = models.OneToOneField('data.Officer', on_delete=models.CASCADE, primary_key=True, related_name='+')
+    items = JSONField()
+    mobile_items = JSONField()
+    created_at = models.DateTimeField(auto_now_add=True)
@@ -1,11 +1,9 @@
 from django.conf import settings
 from django.contrib.gis.db import models
-from django.db.models import F
-from django.utils.timezone import now
+from django.utils.functional import cached_property
 
-from data.constants import GENDER_DICT
-from data.models import Officer, OfficerAllegation, Complainant
-from data.utils.aggregation import get_num_range_case
+from data.models import Officer, OfficerAllegation
+from data.utils.aggregation import unit_aggregations
 from .common import TaggableModel, TimeStampsModel
 
 
@@ -38,57 +36,21 @@ class PoliceUnit(TimeStampsModel, TaggableModel):
             officerhistory__unit=self, officerhistory__end_date__isnull=True
         ).distinct().count()
 
+    @cached_property
+    def aggregations(self):
+        return unit_aggregations([self.id])[self.id]
+
     @property
     def member_race_aggregation(self):
-        query_set = Officer.objects.filter(officerhistory__unit=self).distinct().annotate(
-            name=models.Case(
-                models.When(race__isnull=True, then=models.Value('Unknown')),
-                models.When(race__in=['n/a', 'n/a ', 'nan', ''], then=models.Value('Unknown')),
-                default='race',
-                output_field=models.CharField()
-            )
-        ).values('name').annotate(
-            count=models.Count('id', distinct=True)
-        )
-
-        return list(query_set)
+        return self.aggregations['member_race']
 
     @property
     def member_age_aggregation(self):
-        query_set = Officer.objects.filter(officerhistory__unit=self).distinct().annotate(
-            member_age=models.Case(
-                models.When(birth_year__isnull=True, then=None),
-                default=now().year - F('birth_year'),
-                output_field=models.IntegerField()
-            )
-        ).annotate(
-            name=get_num_range_case('member_age', [0, 20, 30, 40, 50])
-        ).values('name').annotate(
-            count=models.Count('id', distinct=True)
-        )
-
-        return list(query_set)
+        return self.aggregations['member_age']
 
     @property
     def member_gender_aggregation(self):
-        query_set = Officer.objects.filter(officerhistory__unit=self).distinct().annotate(
-            member_gender=models.Case(
-                models.When(gender='', then=models.Value('Unknown')),
-                models.When(gender__isnull=True, then=models.Value('Unknown')),
-                default='gender',
-                output_field=models.CharField()
-            )
-        ).values('member_gender').annotate(
-            count=models.Count('id', distinct=True)
-        )
-
-        return [
-            {
-                'name': GENDER_DICT.get(obj['member_gender'], 'Unknown'),
-                'count': obj['count']
-            }
-            for obj in query_set if obj['count'] > 0
-        ]
+        return self.aggregations['member_gender']
 
     @property
     def complaint_count(self):
@@ -104,133 +66,16 @@ class PoliceUnit(TimeStampsModel, TaggableModel):
 
     @property
     def complaint_category_aggregation(self):
-        query_set = OfficerAllegation.objects.filter(officer__officerhistory__unit=self).distinct().annotate(
-            name=models.Case(
-                models.When(allegation_category__category__isnull=True, then=models.Value('Unknown')),
-                default='allegation_category__category',
-                output_field=models.CharField()
-            )).values('name').annotate(
-            count=models.Count('allegation__crid', distinct=True),
-            sustained_count=models.Sum(
-                models.Case(
-                    models.When(final_finding='SU', then=1),
-                    default=0,
-                    output_field=models.IntegerField()
-                )
-            )
-        )
-        return list(query_set)
+        return self.aggregations['category']
 
     @property
     def complainant_race_aggregation(self):
-        query_set = Complainant.objects.filter(
-            allegation__officerallegation__officer__officerhistory__unit=self
-        ).distinct().annotate(
-            name=models.Case(
-                models.When(race__isnull=True, then=models.Value('Unknown')),
-                models.When(race__in=['n/a', 'n/a ', 'nan', ''], then=models.Value('Unknown')),
-                default='race',
-                output_field=models.CharField()
-            )
-        ).values('name').annotate(
-            count=models.Count('id', distinct=True)
-        )
-
-        sustained_count_query_set = Complainant.objects.filter(
-            allegation__officerallegation__officer__officerhistory__unit=self,
-            allegation__officerallegation__final_finding='SU'
-        ).distinct().annotate(
-            name=models.Case(
-                models.When(race__isnull=True, then=models.Value('Unknown')),
-                models.When(race__in=['n/a', 'n/a ', 'nan', ''], then=models.Value('Unknown')),
-                default='race',
-                output_field=models.CharField()
-            )
-        ).values('name').annotate(
-            sustained_count=models.Count('id', distinct=True)
-        )
-
-        sustained_count_results = {
-            obj['name']: obj['sustained_count'] for obj in sustained_count_query_set
-        }
-
-        return [
-            {
-                'name': obj['name'],
-                'count': obj['count'],
-                'sustained_count': sustained_count_results.get(obj['name'], 0)
-            }
-            for obj in query_set if obj['count'] > 0
-        ]
+        return self.aggregations['race']
 
     @property
     def complainant_age_aggregation(self):
-        query_set = Complainant.objects.filter(
-            allegation__officerallegation__officer__officerhistory__unit=self
-        ).distinct().annotate(
-            name=get_num_range_case('age', [0, 20, 30, 40, 50])
-        ).values('name').annotate(
-            count=models.Count('id', distinct=True)
-        ).order_by('name')
-
-        sustained_count_query_set = Complainant.objects.filter(
-            allegation__officerallegation__officer__officerhistory__unit=self,
-            allegation__officerallegation__final_finding='SU'
-        ).distinct().annotate(
-            name=get_num_range_case('age', [0, 20, 30, 40, 50])
-        ).values('name').annotate(
-            sustained_count=models.Count('id', distinct=True)
-        )
-
-        sustained_count_results = {
-            obj['name']: obj['sustained_count'] for obj in sustained_count_query_set
-        }
-
-        return [
-            {
-                'name': obj['name'],
-                'count': obj['count'],
-                'sustained_count': sustained_count_results.get(obj['name'], 0)
-            }
-            for obj in query_set if obj['count'] > 0
-        ]
+        return self.aggregations['age']
 
     @property
     def complainant_gender_aggregation(self):
-        query_set = Complainant.objects.filter(
-            allegation__officerallegation__officer__officerhistory__unit=self
-        ).distinct().annotate(
-            complainant_gender=models.Case(
-                models.When(gender='', then=models.Value('Unknown')),
-                default='gender',
-                output_field=models.CharField()
-            )
-        ).values('complainant_gender').annotate(
-            count=models.Count('id', distinct=True)
-        )
-
-        sustained_count_query_set = Complainant.objects.filter(
-            allegation__officerallegation__officer__officerhistory__unit=self,
-            allegation__officerallegation__final_finding='SU'
-        ).distinct().annotate(
-            complainant_gender=models.Case(
-                models.When(gender='', then=models.Value('Unknown')),
-                default='gender',
-                output_field=models.CharField()
-            )
-        ).values('complainant_gender').annotate(
-            sustained_count=models.Count('id', distinct=True)
-        )
-
-        sustained_count_results = {
-            obj['complainant_gender']: obj['sustained_count'] for obj in sustained_count_query_set
-        }
-
-        return [
-            {
-                'name': GENDER_DICT.get(obj['complainant_gender'], 'Unknown'),
-                'count': obj['count'],
-                'sustained_count': sustained_count_results.get(obj['complainant_gender'], 0)
-            }
-            for obj in query_set if obj['count'] > 0
-        ]
+        return self.aggregations['gender']
@@ -1,13 +1,16 @@
+from bisect import bisect_left, bisect_right
 from datetime import datetime
+from decimal import Decimal, ROUND_HALF_UP
 
 from django.contrib.gis.db import models
 from django.db.models import F, Q, IntegerField, Func
-from django.utils.timezone import now, timedelta
+from django.db.models.functions import TruncDate
+from django.utils.timezone import now, timedelta, localdate
 
 from tqdm import tqdm
 import pytz
 
-from data.models import Officer, Award
+from data.models import Officer, Award, OfficerAllegation
 from data.constants import (
     ALLEGATION_MAX_DATETIME, ALLEGATION_MIN_DATETIME,
     INTERNAL_CIVILIAN_ALLEGATION_MAX_DATETIME, INTERNAL_CIVILIAN_ALLEGATION_MIN_DATETIME,
@@ -15,8 +18,9 @@ from data.constants import (
     PERCENTILE_GROUPS, PERCENTILE_ALLEGATION_GROUP, PERCENTILE_ALLEGATION_INTERNAL_CIVILIAN_GROUP, PERCENTILE_TRR_GROUP,
     PERCENTILE_HONORABLE_MENTION_GROUP
 )
-from data.utils.percentile import percentile, merge_metric
+from data.utils.percentile import percentile, merge_metric, percentile_rank
 from data.utils.round import Round
+from trr.models import TRR
 
 
 def latest_year_percentile(percentile_groups=PERCENTILE_GROUPS):
@@ -33,14 +37,15 @@ def latest_year_percentile(percentile_groups=PERCENTILE_GROUPS):
     calculating_years = [resignation_year for resignation_year in resignation_years
                          if min_year <= resignation_year <= max_year]
     percentile_officers = []
+    engine = OfficerPercentileEngine(percentile_groups)
 
     for year in tqdm(calculating_years, 'calculate yearly percentiles'):
-        yearly_percentile_officers = top_percentile(year, percentile_groups)
+        yearly_percentile_officers = engine.top_percentile(year)
         percentile_officers += [officer for officer in yearly_percentile_officers
                                 if officer.resignation_date and officer.resignation_date.year == year]
 
     current_year = now().year
-    current_year_percentile_officers = top_percentile(current_year, percentile_groups)
+    current_year_percentile_officers = engine.top_percentile(current_year)
     percentile_officers += [officer for officer in current_year_percentile_officers
                             if not officer.resignation_date or officer.resignation_date.year == current_year]
 
@@ -237,3 +242,162 @@ def _officer_service_year(min_date, max_date):
             )  # in order to easy to test and calculate, we only get 4 decimal points
         )
     )
+
+
+FOUR_DECIMAL_PLACES = Decimal('0.0001')
+
+
+def _round_decimal(value):
+    return value.quantize(FOUR_DECIMAL_PLACES, rounding=ROUND_HALF_UP)
+
+
+def _service_year(days):
+    # Same as ROUND(CAST(DATE_PART(...) / 365.0 as numeric), 4): a double casted to numeric keeps 15 digits
+    return _round_decimal(Decimal(f'{days / 365.0:.15g}'))
+
+
+class PercentileOfficer(object):
+    def __init__(self, officer_id, appointed_date, resignation_date, year):
+        self.id = officer_id
+        self.officer_id = officer_id
+        self.appointed_date = appointed_date
+        self.resignation_date = resignation_date
+        self.year = year
+
+
+class OfficerPercentileEngine(object):
+    """
+    In memory version of `top_percentile`. Officer service dates and the dates of every event
+    used by the percentile groups are fetched once, then any year is computed by counting the events
+    of each officer within the year range with bisect over the sorted dates.
+    Results are the same as `top_percentile` (including rounding), without querying the database per year.
+    """
+    def __init__(self, percentile_groups=PERCENTILE_GROUPS):
+        if any(t not in PERCENTILE_GROUPS for t in percentile_groups):
+            raise ValueError("percentile_group is invalid")
+        self.percentile_groups = percentile_groups
+        self.officers = list(
+            Officer.objects.filter(
+                appointed_date__isnull=False
+            ).order_by('id').values_list('id', 'appointed_date', 'resignation_date')
+        )
+        self.event_dates = dict()
+        percentile_types = [
+            percentile_type
+            for percentile_group in percentile_groups
+            for percentile_type in PERCENTILE_MAP[percentile_group]['percentile_funcs'].keys()
+        ]
+        if {'allegation', 'allegation_civilian', 'allegation_internal'} & set(percentile_types):
+            self._load_allegation_dates()
+        if 'trr' in percentile_types:
+            self._load_trr_dates()
+        if 'honorable_mention' in percentile_types:
+            self._load_honorable_mention_dates()
+
+    def _add_event_dates(self, percentile_type, rows):
+        dates_dict = self.event_dates.setdefault(percentile_type, dict())
+        for officer_id, event_date in rows:
+            dates_dict.setdefault(officer_id, []).append(event_date)
+        for dates in dates_dict.values():
+            dates.sort()
+
+    def _load_allegation_dates(self):
+        rows = list(OfficerAllegation.objects.filter(
+            officer_id__isnull=False,
+            allegation__incident_date__isnull=False
+        ).values_list('officer_id', 'allegation__incident_date', 'allegation__is_officer_complaint'))
+
+        self._add_event_dates('allegation', ((row[0], row[1]) for row in rows))
+        self._add_event_dates('allegation_civilian', ((row[0], row[1]) for row in rows if not row[2]))
+        self._add_event_dates('allegation_internal', ((row[0], row[1]) for row in rows if row[2]))
+
+    def _load_trr_dates(self):
+        self._add_event_dates('trr', TRR.objects.filter(
+            officer_id__isnull=False,
+            trr_datetime__isnull=False
+        ).annotate(trr_date=TruncDate('trr_datetime')).values_list('officer_id', 'trr_date'))
+
+    def _load_honorable_mention_dates(self):
+        self._add_event_dates('honorable_mention', Award.objects.filter(
+            officer_id__isnull=False,
+            start_date__isnull=False,
+            award_type='Honorable Mention'
+        ).values_list('officer_id', 'start_date'))
+
+    @staticmethod
+    def _event_range(percentile_type, min_datetime, max_datetime):
+        if percentile_type == 'trr':
+            return localdate(min_datetime), localdate(max_datetime)
+        if percentile_type == 'honorable_mention':
+            return None, max_datetime.date()
+        return min_datetime, max_datetime
+
+    def _count_events(self, percentile_type, officer_id, lower_bound, upper_bound):
+        dates = self.event_dates[percentile_type].get(officer_id)
+        if not dates:
+            return 0
+        start_index = bisect_left(dates, lower_bound) if lower_bound is not None else 0
+        return max(bisect_right(dates, upper_bound) - start_index, 0)
+
+    def top_percentile(self, year):
+        """
+        :return: list of PercentileOfficer which have the same attributes as officers returned by `top_percentile`
+        """
+        officers = dict()
+        for percentile_group in self.percentile_groups:
+            data_range = PERCENTILE_MAP[percentile_group]['range']
+            if not data_range:
+                continue
+
+            min_datetime, max_datetime = data_range
+            max_datetime = min(max_datetime, datetime(year, 12, 31, tzinfo=pytz.utc))
+            if min_datetime + timedelta(days=365) > max_datetime:
+                continue
+
+            min_date, max_date = min_datetime.date(), max_datetime.date()
+            percentile_types = PERCENTILE_MAP[percentile_group]['percentile_funcs'].keys()
+            event_ranges = {
+                percentile_type: self._event_range(percentile_type, min_datetime, max_datetime)
+                for percentile_type in percentile_types
+            }
+            ranking_officers = []
+
+            for officer_id, appointed_date, resignation_date in self.officers:
+                start_date = min_date if appointed_date < min_date else appointed_date
+                end_date = resignation_date if resignation_date and resignation_date < max_date else max_date
+                if end_date < start_date + timedelta(days=365):
+                    continue
+
+                service_year = _service_year((end_date - start_date).days)
+                officer = officers.get(officer_id)
+                if officer is None:
+                    officer = PercentileOfficer(officer_id, appointed_date, resignation_date, year)
+                    officer.start_date = start_date
+                    officer.end_date = end_date
+                    officer.service_year = float(service_year)
+                    officers[officer_id] = officer
+
+                for percentile_type, (lower_bound, upper_bound) in event_ranges.items():
+                    num = self._count_events(percentile_type, officer_id, lower_bound, upper_bound)
+                    setattr(officer, f'num_{percentile_type}', num)
+                    setattr(officer, f'metric_{percentile_type}', float(_round_decimal(num / service_year)))
+                ranking_officers.append(officer)
+
+            for percentile_type in percentile_types:
+                metric_key = f'metric_{percentile_type}'
+                ranks = percentile_rank(
+                    [getattr(officer, metric_key) for officer in ranking_officers], decimal_places=4
+                )
+                for officer, rank in zip(ranking_officers, ranks):
+                    setattr(officer, f'percentile_{percentile_type}', rank)
+
+        return list(officers.values())
+
+
+def yearly_top_percentile(years, percentile_groups=PERCENTILE_GROUPS):
+    """
+    Compute top percentile of many years while fetching the data only once.
+    :return: dict of year: list of PercentileOfficer
+    """
+    engine = OfficerPercentileEngine(percentile_groups)
+    return {year: engine.top_percentile(year) for year in years}
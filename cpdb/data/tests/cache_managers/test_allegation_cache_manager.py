@@ -1,10 +1,13 @@
-from datetime import date
+from datetime import date, datetime
 
 from django.test.testcases import TestCase
 
+from freezegun import freeze_time
 from robber import expect
+import pytz
 
 from data.cache_managers import allegation_cache_manager
+from data.models import Allegation
 from data.factories import (
     AllegationFactory,
     OfficerAllegationFactory,
@@ -55,3 +58,48 @@ class AllegationCacheManagerTestCase(TestCase):
         allegation.refresh_from_db()
 
         expect(allegation.first_end_date).to.eq(first_end_date)
+
+    def test_cache_data_since(self):
+        with freeze_time('2020-01-01 12:00:00'):
+            allegation_1 = AllegationFactory()
+            allegation_2 = AllegationFactory()
+            OfficerAllegationFactory.create_batch(2, allegation=allegation_1)
+            OfficerAllegationFactory.create_batch(2, allegation=allegation_2)
+        with freeze_time('2020-01-03 12:00:00'):
+            OfficerAllegationFactory(allegation=allegation_1)
+        Allegation.objects.update(coaccused_count=None)
+
+        allegation_cache_manager.cache_data(since=datetime(2020, 1, 2, tzinfo=pytz.utc))
+        allegation_1.refresh_from_db()
+        allegation_2.refresh_from_db()
+
+        expect(allegation_1.coaccused_count).to.eq(3)
+        expect(allegation_2.coaccused_count).to.be.none()
+
+    def test_cache_data_touch_changed_allegations(self):
+        with freeze_time('2020-01-01 12:00:00'):
+            allegation_1 = AllegationFactory()
+            allegation_2 = AllegationFactory()
+            OfficerAllegationFactory(allegation=allegation_1)
+            OfficerAllegationFactory(allegation=allegation_2)
+            allegation_cache_manager.cache_data()
+        with freeze_time('2020-01-03 12:00:00'):
+            OfficerAllegationFactory(allegation=allegation_1)
+
+        with freeze_time('2020-01-04 12:00:00'):
+            allegation_cache_manager.cache_data()
+
+        allegation_1.refresh_from_db()
+        allegation_2.refresh_from_db()
+        expect(allegation_1.coaccused_count).to.eq(2)
+        expect(allegation_1.updated_at).to.eq(datetime(2020, 1, 4, 12, tzinfo=pytz.utc))
+        expect(allegation_2.updated_at).to.eq(datetime(2020, 1, 1, 12, tzinfo=pytz.utc))
+
+    def test_cache_data_since_with_new_allegation(self):
+        with freeze_time('2020-01-03 12:00:00'):
+            allegation = AllegationFactory(coaccused_count=None)
+
+        allegation_cache_manager.cache_data(since=datetime(2020, 1, 2, tzinfo=pytz.utc))
+        allegation.refresh_from_db()
+
+        expect(allegation.coaccused_count).to.eq(0)
@@ -1,26 +1,104 @@
+from datetime import datetime
+
 from django.test.testcases import TestCase
 
-from mock import patch
+from freezegun import freeze_time
+from mock import patch, Mock
 from robber import expect
+import pytz
 
 from data import cache_managers
+from data.factories import CacheDataRunFactory
+from data.models import CacheDataRun
+from data.utils.touch import touch_time
 
 
 class CacheManagersTestCase(TestCase):
+    @patch('data.cache_managers.officer_pair_allegation_cache_manager.cache_data')
+    @patch('data.cache_managers.coaccusal_cache_manager.cache_data')
     @patch('data.cache_managers.allegation_cache_manager.cache_data')
     @patch('data.cache_managers.officer_cache_manager.cache_data')
     @patch('data.cache_managers.salary_cache_manager.cache_data')
     @patch('activity_grid.cache_managers.activity_pair_card_cache_manager.cache_data')
+    @patch('officers.cache_managers.officer_timeline_cache_manager.cache_data')
     def test_cache_all(
         self,
+        officer_timeline_cache_mock,
         salary_cache_mock,
         officer_cache_mock,
         allegation_cache_mock,
-        activity_pair_card_cache_mock
+        activity_pair_card_cache_mock,
+        coaccusal_cache_mock,
+        officer_pair_allegation_cache_mock
     ):
         cache_managers.cache_all()
         expect(salary_cache_mock).to.be.called_once()
         expect(officer_cache_mock).to.be.called_once()
         expect(allegation_cache_mock).to.be.called_once()
         expect(activity_pair_card_cache_mock).to.be.called_once()
-        expect(len(cache_managers.managers)).to.eq(4)
+        expect(coaccusal_cache_mock).to.be.called_once()
+        expect(officer_pair_allegation_cache_mock).to.be.called_once()
+        expect(officer_timeline_cache_mock).to.be.called_once()
+        expect(len(cache_managers.managers)).to.eq(7)
+
+    @freeze_time('2020-01-05 12:00:00')
+    @patch('data.cache_managers.managers', [])
+    def test_cache_all_create_cache_data_run(self):
+        cache_managers.cache_all()
+
+        cache_data_run = CacheDataRun.objects.get()
+        expect(cache_data_run.started_at).to.eq(datetime(2020, 1, 5, 12, tzinfo=pytz.utc))
+        expect(cache_data_run.incremental).to.be.false()
+
+    @freeze_time('2020-01-05 12:00:00')
+    @patch('data.cache_managers.officer_pair_allegation_cache_manager.cache_data')
+    @patch('data.cache_managers.coaccusal_cache_manager.cache_data')
+    @patch('data.cache_managers.allegation_cache_manager.cache_data')
+    @patch('data.cache_managers.officer_cache_manager.cache_data')
+    @patch('data.cache_managers.salary_cache_manager.cache_data')
+    @patch('activity_grid.cache_managers.activity_pair_card_cache_manager.cache_data')
+    @patch('officers.cache_managers.officer_timeline_cache_manager.cache_data')
+    def test_cache_all_incremental(
+        self,
+        officer_timeline_cache_mock,
+        salary_cache_mock,
+        officer_cache_mock,
+        allegation_cache_mock,
+        activity_pair_card_cache_mock,
+        coaccusal_cache_mock,
+        officer_pair_allegation_cache_mock
+    ):
+        CacheDataRunFactory(started_at=datetime(2020, 1, 1, tzinfo=pytz.utc))
+        CacheDataRunFactory(started_at=datetime(2020, 1, 3, tzinfo=pytz.utc))
+
+        cache_managers.cache_all(incremental=True)
+
+        since = datetime(2020, 1, 3, tzinfo=pytz.utc)
+        expect(salary_cache_mock).to.be.called_once_with(since=since)
+        expect(officer_cache_mock).to.be.called_once_with(since=since)
+        expect(allegation_cache_mock).to.be.called_once_with(since=since)
+        expect(activity_pair_card_cache_mock).to.be.called_once_with(since=since)
+        expect(coaccusal_cache_mock).to.be.called_once_with(since=since)
+        expect(officer_pair_allegation_cache_mock).to.be.called_once_with(since=since)
+        expect(officer_timeline_cache_mock).to.be.called_once_with(since=since)
+        expect(CacheDataRun.objects.filter(incremental=True).count()).to.eq(1)
+
+    def test_cache_all_incremental_without_previous_run(self):
+        manager = Mock()
+        with patch('data.cache_managers.managers', [manager]):
+            cache_managers.cache_all(incremental=True)
+
+        expect(manager.cache_data).to.be.called_once_with(since=None)
+        expect(CacheDataRun.objects.get().incremental).to.be.false()
+
+    @freeze_time('2020-01-05 12:00:00', tick=True)
+    def test_cache_all_touch_with_started_at(self):
+        touch_times = []
+        manager = Mock()
+        manager.cache_data.side_effect = lambda since: touch_times.append(touch_time())
+        with patch('data.cache_managers.managers', [manager, manager]):
+            cache_managers.cache_all()
+
+        started_at = CacheDataRun.objects.get().started_at
+        expect(touch_times).to.eq([started_at, started_at])
+        expect(touch_time()).not_to.eq(started_at)
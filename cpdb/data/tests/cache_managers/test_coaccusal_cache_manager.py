@@ -0,0 +1,155 @@
+from datetime import datetime
+
+from django.test.testcases import TestCase
+
+from freezegun import freeze_time
+from robber import expect
+import pytz
+
+from data.cache_managers import coaccusal_cache_manager
+from data.factories import OfficerFactory, AllegationFactory, OfficerAllegationFactory
+from data.models import CacheDataRun, OfficerAllegation, OfficerCoaccusal
+
+
+class CoaccusalCacheManagerTestCase(TestCase):
+    def setUp(self):
+        self.officer_1 = OfficerFactory(id=1)
+        self.officer_2 = OfficerFactory(id=2)
+        self.officer_3 = OfficerFactory(id=3)
+        allegation_1 = AllegationFactory()
+        allegation_2 = AllegationFactory()
+        OfficerAllegationFactory(allegation=allegation_1, officer=self.officer_1)
+        OfficerAllegationFactory(allegation=allegation_1, officer=self.officer_2)
+        OfficerAllegationFactory(allegation=allegation_1, officer=self.officer_3)
+        OfficerAllegationFactory(allegation=allegation_2, officer=self.officer_1)
+        OfficerAllegationFactory(allegation=allegation_2, officer=self.officer_2)
+        OfficerAllegationFactory(allegation=allegation_2, officer=self.officer_2)
+        OfficerAllegationFactory(officer=self.officer_3)
+
+    def pairs(self):
+        return set(OfficerCoaccusal.objects.values_list('officer_id', 'coaccused_id', 'coaccusal_count'))
+
+    def test_build_coaccusal_matrix(self):
+        coaccusal_cache_manager.build_coaccusal_matrix()
+
+        expect(self.pairs()).to.eq({
+            (1, 2, 2), (2, 1, 2),
+            (1, 3, 1), (3, 1, 1),
+            (2, 3, 1), (3, 2, 1),
+        })
+
+    def test_build_coaccusal_matrix_replace_existing_pairs(self):
+        coaccusal_cache_manager.build_coaccusal_matrix()
+        OfficerAllegationFactory(allegation=AllegationFactory(), officer=self.officer_1)
+        OfficerAllegationFactory(allegation=AllegationFactory(), officer=self.officer_3)
+
+        coaccusal_cache_manager.build_coaccusal_matrix()
+
+        expect(OfficerCoaccusal.objects.count()).to.eq(6)
+
+    def test_build_coaccusal_matrix_of_some_officers(self):
+        officer_4 = OfficerFactory(id=4)
+        OfficerCoaccusal.objects.create(officer=self.officer_1, coaccused=self.officer_2, coaccusal_count=10)
+        OfficerCoaccusal.objects.create(officer=self.officer_2, coaccused=self.officer_3, coaccusal_count=10)
+        allegation = AllegationFactory()
+        OfficerAllegationFactory(allegation=allegation, officer=self.officer_2)
+        OfficerAllegationFactory(allegation=allegation, officer=officer_4)
+
+        coaccusal_cache_manager.build_coaccusal_matrix(officer_ids=[4, 1])
+
+        expect(self.pairs()).to.eq({
+            (1, 2, 2), (2, 1, 2),
+            (1, 3, 1), (3, 1, 1),
+            (2, 3, 10),
+            (2, 4, 1), (4, 2, 1),
+        })
+
+    def test_build_coaccusal_matrix_without_officers(self):
+        coaccusal_cache_manager.build_coaccusal_matrix(officer_ids=[])
+
+        expect(OfficerCoaccusal.objects.exists()).to.be.false()
+
+    def test_cache_data_since(self):
+        with freeze_time('2020-01-01 12:00:00'):
+            coaccusal_cache_manager.cache_data()
+            officer_4 = OfficerFactory(id=4)
+        with freeze_time('2020-01-03 12:00:00'):
+            allegation = AllegationFactory()
+            OfficerAllegationFactory(allegation=allegation, officer=self.officer_3)
+            OfficerAllegationFactory(allegation=allegation, officer=officer_4)
+
+            coaccusal_cache_manager.cache_data(since=datetime(2020, 1, 2, tzinfo=pytz.utc))
+
+        expect(OfficerCoaccusal.objects.filter(officer_id=3).count()).to.eq(3)
+        expect(coaccusal_cache_manager.pair_count(4, 3)).to.eq(1)
+
+    def test_is_coaccusal_matrix_stale(self):
+        expect(coaccusal_cache_manager.is_coaccusal_matrix_stale()).to.be.true()
+
+        CacheDataRun.objects.create(started_at=datetime(2999, 1, 1, tzinfo=pytz.utc))
+        expect(coaccusal_cache_manager.is_coaccusal_matrix_stale()).to.be.false()
+
+        with freeze_time('3000-01-01 12:00:00'):
+            OfficerAllegationFactory(officer=self.officer_1)
+        expect(coaccusal_cache_manager.is_coaccusal_matrix_stale()).to.be.true()
+
+    def test_is_coaccusal_matrix_stale_after_build_without_pairs(self):
+        OfficerAllegation.objects.all().delete()
+        expect(coaccusal_cache_manager.is_coaccusal_matrix_stale()).to.be.false()
+
+        with freeze_time('3000-01-01 12:00:00'):
+            OfficerAllegationFactory(officer=self.officer_1)
+        expect(coaccusal_cache_manager.is_coaccusal_matrix_stale()).to.be.true()
+
+        coaccusal_cache_manager.build_coaccusal_matrix()
+        CacheDataRun.objects.create(started_at=datetime(3000, 1, 2, tzinfo=pytz.utc))
+
+        expect(OfficerCoaccusal.objects.exists()).to.be.false()
+        expect(coaccusal_cache_manager.is_coaccusal_matrix_stale()).to.be.false()
+
+    def test_compute_coaccusal_dict(self):
+        expected_coaccusal_dict = {
+            1: {2: 2, 3: 1},
+            2: {1: 2, 3: 1},
+            3: {1: 1, 2: 1},
+        }
+
+        expect(coaccusal_cache_manager.compute_coaccusal_dict()).to.eq(expected_coaccusal_dict)
+        expect(coaccusal_cache_manager.compute_coaccusal_dict((2, 3))).to.eq({
+            2: {1: 2, 3: 1},
+            3: {1: 1, 2: 1},
+        })
+        expect(coaccusal_cache_manager.compute_coaccusal_dict([1, 3])).to.eq({
+            1: {2: 2, 3: 1},
+            3: {1: 1, 2: 1},
+        })
+        expect(OfficerCoaccusal.objects.exists()).to.be.false()
+
+        coaccusal_cache_manager.build_coaccusal_matrix()
+        expect(coaccusal_cache_manager.get_coaccusal_dict()).to.eq(expected_coaccusal_dict)
+
+    def test_get_coaccusal_dict(self):
+        coaccusal_cache_manager.build_coaccusal_matrix()
+
+        expect(coaccusal_cache_manager.get_coaccusal_dict()).to.eq({
+            1: {2: 2, 3: 1},
+            2: {1: 2, 3: 1},
+            3: {1: 1, 2: 1},
+        })
+        expect(coaccusal_cache_manager.get_coaccusal_dict((2, 3))).to.eq({
+            2: {1: 2, 3: 1},
+            3: {1: 1, 2: 1},
+        })
+
+    def test_top_coaccusals(self):
+        coaccusal_cache_manager.build_coaccusal_matrix()
+
+        expect(coaccusal_cache_manager.top_coaccusals(1)).to.eq([(2, 2), (3, 1)])
+        expect(coaccusal_cache_manager.top_coaccusals(3)).to.eq([(1, 1), (2, 1)])
+        expect(coaccusal_cache_manager.top_coaccusals(2, limit=1)).to.eq([(1, 2)])
+
+    def test_pair_count(self):
+        coaccusal_cache_manager.build_coaccusal_matrix()
+
+        expect(coaccusal_cache_manager.pair_count(1, 2)).to.eq(2)
+        expect(coaccusal_cache_manager.pair_count(2, 2)).to.eq(0)
@@ -7,6 +7,7 @@ from django.test.testcases import TestCase
 from mock import patch, Mock
 from robber import expect
 from decimal import Decimal
+from freezegun import freeze_time
 
 from data.factories import (
     OfficerFactory,
@@ -15,10 +16,15 @@ from data.factories import (
     OfficerHistoryFactory,
     PoliceUnitFactory,
     OfficerAllegationFactory,
-    SalaryFactory
+    SalaryFactory,
+    OfficerYearlyPercentileFactory,
+    AllegationFactory,
+    CacheDataRunFactory
 )
 from data.cache_managers import officer_cache_manager
+from data.cache_managers.officer_cache_manager import PERCENTILE_SOURCE_MODELS, YEARLY_PERCENTILE_SOURCE_MODELS
 from data.models import Officer, OfficerYearlyPercentile
+from data.utils.touch import touching_at
 from shared.tests.utils import create_object
 from trr.factories import TRRFactory
 
@@ -372,3 +378,423 @@ class OfficerCacheManagerTestCase(TestCase):
                 percentile = yearly_percentiles.get(year=year)
                 for attr, value in expected_percentile.items():
                     expect(f'{getattr(percentile, attr):.2f}').to.eq(f'{value:.2f}')
+
+    def test_sources_changed(self):
+        since = datetime(2020, 1, 2, tzinfo=pytz.utc)
+        with freeze_time('2020-01-01 12:00:00'):
+            officer = OfficerFactory(id=1)
+            OfficerAllegationFactory(officer=officer)
+            TRRFactory(officer=officer)
+
+        expect(officer_cache_manager.sources_changed(YEARLY_PERCENTILE_SOURCE_MODELS, since)).to.be.false()
+
+        with freeze_time('2020-01-03 12:00:00'):
+            officer.resignation_date = date(2019, 1, 1)
+            officer.save()
+
+        expect(officer_cache_manager.sources_changed(YEARLY_PERCENTILE_SOURCE_MODELS, since)).to.be.true()
+
+    def test_sources_changed_with_new_trr(self):
+        since = datetime(2020, 1, 2, tzinfo=pytz.utc)
+        with freeze_time('2020-01-01 12:00:00'):
+            officer = OfficerFactory(id=1)
+        with freeze_time('2020-01-03 12:00:00'):
+            TRRFactory(officer=officer)
+
+        expect(officer_cache_manager.sources_changed(YEARLY_PERCENTILE_SOURCE_MODELS, since)).to.be.true()
+
+    def test_load_yearly_percentiles(self):
+        officer_1 = OfficerFactory(id=1)
+        officer_2 = OfficerFactory(id=2)
+        OfficerYearlyPercentileFactory(
+            officer=officer_1,
+            year=2016,
+            percentile_trr=Decimal('66.6667'),
+            percentile_allegation=Decimal('33.3333'),
+            percentile_allegation_civilian=Decimal('33.3333'),
+            percentile_allegation_internal=Decimal('0.0'),
+        )
+        OfficerYearlyPercentileFactory(
+            officer=officer_1,
+            year=2015,
+            percentile_trr=Decimal('0.0'),
+            percentile_allegation=Decimal('50.0'),
+        )
+        OfficerYearlyPercentileFactory(
+            officer=officer_2,
+            year=2016,
+            percentile_allegation_civilian=Decimal('66.6667'),
+        )
+
+        expect(officer_cache_manager.load_yearly_percentiles()).to.eq({
+            1: [
+                {
+                    'id': 1,
+                    'year': 2015,
+                    'percentile_trr': '0.0000',
+                    'percentile_allegation': '50.0000',
+                },
+                {
+                    'id': 1,
+                    'year': 2016,
+                    'percentile_trr': '66.6667',
+                    'percentile_allegation': '33.3333',
+                    'percentile_allegation_civilian': '33.3333',
+                    'percentile_allegation_internal': '0.0000',
+                }
+            ],
+            2: [
+                {
+                    'id': 2,
+                    'year': 2016,
+                    'percentile_allegation_civilian': '66.6667',
+                }
+            ]
+        })
+
+    def test_is_yearly_percentiles_stale_without_cache_data_run(self):
+        OfficerYearlyPercentileFactory(officer=OfficerFactory(id=1), year=2016)
+
+        expect(officer_cache_manager.is_yearly_percentiles_stale()).to.be.true()
+
+    def test_is_yearly_percentiles_stale(self):
+        with freeze_time('2020-01-01 12:00:00'):
+            officer = OfficerFactory(id=1)
+            OfficerAllegationFactory(officer=officer)
+            OfficerYearlyPercentileFactory(officer=officer, year=2016)
+        CacheDataRunFactory(started_at=datetime(2020, 1, 2, tzinfo=pytz.utc))
+        with freeze_time('2020-01-02 00:00:00'):
+            officer.save()
+
+        expect(officer_cache_manager.is_yearly_percentiles_stale()).to.be.false()
+
+        with freeze_time('2020-01-03 12:00:00'):
+            TRRFactory(officer=officer)
+
+        expect(officer_cache_manager.is_yearly_percentiles_stale()).to.be.true()
+
+    @override_settings(
+        ALLEGATION_MIN='1988-01-01',
+        ALLEGATION_MAX='2016-07-01',
+        INTERNAL_CIVILIAN_ALLEGATION_MIN='2000-01-01',
+        INTERNAL_CIVILIAN_ALLEGATION_MAX='2016-07-01',
+        TRR_MIN='2004-01-08',
+        TRR_MAX='2016-04-12')
+    def test_compute_yearly_percentiles(self):
+        officer_1 = OfficerFactory(id=1, appointed_date=date(2013, 1, 1))
+        officer_2 = OfficerFactory(id=2, appointed_date=date(2015, 3, 14))
+        OfficerAllegationFactory.create_batch(
+            2,
+            officer=officer_1,
+            start_date=date(2015, 1, 1),
+            allegation__incident_date=datetime(2015, 1, 1, tzinfo=pytz.utc),
+            allegation__is_officer_complaint=False)
+        OfficerAllegationFactory(
+            officer=officer_2,
+            start_date=date(2016, 1, 22),
+            allegation__incident_date=datetime(2016, 1, 16, tzinfo=pytz.utc),
+            allegation__is_officer_complaint=True)
+        TRRFactory(officer=officer_2, trr_datetime=datetime(2016, 3, 15, tzinfo=pytz.utc))
+
+        computed_yearly_percentiles = officer_cache_manager.compute_yearly_percentiles()
+
+        expect(OfficerYearlyPercentile.objects.exists()).to.be.false()
+        officer_cache_manager.build_cached_yearly_percentiles()
+        expect(computed_yearly_percentiles).to.eq(officer_cache_manager.load_yearly_percentiles())
+        expect(computed_yearly_percentiles).not_to.be.empty()
+
+    def test_build_cached_columns_with_officer_ids(self):
+        officer_1 = OfficerFactory()
+        officer_2 = OfficerFactory()
+        OfficerAllegationFactory.create_batch(2, officer=officer_1)
+        OfficerAllegationFactory.create_batch(3, officer=officer_2)
+        Officer.objects.update(allegation_count=None)
+
+        officer_cache_manager.build_cached_columns(officer_ids=[officer_1.id])
+        officer_1.refresh_from_db()
+        officer_2.refresh_from_db()
+
+        expect(officer_1.allegation_count).to.eq(2)
+        expect(officer_2.allegation_count).to.be.none()
+
+    def test_build_cached_columns_with_empty_officer_ids(self):
+        officer = OfficerFactory()
+        OfficerAllegationFactory(officer=officer)
+        Officer.objects.update(allegation_count=None)
+
+        officer_cache_manager.build_cached_columns(officer_ids=set())
+        officer.refresh_from_db()
+
+        expect(officer.allegation_count).to.be.none()
+
+    def test_changed_officer_ids(self):
+        with freeze_time('2020-01-01 12:00:00'):
+            officer_1 = OfficerFactory(id=1, first_name='Jerome', last_name='Finnigan')
+            OfficerFactory(id=2, first_name='Jerome', last_name='Finnigan')
+            officer_3 = OfficerFactory(id=3)
+            officer_4 = OfficerFactory(id=4)
+            officer_5 = OfficerFactory(id=5)
+            officer_6 = OfficerFactory(id=6)
+            officer_7 = OfficerFactory(id=7)
+            officer_8 = OfficerFactory(id=8)
+            OfficerFactory(id=9)
+            OfficerAllegationFactory(officer=officer_3)
+            OfficerAllegationFactory(officer=None)
+
+        with freeze_time('2020-01-03 12:00:00'):
+            officer_1.middle_initial = 'A'
+            officer_1.save()
+            OfficerAllegationFactory(officer=officer_3)
+            AwardFactory(officer=officer_4)
+            TRRFactory(officer=officer_5)
+            SalaryFactory(officer=officer_6)
+            OfficerHistoryFactory(officer=officer_7)
+            OfficerBadgeNumberFactory(officer=officer_8)
+
+        expect(officer_cache_manager.changed_officer_ids(datetime(2020, 1, 2, tzinfo=pytz.utc))).to.eq(
+            {1, 3, 4, 5, 6, 7, 8}
+        )
+
+    def test_build_cached_unique_names(self):
+        with freeze_time('2020-01-01 12:00:00'):
+            officer_1 = OfficerFactory(first_name='Jerome', last_name='Finnigan', has_unique_name=False)
+            officer_2 = OfficerFactory(first_name='Jerome', last_name='Finnigan', has_unique_name=False)
+            officer_3 = OfficerFactory(first_name='Raymond', last_name='Piwnicki', has_unique_name=True)
+
+        with freeze_time('2020-01-03 12:00:00'):
+            officer_1.first_name = 'Edward'
+            officer_1.save()
+
+        with freeze_time('2020-01-04 12:00:00'):
+            officer_cache_manager.build_cached_unique_names()
+
+        officer_1.refresh_from_db()
+        officer_2.refresh_from_db()
+        officer_3.refresh_from_db()
+        expect(officer_1.has_unique_name).to.be.true()
+        expect(officer_2.has_unique_name).to.be.true()
+        expect(officer_2.updated_at).to.eq(datetime(2020, 1, 4, 12, tzinfo=pytz.utc))
+        expect(officer_3.has_unique_name).to.be.true()
+        expect(officer_3.updated_at).to.eq(datetime(2020, 1, 1, 12, tzinfo=pytz.utc))
+
+    @patch('data.cache_managers.officer_cache_manager.build_cached_columns_set_based')
+    @patch('data.cache_managers.officer_cache_manager.build_cached_percentiles')
+    @patch('data.cache_managers.officer_cache_manager.build_cached_yearly_percentiles')
+    def test_cache_data(
+        self, build_cached_yearly_percentiles_mock, build_cached_percentiles_mock, build_cached_columns_mock
+    ):
+        officer_cache_manager.cache_data()
+
+        expect(build_cached_yearly_percentiles_mock).to.be.called_once()
+        expect(build_cached_percentiles_mock).to.be.called_once()
+        expect(build_cached_columns_mock).to.be.called_once_with(officer_ids=None)
+
+    @freeze_time('2020-01-04 12:00:00')
+    @patch('data.cache_managers.officer_cache_manager.changed_officer_ids', Mock(return_value={1, 2}))
+    @patch('data.cache_managers.officer_cache_manager.sources_changed', Mock(return_value=False))
+    @patch('data.cache_managers.officer_cache_manager.build_cached_columns_set_based')
+    @patch('data.cache_managers.officer_cache_manager.build_cached_percentiles')
+    @patch('data.cache_managers.officer_cache_manager.build_cached_yearly_percentiles')
+    def test_cache_data_incremental(
+        self, build_cached_yearly_percentiles_mock, build_cached_percentiles_mock, build_cached_columns_mock
+    ):
+        officer_cache_manager.cache_data(since=datetime(2020, 1, 2, tzinfo=pytz.utc))
+
+        expect(build_cached_yearly_percentiles_mock).not_to.be.called()
+        expect(build_cached_percentiles_mock).not_to.be.called()
+        expect(build_cached_columns_mock).to.be.called_once_with(officer_ids={1, 2})
+
+    @freeze_time('2020-01-04 12:00:00')
+    @patch('data.cache_managers.officer_cache_manager.changed_officer_ids', Mock(return_value={1, 2}))
+    @patch('data.cache_managers.officer_cache_manager.sources_changed', Mock(return_value=True))
+    @patch('data.cache_managers.officer_cache_manager.build_cached_columns_set_based')
+    @patch('data.cache_managers.officer_cache_manager.build_cached_percentiles')
+    @patch('data.cache_managers.officer_cache_manager.build_cached_yearly_percentiles')
+    def test_cache_data_incremental_with_changed_percentile_sources(
+        self, build_cached_yearly_percentiles_mock, build_cached_percentiles_mock, build_cached_columns_mock
+    ):
+        officer_cache_manager.cache_data(since=datetime(2020, 1, 2, tzinfo=pytz.utc))
+
+        expect(build_cached_yearly_percentiles_mock).to.be.called_once()
+        expect(build_cached_percentiles_mock).to.be.called_once()
+
+    @freeze_time('2020-01-04 12:00:00')
+    @patch('data.cache_managers.officer_cache_manager.changed_officer_ids', Mock(return_value={1, 2}))
+    @patch('data.cache_managers.officer_cache_manager.sources_changed', Mock(return_value=False))
+    @patch('data.cache_managers.officer_cache_manager.build_cached_columns_set_based', Mock())
+    @patch('data.cache_managers.officer_cache_manager.build_cached_percentiles')
+    @patch('data.cache_managers.officer_cache_manager.build_cached_yearly_percentiles')
+    def test_cache_data_incremental_in_new_year(
+        self, build_cached_yearly_percentiles_mock, build_cached_percentiles_mock
+    ):
+        officer_cache_manager.cache_data(since=datetime(2019, 12, 31, tzinfo=pytz.utc))
+
+        expect(build_cached_yearly_percentiles_mock).not_to.be.called()
+        expect(build_cached_percentiles_mock).to.be.called_once()
+
+    @patch('data.cache_managers.officer_cache_manager.build_cached_percentiles', Mock())
+    @patch('data.cache_managers.officer_cache_manager.build_cached_yearly_percentiles', Mock())
+    def test_cache_data_touches_are_not_source_changes(self):
+        with freeze_time('2020-01-01 12:00:00'):
+            officer = OfficerFactory()
+            officer_cache_manager.build_cached_columns_set_based()
+        with freeze_time('2020-01-03 12:00:00'):
+            OfficerAllegationFactory(officer=officer)
+
+        started_at = datetime(2020, 1, 4, 12, tzinfo=pytz.utc)
+        with freeze_time('2020-01-04 12:00:05'):
+            with touching_at(started_at):
+                officer_cache_manager.cache_data(since=datetime(2020, 1, 2, tzinfo=pytz.utc))
+
+        officer.refresh_from_db()
+        expect(officer.allegation_count).to.eq(1)
+        expect(officer.updated_at).to.eq(started_at)
+        expect(officer_cache_manager.changed_officer_ids(started_at)).to.be.empty()
+        expect(officer_cache_manager.sources_changed(PERCENTILE_SOURCE_MODELS, started_at)).to.be.false()
+
+    @patch('data.cache_managers.officer_cache_manager.build_cached_percentiles', Mock())
+    @patch('data.cache_managers.officer_cache_manager.build_cached_yearly_percentiles', Mock())
+    def test_cache_data_touch_changed_officers(self):
+        with freeze_time('2020-01-01 12:00:00'):
+            officer_1 = OfficerFactory()
+            officer_2 = OfficerFactory()
+            OfficerAllegationFactory(officer=officer_1)
+            officer_cache_manager.build_cached_columns_set_based()
+        with freeze_time('2020-01-03 12:00:00'):
+            OfficerAllegationFactory(officer=officer_2)
+
+        with freeze_time('2020-01-04 12:00:00'):
+            officer_cache_manager.cache_data()
+
+        officer_1.refresh_from_db()
+        officer_2.refresh_from_db()
+        expect(officer_1.updated_at).to.eq(datetime(2020, 1, 1, 12, tzinfo=pytz.utc))
+        expect(officer_2.updated_at).to.eq(datetime(2020, 1, 4, 12, tzinfo=pytz.utc))
+        expect(officer_2.allegation_count).to.eq(1)
+
+    def test_touch_officers_with_changed_yearly_percentiles(self):
+        with freeze_time('2020-01-01 12:00:00'):
+            officer_1 = OfficerFactory(id=1)
+            officer_2 = OfficerFactory(id=2)
+            officer_3 = OfficerFactory(id=3)
+            OfficerYearlyPercentileFactory(officer=officer_1, year=2016, percentile_trr=Decimal('10.0'))
+            OfficerYearlyPercentileFactory(officer=officer_2, year=2016, percentile_trr=Decimal('20.0'))
+        previous_yearly_percentiles = officer_cache_manager.load_yearly_percentiles()
+        OfficerYearlyPercentile.objects.filter(officer_id=1).update(percentile_trr=Decimal('15.0'))
+        OfficerYearlyPercentileFactory(officer=officer_3, year=2016, percentile_trr=Decimal('30.0'))
+
+        with freeze_time('2020-01-02 12:00:00'):
+            officer_cache_manager.touch_officers_with_changed_yearly_percentiles(previous_yearly_percentiles)
+
+        touched_officer_ids = Officer.objects.filter(
+            updated_at=datetime(2020, 1, 2, 12, tzinfo=pytz.utc)
+        ).values_list('id', flat=True)
+        expect(sorted(touched_officer_ids)).to.eq([1, 3])
+
+    def _create_cached_columns_dataset(self):
+        unit_1 = PoliceUnitFactory()
+        unit_2 = PoliceUnitFactory()
+        officer_1 = OfficerFactory(first_name='Jerome', last_name='Finnigan')
+        officer_2 = OfficerFactory(first_name='Jerome', last_name='Finnigan')
+        officer_3 = OfficerFactory(first_name='Raymond', last_name='Piwnicki')
+        OfficerFactory(first_name='Edward', last_name='May')
+
+        allegation = AllegationFactory()
+        OfficerAllegationFactory(officer=officer_1, allegation=allegation, final_finding='SU', disciplined=True)
+        OfficerAllegationFactory(officer=officer_1, allegation=allegation, final_finding='SU', disciplined=True)
+        OfficerAllegationFactory(officer=officer_1, final_finding='NS', disciplined=False)
+        OfficerAllegationFactory(officer=officer_2, final_finding='NS', disciplined=None)
+        OfficerAllegationFactory(officer=officer_3, allegation=allegation, final_finding='UN')
+        AwardFactory(officer=officer_1, award_type='Honorable Mention')
+        AwardFactory(officer=officer_1, award_type='Special Honorable Mention')
+        AwardFactory(officer=officer_1, award_type='Complimentary Letter')
+        AwardFactory(officer=officer_2, award_type='Honored Police Star')
+        AwardFactory(officer=officer_2, award_type='POLICE MEDAL')
+        TRRFactory.create_batch(2, officer=officer_1)
+        TRRFactory(officer=officer_3)
+        OfficerBadgeNumberFactory(officer=officer_1, star='123', current=True)
+        OfficerBadgeNumberFactory(officer=officer_1, star='456', current=False)
+        OfficerBadgeNumberFactory(officer=officer_2, star='789', current=False)
+        OfficerHistoryFactory(officer=officer_1, unit=unit_1, end_date=date(2010, 1, 1))
+        OfficerHistoryFactory(officer=officer_1, unit=unit_2, end_date=date(2012, 1, 1))
+        OfficerHistoryFactory(officer=officer_2, unit=unit_1, end_date=None)
+        OfficerHistoryFactory(officer=officer_2, unit=unit_2, end_date=date(2012, 1, 1))
+        SalaryFactory(officer=officer_1, salary=5000, year=2005)
+        SalaryFactory(officer=officer_1, salary=10000, year=2006)
+        SalaryFactory(officer=officer_3, salary=7000, year=2004)
+
+    def _cached_columns(self):
+        return list(Officer.objects.order_by('id').values_list('id', *officer_cache_manager.CACHED_COLUMNS))
+
+    def test_build_cached_columns_set_based_same_as_build_cached_columns(self):
+        self._create_cached_columns_dataset()
+
+        officer_cache_manager.build_cached_columns()
+        expected_columns = self._cached_columns()
+        Officer.objects.update(allegation_count=None, trr_count=None, last_unit=None, has_unique_name=False)
+
+        officer_cache_manager.build_cached_columns_set_based()
+        expect(self._cached_columns()).to.eq(expected_columns)
+
+    def test_build_cached_columns_set_based(self):
+        officer_1 = OfficerFactory(first_name='Jerome', last_name='Finnigan')
+        officer_2 = OfficerFactory(first_name='Jerome', last_name='Finnigan')
+        officer_3 = OfficerFactory(first_name='Edward', last_name='May')
+        OfficerAllegationFactory.create_batch(2, officer=officer_1, final_finding='SU')
+        AwardFactory(officer=officer_1, award_type='Honorable Mention')
+        AwardFactory(officer=officer_1, award_type='Lambert Tree')
+        OfficerBadgeNumberFactory(officer=officer_1, star='123', current=True)
+        SalaryFactory(officer=officer_1, salary=5000, year=2005)
+        SalaryFactory(officer=officer_1, salary=10000, year=2006)
+
+        officer_cache_manager.build_cached_columns_set_based()
+        officer_1.refresh_from_db()
+        officer_2.refresh_from_db()
+        officer_3.refresh_from_db()
+
+        expect(officer_1.allegation_count).to.eq(2)
+        expect(officer_1.sustained_count).to.eq(2)
+        expect(officer_1.honorable_mention_count).to.eq(1)
+        expect(officer_1.major_award_count).to.eq(1)
+        expect(officer_1.current_badge).to.eq('123')
+        expect(officer_1.current_salary).to.eq(10000)
+        expect(officer_1.has_unique_name).to.be.false()
+        expect(officer_2.allegation_count).to.eq(0)
+        expect(officer_2.trr_count).to.eq(0)
+        expect(officer_2.current_badge).to.be.none()
+        expect(officer_2.has_unique_name).to.be.false()
+        expect(officer_3.has_unique_name).to.be.true()
+
+    def test_build_cached_columns_set_based_with_officer_ids(self):
+        officer_1 = OfficerFactory()
+        officer_2 = OfficerFactory()
+        OfficerAllegationFactory.create_batch(2, officer=officer_1)
+        OfficerAllegationFactory.create_batch(3, officer=officer_2)
+        AwardFactory(officer=officer_1, award_type='Honorable Mention')
+        AwardFactory(officer=officer_2, award_type='Honorable Mention')
+        TRRFactory(officer=officer_1)
+        OfficerBadgeNumberFactory(officer=officer_1, star='123', current=True)
+        OfficerBadgeNumberFactory(officer=officer_2, star='456', current=True)
+        SalaryFactory(officer=officer_1, salary=5000, year=2005)
+        SalaryFactory(officer=officer_2, salary=10000, year=2006)
+        Officer.objects.update(
+            allegation_count=None, honorable_mention_count=None, trr_count=None, current_badge=None, current_salary=None
+        )
+
+        officer_cache_manager.build_cached_columns_set_based(officer_ids=[officer_1.id])
+        officer_1.refresh_from_db()
+        officer_2.refresh_from_db()
+
+        expect(officer_1.allegation_count).to.eq(2)
+        expect(officer_1.honorable_mention_count).to.eq(1)
+        expect(officer_1.trr_count).to.eq(1)
+        expect(officer_1.current_badge).to.eq('123')
+        expect(officer_1.current_salary).to.eq(5000)
+        expect(officer_2.allegation_count).to.be.none()
+        expect(officer_2.honorable_mention_count).to.be.none()
+        expect(officer_2.current_badge).to.be.none()
+        expect(officer_2.current_salary).to.be.none()
+
+        officer_cache_manager.build_cached_columns_set_based(officer_ids=[])
+        officer_2.refresh_from_db()
+        expect(officer_2.allegation_count).to.be.none()
@@ -0,0 +1,77 @@
+from datetime import datetime
+
+from django.test.testcases import TestCase
+
+from freezegun import freeze_time
+from robber import expect
+import pytz
+
+from data.cache_managers import officer_pair_allegation_cache_manager
+from data.factories import OfficerFactory, AllegationFactory, OfficerAllegationFactory
+from data.models import OfficerPairAllegation
+
+
+class OfficerPairAllegationCacheManagerTestCase(TestCase):
+    def edges(self):
+        return set(OfficerPairAllegation.objects.values_list(
+            'officer1_id', 'officer2_id', 'allegation_id', 'incident_date', 'is_officer_complaint'
+        ))
+
+    def test_build_officer_pair_allegations(self):
+        officer_1 = OfficerFactory(id=1)
+        officer_2 = OfficerFactory(id=2)
+        officer_3 = OfficerFactory(id=3)
+        allegation_1 = AllegationFactory(
+            crid='1', incident_date=datetime(2005, 1, 1, tzinfo=pytz.utc), is_officer_complaint=False
+        )
+        allegation_2 = AllegationFactory(
+            crid='2', incident_date=datetime(2006, 1, 1, tzinfo=pytz.utc), is_officer_complaint=True
+        )
+        allegation_3 = AllegationFactory(crid='3', incident_date=None)
+        OfficerAllegationFactory(allegation=allegation_1, officer=officer_3)
+        OfficerAllegationFactory(allegation=allegation_1, officer=officer_1)
+        OfficerAllegationFactory(allegation=allegation_1, officer=officer_2)
+        OfficerAllegationFactory(allegation=allegation_2, officer=officer_2)
+        OfficerAllegationFactory(allegation=allegation_2, officer=officer_1)
+        OfficerAllegationFactory(allegation=allegation_2, officer=officer_1)
+        OfficerAllegationFactory(allegation=allegation_3, officer=officer_1)
+        OfficerAllegationFactory(allegation=allegation_3, officer=officer_2)
+        OfficerAllegationFactory(officer=officer_3)
+
+        officer_pair_allegation_cache_manager.build_officer_pair_allegations()
+
+        expect(self.edges()).to.eq({
+            (1, 2, '1', datetime(2005, 1, 1, tzinfo=pytz.utc), False),
+            (1, 3, '1', datetime(2005, 1, 1, tzinfo=pytz.utc), False),
+            (2, 3, '1', datetime(2005, 1, 1, tzinfo=pytz.utc), False),
+            (1, 2, '2', datetime(2006, 1, 1, tzinfo=pytz.utc), True),
+        })
+
+    def test_cache_data_since(self):
+        with freeze_time('2020-01-01 12:00:00'):
+            officer_1 = OfficerFactory(id=1)
+            officer_2 = OfficerFactory(id=2)
+            allegation_1 = AllegationFactory(crid='1', incident_date=datetime(2005, 1, 1, tzinfo=pytz.utc))
+            allegation_2 = AllegationFactory(crid='2', incident_date=datetime(2006, 1, 1, tzinfo=pytz.utc))
+            OfficerAllegationFactory(allegation=allegation_1, officer=officer_1)
+            OfficerAllegationFactory(allegation=allegation_1, officer=officer_2)
+            OfficerAllegationFactory(allegation=allegation_2, officer=officer_1)
+            OfficerAllegationFactory(allegation=allegation_2, officer=officer_2)
+            officer_pair_allegation_cache_manager.cache_data()
+        OfficerPairAllegation.objects.filter(allegation_id='1').update(is_officer_complaint=True)
+
+        with freeze_time('2020-01-03 12:00:00'):
+            allegation_2.is_officer_complaint = True
+            allegation_2.save()
+
+        officer_pair_allegation_cache_manager.cache_data(since=datetime(2020, 1, 2, tzinfo=pytz.utc))
+
+        expect(self.edges()).to.eq({
+            (1, 2, '1', datetime(2005, 1, 1, tzinfo=pytz.utc), True),
+            (1, 2, '2', datetime(2006, 1, 1, tzinfo=pytz.utc), True),
+        })
+
+    def test_build_officer_pair_allegations_without_allegations(self):
+        officer_pair_allegation_cache_manager.build_officer_pair_allegations(allegation_ids=[])
+
+        expect(OfficerPairAllegation.objects.exists()).to.be.false()
@@ -1,8 +1,10 @@
-from datetime import date
+from datetime import date, datetime
 
 from django.test.testcases import TestCase
 
+from freezegun import freeze_time
 from robber import expect
+import pytz
 
 from data.cache_managers import salary_cache_manager
 from data.factories import (
@@ -42,3 +44,23 @@ class SalaryCacheManagerTestCase(TestCase):
             officer_1_salary_1.id, officer_1_salary_2.id, officer_2_salary_1.id, officer_2_salary_2.id
         }
         expect(rank_changed_salary_ids).to.eq(expected_rank_changed_salary_ids)
+
+    def test_cache_data_since(self):
+        with freeze_time('2020-01-01 12:00:00'):
+            officer_1 = OfficerFactory(appointed_date=date(2005, 1, 1))
+            officer_2 = OfficerFactory(appointed_date=date(2005, 1, 1))
+            officer_1_salary_1 = SalaryFactory(
+                officer=officer_1, salary=5000, year=2005, rank='Police Officer', spp_date=date(2005, 1, 1),
+            )
+            SalaryFactory(
+                officer=officer_2, salary=5000, year=2005, rank='Police Officer', spp_date=date(2005, 1, 1),
+            )
+        with freeze_time('2020-01-03 12:00:00'):
+            officer_1_salary_2 = SalaryFactory(
+                officer=officer_1, salary=15000, year=2007, rank='Sergeant', spp_date=date(2007, 1, 1),
+            )
+
+        salary_cache_manager.cache_data(since=datetime(2020, 1, 2, tzinfo=pytz.utc))
+
+        rank_changed_salary_ids = set(s.id for s in Salary.objects.filter(rank_changed=True))
+        expect(rank_changed_salary_ids).to.eq({officer_1_salary_1.id, officer_1_salary_2.id})
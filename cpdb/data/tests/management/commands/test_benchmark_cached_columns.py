@@ -0,0 +1,23 @@
+from io import StringIO
+
+from django.test.testcases import TestCase
+from django.core.management import call_command
+
+from robber import expect
+
+from data.factories import OfficerFactory
+from data.models import Officer
+
+
+class BenchmarkCachedColumnsTestCase(TestCase):
+    def test_benchmark_cached_columns(self):
+        OfficerFactory(id=1)
+        out = StringIO()
+
+        call_command('benchmark_cached_columns', '--officers=20', '--rows-per-officer=3', stdout=out)
+
+        output = out.getvalue()
+        expect(output).to.contain('Correlated subqueries:')
+        expect(output).to.contain('Set based:')
+        expect(output).to.contain('Both strategies give the same cached columns')
+        expect(list(Officer.objects.values_list('id', flat=True))).to.eq([1])
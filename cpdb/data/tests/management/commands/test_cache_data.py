@@ -9,4 +9,9 @@ class CacheDataTestCase(TestCase):
     @patch('data.cache_managers.cache_all')
     def test_cache(self, cache_all_mock):
         call_command('cache_data')
-        expect(cache_all_mock).to.be.called_once()
+        expect(cache_all_mock).to.be.called_once_with(incremental=False)
+
+    @patch('data.cache_managers.cache_all')
+    def test_cache_incremental(self, cache_all_mock):
+        call_command('cache_data', '--incremental')
+        expect(cache_all_mock).to.be.called_once_with(incremental=True)
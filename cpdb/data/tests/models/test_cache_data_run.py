@@ -0,0 +1,29 @@
+from datetime import datetime
+
+from django.test import TestCase
+
+from robber import expect
+import pytz
+
+from data.factories import CacheDataRunFactory
+from data.models import CacheDataRun
+
+
+class CacheDataRunTestCase(TestCase):
+    def test_last_started_at(self):
+        CacheDataRunFactory(started_at=datetime(2020, 1, 3, tzinfo=pytz.utc))
+        CacheDataRunFactory(started_at=datetime(2020, 1, 5, tzinfo=pytz.utc))
+        CacheDataRunFactory(started_at=datetime(2020, 1, 1, tzinfo=pytz.utc))
+
+        expect(CacheDataRun.last_started_at()).to.eq(datetime(2020, 1, 5, tzinfo=pytz.utc))
+
+    def test_last_started_at_without_run(self):
+        expect(CacheDataRun.last_started_at()).to.be.none()
+
+    def test_data_version(self):
+        expect(CacheDataRun.data_version()).to.eq(0)
+
+        CacheDataRunFactory()
+        cache_data_run = CacheDataRunFactory()
+
+        expect(CacheDataRun.data_version()).to.eq(cache_data_run.id)
@@ -0,0 +1,23 @@
+from datetime import datetime
+
+from django.test import TestCase
+
+from robber import expect
+import pytz
+
+from data.models import IndexerWatermark
+
+
+class MyIndexer:
+    pass
+
+
+class IndexerWatermarkTestCase(TestCase):
+    def test_last_indexed_at(self):
+        expect(IndexerWatermark.last_indexed_at(MyIndexer)).to.be.none()
+
+        IndexerWatermark.mark(MyIndexer, datetime(2020, 1, 3, tzinfo=pytz.utc))
+        IndexerWatermark.mark(MyIndexer, datetime(2020, 1, 5, tzinfo=pytz.utc))
+
+        expect(IndexerWatermark.objects.count()).to.eq(1)
+        expect(IndexerWatermark.last_indexed_at(MyIndexer)).to.eq(datetime(2020, 1, 5, tzinfo=pytz.utc))
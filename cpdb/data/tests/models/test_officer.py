@@ -8,6 +8,7 @@ from freezegun import freeze_time
 from mock import patch
 from robber.expect import expect
 
+from data.cache_managers import coaccusal_cache_manager
 from data.constants import ACTIVE_YES_CHOICE, ACTIVE_NO_CHOICE
 from data.factories import (
     OfficerFactory, OfficerBadgeNumberFactory, OfficerHistoryFactory, PoliceUnitFactory,
@@ -102,6 +103,16 @@ class OfficerTestCase(TestCase):
         expect(officer.get_unit_by_date(date(2007, 1, 1))).to.eq(unit_101)
         expect(officer.get_unit_by_date(date(2011, 1, 1))).to.be.none()
 
+    def test_get_unit_by_date_with_undated_history(self):
+        officer = OfficerFactory()
+        unit = PoliceUnitFactory()
+        OfficerHistoryFactory(officer=officer, unit=unit, effective_date=None, end_date=date(2005, 12, 31))
+
+        with self.assertNumQueries(2):
+            expect(officer.get_unit_by_date(date(2001, 1, 1))).to.eq(unit)
+        with self.assertNumQueries(1):
+            expect(officer.get_unit_by_date(date(2007, 1, 1))).to.be.none()
+
     def test_complaint_category_aggregation(self):
         officer = OfficerFactory()
 
@@ -305,6 +316,8 @@ class OfficerTestCase(TestCase):
         OfficerAllegationFactory(officer=officer1, allegation=allegation1)
         OfficerAllegationFactory(officer=officer2, allegation=allegation2)
 
+        coaccusal_cache_manager.cache_data()
+
         coaccusals = list(officer0.coaccusals)
         expect(coaccusals).to.have.length(2)
         expect(coaccusals).to.contain(officer1)
@@ -380,6 +393,15 @@ class OfficerTestCase(TestCase):
         expect(officer.get_rank_by_date(date(2009, 1, 1))).to.eq('Sergeant')
         expect(officer.get_rank_by_date(date(2004, 1, 1))).to.be.none()
 
+    def test_get_rank_by_date_with_local_datetime(self):
+        officer = OfficerFactory()
+        SalaryFactory(officer=officer, year=2007, rank='Police Officer', spp_date=date(2007, 1, 1))
+        SalaryFactory(officer=officer, year=2008, rank='Sergeant', spp_date=date(2008, 1, 1))
+
+        chicago_evening = pytz.timezone('America/Chicago').localize(datetime(2007, 12, 31, 20))
+        with self.assertNumQueries(1):
+            expect(officer.get_rank_by_date(chicago_evening)).to.eq('Police Officer')
+
     def test_get_rank_by_date_with_empty_rank_histories(self):
         officer = OfficerFactory()
         expect(officer.get_rank_by_date(date(2007, 1, 1))).to.be.none()
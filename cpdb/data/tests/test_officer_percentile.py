@@ -14,6 +14,7 @@ from data.constants import (
     PERCENTILE_HONORABLE_MENTION_GROUP
 )
 from data.factories import OfficerFactory, OfficerAllegationFactory, AwardFactory
+from data.models import Officer
 from data.tests.officer_percentile_utils import mock_percentile_map_range
 from shared.tests.utils import validate_object
 from trr.factories import TRRFactory
@@ -966,3 +967,134 @@ class OfficerPercentileTestCase(TestCase):
         expect(officers).to.have.length(3)
         for officer in officers:
             validate_object(officer, expected_dict[officer.id])
+
+
+class OfficerPercentileEngineTestCase(TestCase):
+    percentile_attributes = [
+        'officer_id', 'year', 'start_date', 'end_date', 'service_year',
+        'num_allegation', 'num_allegation_civilian', 'num_allegation_internal', 'num_trr', 'num_honorable_mention',
+        'metric_allegation', 'metric_allegation_civilian', 'metric_allegation_internal', 'metric_trr',
+        'metric_honorable_mention', 'percentile_allegation', 'percentile_allegation_civilian',
+        'percentile_allegation_internal', 'percentile_trr', 'percentile_honorable_mention',
+    ]
+
+    def _create_dataset(self):
+        officer1 = OfficerFactory(id=1, appointed_date=date(1990, 3, 14))
+        officer2 = OfficerFactory(id=2, appointed_date=date(1990, 3, 14), resignation_date=date(2014, 7, 1))
+        officer3 = OfficerFactory(id=3, appointed_date=date(2013, 3, 14))
+        OfficerFactory(id=4, appointed_date=date(2015, 6, 1))
+        OfficerFactory(id=5, appointed_date=None)
+
+        OfficerAllegationFactory.create_batch(
+            2, officer=officer1, allegation__incident_date=datetime(2013, 12, 31, tzinfo=pytz.utc)
+        )
+        OfficerAllegationFactory.create_batch(
+            3,
+            officer=officer1,
+            allegation__incident_date=datetime(2015, 7, 2, tzinfo=pytz.utc),
+            allegation__is_officer_complaint=True
+        )
+        OfficerAllegationFactory(
+            officer=officer2,
+            allegation__incident_date=datetime(2014, 3, 2, tzinfo=pytz.utc),
+            allegation__is_officer_complaint=False
+        )
+        OfficerAllegationFactory(
+            officer=officer3,
+            allegation__incident_date=datetime(2016, 1, 1, tzinfo=pytz.utc),
+            allegation__is_officer_complaint=False
+        )
+        OfficerAllegationFactory(officer=officer3, allegation__incident_date=None)
+        TRRFactory(officer=officer1, trr_datetime=datetime(2015, 1, 1, tzinfo=pytz.utc))
+        TRRFactory.create_batch(2, officer=officer3, trr_datetime=datetime(2016, 1, 1, 5, tzinfo=pytz.utc))
+        AwardFactory(officer=officer1, award_type='Honorable Mention', start_date=date(2014, 1, 1))
+        AwardFactory(officer=officer3, award_type='Honorable Mention', start_date=date(2016, 1, 22))
+        AwardFactory(officer=officer3, award_type='Complimentary Letter', start_date=date(2016, 1, 22))
+
+    def _expect_same_as_top_percentile(self, engine_officers, officers):
+        expect(len(engine_officers)).to.eq(len(officers))
+        officer_dict = {officer.id: officer for officer in officers}
+        for engine_officer in engine_officers:
+            officer = officer_dict[engine_officer.id]
+            validate_object(engine_officer, {
+                attr: getattr(officer, attr, None) for attr in self.percentile_attributes
+            })
+
+    @mock_percentile_map_range(
+        allegation_min=datetime(2013, 1, 1, tzinfo=pytz.utc),
+        allegation_max=datetime(2016, 7, 1, tzinfo=pytz.utc),
+        internal_civilian_min=datetime(2014, 1, 1, tzinfo=pytz.utc),
+        internal_civilian_max=datetime(2016, 7, 1, tzinfo=pytz.utc),
+        trr_min=datetime(2015, 1, 1, tzinfo=pytz.utc),
+        trr_max=datetime(2016, 7, 1, tzinfo=pytz.utc),
+        honorable_mention_min=datetime(2014, 1, 1, tzinfo=pytz.utc),
+        honorable_mention_max=datetime(2016, 1, 22, tzinfo=pytz.utc)
+    )
+    def test_top_percentile_same_as_top_percentile_query(self):
+        self._create_dataset()
+
+        engine = officer_percentile.OfficerPercentileEngine()
+        for year in range(2013, 2018):
+            self._expect_same_as_top_percentile(
+                engine.top_percentile(year),
+                officer_percentile.top_percentile(year)
+            )
+
+    @mock_percentile_map_range(
+        internal_civilian_min=datetime(2014, 1, 1, tzinfo=pytz.utc),
+        internal_civilian_max=datetime(2016, 7, 1, tzinfo=pytz.utc),
+        trr_min=datetime(2015, 1, 1, tzinfo=pytz.utc),
+        trr_max=datetime(2016, 7, 1, tzinfo=pytz.utc)
+    )
+    def test_top_percentile_with_types(self):
+        self._create_dataset()
+        percentile_groups = [PERCENTILE_ALLEGATION_INTERNAL_CIVILIAN_GROUP, PERCENTILE_TRR_GROUP]
+
+        engine = officer_percentile.OfficerPercentileEngine(percentile_groups)
+        officers = engine.top_percentile(2016)
+
+        self._expect_same_as_top_percentile(
+            officers,
+            officer_percentile.top_percentile(2016, percentile_groups=percentile_groups)
+        )
+        expect(set(engine.event_dates.keys())).to.eq({
+            'allegation', 'allegation_civilian', 'allegation_internal', 'trr'
+        })
+
+    @mock_percentile_map_range(
+        trr_min=datetime(2015, 1, 1, tzinfo=pytz.utc),
+        trr_max=datetime(2016, 7, 1, tzinfo=pytz.utc)
+    )
+    def test_top_percentile_return_empty_if_date_range_smaller_than_1_year(self):
+        self._create_dataset()
+
+        engine = officer_percentile.OfficerPercentileEngine([PERCENTILE_TRR_GROUP])
+        expect(engine.top_percentile(2015)).to.be.empty()
+
+    def test_percentile_group_not_found(self):
+        expect(lambda: officer_percentile.OfficerPercentileEngine(['not_exist'])).to.throw(ValueError)
+
+    @mock_percentile_map_range(
+        allegation_min=datetime(2013, 1, 1, tzinfo=pytz.utc),
+        allegation_max=datetime(2016, 7, 1, tzinfo=pytz.utc),
+        internal_civilian_min=datetime(2014, 1, 1, tzinfo=pytz.utc),
+        internal_civilian_max=datetime(2016, 7, 1, tzinfo=pytz.utc),
+        trr_min=datetime(2015, 1, 1, tzinfo=pytz.utc),
+        trr_max=datetime(2016, 7, 1, tzinfo=pytz.utc)
+    )
+    def test_yearly_top_percentile(self):
+        self._create_dataset()
+        percentile_groups = [PERCENTILE_ALLEGATION_GROUP, PERCENTILE_TRR_GROUP]
+
+        with patch('data.officer_percentile.Officer.objects.filter', wraps=Officer.objects.filter) as officer_filter:
+            yearly_percentiles = officer_percentile.yearly_top_percentile(
+                range(2014, 2017), percentile_groups=percentile_groups
+            )
+            expect(officer_filter.call_count).to.eq(1)
+
+        expect(list(yearly_percentiles.keys())).to.eq([2014, 2015, 2016])
+        for year, officers in yearly_percentiles.items():
+            self._expect_same_as_top_percentile(
+                officers,
+                officer_percentile.top_percentile(year, percentile_groups=percentile_groups)
+            )
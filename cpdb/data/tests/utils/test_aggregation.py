@@ -1,10 +1,21 @@
 
+from datetime import date
+
+from django.core.cache import cache
 from django.db.models import Case, Value, When, CharField
-from django.test.testcases import SimpleTestCase
+from django.test.testcases import SimpleTestCase, TestCase, override_settings
 
+from freezegun import freeze_time
+from mock import Mock
 from robber import expect
 
-from data.utils.aggregation import get_num_range_case
+from data.factories import (
+    OfficerFactory, OfficerHistoryFactory, PoliceUnitFactory, AllegationFactory, OfficerAllegationFactory,
+    AllegationCategoryFactory, ComplainantFactory, CacheDataRunFactory
+)
+from data.utils.aggregation import (
+    get_num_range_case, get_num_range, compute_officer_aggregations, compute_unit_aggregations, cached_aggregations
+)
 
 
 class AggregationUtilsTestCase(SimpleTestCase):
@@ -52,3 +63,164 @@ class AggregationUtilsTestCase(SimpleTestCase):
                 "WHEN <Q: (AND: ('a__lte', 5), ('a__gte', 4))> "
                 "THEN Value(4-5), WHEN <Q: (AND: ('a__gte', 6))> THEN Value(6+), ELSE Value(Unknown)>")
         ]).to.contain(repr(result))
+
+    def test_get_num_range(self):
+        expect(get_num_range(None, [0, 20, 30])).to.eq('Unknown')
+        expect(get_num_range(-1, [0, 20, 30])).to.eq('<20')
+        expect(get_num_range(20, [0, 20, 30])).to.eq('<20')
+        expect(get_num_range(21, [0, 20, 30])).to.eq('21-30')
+        expect(get_num_range(31, [0, 20, 30])).to.eq('31+')
+        expect(get_num_range(0, [1, 5])).to.eq('Unknown')
+        expect(get_num_range(6, [1, 5])).to.eq('6+')
+        expect(get_num_range(1, [1])).to.eq('1+')
+        expect(get_num_range(1, [])).to.eq('Unknown')
+
+
+class ComputeAggregationsTestCase(TestCase):
+    def test_compute_officer_aggregations(self):
+        officer_1 = OfficerFactory()
+        officer_2 = OfficerFactory()
+        officer_3 = OfficerFactory()
+        allegation_1 = AllegationFactory()
+        allegation_2 = AllegationFactory()
+        OfficerAllegationFactory(
+            officer=officer_1, allegation=allegation_1, start_date=date(2010, 1, 1), final_finding='SU',
+            allegation_category=AllegationCategoryFactory(category='Use of Force')
+        )
+        OfficerAllegationFactory(
+            officer=officer_1, allegation=allegation_2, start_date=None, final_finding='NS', allegation_category=None
+        )
+        OfficerAllegationFactory(
+            officer=officer_2, allegation=allegation_1, start_date=date(2011, 1, 1), final_finding='NS',
+            allegation_category=None
+        )
+        ComplainantFactory(allegation=allegation_1, race='White', age=25, gender='F')
+        ComplainantFactory(allegation=allegation_1, race='n/a', age=None, gender='M')
+
+        aggregations = compute_officer_aggregations([officer_1.id, officer_2.id, officer_3.id])
+
+        expect(aggregations[officer_1.id]['category']).to.eq([
+            {
+                'name': 'Use of Force', 'count': 1, 'sustained_count': 1,
+                'items': [{'name': 'Use of Force', 'year': 2010, 'count': 1, 'sustained_count': 1}]
+            },
+            {'name': 'Unknown', 'count': 1, 'sustained_count': 0, 'items': []}
+        ])
+        expect(aggregations[officer_1.id]['race']).to.eq([
+            {
+                'name': 'White', 'count': 1, 'sustained_count': 1,
+                'items': [{'name': 'White', 'year': 2010, 'count': 1, 'sustained_count': 1}]
+            },
+            {
+                'name': 'Unknown', 'count': 2, 'sustained_count': 1,
+                'items': [{'name': 'Unknown', 'year': 2010, 'count': 1, 'sustained_count': 1}]
+            }
+        ])
+        expect(aggregations[officer_1.id]['age']).to.eq([
+            {
+                'name': '21-30', 'count': 1, 'sustained_count': 1,
+                'items': [{'name': '21-30', 'year': 2010, 'count': 1, 'sustained_count': 1}]
+            },
+            {
+                'name': 'Unknown', 'count': 2, 'sustained_count': 1,
+                'items': [{'name': 'Unknown', 'year': 2010, 'count': 1, 'sustained_count': 1}]
+            }
+        ])
+        expect(aggregations[officer_1.id]['gender']).to.eq([
+            {
+                'name': 'Female', 'count': 1, 'sustained_count': 1,
+                'items': [{'name': 'Female', 'year': 2010, 'count': 1, 'sustained_count': 1}]
+            },
+            {
+                'name': 'Male', 'count': 1, 'sustained_count': 1,
+                'items': [{'name': 'Male', 'year': 2010, 'count': 1, 'sustained_count': 1}]
+            },
+            {'name': 'Unknown', 'count': 1, 'sustained_count': 0, 'items': []}
+        ])
+        expect(aggregations[officer_2.id]['category']).to.eq([
+            {
+                'name': 'Unknown', 'count': 1, 'sustained_count': 0,
+                'items': [{'name': 'Unknown', 'year': 2011, 'count': 1, 'sustained_count': 0}]
+            }
+        ])
+        expect(aggregations[officer_3.id]).to.eq({'category': [], 'race': [], 'age': [], 'gender': []})
+
+    @freeze_time('2020-01-01')
+    def test_compute_unit_aggregations(self):
+        unit_1 = PoliceUnitFactory()
+        unit_2 = PoliceUnitFactory()
+        unit_3 = PoliceUnitFactory()
+        officer_1 = OfficerFactory(race='White', birth_year=1985, gender='F')
+        officer_2 = OfficerFactory(race='', birth_year=None, gender='')
+        OfficerHistoryFactory(officer=officer_1, unit=unit_1)
+        OfficerHistoryFactory(officer=officer_1, unit=unit_2)
+        OfficerHistoryFactory(officer=officer_1, unit=unit_1)
+        OfficerHistoryFactory(officer=officer_2, unit=unit_1)
+
+        allegation_1 = AllegationFactory()
+        allegation_2 = AllegationFactory()
+        use_of_force = AllegationCategoryFactory(category='Use of Force')
+        OfficerAllegationFactory(
+            officer=officer_1, allegation=allegation_1, allegation_category=use_of_force, final_finding='SU'
+        )
+        OfficerAllegationFactory(
+            officer=officer_2, allegation=allegation_1, allegation_category=use_of_force, final_finding='NS'
+        )
+        OfficerAllegationFactory(officer=officer_2, allegation=allegation_2, allegation_category=None)
+        ComplainantFactory(allegation=allegation_1, race='Black', age=25, gender='F')
+        ComplainantFactory(allegation=allegation_2, race='Black', age=None, gender='')
+
+        aggregations = compute_unit_aggregations([unit_1.id, unit_2.id, unit_3.id])
+
+        expect(aggregations[unit_1.id]).to.eq({
+            'member_race': [{'name': 'Unknown', 'count': 1}, {'name': 'White', 'count': 1}],
+            'member_age': [{'name': '31-40', 'count': 1}, {'name': 'Unknown', 'count': 1}],
+            'member_gender': [{'name': 'Female', 'count': 1}, {'name': 'Unknown', 'count': 1}],
+            'category': [
+                {'name': 'Unknown', 'count': 1, 'sustained_count': 0},
+                {'name': 'Use of Force', 'count': 1, 'sustained_count': 1},
+            ],
+            'race': [{'name': 'Black', 'count': 2, 'sustained_count': 1}],
+            'age': [
+                {'name': '21-30', 'count': 1, 'sustained_count': 1},
+                {'name': 'Unknown', 'count': 1, 'sustained_count': 0},
+            ],
+            'gender': [
+                {'name': 'Female', 'count': 1, 'sustained_count': 1},
+                {'name': 'Unknown', 'count': 1, 'sustained_count': 0},
+            ],
+        })
+        expect(aggregations[unit_2.id]['member_race']).to.eq([{'name': 'White', 'count': 1}])
+        expect(aggregations[unit_2.id]['category']).to.eq([{'name': 'Use of Force', 'count': 1, 'sustained_count': 1}])
+        expect(aggregations[unit_3.id]).to.eq({
+            'member_race': [], 'member_age': [], 'member_gender': [],
+            'category': [], 'race': [], 'age': [], 'gender': [],
+        })
+
+
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+class CachedAggregationsTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_cached_aggregations(self):
+        compute = Mock(side_effect=lambda ids: {entity_id: {'category': [entity_id]} for entity_id in ids})
+
+        expect(cached_aggregations('officer', [1, 2], compute)).to.eq({1: {'category': [1]}, 2: {'category': [2]}})
+        expect(cached_aggregations('officer', [2, 3], compute)).to.eq({2: {'category': [2]}, 3: {'category': [3]}})
+        expect(compute.call_args_list[0][0][0]).to.eq([1, 2])
+        expect(compute.call_args_list[1][0][0]).to.eq([3])
+
+        cached_aggregations('unit', [1], compute)
+        expect(compute.call_args_list[2][0][0]).to.eq([1])
+
+    def test_cached_aggregations_invalidated_by_data_version(self):
+        compute = Mock(side_effect=lambda ids: {entity_id: {} for entity_id in ids})
+
+        cached_aggregations('officer', [1], compute)
+        cached_aggregations('officer', [1], compute)
+        expect(compute).to.be.called_once()
+
+        CacheDataRunFactory()
+        cached_aggregations('officer', [1], compute)
+        expect(compute.call_count).to.eq(2)
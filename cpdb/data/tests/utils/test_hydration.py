@@ -0,0 +1,79 @@
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from robber import expect
+
+from data.factories import OfficerFactory, AllegationFactory, OfficerAllegationFactory
+from data.models import Officer, Allegation
+from data.utils.hydration import in_order, RankedObjects
+
+
+class InOrderTestCase(TestCase):
+    def test_in_order(self):
+        officer_1 = OfficerFactory(id=1)
+        officer_2 = OfficerFactory(id=2)
+        officer_3 = OfficerFactory(id=3)
+
+        with CaptureQueriesContext(connection) as context:
+            officers = in_order(Officer.objects.all(), [3, 1, 4, 2, 1])
+
+        expect(officers).to.eq([officer_3, officer_1, officer_2])
+        expect(context.captured_queries).to.have.length(1)
+        expect(context.captured_queries[0]['sql']).not_to.contain('CASE')
+
+    def test_in_order_by_field_name(self):
+        allegation_1 = AllegationFactory(crid='123')
+        allegation_2 = AllegationFactory(crid='456')
+
+        expect(in_order(Allegation.objects.all(), ['456', '123'], field_name='crid')).to.eq(
+            [allegation_2, allegation_1]
+        )
+
+    def test_in_order_keep_prefetches(self):
+        officer = OfficerFactory(id=1)
+        OfficerAllegationFactory.create_batch(2, officer=officer)
+        OfficerAllegationFactory(officer=OfficerFactory(id=2))
+
+        officers = in_order(Officer.objects.prefetch_related('officerallegation_set'), [2, 1])
+
+        with self.assertNumQueries(0):
+            expect([len(officer.officerallegation_set.all()) for officer in officers]).to.eq([1, 2])
+
+    def test_in_order_without_ids(self):
+        OfficerFactory(id=1)
+
+        expect(in_order(Officer.objects.all(), [])).to.eq([])
+
+
+class RankedObjectsTestCase(TestCase):
+    def test_ranked_objects(self):
+        officer_1 = OfficerFactory(id=1)
+        officer_2 = OfficerFactory(id=2)
+        officer_3 = OfficerFactory(id=3)
+        ranked_officers = RankedObjects(
+            Officer.objects.all(), [3, 1, 2], attributes={3: {'coaccusal_count': 5}, 1: {'coaccusal_count': 4}}
+        )
+
+        with self.assertNumQueries(0):
+            expect(ranked_officers.count()).to.eq(3)
+            expect(len(ranked_officers)).to.eq(3)
+
+        with self.assertNumQueries(1):
+            page = ranked_officers[1:3]
+        expect(page).to.eq([officer_1, officer_2])
+        expect(page[0].coaccusal_count).to.eq(4)
+        expect(hasattr(page[1], 'coaccusal_count')).to.be.false()
+
+        expect(ranked_officers[0]).to.eq(officer_3)
+        expect(ranked_officers[-1]).to.eq(officer_2)
+        expect(ranked_officers.first().coaccusal_count).to.eq(5)
+        expect(list(ranked_officers)).to.eq([officer_3, officer_1, officer_2])
+
+    def test_ranked_objects_by_field_name(self):
+        allegation = AllegationFactory(crid='123')
+
+        ranked_allegations = RankedObjects(Allegation.objects.all(), ['123'], field_name='crid')
+
+        expect(ranked_allegations[0]).to.eq(allegation)
+        expect(RankedObjects(Allegation.objects.all(), []).first()).to.be.none()
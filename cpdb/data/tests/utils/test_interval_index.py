@@ -0,0 +1,95 @@
+from datetime import date, datetime, timedelta
+
+from django.db.models import Q
+from django.test import TestCase
+
+from robber import expect
+import pytz
+
+from data.factories import OfficerFactory, OfficerHistoryFactory, PoliceUnitFactory, SalaryFactory
+from data.models import OfficerHistory
+from data.utils.interval_index import OfficerUnitIndex, OfficerRankIndex, date_keys
+
+
+class DateKeysTestCase(TestCase):
+    def test_date_keys(self):
+        expect(date_keys(None)).to.be.none()
+        expect(date_keys(date(2002, 1, 3))).to.eq((date(2002, 1, 3), date(2002, 1, 3)))
+        expect(date_keys(datetime(2002, 1, 3, tzinfo=pytz.utc))).to.eq((date(2002, 1, 3), date(2002, 1, 3)))
+        expect(date_keys(datetime(2002, 1, 3, 10, tzinfo=pytz.utc))).to.eq((date(2002, 1, 3), date(2002, 1, 4)))
+        expect(date_keys(pytz.timezone('America/Chicago').localize(datetime(2002, 1, 3, 20)))).to.eq(
+            (date(2002, 1, 4), date(2002, 1, 5))
+        )
+
+
+class OfficerUnitIndexTestCase(TestCase):
+    def setUp(self):
+        self.officer = OfficerFactory(id=1)
+        self.unit_1 = PoliceUnitFactory(unit_name='001')
+        self.unit_2 = PoliceUnitFactory(unit_name='002')
+        self.unit_3 = PoliceUnitFactory(unit_name='003')
+        OfficerHistoryFactory(
+            officer=self.officer, unit=self.unit_1, effective_date=date(2002, 1, 3), end_date=date(2003, 1, 2)
+        )
+        OfficerHistoryFactory(officer=self.officer, unit=self.unit_2, effective_date=date(2003, 1, 3), end_date=None)
+        # Overlaps the first history, which started earlier and wins
+        OfficerHistoryFactory(
+            officer=self.officer, unit=self.unit_3, effective_date=date(2002, 6, 1), end_date=date(2002, 8, 1)
+        )
+        OfficerHistoryFactory(officer=self.officer, unit=self.unit_3, effective_date=None, end_date=date(2001, 1, 1))
+
+    def test_unit_at(self):
+        unit_index = OfficerUnitIndex()
+
+        expect(unit_index.unit_at(1, date(2000, 6, 1))).to.eq(self.unit_3)
+        expect(unit_index.unit_at(1, date(2002, 1, 2))).to.be.none()
+        expect(unit_index.unit_at(1, date(2002, 1, 3))).to.eq(self.unit_1)
+        expect(unit_index.unit_at(1, date(2002, 7, 1))).to.eq(self.unit_1)
+        expect(unit_index.unit_at(1, date(2003, 1, 2))).to.eq(self.unit_1)
+        expect(unit_index.unit_at(1, datetime(2003, 1, 2, tzinfo=pytz.utc))).to.eq(self.unit_1)
+        expect(unit_index.unit_at(1, datetime(2003, 1, 2, 10, tzinfo=pytz.utc))).to.be.none()
+        expect(unit_index.unit_at(1, date(2020, 1, 1))).to.eq(self.unit_2)
+        expect(unit_index.unit_at(1, None)).to.be.none()
+        expect(unit_index.unit_at(2, date(2020, 1, 1))).to.be.none()
+
+    def test_units_at(self):
+        unit_index = OfficerUnitIndex(officer_ids=[1])
+
+        expect(unit_index.units_at([(1, date(2002, 7, 1)), (1, date(2020, 1, 1)), (2, date(2002, 7, 1))])).to.eq(
+            [self.unit_1, self.unit_2, None]
+        )
+
+    def test_unit_at_same_as_query(self):
+        unit_index = OfficerUnitIndex(officer_ids=[1])
+
+        day = date(2000, 12, 1)
+        while day < date(2003, 3, 1):
+            for at in [day, datetime(day.year, day.month, day.day, 12, tzinfo=pytz.utc)]:
+                history = OfficerHistory.objects.filter(officer_id=1).filter(
+                    Q(effective_date__lte=at) | Q(effective_date__isnull=True),
+                    Q(end_date__gte=at) | Q(end_date__isnull=True)
+                ).order_by('effective_date').first()
+                expect(unit_index.unit_at(1, at)).to.eq(history.unit if history else None)
+            day += timedelta(days=7)
+
+
+class OfficerRankIndexTestCase(TestCase):
+    def test_rank_at(self):
+        officer = OfficerFactory(id=1)
+        SalaryFactory(officer=officer, year=2005, rank='Police Officer', spp_date=date(2005, 1, 1))
+        SalaryFactory(officer=officer, year=2006, rank='Police Officer', spp_date=date(2005, 1, 1))
+        SalaryFactory(officer=officer, year=2008, rank='Sergeant', spp_date=date(2008, 1, 1))
+        SalaryFactory(officer=officer, year=2009, rank='Sergeant', spp_date=date(2008, 1, 1))
+        SalaryFactory(officer=officer, year=2010, rank='Lieutenant', spp_date=None)
+
+        rank_index = OfficerRankIndex()
+
+        expect(rank_index.rank_at(1, date(2004, 12, 31))).to.be.none()
+        expect(rank_index.rank_at(1, date(2005, 1, 1))).to.eq('Police Officer')
+        expect(rank_index.rank_at(1, datetime(2007, 1, 1, tzinfo=pytz.utc))).to.eq('Police Officer')
+        expect(rank_index.rank_at(1, date(2020, 1, 1))).to.eq('Sergeant')
+        expect(rank_index.rank_at(1, None)).to.be.none()
+        expect(rank_index.rank_at(2, date(2020, 1, 1))).to.be.none()
+        expect(rank_index.ranks_at([(1, date(2007, 1, 1)), (1, date(2009, 1, 1)), (2, date(2009, 1, 1))])).to.eq(
+            ['Police Officer', 'Sergeant', None]
+        )
@@ -0,0 +1,21 @@
+from django.test import TestCase
+
+from robber import expect
+
+from data.factories import OfficerFactory
+from data.models import Officer
+from data.utils.key_range import in_key_range
+
+
+class InKeyRangeTestCase(TestCase):
+    def setUp(self):
+        for officer_id in [1, 2, 3, 4]:
+            OfficerFactory(id=officer_id)
+
+    def _ids(self, key_range):
+        return sorted(in_key_range(Officer.objects.all(), 'id', key_range).values_list('id', flat=True))
+
+    def test_in_key_range(self):
+        expect(self._ids(None)).to.eq([1, 2, 3, 4])
+        expect(self._ids((2, 3))).to.eq([2, 3])
+        expect(self._ids([1, 4])).to.eq([1, 4])
@@ -3,7 +3,7 @@ from django.test import SimpleTestCase
 from robber import expect
 from mock import Mock
 
-from data.utils.percentile import percentile, merge_metric
+from data.utils.percentile import percentile, merge_metric, percentile_rank
 from shared.tests.utils import create_object, validate_object
 
 
@@ -67,6 +67,18 @@ class PercentileTestCase(SimpleTestCase):
         expect(hasattr(object2, 'percentile_custom_value')).to.be.false()
         expect(hasattr(object3, 'percentile_custom_value')).to.be.false()
 
+    def test_percentile_rank_with_no_data(self):
+        expect(percentile_rank([])).to.be.eq([])
+
+    def test_percentile_rank(self):
+        expect(percentile_rank([0.2, 0.5, 0.4, 0.1])).to.eq([25.0, 75.0, 50.0, 0.0])
+
+    def test_percentile_rank_with_same_scores(self):
+        expect(percentile_rank([0.1, 0.1, 0.3, 0.4])).to.eq([0.0, 0.0, 50.0, 75.0])
+
+    def test_percentile_rank_with_decimal_places(self):
+        expect(percentile_rank([3, 1, 2], decimal_places=4)).to.eq([66.6667, 0.0, 33.3333])
+
     def test_merge_percentile(self):
         objects = [
             create_object({'id': 1, 'value_a': 0.1, 'metric_value_a': 0.1}),
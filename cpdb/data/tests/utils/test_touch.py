@@ -0,0 +1,62 @@
+from datetime import datetime
+
+from django.test import TestCase
+
+from freezegun import freeze_time
+from robber import expect
+import pytz
+
+from data.factories import OfficerFactory
+from data.models import Officer
+from data.utils.touch import touch, touching_at, touching_changed_rows
+
+
+class TouchTestCase(TestCase):
+    def test_touch(self):
+        with freeze_time('2020-01-01 12:00:00'):
+            officer_1 = OfficerFactory()
+            officer_2 = OfficerFactory()
+
+        with freeze_time('2020-01-02 12:00:00'):
+            touch(Officer.objects.filter(id=officer_1.id))
+
+        officer_1.refresh_from_db()
+        officer_2.refresh_from_db()
+        expect(officer_1.updated_at).to.eq(datetime(2020, 1, 2, 12, tzinfo=pytz.utc))
+        expect(officer_2.updated_at).to.eq(datetime(2020, 1, 1, 12, tzinfo=pytz.utc))
+
+    def test_touching_changed_rows(self):
+        with freeze_time('2020-01-01 12:00:00'):
+            officer_1 = OfficerFactory(allegation_count=1, trr_count=1)
+            officer_2 = OfficerFactory(allegation_count=2, trr_count=2)
+            officer_3 = OfficerFactory(allegation_count=3, trr_count=3)
+
+        with freeze_time('2020-01-02 12:00:00'):
+            with touching_changed_rows(Officer.objects.exclude(id=officer_3.id), ['allegation_count']):
+                Officer.objects.filter(id=officer_1.id).update(allegation_count=10)
+                Officer.objects.filter(id=officer_2.id).update(trr_count=20)
+                Officer.objects.filter(id=officer_3.id).update(allegation_count=30)
+
+        officer_1.refresh_from_db()
+        officer_2.refresh_from_db()
+        officer_3.refresh_from_db()
+        expect(officer_1.updated_at).to.eq(datetime(2020, 1, 2, 12, tzinfo=pytz.utc))
+        expect(officer_2.updated_at).to.eq(datetime(2020, 1, 1, 12, tzinfo=pytz.utc))
+        expect(officer_3.updated_at).to.eq(datetime(2020, 1, 1, 12, tzinfo=pytz.utc))
+
+    def test_touch_inside_touching_at(self):
+        with freeze_time('2020-01-01 12:00:00'):
+            officer = OfficerFactory()
+
+        with freeze_time('2020-01-03 12:00:00'):
+            with touching_at(datetime(2020, 1, 2, 12, tzinfo=pytz.utc)):
+                touch(Officer.objects.filter(id=officer.id))
+
+        officer.refresh_from_db()
+        expect(officer.updated_at).to.eq(datetime(2020, 1, 2, 12, tzinfo=pytz.utc))
+
+        with freeze_time('2020-01-04 12:00:00'):
+            touch(Officer.objects.filter(id=officer.id))
+
+        officer.refresh_from_db()
+        expect(officer.updated_at).to.eq(datetime(2020, 1, 4, 12, tzinfo=pytz.utc))
@@ -1,4 +1,20 @@
+from collections import defaultdict
+from itertools import groupby
+
+from django.apps import apps
+from django.conf import settings
+from django.core.cache import cache
 from django.db.models import Case, Value, When, CharField
+from django.utils.timezone import now
+
+from data.constants import GENDER_DICT
+
+AGGREGATION_CACHE_PREFIX = 'aggregation'
+AGE_RANGES = [0, 20, 30, 40, 50]
+UNKNOWN_RACES = ['n/a', 'n/a ', 'nan', '']
+OFFICER_AGGREGATIONS = ['category', 'race', 'age', 'gender']
+UNIT_MEMBER_AGGREGATIONS = ['member_race', 'member_age', 'member_gender']
+UNIT_COMPLAINT_AGGREGATIONS = ['category', 'race', 'age', 'gender']
 
 
 def get_num_range_case(field, ranges):
@@ -32,3 +48,266 @@ def get_num_range_case(field, ranges):
 
         whens.append(When(**kwargs))
     return Case(default=Value('Unknown'), output_field=CharField(), *whens)
+
+
+def get_num_range(value, ranges):
+    """
+    Python counterpart of get_num_range_case, naming the range of a value which is already fetched.
+
+    ex: get_num_range(25, [0, 20, 30]) => '21-30'
+    """
+    if value is None:
+        return 'Unknown'
+    len_ranges = len(ranges)
+    for ind, val in enumerate(ranges):
+        if ind > 0:
+            val += 1
+
+        if ind == 0 and val == 0:
+            if value <= ranges[ind + 1]:
+                return f'<{ranges[ind + 1]}'
+        elif ind < len_ranges-1:
+            if val <= value <= ranges[ind + 1]:
+                return f'{val}-{ranges[ind + 1]}'
+        elif value >= val:
+            return f'{val}+'
+    return 'Unknown'
+
+
+def group_and_sort_aggregations(data, key_name='name'):
+    """
+    Helper to group by name, aggregate count & sustained_counts.
+    Also makes sure 'Unknown' group is always the last item.
+    """
+    groups = []
+    unknown_group = None
+    for k, g in groupby(data, lambda x: x[key_name]):
+        group = {'name': k, 'count': 0, 'sustained_count': 0, 'items': []}
+        unknown_year = None
+        for item in g:
+            if item['year']:
+                group['items'].append(item)
+                group['count'] += item['count']
+                group['sustained_count'] += item['sustained_count']
+            else:
+                unknown_year = item
+        if unknown_year:
+            group['count'] += item['count']
+            group['sustained_count'] += item['sustained_count']
+        if k != 'Unknown':
+            groups.append(group)
+        else:
+            unknown_group = group
+
+    if unknown_group is not None:
+        groups.append(unknown_group)
+    return groups
+
+
+def race_name(race):
+    return 'Unknown' if race is None or race in UNKNOWN_RACES else race
+
+
+def gender_code(gender):
+    return 'Unknown' if not gender else gender
+
+
+def gender_name(code):
+    return GENDER_DICT.get(code, 'Unknown')
+
+
+def _year_aggregation(counts, display=None):
+    """
+    :param counts: {(name, year): [count, sustained count]}
+    :param display: maps a name to the name shown, after sorting
+    """
+    data = [
+        {
+            'name': display(name) if display else name,
+            'year': year,
+            'count': count,
+            'sustained_count': sustained_count
+        }
+        for (name, year), (count, sustained_count) in sorted(
+            counts.items(), key=lambda item: (item[0][0], item[0][1] is None, item[0][1] or 0)
+        )
+    ]
+    return group_and_sort_aggregations(data)
+
+
+def _member_aggregation(members, display=None):
+    """
+    :param members: {name: set of officer ids}
+    """
+    return [
+        {'name': display(name) if display else name, 'count': len(officer_ids)}
+        for name, officer_ids in sorted(members.items())
+    ]
+
+
+def _complaint_aggregation(entries, display=None):
+    """
+    :param entries: {name: (set of counted ids, set of sustained ids)}
+    """
+    return [
+        {
+            'name': display(name) if display else name,
+            'count': len(ids),
+            'sustained_count': len(sustained_ids)
+        }
+        for name, (ids, sustained_ids) in sorted(entries.items())
+    ]
+
+
+def compute_officer_aggregations(officer_ids):
+    """
+    Complaint category and complainant race, age and gender breakdowns by year of many officers, pivoted from one
+    fetch of their officer allegations joined with complainants.
+    :return: {officer id: {'category': [...], 'race': [...], 'age': [...], 'gender': [...]}}
+    """
+    rows = apps.get_model('data', 'OfficerAllegation').objects.filter(officer_id__in=officer_ids).values_list(
+        'officer_id', 'id', 'start_date', 'final_finding', 'allegation_category__category',
+        'allegation__complainant__id', 'allegation__complainant__race', 'allegation__complainant__age',
+        'allegation__complainant__gender'
+    )
+
+    counts = {
+        officer_id: {facet: defaultdict(lambda: [0, 0]) for facet in OFFICER_AGGREGATIONS}
+        for officer_id in officer_ids
+    }
+    counted_officer_allegation_ids = set()
+    for officer_id, officer_allegation_id, start_date, final_finding, category, complainant_id, race, age, gender \
+            in rows:
+        year = start_date.year if start_date else None
+        sustained = 1 if final_finding == 'SU' else 0
+        names = {
+            'race': race_name(race) if complainant_id else 'Unknown',
+            'age': get_num_range(age, AGE_RANGES),
+            'gender': gender_code(gender) if complainant_id else 'Unknown',
+        }
+        # Rows are repeated for every complainant, categories are counted once per officer allegation
+        if officer_allegation_id not in counted_officer_allegation_ids:
+            counted_officer_allegation_ids.add(officer_allegation_id)
+            names['category'] = 'Unknown' if category is None else category
+
+        for facet, name in names.items():
+            facet_counts = counts[officer_id][facet][(name, year)]
+            facet_counts[0] += 1
+            facet_counts[1] += sustained
+
+    return {
+        officer_id: {
+            'category': _year_aggregation(officer_counts['category']),
+            'race': _year_aggregation(officer_counts['race']),
+            'age': _year_aggregation(officer_counts['age']),
+            'gender': _year_aggregation(officer_counts['gender'], display=gender_name),
+        }
+        for officer_id, officer_counts in counts.items()
+    }
+
+
+def compute_unit_aggregations(unit_ids):
+    """
+    Member race, age and gender breakdowns, complaint category breakdown and complainant race, age and gender
+    breakdowns of many units, pivoted from one fetch of their officer histories joined with officers, officer
+    allegations and complainants. Officers who rejoined a unit and allegations shared by its members are counted once.
+    :return: {unit id: {'member_race': [...], ..., 'category': [...], 'race': [...], 'age': [...], 'gender': [...]}}
+    """
+    rows = apps.get_model('data', 'OfficerHistory').objects.filter(
+        unit_id__in=unit_ids, officer__isnull=False
+    ).values_list(
+        'unit_id', 'officer_id', 'officer__race', 'officer__birth_year', 'officer__gender',
+        'officer__officerallegation__id',
+        'officer__officerallegation__allegation_id',
+        'officer__officerallegation__final_finding',
+        'officer__officerallegation__allegation_category__category',
+        'officer__officerallegation__allegation__complainant__id',
+        'officer__officerallegation__allegation__complainant__race',
+        'officer__officerallegation__allegation__complainant__age',
+        'officer__officerallegation__allegation__complainant__gender',
+    ).distinct()
+
+    current_year = now().year
+    members = {
+        unit_id: {facet: defaultdict(set) for facet in UNIT_MEMBER_AGGREGATIONS}
+        for unit_id in unit_ids
+    }
+    complaints = {
+        unit_id: {facet: defaultdict(lambda: (set(), set())) for facet in UNIT_COMPLAINT_AGGREGATIONS}
+        for unit_id in unit_ids
+    }
+    for (
+        unit_id, officer_id, officer_race, birth_year, officer_gender, officer_allegation_id, allegation_id,
+        final_finding, category, complainant_id, race, age, gender
+    ) in rows:
+        unit_members = members[unit_id]
+        unit_members['member_race'][race_name(officer_race)].add(officer_id)
+        member_age = current_year - birth_year if birth_year is not None else None
+        unit_members['member_age'][get_num_range(member_age, AGE_RANGES)].add(officer_id)
+        unit_members['member_gender'][gender_code(officer_gender)].add(officer_id)
+
+        if officer_allegation_id is None:
+            continue
+        sustained = final_finding == 'SU'
+        unit_complaints = complaints[unit_id]
+        category_ids, sustained_officer_allegation_ids = unit_complaints['category'][
+            'Unknown' if category is None else category
+        ]
+        category_ids.add(allegation_id)
+        if sustained:
+            sustained_officer_allegation_ids.add(officer_allegation_id)
+
+        if complainant_id is None:
+            continue
+        for facet, name in [
+            ('race', race_name(race)),
+            ('age', get_num_range(age, AGE_RANGES)),
+            ('gender', gender_code(gender)),
+        ]:
+            complainant_ids, sustained_complainant_ids = unit_complaints[facet][name]
+            complainant_ids.add(complainant_id)
+            if sustained:
+                sustained_complainant_ids.add(complainant_id)
+
+    return {
+        unit_id: {
+            'member_race': _member_aggregation(members[unit_id]['member_race']),
+            'member_age': _member_aggregation(members[unit_id]['member_age']),
+            'member_gender': _member_aggregation(members[unit_id]['member_gender'], display=gender_name),
+            'category': _complaint_aggregation(complaints[unit_id]['category']),
+            'race': _complaint_aggregation(complaints[unit_id]['race']),
+            'age': _complaint_aggregation(complaints[unit_id]['age']),
+            'gender': _complaint_aggregation(complaints[unit_id]['gender'], display=gender_name),
+        }
+        for unit_id in unit_ids
+    }
+
+
+def cached_aggregations(namespace, ids, compute):
+    """
+    Aggregations of many entities from the cache, computing the missing ones together. Every key holds the data
+    version so that a data refresh drops all cached aggregations.
+    :return: {id: aggregations}
+    """
+    version = apps.get_model('data', 'CacheDataRun').data_version()
+    keys = {entity_id: f'{AGGREGATION_CACHE_PREFIX}:{namespace}:{version}:{entity_id}' for entity_id in ids}
+    cached = cache.get_many(list(keys.values()))
+    result = {entity_id: cached[key] for entity_id, key in keys.items() if key in cached}
+
+    missing_ids = [entity_id for entity_id in keys if entity_id not in result]
+    if missing_ids:
+        computed = compute(missing_ids)
+        cache.set_many(
+            {keys[entity_id]: computed[entity_id] for entity_id in missing_ids},
+            settings.AGGREGATION_CACHE_TIMEOUT
+        )
+        result.update(computed)
+    return result
+
+
+def officer_aggregations(officer_ids):
+    return cached_aggregations('officer', officer_ids, compute_officer_aggregations)
+
+
+def unit_aggregations(unit_ids):
+    return cached_aggregations('unit', unit_ids, compute_unit_aggregations)
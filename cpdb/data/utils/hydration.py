@@ -0,0 +1,49 @@
+def in_order(queryset, ids, field_name='pk'):
+    """
+    Fetch the objects of ids with one IN query and keep them in the order of ids, in Python rather than with a
+    CASE WHEN ordering that grows with the id list. Missing ids are skipped, repeated ids are returned once.
+    :param queryset: any queryset, its select_related and prefetch_related are applied to the whole batch
+    """
+    objects = queryset.in_bulk(ids, field_name=field_name)
+    results = []
+    seen = set()
+    for id in ids:
+        if id in objects and id not in seen:
+            seen.add(id)
+            results.append(objects[id])
+    return results
+
+
+class RankedObjects(object):
+    """
+    Sequence of the objects of a ranked id list which only fetches the objects of the slices taken from it, so that
+    a paginator counts and slices the id list and only hydrates the page.
+    :param attributes: {id: {name: value}} set on the fetched objects, e.g. scores stored along with the ids
+    """
+    def __init__(self, queryset, ids, field_name='pk', attributes=None):
+        self.queryset = queryset
+        self.ids = ids
+        self.field_name = field_name
+        self.attributes = attributes or dict()
+
+    def count(self):
+        return len(self.ids)
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __getitem__(self, key):
+        if not isinstance(key, slice):
+            return self[key:key + 1 or None][0]
+        objects = in_order(self.queryset, self.ids[key], field_name=self.field_name)
+        for obj in objects:
+            key = obj.pk if self.field_name == 'pk' else getattr(obj, self.field_name)
+            for name, value in self.attributes.get(key, {}).items():
+                setattr(obj, name, value)
+        return objects
+
+    def __iter__(self):
+        return iter(self[:])
+
+    def first(self):
+        return self[0] if self.ids else None
@@ -0,0 +1,135 @@
+from bisect import bisect_left, bisect_right
+from datetime import date, datetime, time, timedelta
+from itertools import groupby
+from operator import itemgetter
+
+from django.apps import apps
+import pytz
+
+
+def date_keys(at):
+    """
+    Dates a unit history must start on or before and end on or after to contain `at`. A datetime is compared to
+    date columns the way the timeline subqueries did in Postgres, a date being midnight UTC, so an end date only
+    contains the datetimes of its own day at midnight. Officer.get_rank_by_date and officers.query_helpers take
+    the local date of a datetime instead and do not go through these indexes.
+    :return: (start key, end key) pair or None for a null date, which no history contains
+    """
+    if at is None:
+        return None
+    if isinstance(at, datetime):
+        utc_at = at.astimezone(pytz.utc)
+        start_key = utc_at.date()
+        end_key = start_key if utc_at.time() == time.min else start_key + timedelta(days=1)
+        return start_key, end_key
+    return at, at
+
+
+class OfficerUnitIndex(object):
+    """
+    Unit of officers at any date, answered from per officer arrays of OfficerHistory sorted by effective date.
+    When histories overlap, the one with the earliest effective date wins, and histories without an effective date
+    only match after all dated ones.
+    """
+    def __init__(self, officer_ids=None):
+        histories = apps.get_model('data', 'OfficerHistory').objects.all()
+        units = apps.get_model('data', 'PoliceUnit').objects.all()
+        if officer_ids is not None:
+            histories = histories.filter(officer_id__in=officer_ids)
+            units = units.filter(officerhistory__officer_id__in=officer_ids).distinct()
+        self.units = {unit.id: unit for unit in units}
+
+        self._starts = dict()
+        self._max_ends = dict()
+        self._unit_ids = dict()
+        self._undated = dict()
+        histories = histories.values_list('officer_id', 'effective_date', 'end_date', 'unit_id', 'id')
+        for officer_id, officer_histories in groupby(
+            sorted(histories, key=lambda row: (row[0], row[1] is None, row[1] or date.min, row[4])),
+            key=itemgetter(0)
+        ):
+            starts, max_ends, unit_ids, undated = [], [], [], []
+            max_end = date.min
+            for _, effective_date, end_date, unit_id, _ in officer_histories:
+                if effective_date is None:
+                    undated.append((end_date or date.max, unit_id))
+                    continue
+                # Running max of end dates is sorted, so the first history still going on at a date is a bisect away
+                max_end = max(max_end, end_date or date.max)
+                starts.append(effective_date)
+                max_ends.append(max_end)
+                unit_ids.append(unit_id)
+            self._starts[officer_id] = starts
+            self._max_ends[officer_id] = max_ends
+            self._unit_ids[officer_id] = unit_ids
+            self._undated[officer_id] = undated
+
+    def _unit_id_at(self, officer_id, at):
+        keys = date_keys(at)
+        if keys is None or officer_id not in self._starts:
+            return None
+        start_key, end_key = keys
+
+        starts = self._starts[officer_id]
+        started_count = bisect_right(starts, start_key)
+        index = bisect_left(self._max_ends[officer_id], end_key, 0, started_count)
+        if index < started_count:
+            return self._unit_ids[officer_id][index]
+
+        for end_date, unit_id in self._undated[officer_id]:
+            if end_date >= end_key:
+                return unit_id
+        return None
+
+    def unit_at(self, officer_id, at):
+        """
+        :return: PoliceUnit of the officer at date or datetime `at`, None if it is unknown
+        """
+        return self.units.get(self._unit_id_at(officer_id, at))
+
+    def units_at(self, officer_dates):
+        """
+        :param officer_dates: iterable of (officer id, date or datetime) pairs
+        :return: list of PoliceUnit or None, in the same order
+        """
+        return [self.unit_at(officer_id, at) for officer_id, at in officer_dates]
+
+
+class OfficerRankIndex(object):
+    """
+    Rank of officers at any date, answered from per officer arrays of rank changes sorted by SPP date.
+    Rank changes are the first salary rows of each run of the same rank, in year order, like `Salary.rank_changed`.
+    """
+    def __init__(self, officer_ids=None):
+        salaries = apps.get_model('data', 'Salary').objects.filter(spp_date__isnull=False)
+        if officer_ids is not None:
+            salaries = salaries.filter(officer_id__in=officer_ids)
+
+        self._spp_dates = dict()
+        self._ranks = dict()
+        salaries = salaries.order_by('officer_id', 'year').values_list('officer_id', 'rank', 'spp_date')
+        for officer_id, officer_salaries in groupby(salaries, key=itemgetter(0)):
+            rank_changes = [
+                next(rank_salaries)
+                for _, rank_salaries in groupby(officer_salaries, key=itemgetter(1))
+            ]
+            rank_changes.sort(key=itemgetter(2))
+            self._spp_dates[officer_id] = [spp_date for _, _, spp_date in rank_changes]
+            self._ranks[officer_id] = [rank for _, rank, _ in rank_changes]
+
+    def rank_at(self, officer_id, at):
+        """
+        :return: rank of the officer at date or datetime `at`, None if it is unknown
+        """
+        keys = date_keys(at)
+        if keys is None or officer_id not in self._spp_dates:
+            return None
+        index = bisect_right(self._spp_dates[officer_id], keys[0])
+        return self._ranks[officer_id][index - 1] if index else None
+
+    def ranks_at(self, officer_dates):
+        """
+        :param officer_dates: iterable of (officer id, date or datetime) pairs
+        :return: list of ranks or None, in the same order
+        """
+        return [self.rank_at(officer_id, at) for officer_id, at in officer_dates]
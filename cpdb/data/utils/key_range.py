@@ -0,0 +1,9 @@
+def in_key_range(queryset, field, key_range):
+    """
+    :param key_range: None for no filter, a (first, last) tuple for a range of keys or a list of exact keys
+    """
+    if key_range is None:
+        return queryset
+    if isinstance(key_range, list):
+        return queryset.filter(**{f'{field}__in': key_range})
+    return queryset.filter(**{f'{field}__range': key_range})
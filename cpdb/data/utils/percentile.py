@@ -47,3 +47,29 @@ def merge_metric(objects, new_metric_query_set, percentile_types):
                 pass
 
     return objects + new_objects
+
+
+def percentile_rank(scores, decimal_places=0):
+    """
+    Same ranking as `percentile` but working on a plain list of scores, sorted only once.
+    :param scores: list of numbers
+    :param decimal_places: how much we will round the rank, 0 means no round
+    :return: list of ranks in the same order as scores
+    """
+    scores_length = len(scores)
+    if not scores_length:
+        return []
+
+    ranks = [0.0] * scores_length
+    sorted_indexes = sorted(range(scores_length), key=scores.__getitem__)
+    previous_score = scores[sorted_indexes[0]]
+    current_rank = 0.0
+
+    for i, index in enumerate(sorted_indexes):
+        if scores[index] > previous_score:
+            current_rank = 100.0 * i / scores_length
+            current_rank = round(current_rank, decimal_places) if decimal_places > 0 else current_rank
+            previous_score = scores[index]
+        ranks[index] = current_rank
+
+    return ranks
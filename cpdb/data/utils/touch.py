@@ -0,0 +1,43 @@
+from contextlib import contextmanager
+
+from django.utils import timezone
+
+
+_touched_at = None
+
+
+def touch_time():
+    return _touched_at or timezone.now()
+
+
+@contextmanager
+def touching_at(timestamp):
+    """
+    Rows touched inside the block get timestamp as updated_at instead of now. cache_data dates its touches to the
+    start of its run so that the next incremental run, which looks for rows updated after that start, does not
+    take them for source changes.
+    """
+    global _touched_at
+    previous_touched_at, _touched_at = _touched_at, timestamp
+    try:
+        yield
+    finally:
+        _touched_at = previous_touched_at
+
+
+def touch(queryset):
+    queryset.update(updated_at=touch_time())
+
+
+@contextmanager
+def touching_changed_rows(queryset, fields):
+    """
+    Bump updated_at of the rows of queryset whose fields are changed inside the block. Cached columns are written
+    with QuerySet.update() and raw SQL which leave updated_at as it is, incremental indexing would miss them.
+    """
+    values_before = set(queryset.values_list('pk', *fields))
+    yield
+    values_after = set(queryset.values_list('pk', *fields))
+    changed_pks = {values[0] for values in values_after - values_before}
+    if changed_pks:
+        touch(queryset.model.objects.filter(pk__in=changed_pks))
@@ -3,6 +3,7 @@ from contextlib import contextmanager
 from django.conf import settings
 
 from . import es_client
+from .index_version import bump_index_version
 from .indices import Index
 from .utils import per_run_uuid, timing_validate
 
@@ -47,3 +48,11 @@ class IndexAlias:
         self.read_index.delete(ignore=404)
         es_client.indices.put_alias(index=self.new_index_name, name=self.name)
         self.write_index.refresh()
+        bump_index_version()
+
+    def refresh_read_index(self):
+        """
+        Make documents written straight into the live alias searchable and drop the results cached for it.
+        """
+        self.read_index.refresh()
+        bump_index_version()
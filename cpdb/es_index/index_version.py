@@ -0,0 +1,16 @@
+import uuid
+
+from django.core.cache import cache
+
+INDEX_VERSION_CACHE_KEY = 'es-index-version'
+
+
+def index_version():
+    """
+    Stamp of the current state of the Elasticsearch aliases, it changes every time an alias is swapped.
+    """
+    return cache.get_or_set(INDEX_VERSION_CACHE_KEY, lambda: uuid.uuid4().hex, None)
+
+
+def bump_index_version():
+    cache.set(INDEX_VERSION_CACHE_KEY, uuid.uuid4().hex, None)
@@ -1,11 +1,41 @@
 import copy
 import types
+from functools import partial
+from multiprocessing.pool import ThreadPool
 
+from django.conf import settings
+from django.db import connections
+from django.db.models import QuerySet
 from django.utils.module_loading import autodiscover_modules
 from elasticsearch.helpers import bulk
 from tqdm import tqdm
 
 from es_index import es_client, indexer_klasses
+from es_index.pipeline import IndexingPipeline
+
+
+def keyset_chunks(queryset, key, chunk_size):
+    """
+    Split queryset into lists of at most chunk_size rows ordered by key.
+    Each chunk is fetched by its own `key > last key` query so no server side cursor or offset is needed.
+    """
+    last_key = None
+    while True:
+        chunk_queryset = queryset.order_by(key)
+        if last_key is not None:
+            chunk_queryset = chunk_queryset.filter(**{f'{key}__gt': last_key})
+        chunk = list(chunk_queryset[:chunk_size])
+        if not chunk:
+            return
+        yield chunk
+        if len(chunk) < chunk_size:
+            return
+        last_row = chunk[-1]
+        last_key = last_row[key] if isinstance(last_row, dict) else getattr(last_row, key)
+
+
+def updated_values(queryset, since, field):
+    return set(queryset.filter(updated_at__gt=since).values_list(field, flat=True))
 
 
 class BaseIndexer(object):
@@ -13,10 +43,62 @@ class BaseIndexer(object):
     index_alias = None
     parent_doc_type_property = None
     op_type = 'index'
+    # Indexers which can load their related rows one key range at a time set this to the key of get_queryset
+    chunk_key = None
+    incremental_chunk_size = 1000
+    # Keys of the documents to update in the live alias, None for a full rebuild
+    updated_keys = None
+
+    def __init__(self, updated_keys=None):
+        if updated_keys is not None:
+            self.updated_keys = sorted(set(updated_keys))
+
+    @property
+    def incremental(self):
+        return self.updated_keys is not None
+
+    @property
+    def chunk_size(self):
+        if not self.chunk_key:
+            return 0
+        if self.incremental:
+            return settings.ES_INDEXING_CHUNK_SIZE or self.incremental_chunk_size
+        return settings.ES_INDEXING_CHUNK_SIZE
+
+    @property
+    def index_name(self):
+        return self.index_alias.name if self.incremental else self.index_alias.new_index_name
 
     def get_queryset(self):
         raise NotImplementedError
 
+    @classmethod
+    def get_updated_keys(cls, since):
+        """
+        :return: keys (values of chunk_key) of the documents whose source rows were updated after since
+        """
+        raise NotImplementedError
+
+    def populate_chunk(self, key_range):
+        raise NotImplementedError
+
+    def chunked(self, queryset):
+        if self.incremental:
+            # Related rows of an incremental update are loaded by exact keys, changed keys are usually sparse
+            for i in range(0, len(self.updated_keys), self.chunk_size):
+                keys = self.updated_keys[i:i + self.chunk_size]
+                self.populate_chunk(keys)
+                yield from queryset.filter(**{f'{self.chunk_key}__in': keys})
+            return
+
+        for chunk in keyset_chunks(queryset, self.chunk_key, self.chunk_size):
+            first_row, last_row = chunk[0], chunk[-1]
+            if isinstance(first_row, dict):
+                self.populate_chunk((first_row[self.chunk_key], last_row[self.chunk_key]))
+            else:
+                self.populate_chunk((getattr(first_row, self.chunk_key), getattr(last_row, self.chunk_key)))
+            yield from chunk
+
     def extract_datum(self, datum):
         raise NotImplementedError
 
@@ -44,7 +126,7 @@ class BaseIndexer(object):
 
     def doc_dict(self, raw_doc):
         doc = self.doc_type_klass(**raw_doc).to_dict(include_meta=True)
-        doc['_index'] = self.index_alias.new_index_name
+        doc['_index'] = self.index_name
         doc['_op_type'] = self.op_type
 
         if 'id' in raw_doc:
@@ -55,17 +137,18 @@ class BaseIndexer(object):
             doc = self._embed_update_script(doc)
         return doc
 
+    def serialize(self, datum):
+        result = self.extract_datum(datum)
+        if isinstance(result, types.GeneratorType):
+            return [self.doc_dict(obj) for obj in result]
+        return [self.doc_dict(result)]
+
     def docs(self):
         for datum in tqdm(
             self.get_queryset(),
             desc=f'Indexing {self.doc_type_klass._doc_type.name}({self.__class__.__name__})'
         ):
-            result = self.extract_datum(datum)
-            if isinstance(result, types.GeneratorType):
-                for obj in result:
-                    yield self.doc_dict(obj)
-            else:
-                yield self.doc_dict(result)
+            yield from self.serialize(datum)
 
     @classmethod
     def create_mapping(cls):
@@ -76,7 +159,10 @@ class BaseIndexer(object):
     def add_new_data(self):
         self.index_alias.write_index.settings(refresh_interval='-1')
         self.index_alias.write_index.open()
-        bulk(es_client, self.docs())
+        if settings.ES_INDEXING_PIPELINE:
+            IndexingPipeline(self).run()
+        else:
+            bulk(es_client, self.docs())
         self.index_alias.write_index.settings(refresh_interval='1s')
         self.index_alias.write_index.refresh()
 
@@ -84,13 +170,30 @@ class BaseIndexer(object):
         self.create_mapping()
         self.add_new_data()
 
+    def update_index(self):
+        """
+        Index the documents of updated_keys straight into the live alias, without building a new index.
+        """
+        if not self.incremental:
+            raise ValueError(f'{self.__class__.__name__} has no updated keys to index')
+        if not self.updated_keys:
+            return
+        bulk(es_client, self.docs())
+        self.index_alias.refresh_read_index()
+
 
 class PartialIndexer(BaseIndexer):
     batch_size = 1000
+    # Number of batches reindexed at the same time, each from its own thread and database connection
+    concurrency = 1
+    # Updating keys are already batched, related rows are loaded as a whole
+    chunk_key = None
 
-    def __init__(self, updating_keys=None):
+    def __init__(self, updating_keys=None, concurrency=None):
         super(PartialIndexer, self).__init__()
         self.updating_keys = list(updating_keys) if updating_keys else []
+        if concurrency is not None:
+            self.concurrency = concurrency
 
     @classmethod
     def create_mapping(cls):
@@ -101,11 +204,22 @@ class PartialIndexer(BaseIndexer):
             doc_type.init(index=cls.index_alias.new_index_name)
 
     def reindex(self):
-        self.validate_updated_docs()
+        """
+        Validate every batch of updating keys against the live index first, so a count mismatch raises before
+        anything is written. Then copy the live index into the new index and replace the docs of each batch: its
+        existing docs are deleted by id and its rows are re-added in a single bulk request.
+        Raising ValueError inside `index_alias.indexing()` drops the new index so the alias is left untouched.
+        """
+        keys_batches = list(self.get_keys_batches())
+        doc_ids_batches = self._map_batches(self.get_batch_doc_ids, keys_batches)
         self.create_mapping()
         self.index_alias.migrate()
-        self.delete_existing_docs()
-        self.add_new_data()
+        self.index_alias.write_index.settings(refresh_interval='-1')
+        try:
+            self._map_batches(self.reindex_batch, keys_batches, doc_ids_batches)
+        finally:
+            self.index_alias.write_index.settings(refresh_interval='1s')
+        self.index_alias.write_index.refresh()
 
     def get_keys_batches(self):
         for i in range(0, len(self.updating_keys), self.batch_size):
@@ -122,32 +236,54 @@ class PartialIndexer(BaseIndexer):
         for keys_batch in self.get_keys_batches():
             yield self.get_batch_queryset(keys_batch)
 
-    @property
-    def batch_update_docs_queries(self):
-        for keys_batch in self.get_keys_batches():
-            yield self.get_batch_update_docs_queries(keys_batch)
-
     def get_queryset(self):
         for queryset in self.batch_querysets:
             for item in queryset:
                 yield item
 
-    def delete_existing_docs(self):
-        self.index_alias.write_index.open()
-        for update_docs_query in self.batch_update_docs_queries:
-            es_client.delete_by_query(
-                index=self.index_alias.new_index_name,
-                body=update_docs_query.to_dict(),
-                doc_type=self.doc_type_klass._doc_type.name)
-
-        self.index_alias.write_index.refresh()
-
-    def validate_updated_docs(self):
-        num_es_docs = sum(update_docs_query.count() for update_docs_query in self.batch_update_docs_queries)
-        num_postgres_rows = sum(queryset.count() for queryset in self.batch_querysets)
+    def count_batch_rows(self, keys):
+        queryset = self.get_batch_queryset(keys)
+        return queryset.count() if isinstance(queryset, QuerySet) else len(queryset)
 
-        if num_postgres_rows != num_es_docs:
+    def get_existing_doc_ids(self, keys, expected_count):
+        """
+        Fetch ids of the docs to replace in the same request that counts them.
+        """
+        response = self.get_batch_update_docs_queries(keys).source(False)[:expected_count + 1].execute()
+        if response.hits.total != expected_count:
             raise ValueError(
                 f'Can not update index for {self.doc_type_klass._doc_type.name}. '
-                f'Number of ES doc ({num_es_docs}) is not equal to number of PostgreS rows ({num_postgres_rows})'
+                f'Number of ES doc ({response.hits.total}) is not equal to number of PostgreS rows ({expected_count})'
             )
+        return [hit.meta.id for hit in response]
+
+    def get_batch_doc_ids(self, keys):
+        return self.get_existing_doc_ids(keys, self.count_batch_rows(keys))
+
+    def reindex_batch(self, keys, doc_ids):
+        rows = list(self.get_batch_queryset(keys))
+
+        doc_type_name = self.doc_type_klass._doc_type.name
+        delete_actions = [
+            {'_op_type': 'delete', '_index': self.index_name, '_type': doc_type_name, '_id': doc_id}
+            for doc_id in doc_ids
+        ]
+        docs = [doc for row in rows for doc in self.serialize(row)]
+        bulk(es_client, delete_actions + docs)
+
+    def _map_batches(self, func, *batches):
+        """
+        :return: results of func over the zipped batches in order, run in `concurrency` threads if more than one
+        """
+        if self.concurrency > 1:
+            with ThreadPool(self.concurrency) as pool:
+                return pool.starmap(partial(self._call_in_thread, func), zip(*batches))
+        return [func(*args) for args in zip(*batches)]
+
+    @staticmethod
+    def _call_in_thread(func, *args):
+        try:
+            return func(*args)
+        finally:
+            # Connections are per thread, pool threads must not leave theirs open
+            connections.close_all()
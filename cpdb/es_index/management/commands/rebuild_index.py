@@ -1,8 +1,14 @@
 import json
+import queue
+from multiprocessing import get_context
+from time import time
 
-from django.core.management import BaseCommand
+from django.core.management import BaseCommand, CommandError
+from django.db import connections
+from django.utils import timezone
 from django.utils.module_loading import autodiscover_modules
 
+from data.models import IndexerWatermark
 from es_index import indexer_klasses, indexer_klasses_map
 from es_index.constants import DAILY_INDEXERS
 
@@ -17,6 +23,13 @@ class Command(BaseCommand):
             dest='from_file',
             help='Read config json and choose which indexer to rebuild'
         )
+        parser.add_argument(
+            '--jobs',
+            dest='jobs',
+            type=int,
+            default=1,
+            help='Number of index aliases to rebuild concurrently in separate processes'
+        )
 
     def _get_indexer_names_from_json(self, file_name):
         with open(file_name) as f:
@@ -83,22 +96,99 @@ class Command(BaseCommand):
     def _get_distinct_doc_types_from_indexers(self, indexers):
         return list(set(x.doc_type_klass._doc_type.name for x in indexers))
 
-    def handle(self, *args, **options):
-        selected_indexers = self.get_indexers(**options)
-        alias_indexers_tuple = self.categorize_indexers_by_index_alias(selected_indexers)
+    def rebuild_alias(self, alias, indexers, migrating_indexers):
+        timings = []
+        started_at = timezone.now()
+        with alias.indexing():
+            list_migrate_doc_types = self._get_distinct_doc_types_from_indexers(migrating_indexers)
+
+            for indexer_klass in indexers:
+                indexer_klass.create_mapping()
+
+            for indexer_klass in migrating_indexers:
+                indexer_klass.create_mapping()
+
+            start_time = time()
+            alias.migrate(list_migrate_doc_types)
+            timings.append(('migrate', time() - start_time))
+
+            for indexer_klass in indexers:
+                start_time = time()
+                indexer_instance = indexer_klass()
+                indexer_instance.add_new_data()
+                timings.append((indexer_klass.__name__, time() - start_time))
+
+        # Rows updated while rebuilding are picked up by the next update_index run
+        for indexer_klass in indexers:
+            IndexerWatermark.mark(indexer_klass, started_at)
+        return timings
+
+    def _rebuild_alias_in_process(self, result_queue, alias, indexers, migrating_indexers):
+        try:
+            result_queue.put((alias.name, self.rebuild_alias(alias, indexers, migrating_indexers), None))
+        except Exception as e:
+            result_queue.put((alias.name, [], f'{e.__class__.__name__}: {e}'))
+        finally:
+            connections.close_all()
+
+    def rebuild_aliases_in_processes(self, alias_indexers_tuple, jobs):
+        # Each child opens its own database connection, so none may be inherited
+        connections.close_all()
+        context = get_context('fork')
+        result_queue = context.Queue()
+        pending = list(alias_indexers_tuple)
+        running = dict()
+        alias_timings = dict()
+        errors = dict()
+
+        while pending or running:
+            while pending and len(running) < jobs:
+                alias, indexers, migrating_indexers = pending.pop(0)
+                process = context.Process(
+                    target=self._rebuild_alias_in_process,
+                    args=(result_queue, alias, indexers, migrating_indexers)
+                )
+                process.start()
+                running[alias.name] = process
+
+            try:
+                alias_name, timings, error = result_queue.get(timeout=1)
+            except queue.Empty:
+                for alias_name, process in list(running.items()):
+                    if not process.is_alive() and process.exitcode != 0:
+                        running.pop(alias_name)
+                        errors[alias_name] = f'process exited with code {process.exitcode}'
+                continue
 
-        for alias, indexers, migrating_indexers in alias_indexers_tuple:
-            with alias.indexing():
-                list_migrate_doc_types = self._get_distinct_doc_types_from_indexers(migrating_indexers)
+            running.pop(alias_name).join()
+            alias_timings[alias_name] = timings
+            if error:
+                errors[alias_name] = error
 
-                for indexer_klass in indexers:
-                    indexer_klass.create_mapping()
+        return alias_timings, errors
 
-                for indexer_klass in migrating_indexers:
-                    indexer_klass.create_mapping()
+    def report_timings(self, alias_timings, wall_seconds):
+        self.stdout.write('Rebuild index timings:')
+        for alias_name, timings in alias_timings.items():
+            alias_seconds = sum(seconds for _, seconds in timings)
+            self.stdout.write(f'  {alias_name}: {alias_seconds:.2f}s')
+            for name, seconds in timings:
+                self.stdout.write(f'    {name}: {seconds:.2f}s')
+        total_seconds = sum(seconds for timings in alias_timings.values() for _, seconds in timings)
+        self.stdout.write(f'Total {total_seconds:.2f}s of indexing done in {wall_seconds:.2f}s')
 
-                alias.migrate(list_migrate_doc_types)
+    def handle(self, *args, **options):
+        selected_indexers = self.get_indexers(**options)
+        alias_indexers_tuple = self.categorize_indexers_by_index_alias(selected_indexers)
 
-                for indexer_klass in indexers:
-                    indexer_instance = indexer_klass()
-                    indexer_instance.add_new_data()
+        start_time = time()
+        if options['jobs'] > 1 and len(alias_indexers_tuple) > 1:
+            alias_timings, errors = self.rebuild_aliases_in_processes(alias_indexers_tuple, options['jobs'])
+            self.report_timings(alias_timings, time() - start_time)
+            if errors:
+                raise CommandError('\n'.join(f'{name}: {error}' for name, error in errors.items()))
+        else:
+            alias_timings = dict()
+            for alias, indexers, migrating_indexers in alias_indexers_tuple:
+                alias_timings[alias.name] = self.rebuild_alias(alias, indexers, migrating_indexers)
+            self.report_timings(alias_timings, time() - start_time)
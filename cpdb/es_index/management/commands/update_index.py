@@ -0,0 +1,43 @@
+from time import time
+
+from django.core.management import BaseCommand
+from django.utils import timezone
+from django.utils.module_loading import autodiscover_modules
+
+from data.models import IndexerWatermark
+from es_index import indexer_klasses, indexer_klasses_map
+from es_index.indexers import BaseIndexer
+
+
+class Command(BaseCommand):
+    help = 'Index documents whose rows were updated since the last indexing straight into the live index aliases'
+
+    def add_arguments(self, parser):
+        parser.add_argument('app', nargs='*')
+
+    def get_indexers(self, apps):
+        autodiscover_modules('indexers')
+        if apps:
+            indexers = [indexer for app in apps for indexer in indexer_klasses_map[app]]
+        else:
+            indexers = indexer_klasses
+        return [
+            indexer for indexer in indexers
+            if indexer.get_updated_keys.__func__ is not BaseIndexer.get_updated_keys.__func__
+        ]
+
+    def handle(self, *args, **options):
+        for indexer_klass in self.get_indexers(options['app']):
+            since = IndexerWatermark.last_indexed_at(indexer_klass)
+            if since is None:
+                self.stdout.write(f'{indexer_klass.__name__}: never indexed, run rebuild_index first')
+                continue
+
+            start_time = time()
+            started_at = timezone.now()
+            updated_keys = indexer_klass.get_updated_keys(since)
+            indexer_klass(updated_keys=updated_keys).update_index()
+            IndexerWatermark.mark(indexer_klass, started_at)
+            self.stdout.write(
+                f'{indexer_klass.__name__}: {len(updated_keys)} documents updated in {time() - start_time:.2f}s'
+            )
@@ -1,5 +1,13 @@
-from django.db.models import Case, When
-from rest_framework.pagination import LimitOffsetPagination
+import base64
+import json
+from collections import OrderedDict
+
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, LimitOffsetPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+from data.utils.hydration import in_order
 
 
 class ESBasePagination(LimitOffsetPagination):
@@ -26,6 +34,89 @@ class ESQueryPagination(ESBasePagination):
 
 class ESQuerysetPagination(ESBasePagination):
     def get_response(self, response):
-        pk_list = [item.id for item in response]
-        preserved = Case(*[When(pk=pk, then=pos) for pos, pk in enumerate(pk_list)])
-        return self.queryset.filter(id__in=pk_list).order_by(preserved)
+        return in_order(self.queryset, [item.id for item in response])
+
+
+class ESCursorPagination(BasePagination):
+    """
+    Page through an Elasticsearch query with search_after instead of from/size so that every page costs the same.
+    The cursor is an opaque token holding the sort values of the last hit and the total count of the first page.
+    """
+    cursor_query_param = 'cursor'
+    limit_query_param = 'limit'
+    default_limit = 20
+    max_limit = 100
+    tiebreak_sort = {'_uid': 'asc'}
+    invalid_cursor_message = 'Invalid cursor'
+
+    def get_limit(self, request):
+        try:
+            limit = int(request.query_params[self.limit_query_param])
+        except (KeyError, ValueError):
+            return self.default_limit
+        return min(limit, self.max_limit) if limit > 0 else self.default_limit
+
+    def encode_cursor(self, cursor):
+        return base64.urlsafe_b64encode(json.dumps(cursor).encode()).decode()
+
+    def decode_cursor(self, request):
+        encoded_cursor = request.query_params.get(self.cursor_query_param)
+        if not encoded_cursor:
+            return None
+        try:
+            cursor = json.loads(base64.urlsafe_b64decode(encoded_cursor.encode()).decode())
+        except (TypeError, ValueError):
+            raise NotFound(self.invalid_cursor_message)
+        if not isinstance(cursor, dict) or not isinstance(cursor.get('search_after'), list):
+            raise NotFound(self.invalid_cursor_message)
+        return cursor
+
+    def sorted_query(self, query):
+        sort = list(query._sort) or ['_score']
+        return query.sort(*sort, self.tiebreak_sort)
+
+    def paginate_es_query(self, query, request, queryset=None, view=None):
+        self.limit = self.get_limit(request)
+        self.request = request
+        self.queryset = queryset
+        cursor = self.decode_cursor(request)
+
+        query = self.sorted_query(query)
+        if cursor:
+            query = query.extra(search_after=cursor['search_after'])
+        response = query[:self.limit + 1].execute()
+        hits = list(response)
+
+        self.count = cursor['count'] if cursor else response.hits.total
+        self.next_cursor = None
+        if len(hits) > self.limit:
+            hits = hits[:self.limit]
+            self.next_cursor = {'search_after': list(hits[-1].meta.sort), 'count': self.count}
+
+        return self.get_response(hits)
+
+    def get_response(self, hits):
+        raise NotImplementedError()
+
+    def get_next_link(self):
+        if self.next_cursor is None:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, self.encode_cursor(self.next_cursor))
+
+    def get_paginated_response(self, data):
+        return Response(OrderedDict([
+            ('count', self.count),
+            ('next', self.get_next_link()),
+            ('results', data)
+        ]))
+
+
+class ESQueryCursorPagination(ESCursorPagination):
+    def get_response(self, hits):
+        return hits
+
+
+class ESQuerysetCursorPagination(ESCursorPagination):
+    def get_response(self, hits):
+        return in_order(self.queryset, [hit.id for hit in hits])
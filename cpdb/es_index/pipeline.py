@@ -0,0 +1,155 @@
+import itertools
+from collections import deque
+from multiprocessing import get_context
+from multiprocessing.pool import ThreadPool
+from time import time
+
+from django.conf import settings
+from django.db import connections
+from elasticsearch.helpers import streaming_bulk
+
+from es_index import es_client
+
+_worker_indexer = None
+
+
+def _init_worker(indexer):
+    global _worker_indexer
+    _worker_indexer = indexer
+
+
+def _serialize_batch(batch):
+    start_time = time()
+    docs = [doc for datum in batch for doc in _worker_indexer.serialize(datum)]
+    return docs, time() - start_time
+
+
+def _batches(iterable, batch_size, stage_stats=None):
+    iterator = iter(iterable)
+    while True:
+        start_time = time()
+        batch = list(itertools.islice(iterator, batch_size))
+        if stage_stats:
+            stage_stats.add(len(batch), time() - start_time)
+        if not batch:
+            return
+        yield batch
+
+
+def _imap_from_calling_thread(pool, func, iterable, max_pending):
+    """
+    Ordered results of `func` over `iterable` like `pool.imap`, but `iterable` is consumed by the calling thread.
+    `pool.imap` consumes it from the pool's task feeder thread, which would read the queryset on a database
+    connection of its own that is never closed. At most `max_pending` items are read ahead.
+    """
+    pending = deque()
+    for item in iterable:
+        pending.append(pool.apply_async(func, (item,)))
+        if len(pending) >= max_pending:
+            yield pending.popleft().get()
+    while pending:
+        yield pending.popleft().get()
+
+
+class StageStats(object):
+    def __init__(self, name):
+        self.name = name
+        self.count = 0
+        self.seconds = 0.0
+
+    def add(self, count, seconds):
+        self.count += count
+        self.seconds += seconds
+
+    @property
+    def throughput(self):
+        return self.count / self.seconds if self.seconds else 0.0
+
+    def __str__(self):
+        return f'{self.name}: {self.count} items in {self.seconds:.2f}s ({self.throughput:.1f} items/s)'
+
+
+class IndexingPipeline(object):
+    """
+    Index docs of an indexer in 3 pipelined stages:
+    - extract: rows are read from `indexer.get_queryset()` in the main thread of the main process
+    - serialize: `extract_datum` and `doc_dict` are run by `num_workers` forked processes
+    - bulk: docs are sent by chunks of `bulk_chunk_size` from `bulk_threads` threads,
+      documents rejected with 429 are retried up to `bulk_max_retries` times with exponential backoff
+    Seconds of a stage are summed over its workers.
+    Chunked indexers load their related rows while rows are extracted, so they are serialized in process.
+    """
+    def __init__(
+        self, indexer, num_workers=None, worker_batch_size=None, bulk_chunk_size=None, bulk_threads=None,
+        bulk_max_retries=None
+    ):
+        self.indexer = indexer
+        self.num_workers = num_workers or settings.ES_INDEXING_WORKERS
+        self.worker_batch_size = worker_batch_size or settings.ES_INDEXING_WORKER_BATCH_SIZE
+        self.bulk_chunk_size = bulk_chunk_size or settings.ES_BULK_CHUNK_SIZE
+        self.bulk_threads = bulk_threads or settings.ES_BULK_THREADS
+        self.bulk_max_retries = settings.ES_BULK_MAX_RETRIES if bulk_max_retries is None else bulk_max_retries
+        self.extract_stats = StageStats('extract')
+        self.serialize_stats = StageStats('serialize')
+        self.bulk_stats = StageStats('bulk')
+
+    def serialized_docs(self, batches):
+        if self.num_workers <= 1 or self.indexer.chunk_size:
+            for batch in batches:
+                docs, seconds = self._serialize_in_process(batch)
+                self.serialize_stats.add(len(docs), seconds)
+                yield from docs
+            return
+
+        # Forked workers must not share the database connections of the main process
+        connections.close_all()
+        pool = get_context('fork').Pool(self.num_workers, initializer=_init_worker, initargs=(self.indexer,))
+        try:
+            for docs, seconds in _imap_from_calling_thread(pool, _serialize_batch, batches, self.num_workers * 2):
+                self.serialize_stats.add(len(docs), seconds)
+                yield from docs
+        finally:
+            pool.terminate()
+            pool.join()
+
+    def _serialize_in_process(self, batch):
+        start_time = time()
+        docs = [doc for datum in batch for doc in self.indexer.serialize(datum)]
+        return docs, time() - start_time
+
+    def send_chunk(self, chunk):
+        start_time = time()
+        for _ in streaming_bulk(
+            es_client,
+            chunk,
+            chunk_size=len(chunk),
+            max_retries=self.bulk_max_retries
+        ):
+            pass
+        return len(chunk), time() - start_time
+
+    def run(self):
+        start_time = time()
+        batches = _batches(self.indexer.get_queryset(), self.worker_batch_size, self.extract_stats)
+        chunks = _batches(self.serialized_docs(batches), self.bulk_chunk_size)
+
+        if self.bulk_threads <= 1:
+            results = map(self.send_chunk, chunks)
+        else:
+            thread_pool = ThreadPool(self.bulk_threads)
+            results = _imap_from_calling_thread(thread_pool, self.send_chunk, chunks, self.bulk_threads * 2)
+
+        try:
+            for count, seconds in results:
+                self.bulk_stats.add(count, seconds)
+        finally:
+            if self.bulk_threads > 1:
+                thread_pool.terminate()
+                thread_pool.join()
+
+        self.report(time() - start_time)
+
+    def report(self, total_seconds):
+        print(f'{self.indexer.__class__.__name__}: indexed {self.bulk_stats.count} docs in {total_seconds:.2f}s')
+        for stage_stats in [self.extract_stats, self.serialize_stats, self.bulk_stats]:
+            print(f'  {stage_stats}')
@@ -1,8 +1,15 @@
+import queue
+from datetime import datetime
+
 from django.test import TestCase
-from django.core.management import call_command
+from django.core.management import call_command, CommandError
 
+from freezegun import freeze_time
 from mock import Mock, patch, mock_open
+from robber import expect
+import pytz
 
+from data.models import IndexerWatermark
 from es_index import indexer_klasses, indexer_klasses_map
 from es_index.management.commands.rebuild_index import Command
 from es_index.management.commands import rebuild_index
@@ -39,6 +46,17 @@ class RebuildIndexCommandTestCase(TestCase):
         Indexer.index_alias.indexing.return_value.__exit__.assert_called_once()
         Indexer.index_alias.indexing.return_value.__enter__.assert_called_once()
 
+    @freeze_time('2018-04-04 12:00:01', tz_offset=0)
+    def test_handle_marks_indexer_watermarks(self):
+        self._prepare_data()
+
+        with patch('es_index.management.commands.rebuild_index.autodiscover_modules'):
+            call_command('rebuild_index')
+
+        expect(IndexerWatermark.objects.get(indexer='Indexer').indexed_at).to.eq(
+            datetime(2018, 4, 4, 12, 0, 1, tzinfo=pytz.utc)
+        )
+
     def test_call_with_app_specified(self):
         Indexer = self._prepare_data()
 
@@ -200,3 +218,94 @@ class RebuildIndexCommandTestCase(TestCase):
             call_command('rebuild_index', '--daily')
             daily_index.create_mapping.assert_called_once()
             daily_index.add_new_data.assert_called_once()
+
+    def _prepare_alias_data(self, alias_name):
+        class Indexer:
+            index_alias = Mock(new_index_name=f'{alias_name}_new')
+            doc_type_klass = Mock(_doc_type=Mock())
+
+        Indexer.doc_type_klass._doc_type.name = 'a'
+        Indexer.create_mapping = Mock()
+        Indexer.add_new_data = Mock()
+        Indexer.index_alias.name = alias_name
+        Indexer.index_alias.indexing.return_value.__exit__ = Mock(return_value=False)
+        Indexer.index_alias.indexing.return_value.__enter__ = Mock()
+        indexer_klasses_map[alias_name] = [Indexer]
+        indexer_klasses.append(Indexer)
+        return Indexer
+
+    def _fake_fork_context(self):
+        class FakeProcess:
+            exitcode = 0
+
+            def __init__(self, target, args):
+                self.target = target
+                self.args = args
+
+            def start(self):
+                self.target(*self.args)
+
+            def is_alive(self):
+                return False
+
+            def join(self):
+                pass
+
+        return Mock(Queue=queue.Queue, Process=FakeProcess)
+
+    def test_handle_with_jobs(self):
+        del indexer_klasses[:]
+        indexer1 = self._prepare_alias_data('alias1')
+        indexer2 = self._prepare_alias_data('alias2')
+
+        with patch('es_index.management.commands.rebuild_index.autodiscover_modules'), \
+                patch('es_index.management.commands.rebuild_index.connections') as mock_connections, \
+                patch('es_index.management.commands.rebuild_index.get_context', return_value=self._fake_fork_context()):
+            call_command('rebuild_index', '--jobs=2')
+
+        expect(mock_connections.close_all).to.be.called()
+        indexer1.create_mapping.assert_called_once()
+        indexer1.add_new_data.assert_called_once()
+        indexer1.index_alias.migrate.assert_called_once()
+        indexer2.create_mapping.assert_called_once()
+        indexer2.add_new_data.assert_called_once()
+        indexer2.index_alias.migrate.assert_called_once()
+
+    def test_handle_with_jobs_raise_error_after_all_aliases_done(self):
+        del indexer_klasses[:]
+        indexer1 = self._prepare_alias_data('alias1')
+        indexer1.add_new_data = Mock(side_effect=ValueError('index failed'))
+        indexer2 = self._prepare_alias_data('alias2')
+
+        with patch('es_index.management.commands.rebuild_index.autodiscover_modules'), \
+                patch('es_index.management.commands.rebuild_index.connections'), \
+                patch('es_index.management.commands.rebuild_index.get_context', return_value=self._fake_fork_context()):
+            expect(lambda: call_command('rebuild_index', '--jobs=2')).to.throw(CommandError)
+
+        indexer2.add_new_data.assert_called_once()
+
+    def test_handle_with_jobs_and_single_alias_run_in_process(self):
+        indexer = self._prepare_data()
+
+        with patch('es_index.management.commands.rebuild_index.autodiscover_modules'), \
+                patch('es_index.management.commands.rebuild_index.get_context') as mock_get_context:
+            call_command('rebuild_index', '--jobs=4')
+
+        mock_get_context.assert_not_called()
+        indexer.add_new_data.assert_called_once()
+
+    def test_report_timings(self):
+        command = Command()
+        command.stdout = Mock()
+        command.report_timings({'alias1': [('migrate', 1.0), ('Indexer', 2.0)], 'alias2': [('Indexer', 3.0)]}, 3.5)
+
+        lines = [call[0][0] for call in command.stdout.write.call_args_list]
+        expect(lines).to.eq([
+            'Rebuild index timings:',
+            '  alias1: 3.00s',
+            '    migrate: 1.00s',
+            '    Indexer: 2.00s',
+            '  alias2: 3.00s',
+            '    Indexer: 3.00s',
+            'Total 6.00s of indexing done in 3.50s',
+        ])
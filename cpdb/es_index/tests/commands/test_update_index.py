@@ -0,0 +1,61 @@
+from datetime import datetime
+
+from django.core.management import call_command
+from django.test import TestCase
+
+from freezegun import freeze_time
+from mock import Mock, patch
+from robber import expect
+import pytz
+
+from data.models import IndexerWatermark
+from es_index import indexer_klasses, indexer_klasses_map
+from es_index.indexers import BaseIndexer
+
+
+class UpdateIndexCommandTestCase(TestCase):
+    def setUp(self):
+        class IncrementalIndexer(BaseIndexer):
+            update_index = Mock()
+
+            @classmethod
+            def get_updated_keys(cls, since):
+                return {1, 2}
+
+        class FullIndexer(BaseIndexer):
+            update_index = Mock()
+
+        self.IncrementalIndexer = IncrementalIndexer
+        self.FullIndexer = FullIndexer
+        indexer_klasses_map['test'] = [IncrementalIndexer, FullIndexer]
+        del indexer_klasses[:]
+        indexer_klasses.extend([IncrementalIndexer, FullIndexer])
+
+    @freeze_time('2018-04-04 12:00:01', tz_offset=0)
+    def test_handle(self):
+        IndexerWatermark.mark(self.IncrementalIndexer, datetime(2018, 4, 1, tzinfo=pytz.utc))
+
+        with patch('es_index.management.commands.update_index.autodiscover_modules'):
+            call_command('update_index')
+
+        self.IncrementalIndexer.update_index.assert_called_once()
+        self.FullIndexer.update_index.assert_not_called()
+        expect(IndexerWatermark.last_indexed_at(self.IncrementalIndexer)).to.eq(
+            datetime(2018, 4, 4, 12, 0, 1, tzinfo=pytz.utc)
+        )
+
+    def test_handle_with_app_specified(self):
+        IndexerWatermark.mark(self.IncrementalIndexer, datetime(2018, 4, 1, tzinfo=pytz.utc))
+        indexer_klasses_map['other'] = []
+
+        with patch('es_index.management.commands.update_index.autodiscover_modules'):
+            call_command('update_index', 'other')
+
+        self.IncrementalIndexer.update_index.assert_not_called()
+
+    def test_handle_without_watermark(self):
+        with patch('es_index.management.commands.update_index.autodiscover_modules'):
+            call_command('update_index')
+
+        self.IncrementalIndexer.update_index.assert_not_called()
+        expect(IndexerWatermark.last_indexed_at(self.IncrementalIndexer)).to.be.none()
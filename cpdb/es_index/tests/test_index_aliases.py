@@ -43,6 +43,23 @@ class IndexAliasTestCase(TestCase):
         expect(self.TestDocType.search().count()).to.eq(1)
         expect(self.alias.write_index.search().count()).to.eq(1)
 
+    @patch('es_index.index_aliases.bump_index_version')
+    def test_indexing_bump_index_version(self, bump_index_version_mock):
+        with self.alias.indexing():
+            expect(bump_index_version_mock).not_to.be.called()
+
+        expect(bump_index_version_mock).to.be.called_once()
+
+    @patch('es_index.index_aliases.bump_index_version')
+    def test_refresh_read_index(self, bump_index_version_mock):
+        alias = IndexAlias('my_alias')
+        alias.read_index = Mock()
+
+        alias.refresh_read_index()
+
+        expect(alias.read_index.refresh).to.be.called_once()
+        expect(bump_index_version_mock).to.be.called_once()
+
     def test_querying(self):
         self.TestDocType(c='d').save()
         self.old_read_index.refresh()
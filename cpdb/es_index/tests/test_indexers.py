@@ -1,12 +1,15 @@
-from django.test import SimpleTestCase, TestCase
+from django.test import SimpleTestCase, TestCase, override_settings
 
+from elasticsearch.helpers import bulk
 from elasticsearch_dsl import DocType, Keyword, Float, Mapping
 from robber import expect
-from mock import Mock, patch
+from mock import Mock, call, patch
 
-from es_index.indexers import BaseIndexer, es_client, PartialIndexer
+from es_index.indexers import BaseIndexer, es_client, keyset_chunks, PartialIndexer
 from es_index.index_aliases import IndexAlias
 from es_index import register_indexer
+from data.factories import AllegationFactory, OfficerFactory
+from data.models import Allegation, Officer
 
 
 class IndexersTestCase(SimpleTestCase):
@@ -178,6 +181,108 @@ class IndexersTestCase(SimpleTestCase):
         expect(mock_init.called).to.be.true()
         expect(mock_bulk).to.be.called_with(es_client, [1])
 
+    @override_settings(ES_INDEXING_CHUNK_SIZE=100)
+    def test_chunk_size(self):
+        class ChunkedIndexer(BaseIndexer):
+            chunk_key = 'id'
+
+        expect(BaseIndexer().chunk_size).to.eq(0)
+        expect(ChunkedIndexer().chunk_size).to.eq(100)
+
+    def test_populate_chunk(self):
+        expect(lambda: BaseIndexer().populate_chunk((1, 2))).to.throw(NotImplementedError)
+
+    @patch('es_index.indexers.keyset_chunks', return_value=iter([[{'id': 1}, {'id': 3}], [{'id': 5}]]))
+    def test_chunked(self, mock_keyset_chunks):
+        class ChunkedIndexer(BaseIndexer):
+            chunk_key = 'id'
+
+        indexer = ChunkedIndexer()
+        indexer.populate_chunk = Mock()
+
+        with override_settings(ES_INDEXING_CHUNK_SIZE=2):
+            rows = list(indexer.chunked('queryset'))
+
+        expect(rows).to.eq([{'id': 1}, {'id': 3}, {'id': 5}])
+        expect(mock_keyset_chunks).to.be.called_with('queryset', 'id', 2)
+        expect(indexer.populate_chunk.call_args_list).to.eq([call((1, 3)), call((5, 5))])
+
+    def test_get_updated_keys(self):
+        expect(lambda: BaseIndexer.get_updated_keys(None)).to.throw(NotImplementedError)
+
+    @override_settings(ES_INDEXING_CHUNK_SIZE=0)
+    def test_incremental(self):
+        class ChunkedIndexer(BaseIndexer):
+            chunk_key = 'id'
+            index_alias = Mock(new_index_name='new_index_name')
+
+        ChunkedIndexer.index_alias.name = 'alias_name'
+        full_indexer = ChunkedIndexer()
+        incremental_indexer = ChunkedIndexer(updated_keys=[3, 1, 3])
+
+        expect(full_indexer.incremental).to.be.false()
+        expect(full_indexer.chunk_size).to.eq(0)
+        expect(full_indexer.index_name).to.eq('new_index_name')
+        expect(incremental_indexer.incremental).to.be.true()
+        expect(incremental_indexer.updated_keys).to.eq([1, 3])
+        expect(incremental_indexer.chunk_size).to.eq(1000)
+        expect(incremental_indexer.index_name).to.eq('alias_name')
+
+    def test_chunked_incremental(self):
+        class ChunkedIndexer(BaseIndexer):
+            chunk_key = 'id'
+            incremental_chunk_size = 2
+
+        queryset = Mock()
+        queryset.filter.side_effect = lambda id__in: [{'id': key} for key in id__in]
+        indexer = ChunkedIndexer(updated_keys=[5, 1, 3])
+        indexer.populate_chunk = Mock()
+
+        with override_settings(ES_INDEXING_CHUNK_SIZE=0):
+            rows = list(indexer.chunked(queryset))
+
+        expect(rows).to.eq([{'id': 1}, {'id': 3}, {'id': 5}])
+        expect(indexer.populate_chunk.call_args_list).to.eq([call([1, 3]), call([5])])
+
+    @patch('es_index.indexers.bulk')
+    def test_update_index(self, mock_bulk):
+        class TestIndexer(BaseIndexer):
+            index_alias = Mock()
+
+            def docs(self):
+                return [1]
+
+        TestIndexer(updated_keys=[1]).update_index()
+
+        expect(mock_bulk).to.be.called_with(es_client, [1])
+        expect(TestIndexer.index_alias.refresh_read_index).to.be.called_once()
+        expect(TestIndexer.index_alias.write_index.settings).not_to.be.called()
+
+    @patch('es_index.indexers.bulk')
+    def test_update_index_without_updated_keys(self, mock_bulk):
+        expect(lambda: BaseIndexer().update_index()).to.throw(ValueError)
+
+        BaseIndexer(updated_keys=[]).update_index()
+
+        expect(mock_bulk).not_to.be.called()
+
+    @override_settings(ES_INDEXING_PIPELINE=True)
+    @patch('es_index.indexers.bulk')
+    @patch('es_index.indexers.IndexingPipeline')
+    def test_add_new_data_with_pipeline(self, mock_pipeline, mock_bulk):
+        mock_write_index = Mock()
+
+        class TestIndexer(BaseIndexer):
+            index_alias = Mock(write_index=mock_write_index, new_index_name='new_index_name')
+
+        indexer = TestIndexer()
+        indexer.add_new_data()
+
+        expect(mock_pipeline).to.be.called_with(indexer)
+        expect(mock_pipeline.return_value.run).to.be.called_once()
+        expect(mock_bulk).not_to.be.called()
+        expect(mock_write_index.refresh).to.be.called_once()
+
 
 my_index_alias = IndexAlias('my_alias')
 
@@ -212,16 +317,6 @@ class PartialIndexerTestCase(TestCase):
         my_indexer = MyPartialIndexer(updating_keys=[1, 2, 3])
         expect(list(my_indexer.batch_querysets)).to.eq([[1, 2], [3]])
 
-    def test_batch_update_docs_queries(self):
-        class MyPartialIndexer(PartialIndexer):
-            batch_size = 2
-
-            def get_batch_update_docs_queries(self, keys):
-                return keys
-
-        my_indexer = MyPartialIndexer(updating_keys=[1, 2, 3])
-        expect(list(my_indexer.batch_update_docs_queries)).to.eq([[1, 2], [3]])
-
     def test_get_queryset(self):
         class MyPartialIndexer(PartialIndexer):
             batch_size = 2
@@ -232,109 +327,142 @@ class PartialIndexerTestCase(TestCase):
         my_indexer = MyPartialIndexer(updating_keys=[1, 2, 3])
         expect(list(my_indexer.get_queryset())).to.eq([1, 2, 3])
 
-    def test_validate_updated_docs(self):
+    def test_get_existing_doc_ids(self):
         class MyPartialIndexer(PartialIndexer):
-            batch_size = 2
-
-            def get_batch_queryset(self, keys):
-                return Mock(count=Mock(return_value=len(keys)))
+            doc_type_klass = MyDocType
+            index_alias = my_index_alias
 
             def get_batch_update_docs_queries(self, keys):
-                return Mock(count=Mock(return_value=len(keys)))
+                return self.doc_type_klass.search().query('terms', id=keys)
 
-        my_indexer = MyPartialIndexer(updating_keys=[1, 2, 3])
-        expect(my_indexer.validate_updated_docs()).to.be.none()
+        for value in [1, 2, 3]:
+            MyDocType(_id=f'doc-{value}', id=value).save()
+        my_index_alias.read_index.refresh()
+
+        my_indexer = MyPartialIndexer(updating_keys=[1, 2])
+
+        expect(sorted(my_indexer.get_existing_doc_ids([1, 2], 2))).to.eq(['doc-1', 'doc-2'])
+        expect(lambda: my_indexer.get_existing_doc_ids([1, 2], 1)).to.throw(ValueError)
 
-    def test_validate_updated_docs_raise_ValueError(self):
+    def test_reindex_raise_ValueError(self):
         class MyPartialIndexer(PartialIndexer):
             doc_type_klass = MyDocType
             index_alias = my_index_alias
             batch_size = 2
 
             def get_batch_queryset(self, keys):
-                return Mock(count=Mock(return_value=len(keys)))
+                return []
 
             def get_batch_update_docs_queries(self, keys):
-                return Mock(count=Mock(return_value=1))
+                return self.doc_type_klass.search().query('terms', id=keys)
 
-        my_indexer = MyPartialIndexer(updating_keys=[1, 2, 3])
-        expect(lambda: my_indexer.validate_updated_docs()).to.throw(ValueError)
+            def extract_datum(self, datum):
+                return {'id': datum.id}
+
+        MyDocType(id=1).save()
+        MyDocType(id=2).save()
+        MyDocType(id=3).save()
+        my_index_alias.read_index.refresh()
 
-    def test_delete_existing_docs(self):
+        my_indexer = MyPartialIndexer(updating_keys=[1, 2])
+
+        def reindex():
+            with my_indexer.index_alias.indexing():
+                my_indexer.reindex()
+
+        expect(reindex).to.throw(ValueError)
+        expect(MyDocType.search().count()).to.equal(3)
+        expect(my_index_alias.write_index.exists()).to.be.false()
+
+    def test_reindex_raise_ValueError_on_late_batch_before_writing(self):
         class MyPartialIndexer(PartialIndexer):
             doc_type_klass = MyDocType
             index_alias = my_index_alias
-            batch_size = 2
+            batch_size = 1
+
+            def get_batch_queryset(self, keys):
+                return [Mock(id=key, value=key + 10) for key in keys]
 
             def get_batch_update_docs_queries(self, keys):
                 return self.doc_type_klass.search().query('terms', id=keys)
 
-        MyDocType(id=1).save()
-        MyDocType(id=2).save()
-        my_index_alias.read_index.refresh()
-
-        my_indexer = MyPartialIndexer(updating_keys=[1])
+            def extract_datum(self, datum):
+                return {'id': datum.id, 'value': datum.value}
 
-        expect(MyDocType.search().count()).to.equal(2)
+        # Last batch has a row but no doc
+        MyDocType(id=1, value=1).save()
+        MyDocType(id=2, value=2).save()
+        my_index_alias.read_index.refresh()
 
-        my_index_alias.write_index.create(ignore=400)
-        my_indexer.index_alias.migrate()
-        expect(my_index_alias.write_index.search().count()).to.equal(2)
+        my_indexer = MyPartialIndexer(updating_keys=[1, 2, 3])
 
-        my_indexer.delete_existing_docs()
+        def reindex():
+            with my_indexer.index_alias.indexing():
+                my_indexer.reindex()
 
-        expect(my_index_alias.write_index.search().count()).to.equal(1)
-        expect(my_index_alias.write_index.search().query('term', id=2).count()).to.equal(1)
+        with patch('es_index.indexers.bulk') as mock_bulk:
+            expect(reindex).to.throw(ValueError)
 
-        my_index_alias.write_index.delete(ignore=404)
+        expect(mock_bulk.called).to.be.false()
+        expect(my_index_alias.write_index.exists()).to.be.false()
+        expect(sorted(doc.value for doc in MyDocType.search().execute())).to.eq([1, 2])
 
-    def test_reindex_raise_ValueError_first(self):
+    def test_reindex_batch(self):
         class MyPartialIndexer(PartialIndexer):
             doc_type_klass = MyDocType
             index_alias = my_index_alias
-            batch_size = 2
 
             def get_batch_queryset(self, keys):
-                return Mock(count=Mock(return_value=len(keys)))
+                return [Mock(id=key, value=key + 10) for key in keys]
 
             def get_batch_update_docs_queries(self, keys):
-                return Mock(count=Mock(return_value=1))
+                return self.doc_type_klass.search().query('terms', id=keys)
 
-        my_indexer = MyPartialIndexer(updating_keys=[1, 2, 3])
-        MyPartialIndexer.create_mapping = Mock()
-        my_indexer.migrate = Mock()
-        my_indexer.delete_existing_docs = Mock()
-        my_indexer.add_new_data = Mock()
+            def extract_datum(self, datum):
+                return {'id': datum.id, 'value': datum.value}
 
-        expect(lambda: my_indexer.reindex()).to.throw(ValueError)
+        # Docs indexed under other ids than the ones of new docs are replaced too
+        MyDocType(_id='old-1', id=1, value=1).save()
+        MyDocType(id=2, value=2).save()
+        my_index_alias.read_index.refresh()
 
-        expect(MyPartialIndexer.create_mapping).not_to.be.called()
-        expect(my_indexer.migrate).not_to.be.called()
-        expect(my_indexer.delete_existing_docs).not_to.be.called()
-        expect(my_indexer.add_new_data).not_to.be.called()
+        my_indexer = MyPartialIndexer(updating_keys=[1])
+        my_indexer.index_alias = Mock(new_index_name=my_index_alias.name)
 
-    def test_reindex_raise_ValueError(self):
+        with patch('es_index.indexers.bulk', wraps=bulk) as mock_bulk:
+            my_indexer.reindex_batch([1], my_indexer.get_batch_doc_ids([1]))
+        my_index_alias.read_index.refresh()
+
+        expect(mock_bulk.call_count).to.eq(1)
+        expect(MyDocType.search().count()).to.equal(2)
+        expect(MyDocType.search().query('term', id=1).execute()[0].to_dict()['value']).to.equal(11)
+        expect(MyDocType.search().query('term', id=2).execute()[0].to_dict()['value']).to.equal(2)
+
+    def test_reindex_with_concurrency(self):
         class MyPartialIndexer(PartialIndexer):
             doc_type_klass = MyDocType
             index_alias = my_index_alias
-            batch_size = 2
+            batch_size = 1
 
             def get_batch_queryset(self, keys):
-                return Mock(count=Mock(return_value=0))
+                return [Mock(id=key, value=key + 10) for key in keys]
 
             def get_batch_update_docs_queries(self, keys):
                 return self.doc_type_klass.search().query('terms', id=keys)
 
             def extract_datum(self, datum):
-                return {'id': datum.id}
+                return {'id': datum.id, 'value': datum.value}
 
-        MyDocType(id=1).save()
-        MyDocType(id=2).save()
-        MyDocType(id=3).save()
+        for value in [1, 2, 3]:
+            MyDocType(id=value, value=value).save()
         my_index_alias.read_index.refresh()
 
-        my_indexer = MyPartialIndexer(updating_keys=[1, 2])
-        expect(lambda: my_indexer.reindex()).to.throw(ValueError)
+        my_indexer = MyPartialIndexer(updating_keys=[1, 2, 3], concurrency=2)
+        with my_indexer.index_alias.indexing():
+            my_indexer.reindex()
+
+        expect(MyDocType.search().count()).to.equal(3)
+        expect(sorted(doc.value for doc in MyDocType.search().execute())).to.eq([11, 12, 13])
 
     def test_reindex(self):
         class MyPartialIndexer(PartialIndexer):
@@ -343,10 +471,7 @@ class PartialIndexerTestCase(TestCase):
             batch_size = 2
 
             def get_batch_queryset(self, keys):
-                return Mock(
-                    count=Mock(return_value=len(keys)),
-                    __iter__=Mock(return_value=iter([Mock(id=key, value=key + 10) for key in keys]))
-                )
+                return [Mock(id=key, value=key + 10) for key in keys]
 
             def get_batch_update_docs_queries(self, keys):
                 return self.doc_type_klass.search().query('terms', id=keys)
@@ -395,10 +520,7 @@ class PartialIndexerTestCase(TestCase):
             batch_size = 2
 
             def get_batch_queryset(self, keys):
-                return Mock(
-                    count=Mock(return_value=len(keys)),
-                    __iter__=Mock(return_value=iter([Mock(id=key, value=key + 10) for key in keys]))
-                )
+                return [Mock(id=key, value=key + 10) for key in keys]
 
             def get_batch_update_docs_queries(self, keys):
                 return self.doc_type_klass.search().query('terms', id=keys)
@@ -442,3 +564,25 @@ class PartialIndexerTestCase(TestCase):
                  }
             }
         })
+
+
+class KeysetChunksTestCase(TestCase):
+    def test_keyset_chunks(self):
+        for crid in ['5', '1', '3', '2', '4']:
+            AllegationFactory(crid=crid)
+
+        chunks = list(keyset_chunks(Allegation.objects.values('crid'), 'crid', 2))
+
+        expect(chunks).to.eq([
+            [{'crid': '1'}, {'crid': '2'}],
+            [{'crid': '3'}, {'crid': '4'}],
+            [{'crid': '5'}],
+        ])
+
+    def test_keyset_chunks_with_model_instances(self):
+        OfficerFactory(id=1)
+        OfficerFactory(id=2)
+
+        chunks = list(keyset_chunks(Officer.objects.all(), 'id', 2))
+
+        expect([[officer.id for officer in chunk] for chunk in chunks]).to.eq([[1, 2]])
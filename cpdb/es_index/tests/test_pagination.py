@@ -1,11 +1,17 @@
 from django.test import SimpleTestCase, TestCase
 
 from mock import Mock
+from rest_framework.exceptions import NotFound
+from rest_framework.test import APIRequestFactory
+from rest_framework.request import Request
 from robber import expect
 
 from data.factories import AttachmentFileFactory, AllegationFactory
 from data.models import AttachmentFile
-from es_index.pagination import ESBasePagination, ESQueryPagination, ESQuerysetPagination
+from es_index.pagination import (
+    ESBasePagination, ESQueryPagination, ESQuerysetPagination, ESCursorPagination,
+    ESQueryCursorPagination, ESQuerysetCursorPagination
+)
 
 
 class ESBasePaginationTestCase(SimpleTestCase):
@@ -147,3 +153,99 @@ class ESQuerysetPaginationTestCase(TestCase):
         pagination = ESQuerysetPagination()
         paginated_query = pagination.paginate_es_query(query, request, queryset)
         expect(list(paginated_query)).to.eq([])
+
+
+def mock_es_query(hits, total):
+    search_result = Mock()
+    search_result.hits = Mock()
+    search_result.hits.total = total
+    search_result.__iter__ = Mock(return_value=iter(hits))
+    query = Mock()
+    query._sort = []
+    query.sort.return_value = query
+    query.extra.return_value = query
+    query.__getitem__ = Mock(return_value=query)
+    query.execute.return_value = search_result
+    return query
+
+
+def mock_hit(id, sort):
+    hit = Mock(id=id)
+    hit.meta.sort = sort
+    return hit
+
+
+def make_request(params):
+    return Request(APIRequestFactory().get('/documents/', params))
+
+
+class ESCursorPaginationTestCase(SimpleTestCase):
+    def test_get_response_raise_NotImplementedError(self):
+        expect(lambda: ESCursorPagination().get_response([])).to.throw(NotImplementedError)
+
+    def test_paginate_es_query_first_page(self):
+        hits = [mock_hit(1, [2.0, 'doc#1']), mock_hit(2, [1.5, 'doc#2']), mock_hit(3, [1.0, 'doc#3'])]
+        query = mock_es_query(hits, 50)
+
+        pagination = ESQueryCursorPagination()
+        results = pagination.paginate_es_query(query, make_request({'cursor': '', 'limit': 2}))
+
+        query.sort.assert_called_with('_score', {'_uid': 'asc'})
+        query.extra.assert_not_called()
+        query.__getitem__.assert_called_with(slice(None, 3))
+        expect(results).to.eq(hits[:2])
+        expect(pagination.count).to.eq(50)
+        expect(pagination.next_cursor).to.eq({'search_after': [1.5, 'doc#2'], 'count': 50})
+
+        response = pagination.get_paginated_response(['a', 'b'])
+        expect(response.data['count']).to.eq(50)
+        expect(response.data['results']).to.eq(['a', 'b'])
+        expect(response.data['next']).to.contain(f'cursor={pagination.encode_cursor(pagination.next_cursor)}')
+
+    def test_paginate_es_query_next_page(self):
+        hits = [mock_hit(3, [1.0, 'doc#3'])]
+        query = mock_es_query(hits, 1)
+        query._sort = ['-created_at']
+        cursor = ESCursorPagination().encode_cursor({'search_after': [1.5, 'doc#2'], 'count': 50})
+
+        pagination = ESQueryCursorPagination()
+        results = pagination.paginate_es_query(query, make_request({'cursor': cursor, 'limit': 2}))
+
+        query.sort.assert_called_with('-created_at', {'_uid': 'asc'})
+        query.extra.assert_called_with(search_after=[1.5, 'doc#2'])
+        expect(results).to.eq(hits)
+        expect(pagination.count).to.eq(50)
+        expect(pagination.next_cursor).to.be.none()
+        expect(pagination.get_paginated_response([]).data['next']).to.be.none()
+
+    def test_paginate_es_query_invalid_cursor(self):
+        query = mock_es_query([], 0)
+
+        for cursor in ['invalid', ESCursorPagination().encode_cursor(['a'])]:
+            expect(lambda: ESQueryCursorPagination().paginate_es_query(
+                query, make_request({'cursor': cursor})
+            )).to.throw(NotFound)
+
+    def test_get_limit(self):
+        pagination = ESCursorPagination()
+
+        expect(pagination.get_limit(make_request({}))).to.eq(20)
+        expect(pagination.get_limit(make_request({'limit': 'abc'}))).to.eq(20)
+        expect(pagination.get_limit(make_request({'limit': 0}))).to.eq(20)
+        expect(pagination.get_limit(make_request({'limit': 1000}))).to.eq(100)
+
+
+class ESQuerysetCursorPaginationTestCase(TestCase):
+    def test_paginate_es_query(self):
+        allegation = AllegationFactory(crid=123456)
+        attachment_1 = AttachmentFileFactory(id=1, allegation=allegation)
+        attachment_2 = AttachmentFileFactory(id=2, allegation=allegation)
+        AttachmentFileFactory(id=3, allegation=allegation)
+        query = mock_es_query([
+            mock_hit(2, [2.0, 'doc#2']), mock_hit(4, [1.5, 'doc#4']), mock_hit(1, [1.0, 'doc#1'])
+        ], 3)
+
+        pagination = ESQuerysetCursorPagination()
+        results = pagination.paginate_es_query(query, make_request({'cursor': ''}), AttachmentFile.objects.all())
+
+        expect(results).to.eq([attachment_2, attachment_1])
@@ -0,0 +1,92 @@
+import threading
+
+from django.test import SimpleTestCase
+
+from elasticsearch_dsl import DocType
+from mock import Mock, patch
+from robber import expect
+
+from es_index.indexers import BaseIndexer
+from es_index.pipeline import IndexingPipeline, StageStats
+
+
+class PipelineDocType(DocType):
+    pass
+
+
+class PipelineIndexer(BaseIndexer):
+    doc_type_klass = PipelineDocType
+    index_alias = Mock(new_index_name='new_index_name')
+
+    def get_queryset(self):
+        return range(5)
+
+    def extract_datum(self, datum):
+        yield {'id': datum, 'value': datum}
+        yield {'id': datum + 100, 'value': datum}
+
+
+def sent_ids(mock_streaming_bulk):
+    return sorted(doc['_id'] for call in mock_streaming_bulk.call_args_list for doc in call[0][1])
+
+
+class StageStatsTestCase(SimpleTestCase):
+    def test_throughput(self):
+        stats = StageStats('bulk')
+        stats.add(10, 2.0)
+        stats.add(30, 2.0)
+        expect(stats.count).to.eq(40)
+        expect(stats.throughput).to.eq(10.0)
+
+    def test_throughput_without_seconds(self):
+        expect(StageStats('bulk').throughput).to.eq(0.0)
+
+
+class IndexingPipelineTestCase(SimpleTestCase):
+    @patch('es_index.pipeline.streaming_bulk')
+    def test_run_in_process(self, mock_streaming_bulk):
+        mock_streaming_bulk.side_effect = lambda *args, **kwargs: iter([])
+        pipeline = IndexingPipeline(
+            PipelineIndexer(), num_workers=1, worker_batch_size=2, bulk_chunk_size=3, bulk_threads=1,
+            bulk_max_retries=2
+        )
+        pipeline.run()
+
+        expect(sent_ids(mock_streaming_bulk)).to.eq([0, 1, 2, 3, 4, 100, 101, 102, 103, 104])
+        expect(mock_streaming_bulk.call_count).to.eq(4)
+        expect(mock_streaming_bulk.call_args[1]['max_retries']).to.eq(2)
+        expect(pipeline.extract_stats.count).to.eq(5)
+        expect(pipeline.serialize_stats.count).to.eq(10)
+        expect(pipeline.bulk_stats.count).to.eq(10)
+
+    @patch('es_index.pipeline.connections')
+    @patch('es_index.pipeline.streaming_bulk')
+    def test_run_with_workers_and_threads(self, mock_streaming_bulk, mock_connections):
+        mock_streaming_bulk.side_effect = lambda *args, **kwargs: iter([])
+        pipeline = IndexingPipeline(
+            PipelineIndexer(), num_workers=2, worker_batch_size=2, bulk_chunk_size=4, bulk_threads=2
+        )
+        pipeline.run()
+
+        expect(mock_connections.close_all).to.be.called_once()
+        expect(sent_ids(mock_streaming_bulk)).to.eq([0, 1, 2, 3, 4, 100, 101, 102, 103, 104])
+        expect(pipeline.serialize_stats.count).to.eq(10)
+        expect(pipeline.bulk_stats.count).to.eq(10)
+
+    @patch('es_index.pipeline.connections', Mock())
+    @patch('es_index.pipeline.streaming_bulk')
+    def test_run_extract_rows_in_calling_thread(self, mock_streaming_bulk):
+        mock_streaming_bulk.side_effect = lambda *args, **kwargs: iter([])
+        extract_threads = set()
+
+        class ThreadRecordingIndexer(PipelineIndexer):
+            def get_queryset(self):
+                for datum in range(5):
+                    extract_threads.add(threading.current_thread())
+                    yield datum
+
+        IndexingPipeline(
+            ThreadRecordingIndexer(), num_workers=2, worker_batch_size=2, bulk_chunk_size=4, bulk_threads=2
+        ).run()
+
+        expect(extract_threads).to.eq({threading.current_thread()})
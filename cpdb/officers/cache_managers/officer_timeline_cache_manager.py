@@ -0,0 +1,178 @@
+from django.db import transaction
+from django.db.models import Prefetch, Q
+from django.db.models.functions import TruncDate
+
+from data.models import (
+    Allegation, AttachmentFile, Award, Officer, OfficerAllegation, OfficerHistory, OfficerTimeline, Salary, Victim
+)
+from data.utils.attachment_file import filter_attachments
+from data.utils.interval_index import OfficerUnitIndex, OfficerRankIndex
+from officers.queries import OfficerTimelineQuery, OfficerTimelineMobileQuery
+from trr.models import TRR
+
+BATCH_SIZE = 1000
+KINDS = ['cr', 'unit_change', 'rank_change', 'joined', 'award', 'trr']
+
+
+def cache_data(since=None):
+    if since is None or not OfficerTimeline.objects.exists():
+        build_officer_timelines()
+    else:
+        build_officer_timelines(officer_ids=changed_officer_ids(since))
+
+
+def changed_officer_ids(since):
+    officer_ids = set(Officer.objects.filter(updated_at__gt=since).values_list('id', flat=True))
+    for model in [OfficerAllegation, OfficerHistory, Salary, Award, TRR]:
+        officer_ids.update(model.objects.filter(updated_at__gt=since).values_list('officer_id', flat=True))
+
+    # CR items hold the coaccused count, a changed officer allegation changes the items of every coaccused officer
+    allegation_ids = set(Allegation.objects.filter(updated_at__gt=since).values_list('crid', flat=True))
+    for model in [OfficerAllegation, Victim, AttachmentFile]:
+        allegation_ids.update(model.objects.filter(updated_at__gt=since).values_list('allegation_id', flat=True))
+    officer_ids.update(OfficerAllegation.objects.filter(
+        allegation_id__in=list(allegation_ids)
+    ).values_list('officer_id', flat=True))
+
+    officer_ids.update(
+        OfficerHistory.objects.filter(unit__updated_at__gt=since).values_list('officer_id', flat=True)
+    )
+    officer_ids.discard(None)
+    return sorted(officer_ids)
+
+
+def build_officer_timelines(officer_ids=None):
+    """
+    :param officer_ids: only rebuild timelines of these officers, rebuild all timelines if it is None
+    """
+    if officer_ids is None:
+        officer_ids = list(Officer.objects.order_by('id').values_list('id', flat=True))
+        OfficerTimeline.objects.exclude(officer_id__in=Officer.objects.values('id')).delete()
+
+    for i in range(0, len(officer_ids), BATCH_SIZE):
+        batch_ids = officer_ids[i:i + BATCH_SIZE]
+        timelines = OfficerTimelineBuilder(batch_ids).build()
+        with transaction.atomic():
+            OfficerTimeline.objects.filter(officer_id__in=batch_ids).delete()
+            OfficerTimeline.objects.bulk_create(timelines)
+
+
+class OfficerTimelineBuilder(object):
+    """
+    Serialize timelines of a batch of officers with one query per event kind for the whole batch.
+    Unit and rank of every event are looked up in interval indexes of the batch, which are loaded once.
+    """
+    def __init__(self, officer_ids):
+        self.officers = {
+            officer.id: officer
+            for officer in Officer.objects.filter(id__in=officer_ids).order_by('id')
+        }
+        self.unit_index = OfficerUnitIndex(officer_ids=officer_ids)
+        self.rank_index = OfficerRankIndex(officer_ids=officer_ids)
+
+    def unit_at(self, officer_id, at):
+        return self.unit_index.unit_at(officer_id, at)
+
+    def rank_at(self, officer_id, at):
+        return self.rank_index.rank_at(officer_id, at)
+
+    def set_unit(self, obj, officer_id, at):
+        unit = self.unit_at(officer_id, at)
+        obj.unit_name = unit.unit_name if unit else None
+        obj.unit_description = unit.description if unit else None
+
+    def set_rank(self, obj, officer_id, at):
+        obj.rank_name = self.rank_at(officer_id, at)
+
+    def events(self):
+        officer_ids = list(self.officers.keys())
+        events = {officer_id: {kind: [] for kind in KINDS} for officer_id in officer_ids}
+
+        officer_allegations = OfficerAllegation.objects.filter(
+            officer_id__in=officer_ids,
+            allegation__incident_date__isnull=False,
+        ).select_related(
+            'allegation', 'allegation_category'
+        ).prefetch_related(
+            'allegation__victims',
+            Prefetch(
+                'allegation__attachment_files',
+                queryset=filter_attachments(AttachmentFile.objects),
+                to_attr='prefetch_filtered_attachments'
+            )
+        ).order_by('officer_id', 'id')
+        for officer_allegation in officer_allegations:
+            incident_date = officer_allegation.allegation.incident_date
+            self.set_unit(officer_allegation, officer_allegation.officer_id, incident_date)
+            self.set_rank(officer_allegation, officer_allegation.officer_id, incident_date)
+            events[officer_allegation.officer_id]['cr'].append(officer_allegation)
+
+        histories = OfficerHistory.objects.filter(
+            officer_id__in=officer_ids, effective_date__isnull=False
+        ).select_related('unit').order_by('officer_id', 'effective_date')
+        for history in histories:
+            if history.effective_date == self.officers[history.officer_id].appointed_date:
+                continue
+            self.set_rank(history, history.officer_id, history.effective_date)
+            events[history.officer_id]['unit_change'].append(history)
+
+        salaries = Salary.objects.filter(officer_id__in=officer_ids, rank_changed=True).order_by('officer_id', 'year')
+        for salary in salaries:
+            appointed_date = self.officers[salary.officer_id].appointed_date
+            # Excluding a null appointed date also excludes rank changes without a date
+            if salary.spp_date == appointed_date:
+                continue
+            self.set_unit(salary, salary.officer_id, salary.spp_date)
+            events[salary.officer_id]['rank_change'].append(salary)
+
+        for officer in self.officers.values():
+            if officer.appointed_date:
+                self.set_unit(officer, officer.id, officer.appointed_date)
+                self.set_rank(officer, officer.id, officer.appointed_date)
+                events[officer.id]['joined'].append(officer)
+
+        awards = Award.objects.filter(
+            Q(officer_id__in=officer_ids),
+            Q(start_date__isnull=False),
+            ~Q(award_type__contains='Honorable Mention'),
+            ~Q(award_type__in=['Complimentary Letter', 'Department Commendation'])
+        ).order_by('officer_id', 'id')
+        for award in awards:
+            self.set_unit(award, award.officer_id, award.start_date)
+            self.set_rank(award, award.officer_id, award.start_date)
+            events[award.officer_id]['award'].append(award)
+
+        trrs = TRR.objects.filter(officer_id__in=officer_ids).annotate(
+            trr_date=TruncDate('trr_datetime')
+        ).order_by('officer_id', 'id')
+        for trr in trrs:
+            self.set_unit(trr, trr.officer_id, trr.trr_date)
+            self.set_rank(trr, trr.officer_id, trr.trr_date)
+            events[trr.officer_id]['trr'].append(trr)
+
+        return events
+
+    def serialize(self, query_klass, officer_events):
+        serializers = {
+            'cr': query_klass.cr_new_timeline_serializer,
+            'unit_change': query_klass.unit_change_new_timeline_serializer,
+            'rank_change': query_klass.rank_change_new_timeline_serializer,
+            'joined': query_klass.joined_new_timeline_serializer,
+            'award': query_klass.award_new_timeline_serializer,
+            'trr': query_klass.trr_new_timeline_serializer,
+        }
+        timeline = []
+        for kind in KINDS:
+            if officer_events[kind]:
+                timeline += serializers[kind](officer_events[kind], many=True).data
+        return query_klass.sort_timeline(timeline)
+
+    def build(self):
+        return [
+            OfficerTimeline(
+                officer_id=officer_id,
+                items=self.serialize(OfficerTimelineQuery, officer_events),
+                mobile_items=self.serialize(OfficerTimelineMobileQuery, officer_events)
+            )
+            for officer_id, officer_events in self.events().items()
+        ]
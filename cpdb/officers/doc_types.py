@@ -37,6 +37,7 @@ class OfficerInfoDocType(DocType):
     tags = Text(analyzer=autocomplete, search_analyzer=autocomplete_search)
     historic_badges = Text(analyzer=autocomplete, search_analyzer=autocomplete_search)
     allegation_count = Long()
+    autocomplete_weight = Float()
     has_visual_token = Boolean()
     complaint_percentile = Float()
     cr_incident_dates = Date()
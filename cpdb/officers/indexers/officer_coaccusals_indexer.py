@@ -1,7 +1,6 @@
-import itertools
-
 from django.db import models
 
+from data.cache_managers import coaccusal_cache_manager
 from data.models import Officer, OfficerAllegation
 from data.utils.subqueries import SQCount
 from es_index import register_indexer
@@ -24,17 +23,10 @@ class OfficerCoaccusalsIndexer(BaseIndexer):
 
     @timing_validate('OfficerCoaccusalsIndexer: Populating coaccusal dict...')
     def _populate_coaccusal_dict(self):
-        self._coaccusal_dict = dict()
-        allegation_dict = dict()
-        for obj in OfficerAllegation.objects.all():
-            allegation_dict.setdefault(obj.allegation_id, []).append(obj.officer_id)
-
-        for officer_ids in allegation_dict.values():
-            if len(officer_ids) < 2:
-                continue
-            for id_1, id_2 in itertools.permutations(officer_ids, 2):
-                d1 = self._coaccusal_dict.setdefault(id_1, dict())
-                d1[id_2] = d1.get(id_2, 0) + 1
+        if coaccusal_cache_manager.is_coaccusal_matrix_stale():
+            self._coaccusal_dict = coaccusal_cache_manager.compute_coaccusal_dict()
+        else:
+            self._coaccusal_dict = coaccusal_cache_manager.get_coaccusal_dict()
 
     @timing_validate('OfficerCoaccusalsIndexer: Populating officers dict...')
     def _populate_officers_dict(self):
@@ -1,21 +1,16 @@
-import itertools
-
 from django.db import models
 from django.contrib.postgres.aggregates import ArrayAgg
 
-from data import officer_percentile
-from data.constants import (
-    MIN_VISUAL_TOKEN_YEAR, MAX_VISUAL_TOKEN_YEAR,
-    PERCENTILE_TRR_GROUP, PERCENTILE_ALLEGATION_INTERNAL_CIVILIAN_GROUP, PERCENTILE_ALLEGATION_GROUP
-)
+from data.cache_managers import coaccusal_cache_manager, officer_cache_manager
 from data.models import (
     Officer, Award, OfficerAllegation, Complainant, Allegation, OfficerHistory,
-    OfficerBadgeNumber, Salary
+    OfficerBadgeNumber, Salary, PoliceUnit
 )
+from data.utils.key_range import in_key_range
 from data.utils.subqueries import SQCount
 from es_index import register_indexer
 from es_index.utils import timing_validate
-from es_index.indexers import BaseIndexer
+from es_index.indexers import BaseIndexer, updated_values
 from es_index.serializers import get_gender, get_age_range
 from officers.doc_types import OfficerInfoDocType
 from officers.index_aliases import officers_index_alias
@@ -25,16 +20,25 @@ from trr.models import TRR
 app_name = __name__.split('.')[0]
 
 
+def in_officer_allegation_range(queryset, allegation_field, officer_id_range):
+    if officer_id_range is None:
+        return queryset
+    allegation_ids = in_key_range(OfficerAllegation.objects.all(), 'officer_id', officer_id_range).values(
+        'allegation_id'
+    )
+    return queryset.filter(**{f'{allegation_field}__in': allegation_ids})
+
+
 @register_indexer(app_name)
 class OfficersIndexer(BaseIndexer):
     doc_type_klass = OfficerInfoDocType
     index_alias = officers_index_alias
     serializer = OfficerSerializer()
-    percentile_groups = [
-        PERCENTILE_ALLEGATION_GROUP,
-        PERCENTILE_ALLEGATION_INTERNAL_CIVILIAN_GROUP,
-        PERCENTILE_TRR_GROUP
-    ]
+    chunk_key = 'id'
+    # Yearly percentiles computed from the source tables when the cached table is stale, None to read the table
+    computed_yearly_percentiles = None
+    # Coaccusals are counted from officer allegations when the cached matrix is stale
+    coaccusal_matrix_stale = False
 
     def __del__(self):
         del self.allegation_dict
@@ -45,39 +49,67 @@ class OfficersIndexer(BaseIndexer):
         del self.badgenumber_dict
         del self.salary_dict
 
+    @timing_validate('OfficersIndexer: Checking yearly percentiles...')
+    def check_yearly_percentiles(self):
+        if officer_cache_manager.is_yearly_percentiles_stale():
+            print('OfficersIndexer: yearly percentiles are stale, computing them without cache_data')
+            self.computed_yearly_percentiles = officer_cache_manager.compute_yearly_percentiles()
+
+    def load_yearly_percentiles(self, officer_id_range=None):
+        if self.computed_yearly_percentiles is None:
+            return officer_cache_manager.load_yearly_percentiles(officer_id_range)
+        if officer_id_range is None:
+            return self.computed_yearly_percentiles
+        if isinstance(officer_id_range, list):
+            officer_ids = officer_id_range
+        else:
+            officer_ids = range(officer_id_range[0], officer_id_range[1] + 1)
+        return {
+            officer_id: self.computed_yearly_percentiles[officer_id]
+            for officer_id in officer_ids if officer_id in self.computed_yearly_percentiles
+        }
+
+    @timing_validate('OfficersIndexer: Checking coaccusal matrix...')
+    def check_coaccusal_matrix(self):
+        self.coaccusal_matrix_stale = coaccusal_cache_manager.is_coaccusal_matrix_stale()
+        if self.coaccusal_matrix_stale:
+            print('OfficersIndexer: coaccusal matrix is stale, counting coaccusals without cache_data')
+
+    def load_coaccusals(self, officer_id_range=None):
+        if self.coaccusal_matrix_stale:
+            return coaccusal_cache_manager.compute_coaccusal_dict(officer_id_range)
+        return coaccusal_cache_manager.get_coaccusal_dict(officer_id_range)
+
+    def populate_chunk(self, officer_id_range):
+        self.yearly_top_percentile = self.load_yearly_percentiles(officer_id_range)
+        self.load_allegation_dict(officer_id_range)
+        self.coaccusals = self.load_coaccusals(officer_id_range)
+        self.award_dict = self.get_award_dict(officer_id_range)
+        self.history_dict = self.get_history_dict(officer_id_range)
+        self.badgenumber_dict = self.get_badgenumber_dict(officer_id_range)
+        self.salary_dict = self.get_salary_dict(officer_id_range)
+        self.tags_dict = self.get_tags_dict(officer_id_range)
+
     @timing_validate('OfficersIndexer: Preparing percentile data...')
     def populate_top_percentile_dict(self):
-        self.yearly_top_percentile = dict()
-        for yr in range(MIN_VISUAL_TOKEN_YEAR, MAX_VISUAL_TOKEN_YEAR + 1):
-            for officer in officer_percentile.top_percentile(yr, percentile_groups=self.percentile_groups):
-                if officer.resignation_date and yr > officer.resignation_date.year:
-                    continue
-                officer_list = self.yearly_top_percentile.setdefault(officer.id, [])
-                officer_dict = {
-                    'id': officer.id,
-                    'year': yr
-                }
-                for attr in [
-                        'percentile_trr',
-                        'percentile_allegation',
-                        'percentile_allegation_civilian',
-                        'percentile_allegation_internal']:
-                    if hasattr(officer, attr):
-                        officer_dict[attr] = f'{getattr(officer, attr):.4f}'
-                officer_list.append(officer_dict)
-
-    def get_complainant_dict(self):
+        self.yearly_top_percentile = self.load_yearly_percentiles()
+
+    def get_complainant_dict(self, officer_id_range=None):
         complainant_dict = dict()
-        complainant_queryset = Complainant.objects.all().values(
+        complainant_queryset = in_officer_allegation_range(
+            Complainant.objects.all(), 'allegation_id', officer_id_range
+        ).values(
             'allegation_id', 'gender', 'race', 'age'
         )
         for obj in complainant_queryset:
             complainant_dict.setdefault(obj['allegation_id'], []).append(obj)
         return complainant_dict
 
-    def get_officer_allegation_dict(self):
+    def get_officer_allegation_dict(self, officer_id_range=None):
         officer_allegation_dict = dict()
-        officer_allegation_queryset = OfficerAllegation.objects.all().select_related('allegation_category').values(
+        officer_allegation_queryset = in_officer_allegation_range(
+            OfficerAllegation.objects.all(), 'allegation_id', officer_id_range
+        ).select_related('allegation_category').values(
             'id', 'allegation_id', 'officer_id', 'start_date', 'allegation_category__category', 'final_finding'
         )
         for obj in officer_allegation_queryset:
@@ -93,78 +125,122 @@ class OfficersIndexer(BaseIndexer):
             if complainant['race'] == '':
                 complainant['race'] = 'Unknown'
 
-    def populate_coaccusal(self, allegation):
-        for complaint_a, complaint_b in itertools.combinations(allegation['complaints'], 2):
-            officer_id_a = complaint_a['officer_id']
-            officer_id_b = complaint_b['officer_id']
-            dict_a = self.coaccusals.setdefault(officer_id_a, dict())
-            dict_a[officer_id_b] = dict_a.get(officer_id_b, 0) + 1
-            dict_b = self.coaccusals.setdefault(officer_id_b, dict())
-            dict_b[officer_id_a] = dict_b.get(officer_id_a, 0) + 1
-
-    @timing_validate('OfficersIndexer: Populating allegation dict...')
-    def populate_allegation_dict(self):
-        complainant_dict = self.get_complainant_dict()
-        officer_allegation_dict = self.get_officer_allegation_dict()
-        allegations = Allegation.objects.all().values('crid')
+    def load_allegation_dict(self, officer_id_range=None):
+        complainant_dict = self.get_complainant_dict(officer_id_range)
+        officer_allegation_dict = self.get_officer_allegation_dict(officer_id_range)
+        allegations = in_officer_allegation_range(Allegation.objects.all(), 'crid', officer_id_range).values('crid')
         self.allegation_dict = dict()
-        self.coaccusals = dict()
         for allegation in allegations:
             allegation['complainants'] = complainant_dict.get(allegation['crid'], [])
             allegation['complaints'] = officer_allegation_dict.get(allegation['crid'], [])
             self.transform_demographic(allegation)
             for complaint in allegation['complaints']:
                 self.allegation_dict.setdefault(complaint['officer_id'], []).append(allegation)
-            self.populate_coaccusal(allegation)
+
+    @timing_validate('OfficersIndexer: Populating allegation dict...')
+    def populate_allegation_dict(self):
+        self.load_allegation_dict()
+
+    def get_award_dict(self, officer_id_range=None):
+        award_dict = dict()
+        queryset = in_key_range(Award.objects.all(), 'officer_id', officer_id_range).values(
+            'officer_id', 'award_type'
+        )
+        for award in queryset:
+            award_dict.setdefault(award['officer_id'], []).append(award)
+        return award_dict
+
+    @timing_validate('OfficersIndexer: Populating coaccusals...')
+    def populate_coaccusals(self):
+        self.coaccusals = self.load_coaccusals()
 
     @timing_validate('OfficersIndexer: Populating award dict...')
     def populate_award_dict(self):
-        self.award_dict = dict()
-        queryset = Award.objects.all().values('officer_id', 'award_type')
-        for award in queryset:
-            self.award_dict.setdefault(award['officer_id'], []).append(award)
+        self.award_dict = self.get_award_dict()
+
+    def get_history_dict(self, officer_id_range=None):
+        history_dict = dict()
+        queryset = in_key_range(OfficerHistory.objects.all(), 'officer_id', officer_id_range)\
+            .select_related('unit').values(
+                'officer_id', 'unit_id', 'unit__unit_name', 'unit__description', 'end_date', 'effective_date'
+            )
+        for obj in queryset:
+            history_dict.setdefault(obj['officer_id'], []).append(obj)
+        return history_dict
 
     @timing_validate('OfficersIndexer: Populating history dict...')
     def populate_history_dict(self):
-        self.history_dict = dict()
-        queryset = OfficerHistory.objects.all().select_related('unit').values(
-            'officer_id', 'unit_id', 'unit__unit_name', 'unit__description', 'end_date', 'effective_date'
+        self.history_dict = self.get_history_dict()
+
+    def get_badgenumber_dict(self, officer_id_range=None):
+        badgenumber_dict = dict()
+        queryset = in_key_range(OfficerBadgeNumber.objects.all(), 'officer_id', officer_id_range).values(
+            'officer_id', 'star', 'current'
         )
         for obj in queryset:
-            self.history_dict.setdefault(obj['officer_id'], []).append(obj)
+            badgenumber_dict.setdefault(obj['officer_id'], []).append(obj)
+        return badgenumber_dict
 
     @timing_validate('OfficersIndexer: Populating badgenumber dict...')
     def populate_badgenumber_dict(self):
-        self.badgenumber_dict = dict()
-        queryset = OfficerBadgeNumber.objects.all().values(
-            'officer_id', 'star', 'current'
+        self.badgenumber_dict = self.get_badgenumber_dict()
+
+    def get_salary_dict(self, officer_id_range=None):
+        salary_dict = dict()
+        queryset = in_key_range(Salary.objects.all(), 'officer_id', officer_id_range).values(
+            'officer_id', 'salary', 'year'
         )
         for obj in queryset:
-            self.badgenumber_dict.setdefault(obj['officer_id'], []).append(obj)
+            salary_dict.setdefault(obj['officer_id'], []).append(obj)
+        return salary_dict
 
     @timing_validate('OfficersIndexer: Populating salary dict...')
     def populate_salary_dict(self):
-        self.salary_dict = dict()
-        queryset = Salary.objects.all().values(
-            'officer_id', 'salary', 'year'
-        )
-        for obj in queryset:
-            self.salary_dict.setdefault(obj['officer_id'], []).append(obj)
+        self.salary_dict = self.get_salary_dict()
+
+    def get_tags_dict(self, officer_id_range=None):
+        tags_dict = dict()
+        queryset = in_key_range(Officer.objects.exclude(tags__isnull=True), 'id', officer_id_range)
+        for officer in queryset.prefetch_related('tags'):
+            tags_dict[officer.id] = [tag.name for tag in officer.tags.all()]
+        return tags_dict
 
     @timing_validate('OfficersIndexer: Populating tags dict...')
     def populate_tags_dict(self):
-        self.tags_dict = dict()
-        for officer in Officer.objects.exclude(tags__isnull=True).prefetch_related('tags'):
-            self.tags_dict[officer.id] = [tag.name for tag in officer.tags.all()]
+        self.tags_dict = self.get_tags_dict()
+
+    @classmethod
+    def get_updated_keys(cls, since):
+        officer_ids = updated_values(Officer.objects.all(), since, 'id')
+        for model in [Award, OfficerHistory, OfficerBadgeNumber, Salary, TRR]:
+            officer_ids |= updated_values(model.objects.all(), since, 'officer_id')
+
+        # Complaints and coaccusals are embedded in the documents of every officer accused in the complaint
+        allegation_ids = set(Allegation.objects.filter(updated_at__gt=since).values_list('crid', flat=True))
+        for model in [OfficerAllegation, Complainant]:
+            allegation_ids |= updated_values(model.objects.all(), since, 'allegation_id')
+        officer_ids.update(OfficerAllegation.objects.filter(
+            allegation_id__in=list(allegation_ids)
+        ).values_list('officer_id', flat=True))
+
+        officer_ids.update(OfficerHistory.objects.filter(
+            unit_id__in=PoliceUnit.objects.filter(updated_at__gt=since).values('id')
+        ).values_list('officer_id', flat=True))
+        officer_ids.discard(None)
+        return officer_ids
 
     def get_queryset(self):
-        self.populate_top_percentile_dict()
-        self.populate_allegation_dict()
-        self.populate_award_dict()
-        self.populate_history_dict()
-        self.populate_badgenumber_dict()
-        self.populate_salary_dict()
-        self.populate_tags_dict()
+        self.check_yearly_percentiles()
+        self.check_coaccusal_matrix()
+        if not self.chunk_size:
+            self.populate_top_percentile_dict()
+            self.populate_allegation_dict()
+            self.populate_coaccusals()
+            self.populate_award_dict()
+            self.populate_history_dict()
+            self.populate_badgenumber_dict()
+            self.populate_salary_dict()
+            self.populate_tags_dict()
         allegation_count = OfficerAllegation.objects.filter(
             officer=models.OuterRef('id')
         )
@@ -183,7 +259,7 @@ class OfficersIndexer(BaseIndexer):
         trr_count = TRR.objects.filter(
             officer=models.OuterRef('id')
         )
-        return Officer.objects.all()\
+        queryset = Officer.objects.all()\
             .annotate(complaint_count=SQCount(allegation_count.values('id')))\
             .annotate(sustained_complaint_count=SQCount(sustained_count.values('id')))\
             .annotate(discipline_complaint_count=SQCount(discipline_count.values('id')))\
@@ -191,6 +267,9 @@ class OfficersIndexer(BaseIndexer):
             .annotate(unsustained_complaint_count=SQCount(unsustained_count.values('id')))\
             .annotate(trr_datetimes=ArrayAgg('trr__trr_datetime'))\
             .annotate(cr_incident_dates=ArrayAgg('officerallegation__allegation__incident_date'))
+        if self.chunk_size:
+            return self.chunked(queryset)
+        return queryset
 
     def extract_datum(self, obj):
         datum = obj.__dict__
@@ -1,10 +1,11 @@
 from operator import itemgetter
 
-from django.db.models import Q, Subquery, OuterRef, Prefetch
+from django.db.models import Q, Prefetch
 from django.db.models.functions import TruncDate
 
-from data.models import OfficerHistory, Salary, Officer, AttachmentFile
+from data.models import Officer, AttachmentFile, OfficerTimeline
 from data.utils.attachment_file import filter_attachments
+from data.utils.interval_index import OfficerUnitIndex, OfficerRankIndex
 from officers.serializers.response_serializers import (
     CRNewTimelineSerializer,
     JoinedNewTimelineSerializer,
@@ -24,6 +25,8 @@ from officers.serializers.response_mobile_serializers import (
 
 
 class OfficerTimelineBaseQuery(object):
+    # Field of OfficerTimeline holding the items serialized by the serializers below
+    timeline_field = None
     cr_new_timeline_serializer = None
     unit_change_new_timeline_serializer = None
     rank_change_new_timeline_serializer = None
@@ -31,35 +34,30 @@ class OfficerTimelineBaseQuery(object):
     award_new_timeline_serializer = None
     trr_new_timeline_serializer = None
 
-    def __init__(self, officer):
+    def __init__(self, officer, unit_index=None, rank_index=None):
         self.officer = officer
+        self._unit_index = unit_index
+        self._rank_index = rank_index
 
-    def unit_subqueries(self, outer_ref_field):
-        return {
-            'unit_name': Subquery(
-                OfficerHistory.objects.filter(officer_id=self.officer.id).filter(
-                    Q(effective_date__lte=OuterRef(outer_ref_field)) | Q(effective_date__isnull=True),
-                    Q(end_date__gte=OuterRef(outer_ref_field)) | Q(end_date__isnull=True)
-                ).order_by('effective_date').values('unit__unit_name')[:1]
-            ),
-            'unit_description': Subquery(
-                OfficerHistory.objects.filter(officer_id=self.officer.id).filter(
-                    Q(effective_date__lte=OuterRef(outer_ref_field)) | Q(effective_date__isnull=True),
-                    Q(end_date__gte=OuterRef(outer_ref_field)) | Q(end_date__isnull=True)
-                ).values('unit__description')[:1]
-            )
-        }
-
-    def rank_subquery(self, outer_ref_field):
-        return {
-            'rank_name': Subquery(
-                Salary.objects.filter(
-                    officer_id=self.officer.id,
-                    rank_changed=True,
-                    spp_date__lte=OuterRef(outer_ref_field),
-                ).order_by('-year', '-spp_date').values('rank')[:1]
-            )
-        }
+    @property
+    def unit_index(self):
+        if self._unit_index is None:
+            self._unit_index = OfficerUnitIndex(officer_ids=[self.officer.id])
+        return self._unit_index
+
+    @property
+    def rank_index(self):
+        if self._rank_index is None:
+            self._rank_index = OfficerRankIndex(officer_ids=[self.officer.id])
+        return self._rank_index
+
+    def set_unit(self, obj, at):
+        unit = self.unit_index.unit_at(self.officer.id, at)
+        obj.unit_name = unit.unit_name if unit else None
+        obj.unit_description = unit.description if unit else None
+
+    def set_rank(self, obj, at):
+        obj.rank_name = self.rank_index.rank_at(self.officer.id, at)
 
     @property
     def _cr_timeline(self):
@@ -74,13 +72,13 @@ class OfficerTimelineBaseQuery(object):
                 queryset=filter_attachments(AttachmentFile.objects),
                 to_attr='prefetch_filtered_attachments'
             )
-        ).annotate(
-            **self.unit_subqueries('allegation__incident_date')
-        ).annotate(
-            **self.rank_subquery('allegation__incident_date')
         )
+        officer_allegations = list(cr_timeline_queryset)
+        for officer_allegation in officer_allegations:
+            self.set_unit(officer_allegation, officer_allegation.allegation.incident_date)
+            self.set_rank(officer_allegation, officer_allegation.allegation.incident_date)
 
-        return self.cr_new_timeline_serializer(cr_timeline_queryset, many=True).data
+        return self.cr_new_timeline_serializer(officer_allegations, many=True).data
 
     @property
     def _unit_change_timeline(self):
@@ -88,12 +86,13 @@ class OfficerTimelineBaseQuery(object):
             effective_date__isnull=False,
         ).exclude(
             effective_date=self.officer.appointed_date
-        ).order_by('effective_date').select_related('unit').annotate(
-            **self.rank_subquery('effective_date')
-        )
+        ).order_by('effective_date').select_related('unit')
+        officer_histories = list(unit_change_timeline_queryset)
+        for officer_history in officer_histories:
+            self.set_rank(officer_history, officer_history.effective_date)
 
         return self.unit_change_new_timeline_serializer(
-            unit_change_timeline_queryset,
+            officer_histories,
             many=True
         ).data
 
@@ -103,23 +102,23 @@ class OfficerTimelineBaseQuery(object):
             rank_changed=True
         ).exclude(
             spp_date=self.officer.appointed_date
-        ).order_by('year').annotate(
-            **self.unit_subqueries('spp_date')
-        )
+        ).order_by('year')
+        salaries = list(salary_timeline)
+        for salary in salaries:
+            self.set_unit(salary, salary.spp_date)
 
         return self.rank_change_new_timeline_serializer(
-            salary_timeline, many=True
+            salaries, many=True
         ).data
 
     @property
     def _join_timeline(self):
         if self.officer.appointed_date:
-            joined_timeline_query = Officer.objects.filter(id=self.officer.id).annotate(
-                **self.unit_subqueries('appointed_date')
-            ).annotate(
-                **self.rank_subquery('appointed_date')
-            )[:1]
-            return self.joined_new_timeline_serializer(joined_timeline_query, many=True).data
+            officers = list(Officer.objects.filter(id=self.officer.id)[:1])
+            for officer in officers:
+                self.set_unit(officer, officer.appointed_date)
+                self.set_rank(officer, officer.appointed_date)
+            return self.joined_new_timeline_serializer(officers, many=True).data
         else:
             return []
 
@@ -129,27 +128,26 @@ class OfficerTimelineBaseQuery(object):
             Q(start_date__isnull=False),
             ~Q(award_type__contains='Honorable Mention'),
             ~Q(award_type__in=['Complimentary Letter', 'Department Commendation'])
-        ).annotate(
-            **self.unit_subqueries('start_date')
-        ).annotate(
-            **self.rank_subquery('start_date')
         )
-        return self.award_new_timeline_serializer(award_timeline_queryset, many=True).data
+        awards = list(award_timeline_queryset)
+        for award in awards:
+            self.set_unit(award, award.start_date)
+            self.set_rank(award, award.start_date)
+        return self.award_new_timeline_serializer(awards, many=True).data
 
     @property
     def _trr_timeline(self):
         trr_timeline_queryset = self.officer.trr_set.all().annotate(
             trr_date=TruncDate('trr_datetime')
-        ).annotate(
-            **self.unit_subqueries('trr_date')
-        ).annotate(
-            **self.rank_subquery('trr_date')
         )
-        return self.trr_new_timeline_serializer(trr_timeline_queryset, many=True).data
-
-    def execute(self):
-        timeline = self._cr_timeline + self._unit_change_timeline + self._rank_change_timeline + \
-                   self._join_timeline + self._award_timeline + self._trr_timeline
+        trrs = list(trr_timeline_queryset)
+        for trr in trrs:
+            self.set_unit(trr, trr.trr_date)
+            self.set_rank(trr, trr.trr_date)
+        return self.trr_new_timeline_serializer(trrs, many=True).data
+
+    @staticmethod
+    def sort_timeline(timeline):
         sorted_timeline = sorted(timeline, key=itemgetter('date_sort', 'priority_sort'), reverse=True)
 
         for item in sorted_timeline:
@@ -157,8 +155,23 @@ class OfficerTimelineBaseQuery(object):
                 item.pop(key, None)
         return sorted_timeline
 
+    def build(self):
+        timeline = self._cr_timeline + self._unit_change_timeline + self._rank_change_timeline + \
+                   self._join_timeline + self._award_timeline + self._trr_timeline
+        return self.sort_timeline(timeline)
+
+    def execute(self):
+        timeline = OfficerTimeline.objects.filter(
+            officer_id=self.officer.id
+        ).values_list(self.timeline_field, flat=True).first()
+        # Officers imported after the last cache_data have no materialized timeline yet
+        if timeline is None:
+            return self.build()
+        return timeline
+
 
 class OfficerTimelineQuery(OfficerTimelineBaseQuery):
+    timeline_field = 'items'
     cr_new_timeline_serializer = CRNewTimelineSerializer
     unit_change_new_timeline_serializer = UnitChangeNewTimelineSerializer
     rank_change_new_timeline_serializer = RankChangeNewTimelineSerializer
@@ -168,6 +181,7 @@ class OfficerTimelineQuery(OfficerTimelineBaseQuery):
 
 
 class OfficerTimelineMobileQuery(OfficerTimelineBaseQuery):
+    timeline_field = 'mobile_items'
     cr_new_timeline_serializer = CRNewTimelineMobileSerializer
     unit_change_new_timeline_serializer = UnitChangeNewTimelineMobileSerializer
     rank_change_new_timeline_serializer = RankChangeNewTimelineMobileSerializer
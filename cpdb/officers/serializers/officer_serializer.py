@@ -21,6 +21,7 @@ class _UnitSerializer(BaseSerializer):
 
 class OfficerSerializer(BaseSerializer):
     _unit_serializer = _UnitSerializer()
+    allegation_count_autocomplete_weight = 3
 
     def get_full_name(self, obj):
         return ' '.join([obj['first_name'], obj['last_name']])
@@ -231,6 +232,9 @@ class OfficerSerializer(BaseSerializer):
                 count += 1
         return count
 
+    def get_autocomplete_weight(self, obj):
+        return (obj['complaint_count'] or 0) * self.allegation_count_autocomplete_weight + 1
+
     def get_has_visual_token(self, obj):
         return not any(
             obj[key] is None for key in
@@ -295,6 +299,7 @@ class OfficerSerializer(BaseSerializer):
             'birth_year': get('birth_year'),
             'complaint_records': self.get_complaint_records,
             'allegation_count': get('complaint_count'),
+            'autocomplete_weight': self.get_autocomplete_weight,
             'complaint_percentile': get('complaint_percentile'),
             'civilian_allegation_percentile': get('civilian_allegation_percentile'),
             'internal_allegation_percentile': get('internal_allegation_percentile'),
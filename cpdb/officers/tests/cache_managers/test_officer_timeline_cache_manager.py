@@ -0,0 +1,141 @@
+from datetime import date, datetime
+
+from django.contrib.gis.geos import Point
+from django.test.testcases import TestCase
+
+from freezegun import freeze_time
+from robber import expect
+import pytz
+
+from data.factories import (
+    OfficerFactory, OfficerAllegationFactory, AllegationFactory, AllegationCategoryFactory, PoliceUnitFactory,
+    OfficerHistoryFactory, SalaryFactory, AwardFactory, VictimFactory, AttachmentFileFactory
+)
+from data.models import OfficerTimeline
+from officers.cache_managers import officer_timeline_cache_manager
+from officers.cache_managers.officer_timeline_cache_manager import OfficerTimelineBuilder
+from officers.queries import OfficerTimelineQuery, OfficerTimelineMobileQuery
+from trr.factories import TRRFactory
+
+
+class OfficerTimelineCacheManagerTestCase(TestCase):
+    def setUp(self):
+        self.maxDiff = None
+
+    def create_officer_events(self, officer):
+        unit_1 = PoliceUnitFactory(unit_name='001', description='District 001')
+        unit_2 = PoliceUnitFactory(unit_name='002', description='District 002')
+        OfficerHistoryFactory(officer=officer, unit=unit_1, effective_date=date(2001, 2, 3), end_date=date(2003, 1, 2))
+        OfficerHistoryFactory(officer=officer, unit=unit_2, effective_date=date(2003, 1, 3), end_date=None)
+        OfficerHistoryFactory(officer=officer, unit=unit_2, effective_date=None, end_date=date(2000, 1, 1))
+        SalaryFactory(officer=officer, year=2001, rank='Police Officer', rank_changed=True, spp_date=date(2001, 2, 3))
+        SalaryFactory(
+            officer=officer, year=2002, rank='Senior Police Officer', rank_changed=True, spp_date=date(2002, 5, 3)
+        )
+        SalaryFactory(officer=officer, year=2003, rank='Senior Police Officer', rank_changed=False)
+
+        allegation_1 = AllegationFactory(
+            crid='1', incident_date=datetime(2002, 2, 3, tzinfo=pytz.utc), point=Point(-35.5, 68.9), coaccused_count=2
+        )
+        OfficerAllegationFactory(
+            officer=officer, allegation=allegation_1, final_finding='SU',
+            allegation_category=AllegationCategoryFactory(category='Use of Force', allegation_name='Excessive')
+        )
+        VictimFactory(allegation=allegation_1, gender='F', race='Black', age=30)
+        AttachmentFileFactory(allegation=allegation_1, title='CR document', tag='CR', file_type='document')
+        # Incident happens after midnight of the last day in unit 001
+        allegation_2 = AllegationFactory(crid='2', incident_date=datetime(2003, 1, 2, 10, tzinfo=pytz.utc))
+        OfficerAllegationFactory(officer=officer, allegation=allegation_2, allegation_category=None)
+        OfficerAllegationFactory(officer=officer, allegation__incident_date=None)
+
+        AwardFactory(officer=officer, start_date=date(2002, 3, 4), award_type='Life Saving Award')
+        AwardFactory(officer=officer, start_date=date(2002, 3, 5), award_type='Honorable Mention')
+        TRRFactory(officer=officer, trr_datetime=datetime(2004, 1, 2, 5, tzinfo=pytz.utc), taser=True)
+
+    def test_build_officer_timelines(self):
+        officer = OfficerFactory(id=1, appointed_date=date(2001, 2, 3))
+        officer_without_events = OfficerFactory(id=2, appointed_date=None)
+        other_officer = OfficerFactory(id=3, appointed_date=date(2005, 1, 1))
+        self.create_officer_events(officer)
+        OfficerAllegationFactory(
+            officer=other_officer, allegation__incident_date=datetime(2006, 2, 3, tzinfo=pytz.utc)
+        )
+
+        officer_timeline_cache_manager.build_officer_timelines()
+
+        expect(OfficerTimeline.objects.count()).to.eq(3)
+        for each_officer in [officer, officer_without_events, other_officer]:
+            timeline = OfficerTimeline.objects.get(officer=each_officer)
+            expect(timeline.items).to.eq(OfficerTimelineQuery(each_officer).build())
+            expect(timeline.mobile_items).to.eq(OfficerTimelineMobileQuery(each_officer).build())
+
+        expect([item['kind'] for item in OfficerTimeline.objects.get(officer=officer).items]).to.eq(
+            ['FORCE', 'UNIT_CHANGE', 'CR', 'RANK_CHANGE', 'AWARD', 'CR', 'JOINED']
+        )
+        expect(OfficerTimeline.objects.get(officer=officer_without_events).items).to.eq([])
+
+    def test_build_officer_timelines_of_some_officers(self):
+        officer_1 = OfficerFactory(appointed_date=date(2001, 2, 3))
+        officer_2 = OfficerFactory(appointed_date=date(2002, 2, 3))
+        OfficerTimeline.objects.create(officer=officer_1, items=[], mobile_items=[])
+        OfficerTimeline.objects.create(officer=officer_2, items=[], mobile_items=[])
+
+        officer_timeline_cache_manager.build_officer_timelines(officer_ids=[officer_1.id])
+
+        expect(OfficerTimeline.objects.get(officer=officer_1).items).to.have.length(1)
+        expect(OfficerTimeline.objects.get(officer=officer_2).items).to.eq([])
+
+    def test_unit_and_rank_at(self):
+        officer = OfficerFactory(appointed_date=date(2001, 2, 3))
+        self.create_officer_events(officer)
+        builder = OfficerTimelineBuilder([officer.id])
+
+        expect(builder.unit_at(officer.id, date(2003, 1, 2)).unit_name).to.eq('001')
+        expect(builder.unit_at(officer.id, datetime(2003, 1, 2, tzinfo=pytz.utc)).unit_name).to.eq('001')
+        expect(builder.unit_at(officer.id, datetime(2003, 1, 2, 10, tzinfo=pytz.utc))).to.be.none()
+        expect(builder.unit_at(officer.id, date(1999, 1, 1)).unit_name).to.eq('002')
+        expect(builder.unit_at(officer.id, None)).to.be.none()
+        expect(builder.rank_at(officer.id, date(2002, 5, 2))).to.eq('Police Officer')
+        expect(builder.rank_at(officer.id, date(2002, 5, 3))).to.eq('Senior Police Officer')
+        expect(builder.rank_at(officer.id, date(2000, 1, 1))).to.be.none()
+        expect(builder.rank_at(officer.id, None)).to.be.none()
+
+    def test_cache_data_since(self):
+        with freeze_time('2020-01-01 12:00:00'):
+            officer_1 = OfficerFactory(appointed_date=date(2001, 2, 3))
+            officer_2 = OfficerFactory(appointed_date=date(2002, 2, 3))
+            allegation = AllegationFactory(incident_date=datetime(2005, 1, 1, tzinfo=pytz.utc))
+            OfficerAllegationFactory(officer=officer_1, allegation=allegation)
+            officer_timeline_cache_manager.cache_data()
+
+        with freeze_time('2020-01-03 12:00:00'):
+            VictimFactory(allegation=allegation)
+            AwardFactory(officer=officer_2, start_date=date(2003, 1, 1), award_type='Life Saving Award')
+            officer_3 = OfficerFactory(appointed_date=date(2003, 2, 3))
+
+        expect(officer_timeline_cache_manager.changed_officer_ids(datetime(2020, 1, 2, tzinfo=pytz.utc))).to.eq(
+            sorted([officer_1.id, officer_2.id, officer_3.id])
+        )
+
+        officer_timeline_cache_manager.cache_data(since=datetime(2020, 1, 2, tzinfo=pytz.utc))
+
+        expect(OfficerTimeline.objects.count()).to.eq(3)
+        expect(OfficerTimeline.objects.get(officer=officer_1).items[0]['victims']).to.have.length(1)
+        expect([item['kind'] for item in OfficerTimeline.objects.get(officer=officer_2).items]).to.eq(
+            ['AWARD', 'JOINED']
+        )
+
+    def test_changed_officer_ids_with_new_coaccused(self):
+        with freeze_time('2020-01-01 12:00:00'):
+            officer_1 = OfficerFactory()
+            officer_2 = OfficerFactory()
+            OfficerFactory()
+            allegation = AllegationFactory()
+            OfficerAllegationFactory(officer=officer_1, allegation=allegation)
+
+        with freeze_time('2020-01-03 12:00:00'):
+            OfficerAllegationFactory(officer=officer_2, allegation=allegation)
+
+        expect(officer_timeline_cache_manager.changed_officer_ids(datetime(2020, 1, 2, tzinfo=pytz.utc))).to.eq(
+            sorted([officer_1.id, officer_2.id])
+        )
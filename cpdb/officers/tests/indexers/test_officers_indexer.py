@@ -3,15 +3,19 @@ from decimal import Decimal
 from operator import itemgetter
 
 from django.test import TestCase, override_settings
+from django.utils import timezone
 
+from freezegun import freeze_time
 from mock import Mock, patch
 from robber import expect
 import pytz
 
 from data.factories import (
     OfficerFactory, OfficerAllegationFactory, OfficerHistoryFactory, AllegationFactory,
-    AwardFactory, SalaryFactory, OfficerBadgeNumberFactory, ComplainantFactory
+    AwardFactory, SalaryFactory, OfficerBadgeNumberFactory, ComplainantFactory, OfficerYearlyPercentileFactory,
+    PoliceUnitFactory, CacheDataRunFactory
 )
+from data.cache_managers import coaccusal_cache_manager
 from officers.indexers import OfficersIndexer
 from trr.factories import TRRFactory
 
@@ -26,8 +30,8 @@ class OfficersIndexerTestCase(TestCase):
 
     @override_settings(V1_URL='http://test.com')
     @patch(
-        'officers.indexers.officers_indexer.officer_percentile.top_percentile',
-        Mock(return_value=[])
+        'data.cache_managers.officer_cache_manager.officer_percentile.yearly_top_percentile',
+        Mock(return_value={})
     )
     def test_extract_info(self):
         officer = OfficerFactory(
@@ -177,6 +181,7 @@ class OfficersIndexerTestCase(TestCase):
                 ]
             },
             'allegation_count': 1,
+            'autocomplete_weight': 4,
             'complaint_percentile': Decimal('99.8'),
             'honorable_mention_count': 1,
             'honorable_mention_percentile': 98,
@@ -513,11 +518,9 @@ class OfficersIndexerTestCase(TestCase):
             }
         ])
 
-    @patch('officers.indexers.officers_indexer.MIN_VISUAL_TOKEN_YEAR', 2016)
-    @patch('officers.indexers.officers_indexer.MAX_VISUAL_TOKEN_YEAR', 2016)
     @patch(
-        'officers.indexers.officers_indexer.officer_percentile.top_percentile',
-        Mock(return_value=[Mock(
+        'data.cache_managers.officer_cache_manager.officer_percentile.yearly_top_percentile',
+        Mock(return_value={2016: [Mock(
             spec=[
                 'id',
                 'year',
@@ -531,7 +534,7 @@ class OfficersIndexerTestCase(TestCase):
             percentile_allegation=23.4543,
             percentile_allegation_civilian=54.2342,
             percentile_allegation_internal=54.3432
-        )])
+        )]})
     )
     def test_extract_datum_percentiles_missing_value(self):
         OfficerFactory(id=123)
@@ -547,3 +550,140 @@ class OfficersIndexerTestCase(TestCase):
                 'percentile_allegation_internal': '54.3432'
             }
         ])
+
+    @patch('data.cache_managers.officer_cache_manager.officer_percentile.yearly_top_percentile')
+    def test_extract_datum_percentiles_from_yearly_percentile_table(self, yearly_top_percentile_mock):
+        officer = OfficerFactory(id=123)
+        OfficerYearlyPercentileFactory(
+            officer=officer,
+            year=2016,
+            percentile_trr=Decimal('12.3456'),
+            percentile_allegation=Decimal('23.4543'),
+        )
+        CacheDataRunFactory(started_at=timezone.now())
+        rows = self.extract_data()
+
+        expect(yearly_top_percentile_mock).not_to.be.called()
+        expect(rows).to.have.length(1)
+        expect(rows[0]['percentiles']).to.eq([
+            {
+                'id': 123,
+                'year': 2016,
+                'percentile_trr': '12.3456',
+                'percentile_allegation': '23.4543',
+            }
+        ])
+
+    @patch('data.cache_managers.officer_cache_manager.compute_yearly_percentiles')
+    def test_extract_data_in_chunks_with_stale_yearly_percentiles(self, compute_yearly_percentiles_mock):
+        officers = [OfficerFactory(id=officer_id) for officer_id in [11, 12, 13]]
+        for officer in officers:
+            OfficerYearlyPercentileFactory(officer=officer, year=2016, percentile_trr=Decimal('10.0'))
+        CacheDataRunFactory(started_at=timezone.now())
+        OfficerAllegationFactory(officer=officers[0])
+        compute_yearly_percentiles_mock.return_value = {
+            officer_id: [{'id': officer_id, 'year': 2016, 'percentile_trr': f'{officer_id}.0000'}]
+            for officer_id in [11, 12, 13]
+        }
+
+        with override_settings(ES_INDEXING_CHUNK_SIZE=2):
+            indexer = OfficersIndexer()
+            rows = [indexer.extract_datum(obj) for obj in indexer.get_queryset()]
+
+        expect(compute_yearly_percentiles_mock).to.be.called_once()
+        expect([row['percentiles'] for row in rows]).to.eq([
+            [{'id': 11, 'year': 2016, 'percentile_trr': '11.0000'}],
+            [{'id': 12, 'year': 2016, 'percentile_trr': '12.0000'}],
+            [{'id': 13, 'year': 2016, 'percentile_trr': '13.0000'}],
+        ])
+
+    def test_extract_data_in_chunks(self):
+        officers = [OfficerFactory(id=officer_id) for officer_id in [11, 12, 13, 14, 15]]
+        for officer_a, officer_b in zip(officers, officers[1:]):
+            allegation = AllegationFactory()
+            OfficerAllegationFactory(officer=officer_a, allegation=allegation)
+            OfficerAllegationFactory(officer=officer_b, allegation=allegation)
+            ComplainantFactory(allegation=allegation, gender='F', race='Black', age=25)
+        for officer in officers:
+            AwardFactory(officer=officer, award_type='Honorable Mention')
+            OfficerHistoryFactory(officer=officer)
+            OfficerBadgeNumberFactory(officer=officer, current=True)
+            SalaryFactory(officer=officer)
+            OfficerYearlyPercentileFactory(officer=officer, year=2016, percentile_trr=Decimal('12.3456'))
+        coaccusal_cache_manager.build_coaccusal_matrix()
+        CacheDataRunFactory(started_at=timezone.now())
+
+        rows = sorted(self.extract_data(), key=itemgetter('id'))
+
+        with override_settings(ES_INDEXING_CHUNK_SIZE=2):
+            indexer = OfficersIndexer()
+            chunked_rows = [indexer.extract_datum(obj) for obj in indexer.get_queryset()]
+
+        expect([row['id'] for row in chunked_rows]).to.eq([11, 12, 13, 14, 15])
+        expect(chunked_rows).to.eq(rows)
+        expect(chunked_rows[1]['coaccusals']).to.have.length(2)
+        expect(set(indexer.salary_dict.keys())).to.eq({15})
+
+    def test_get_updated_keys(self):
+        with freeze_time('2018-01-01 12:00:00', tz_offset=0):
+            officers = [OfficerFactory(id=officer_id) for officer_id in range(1, 10)]
+            allegation = AllegationFactory()
+            OfficerAllegationFactory(officer=officers[1], allegation=allegation)
+            OfficerAllegationFactory(officer=officers[2], allegation=allegation)
+            complained_allegation = AllegationFactory()
+            OfficerAllegationFactory(officer=officers[3], allegation=complained_allegation)
+            unit = PoliceUnitFactory()
+            OfficerHistoryFactory(officer=officers[4], unit=unit)
+
+        with freeze_time('2018-03-01 12:00:00', tz_offset=0):
+            officers[0].save()
+            allegation.save()
+            ComplainantFactory(allegation=complained_allegation)
+            unit.save()
+            AwardFactory(officer=officers[5])
+            SalaryFactory(officer=officers[6])
+            OfficerBadgeNumberFactory(officer=officers[7])
+            TRRFactory(officer=officers[8])
+
+        expect(OfficersIndexer.get_updated_keys(datetime(2018, 2, 1, tzinfo=pytz.utc))).to.eq(
+            {1, 2, 3, 4, 5, 6, 7, 8, 9}
+        )
+        expect(OfficersIndexer.get_updated_keys(datetime(2018, 4, 1, tzinfo=pytz.utc))).to.eq(set())
+
+    @override_settings(V1_URL='http://test.com')
+    @patch(
+        'data.cache_managers.officer_cache_manager.officer_percentile.yearly_top_percentile',
+        Mock(return_value={})
+    )
+    def test_extract_data_incremental(self):
+        officers = [OfficerFactory(id=officer_id) for officer_id in [11, 12, 13]]
+        for officer_a, officer_b in zip(officers, officers[1:]):
+            allegation = AllegationFactory()
+            OfficerAllegationFactory(officer=officer_a, allegation=allegation)
+            OfficerAllegationFactory(officer=officer_b, allegation=allegation)
+        for officer in officers:
+            AwardFactory(officer=officer, award_type='Honorable Mention')
+            SalaryFactory(officer=officer)
+
+        rows = {row['id']: row for row in self.extract_data()}
+
+        indexer = OfficersIndexer(updated_keys=[13, 11])
+        incremental_rows = [indexer.extract_datum(obj) for obj in indexer.get_queryset()]
+
+        expect(incremental_rows).to.eq([rows[11], rows[13]])
+
+    @patch('data.cache_managers.coaccusal_cache_manager.build_coaccusal_matrix')
+    @patch('data.cache_managers.officer_cache_manager.build_cached_yearly_percentiles')
+    def test_extract_data_incremental_reads_cached_tables(
+        self, build_cached_yearly_percentiles_mock, build_coaccusal_matrix_mock
+    ):
+        officer = OfficerFactory(id=11)
+        OfficerYearlyPercentileFactory(officer=officer, year=2016, percentile_trr=Decimal('12.3456'))
+        CacheDataRunFactory(started_at=timezone.now())
+
+        indexer = OfficersIndexer(updated_keys=[11])
+        incremental_rows = [indexer.extract_datum(obj) for obj in indexer.get_queryset()]
+
+        expect(incremental_rows[0]['percentiles']).to.eq([{'id': 11, 'year': 2016, 'percentile_trr': '12.3456'}])
+        expect(build_cached_yearly_percentiles_mock).not_to.be.called()
+        expect(build_coaccusal_matrix_mock).not_to.be.called()
@@ -10,6 +10,7 @@ from robber import expect
 from data.factories import (
     OfficerFactory, OfficerAllegationFactory, PoliceUnitFactory, OfficerHistoryFactory, SalaryFactory,
     AwardFactory)
+from data.models import OfficerTimeline
 from officers.queries import OfficerTimelineQuery
 from trr.factories import TRRFactory
 
@@ -327,7 +328,21 @@ class OfficerTimelineQueryTestCase(TestCase):
             {'id': 11, 'date_sort': date(2001, 1, 2), 'priority_sort': 50},
         ]
     )
-    def test_execute(self, _trr, _award, _join, _rank, _unit, _cr):
-        sorted_timeline = OfficerTimelineQuery(None).execute()
+    def test_build(self, _trr, _award, _join, _rank, _unit, _cr):
+        sorted_timeline = OfficerTimelineQuery(None).build()
         sorted_timeline_ids = [item['id'] for item in sorted_timeline]
         expect(sorted_timeline_ids).to.eq([11, 9, 2, 6, 4, 10, 8, 5, 3, 1, 7])
+
+    def test_execute(self):
+        officer = OfficerFactory()
+        OfficerTimeline.objects.create(officer=officer, items=[{'kind': 'JOINED'}], mobile_items=[{'kind': 'JOINED'}])
+
+        with patch('officers.queries.OfficerTimelineQuery.build') as build_mock:
+            expect(OfficerTimelineQuery(officer).execute()).to.eq([{'kind': 'JOINED'}])
+        expect(build_mock).not_to.be.called()
+
+    def test_execute_without_materialized_timeline(self):
+        officer = OfficerFactory()
+
+        with patch('officers.queries.OfficerTimelineQuery.build', return_value=[{'kind': 'JOINED'}]):
+            expect(OfficerTimelineQuery(officer).execute()).to.eq([{'kind': 'JOINED'}])
@@ -19,7 +19,7 @@ from data.factories import (
 )
 from trr.factories import TRRFactory
 from data import cache_managers
-from data.cache_managers import officer_cache_manager, allegation_cache_manager
+from data.cache_managers import officer_cache_manager, allegation_cache_manager, coaccusal_cache_manager
 from data.models import OfficerYearlyPercentile
 
 
@@ -588,6 +588,7 @@ class OfficersMobileViewSetTestCase(OfficerSummaryTestCaseMixin, APITestCase):
             'coaccusal_count': 1,
             'rank': 'Detective',
         }]
+        coaccusal_cache_manager.cache_data()
         response = self.client.get(reverse('api-v2:officers-mobile-coaccusals', kwargs={'pk': officer1.id}))
         expect(response.status_code).to.eq(status.HTTP_200_OK)
         expect(response.data).to.eq(expected_response_data)
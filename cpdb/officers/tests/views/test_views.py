@@ -26,7 +26,7 @@ from trr.factories import TRRFactory
 from officers.tests.mixins import OfficerSummaryTestCaseMixin
 from analytics.models import AttachmentTracking
 from analytics import constants
-from data.cache_managers import officer_cache_manager, allegation_cache_manager
+from data.cache_managers import officer_cache_manager, allegation_cache_manager, coaccusal_cache_manager
 from data import cache_managers
 
 
@@ -592,6 +592,7 @@ class OfficersViewSetTestCase(OfficerSummaryTestCaseMixin, APITestCase):
             'coaccusal_count': 1,
             'rank': 'Police Officer',
         }]
+        coaccusal_cache_manager.cache_data()
         response = self.client.get(reverse('api-v2:officers-coaccusals', kwargs={'pk': officer1.id}))
         expect(response.status_code).to.eq(status.HTTP_200_OK)
         expect(response.data).to.eq(expected_response_data)
@@ -664,6 +665,7 @@ class OfficersViewSetTestCase(OfficerSummaryTestCaseMixin, APITestCase):
         coaccused = OfficerFactory(id=333)
         OfficerAllegationFactory(officer=officer, allegation=allegation)
         OfficerAllegationFactory(officer=coaccused, allegation=allegation)
+        coaccusal_cache_manager.cache_data()
 
         response = self.client.get(reverse('api-v2:officers-coaccusals', kwargs={'pk': 123}))
         expect(response.status_code).to.eq(status.HTTP_200_OK)
@@ -1,4 +1,3 @@
-from django.db.models import Case, When
 from django.shortcuts import get_object_or_404
 
 from rest_framework import viewsets, status
@@ -6,6 +5,7 @@ from rest_framework.decorators import action
 from rest_framework.response import Response
 
 from data.models import Officer, OfficerAlias
+from data.utils.hydration import in_order
 from analytics.models import AttachmentTracking
 from officers.queries import OfficerTimelineQuery, OfficerTimelineMobileQuery
 from officers.serializers.response_mobile_serializers import (
@@ -83,8 +83,7 @@ class OfficersDesktopViewSet(OfficerBaseViewSet):
             except ValueError:
                 invalid_officer_ids.append(officer_id)
 
-        preserved = Case(*[When(pk=pk, then=pos) for pos, pk in enumerate(officer_ids)])
-        officers = Officer.objects.filter(id__in=officer_ids).order_by(preserved)
+        officers = in_order(Officer.objects.all(), officer_ids)
 
         invalid_officer_ids = invalid_officer_ids + list(set(officer_ids) - {o.id for o in officers})
 
@@ -157,8 +156,7 @@ class OfficersMobileViewSet(OfficerBaseViewSet):
             except ValueError:
                 invalid_officer_ids.append(officer_id)
 
-        preserved = Case(*[When(pk=pk, then=pos) for pos, pk in enumerate(officer_ids)])
-        officers = Officer.objects.filter(id__in=officer_ids).order_by(preserved)
+        officers = in_order(Officer.objects.all(), officer_ids)
 
         invalid_officer_ids = invalid_officer_ids + list(set(officer_ids) - {o.id for o in officers})
 
@@ -0,0 +1,30 @@
+# Generated by Django 2.2.10 on 2020-04-24 10:12
+
+import django.contrib.postgres.fields.jsonb
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pinboard', '0009_pinboard_source_pinboard_related_name'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PinboardRelevance',
+            fields=[
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('pinboard', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='+', serialize=False, to='pinboard.Pinboard')),
+                ('version', models.CharField(max_length=64)),
+                ('coaccusals', django.contrib.postgres.fields.jsonb.JSONField(null=True)),
+                ('crids', django.contrib.postgres.fields.jsonb.JSONField(null=True)),
+                ('document_ids', django.contrib.postgres.fields.jsonb.JSONField(null=True)),
+            ],
+            options={
+                'abstract': False,
+            },
+        ),
+    ]
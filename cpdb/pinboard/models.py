@@ -1,14 +1,20 @@
+import hashlib
+import json
+from collections import Counter
 from random import sample
 
 from django.contrib.gis.db import models
-from django.db.models import Q, Count, Prefetch, Value, IntegerField, F
+from django.contrib.postgres.fields import JSONField
+from django.db.models import Q, Count, Prefetch, F
 
 from sortedm2m.fields import SortedManyToManyField
 
 from data.constants import MEDIA_TYPE_DOCUMENT
 from data.models import Officer, AttachmentFile, OfficerAllegation, Allegation
 from data.models.common import TimeStampsModel
+from data.utils.hydration import RankedObjects
 from pinboard.fields import HexField
+from pinboard.relevance import relevant_ids
 
 
 class AllegationManager(models.Manager):
@@ -88,6 +94,15 @@ class Pinboard(TimeStampsModel):
     def trr_ids(self):
         return self.trrs.values_list('id', flat=True)
 
+    @property
+    def content_digest(self):
+        content = {
+            'officer_ids': sorted(self.officer_ids),
+            'crids': sorted(self.crids),
+            'trr_ids': sorted(self.trr_ids),
+        }
+        return hashlib.sha1(json.dumps(content).encode()).hexdigest()
+
     def relevant_documents_query(self, **kwargs):
         return AttachmentFile.showing.filter(
             file_type=MEDIA_TYPE_DOCUMENT,
@@ -108,99 +123,76 @@ class Pinboard(TimeStampsModel):
             )
         )
 
-    @property
-    def relevant_documents(self):
+    def relevant_document_ids(self):
         officer_ids = self.officers.all().values_list('id', flat=True)
         crids = self.allegations.all().values_list('crid', flat=True)
-        via_allegation = self.relevant_documents_query(allegation__in=crids)
-        via_officer = self.relevant_documents_query(allegation__officerallegation__officer__in=officer_ids)
+        documents = AttachmentFile.showing.filter(file_type=MEDIA_TYPE_DOCUMENT)
+        via_allegation = documents.filter(allegation__in=crids)
+        via_officer = documents.filter(allegation__officerallegation__officer__in=officer_ids)
 
-        return via_allegation.union(
-            via_officer,
-        ).distinct().order_by('-allegation__incident_date')
+        query = via_allegation.values_list('id', 'allegation__incident_date').union(
+            via_officer.values_list('id', 'allegation__incident_date')
+        ).order_by('-allegation__incident_date', 'id')
+        return [document_id for document_id, _ in query]
 
     @property
-    def relevant_coaccusals(self):
+    def relevant_documents(self):
+        return RankedObjects(self.relevant_documents_query(), relevant_ids(self, 'document_ids'))
+
+    def relevant_coaccusal_counts(self):
+        """
+        :return: [officer id, coaccusal count] pairs of the officers related to the pinned items, ranked by
+        coaccusal count
+        """
         officer_ids = self.officers.all().values_list('id', flat=True)
         crids = self.allegations.all().values_list('crid', flat=True)
         trr_officer_ids = self.trrs.all().values_list('officer_id', flat=True).distinct()
 
-        columns = [
-            'id',
-            'rank',
-            'first_name',
-            'last_name',
-            'appointed_date',
-            'resignation_date',
-            'current_badge',
-            'gender',
-            'birth_year',
-            'race',
-            'rank',
-            'trr_percentile',
-            'complaint_percentile',
-            'civilian_allegation_percentile',
-            'internal_allegation_percentile',
-            'allegation_count',
-            'sustained_count',
-            'discipline_count',
-            'trr_count',
-            'major_award_count',
-            'honorable_mention_count',
-            'honorable_mention_percentile',
-            'last_unit_id',
-            'civilian_compliment_count'
-        ]
-
-        related_renamed_columns = (
-            ('unit_id', 'last_unit__id'),
-            ('unit_name', 'last_unit__unit_name'),
-            ('unit_description', 'last_unit__description')
-        )
-
-        content_columns = columns + [col[1] for col in related_renamed_columns]
-        officer_qs = Officer.objects.annotate(**{
-            annotated_column: F(column) for annotated_column, column in related_renamed_columns
-        })
-
-        via_officer = officer_qs.filter(
+        via_officer = Officer.objects.filter(
             officerallegation__allegation__officerallegation__officer_id__in=officer_ids
-        ).exclude(id__in=officer_ids).only(*content_columns).annotate(
+        ).exclude(id__in=officer_ids).annotate(
             sub_coaccusal_count=Count('officerallegation', distinct=True)
-        )
+        ).values_list('id', 'sub_coaccusal_count')
 
-        via_allegation = officer_qs.filter(
+        via_allegation = Officer.objects.filter(
             officerallegation__allegation__in=crids
-        ).exclude(id__in=officer_ids).only(*content_columns).annotate(
+        ).exclude(id__in=officer_ids).annotate(
             sub_coaccusal_count=Count('officerallegation', distinct=True)
-        )
+        ).values_list('id', 'sub_coaccusal_count')
 
-        via_trr = officer_qs.filter(
+        via_trr = Officer.objects.filter(
             id__in=trr_officer_ids
-        ).exclude(id__in=officer_ids).only(*content_columns).annotate(
-            sub_coaccusal_count=Value(1, output_field=IntegerField())
-        )
-        sub_query = via_officer.union(via_allegation, all=True).union(via_trr, all=True)
+        ).exclude(id__in=officer_ids).values_list('id', flat=True)
+
+        coaccusal_counts = Counter()
+        for officer_id, sub_coaccusal_count in list(via_officer) + list(via_allegation):
+            coaccusal_counts[officer_id] += sub_coaccusal_count
+        for officer_id in via_trr:
+            coaccusal_counts[officer_id] += 1
 
-        select_columns = ', '.join(
-            [f'"{col}"' for col in columns] +
-            [f'"{col[0]}"' for col in related_renamed_columns]
+        return [
+            [officer_id, coaccusal_count]
+            for officer_id, coaccusal_count in sorted(coaccusal_counts.items(), key=lambda item: (-item[1], item[0]))
+        ]
+
+    @property
+    def relevant_coaccusals(self):
+        coaccusals = relevant_ids(self, 'coaccusals')
+        officer_qs = Officer.objects.annotate(
+            unit_id=F('last_unit__id'),
+            unit_name=F('last_unit__unit_name'),
+            unit_description=F('last_unit__description'),
+        )
+        return RankedObjects(
+            officer_qs,
+            [officer_id for officer_id, _ in coaccusals],
+            attributes={
+                officer_id: {'coaccusal_count': coaccusal_count} for officer_id, coaccusal_count in coaccusals
+            }
         )
 
-        raw_query = f'''
-            WITH cte AS ({sub_query.query})
-            SELECT {select_columns},
-                SUM("sub_coaccusal_count") "coaccusal_count"
-            FROM cte
-            GROUP BY {select_columns}
-            ORDER BY "coaccusal_count" DESC
-        '''
-        query = Officer.objects.raw(raw_query)
-        return query
-
-    def relevant_complaints_query(self, **kwargs):
-        crids = self.allegations.all().values_list('crid', flat=True)
-        return Allegation.objects.filter(**kwargs).exclude(crid__in=crids).only(
+    def relevant_complaints_query(self):
+        return Allegation.objects.only(
             'crid',
             'incident_date',
             'most_common_category',
@@ -224,40 +216,31 @@ class Pinboard(TimeStampsModel):
             'victims'
         )
 
-    def relevant_complaints_count_query(self, **kwargs):
+    def relevant_complaint_ids_query(self, **kwargs):
         crids = self.allegations.all().values_list('crid', flat=True)
-        return Allegation.objects.filter(**kwargs).exclude(crid__in=crids).only('crid')
+        return Allegation.objects.filter(**kwargs).exclude(crid__in=crids).values_list('crid', 'incident_date')
 
-    @property
-    def relevant_complaints_count(self):
+    def relevant_complaint_crids(self):
+        """
+        :return: crids of the relevant complaints, sorted by incident date, newest first
+        """
         officer_ids = self.officers.all().values_list('id', flat=True)
-        via_officer = self.relevant_complaints_count_query(
+        via_officer = self.relevant_complaint_ids_query(
             officerallegation__officer__in=officer_ids
         )
-        via_investigator = self.relevant_complaints_count_query(
+        via_investigator = self.relevant_complaint_ids_query(
             investigatorallegation__investigator__officer__in=officer_ids
         )
-        via_police_witness = self.relevant_complaints_count_query(
+        via_police_witness = self.relevant_complaint_ids_query(
             police_witnesses__in=officer_ids
         )
-        return via_officer.union(via_investigator, via_police_witness).distinct().count
+        query = via_officer.union(via_investigator, via_police_witness).order_by('-incident_date', 'crid')
+        return [crid for crid, _ in query]
 
     @property
     def relevant_complaints(self):
-        officer_ids = self.officers.all().values_list('id', flat=True)
-        via_officer = self.relevant_complaints_query(
-            officerallegation__officer__in=officer_ids
-        )
-        via_investigator = self.relevant_complaints_query(
-            investigatorallegation__investigator__officer__in=officer_ids
-        )
-        via_police_witness = self.relevant_complaints_query(
-            police_witnesses__in=officer_ids
-        )
-        query = via_officer.union(via_investigator, via_police_witness).distinct().order_by('-incident_date')
-        # LimitOffsetPagination need count and we optimize it with a more simple query
-        setattr(query, 'count', self.relevant_complaints_count)
-        return query
+        # Pagination counts and slices the stored crids, only the page is fetched with its prefetches
+        return RankedObjects(self.relevant_complaints_query(), relevant_ids(self, 'crids'))
 
 
 class ExamplePinboard(TimeStampsModel):
@@ -269,3 +252,16 @@ class ExamplePinboard(TimeStampsModel):
     @classmethod
     def random(cls, n):
         return sample(list(cls.objects.all()), min(cls.objects.count(), n))
+
+
+class PinboardRelevance(TimeStampsModel):
+    """
+    Ranked ids of the relevant coaccusals, complaints and documents of a pinboard, computed for one version of its
+    content and of the data.
+    """
+    pinboard = models.OneToOneField(Pinboard, primary_key=True, on_delete=models.CASCADE, related_name='+')
+    version = models.CharField(max_length=64)
+    # Ranked ids are null until they are computed for the version
+    coaccusals = JSONField(null=True)
+    crids = JSONField(null=True)
+    document_ids = JSONField(null=True)
@@ -0,0 +1,105 @@
+import logging
+import queue
+import threading
+
+from django.apps import apps
+from django.conf import settings
+from django.db import connections, transaction
+
+logger = logging.getLogger(__name__)
+
+# Ranked id fields of PinboardRelevance and the Pinboard methods computing them
+RANKED_IDS = {
+    'coaccusals': 'relevant_coaccusal_counts',
+    'crids': 'relevant_complaint_crids',
+    'document_ids': 'relevant_document_ids',
+}
+
+
+def relevance_version(pinboard):
+    data_version = apps.get_model('data', 'CacheDataRun').data_version()
+    return f'{pinboard.content_digest}:{data_version}'
+
+
+def current_relevance(pinboard):
+    """
+    Stored relevance of the pinboard's current content and data. A stale one is reset to a version without any
+    ranked ids, which are computed when they are first read.
+    """
+    version = relevance_version(pinboard)
+    PinboardRelevance = apps.get_model('pinboard', 'PinboardRelevance')
+    relevance = PinboardRelevance.objects.filter(pinboard_id=pinboard.id, version=version).first()
+    if relevance is None:
+        relevance, _ = PinboardRelevance.objects.update_or_create(
+            pinboard_id=pinboard.id,
+            defaults={'version': version, **{name: None for name in RANKED_IDS}}
+        )
+    return relevance
+
+
+def relevant_ids(pinboard, name):
+    """
+    Ranked ids `name` of the pinboard's current version, computed with one query and stored if it is missing.
+    """
+    relevance = current_relevance(pinboard)
+    ids = getattr(relevance, name)
+    if ids is None:
+        ids = getattr(pinboard, RANKED_IDS[name])()
+        # Leave a relevance reset by a newer version meanwhile alone
+        apps.get_model('pinboard', 'PinboardRelevance').objects.filter(
+            pinboard_id=pinboard.id, version=relevance.version
+        ).update(**{name: ids})
+    return ids
+
+
+def refresh_relevance(pinboard):
+    for name in RANKED_IDS:
+        relevant_ids(pinboard, name)
+
+
+class RelevanceRefresher(object):
+    """
+    Recompute the relevance of edited pinboards in a background thread, so that editing a pinboard does not wait
+    for it and paging through its relevant results afterward only slices the stored id lists.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._queue = queue.Queue()
+        self._pending = set()
+        self._worker = None
+
+    def schedule(self, pinboard_id):
+        if not settings.PINBOARD_RELEVANCE_ASYNC_REFRESH:
+            return
+        # The worker reads the pinboard with its own connection, so it waits for the edit to be committed
+        transaction.on_commit(lambda: self._enqueue(pinboard_id))
+
+    def _enqueue(self, pinboard_id):
+        with self._lock:
+            if pinboard_id in self._pending:
+                return
+            self._pending.add(pinboard_id)
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(target=self._refresh_forever, daemon=True)
+                self._worker.start()
+        self._queue.put(pinboard_id)
+
+    def _refresh_forever(self):
+        while True:
+            try:
+                self.refresh(self._queue.get())
+            finally:
+                connections.close_all()
+
+    def refresh(self, pinboard_id):
+        with self._lock:
+            self._pending.discard(pinboard_id)
+        try:
+            pinboard = apps.get_model('pinboard', 'Pinboard').objects.filter(id=pinboard_id).first()
+            if pinboard is not None:
+                refresh_relevance(pinboard)
+        except Exception:
+            logger.exception(f'Could not refresh relevance of pinboard {pinboard_id}')
+
+
+relevance_refresher = RelevanceRefresher()
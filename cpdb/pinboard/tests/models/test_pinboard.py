@@ -9,8 +9,10 @@ from data.factories import (
     AllegationFactory, OfficerFactory, OfficerAllegationFactory, InvestigatorAllegationFactory,
     PoliceWitnessFactory,
     AttachmentFileFactory,
+    CacheDataRunFactory,
 )
 from pinboard.factories import PinboardFactory, ExamplePinboardFactory
+from pinboard.models import PinboardRelevance
 from trr.factories import TRRFactory
 
 
@@ -235,6 +237,74 @@ class PinboardTestCase(TestCase):
         pinboard.trrs.set([pinned_trr_1, pinned_trr_2])
         expect(list(pinboard.trr_ids)).to.eq([1, 2])
 
+    def test_content_digest(self):
+        officer_1 = OfficerFactory(id=1)
+        officer_2 = OfficerFactory(id=2)
+        allegation = AllegationFactory(crid='123')
+        pinboard_1 = PinboardFactory(officers=[officer_1, officer_2], allegations=[allegation])
+        pinboard_2 = PinboardFactory(officers=[officer_2, officer_1], allegations=[allegation])
+        pinboard_3 = PinboardFactory(officers=[officer_1])
+
+        expect(pinboard_1.content_digest).to.eq(pinboard_2.content_digest)
+        expect(pinboard_1.content_digest).not_to.eq(pinboard_3.content_digest)
+
+    def test_relevant_coaccusal_counts(self):
+        pinned_officer = OfficerFactory(id=1)
+        pinned_allegation = AllegationFactory(crid='1')
+        pinboard = PinboardFactory(officers=[pinned_officer], allegations=[pinned_allegation])
+        allegation = AllegationFactory(crid='11')
+        officer_13 = OfficerFactory(id=13)
+        OfficerAllegationFactory(allegation=allegation, officer=pinned_officer)
+        OfficerAllegationFactory(allegation=allegation, officer=OfficerFactory(id=11))
+        OfficerAllegationFactory(allegation=pinned_allegation, officer=OfficerFactory(id=12))
+        OfficerAllegationFactory(allegation=pinned_allegation, officer=officer_13)
+        pinboard.trrs.set([TRRFactory(officer=officer_13)])
+
+        expect(pinboard.relevant_coaccusal_counts()).to.eq([[13, 2], [11, 1], [12, 1]])
+
+    def test_relevant_results_are_stored_per_version(self):
+        pinned_officer = OfficerFactory(id=1)
+        pinboard = PinboardFactory(officers=[pinned_officer])
+        allegation_1 = AllegationFactory(crid='1', incident_date=datetime(2002, 2, 21, tzinfo=pytz.utc))
+        OfficerAllegationFactory(officer=pinned_officer, allegation=allegation_1)
+        AttachmentFileFactory(id=1, file_type='document', allegation=allegation_1, show=True)
+
+        expect([allegation.crid for allegation in pinboard.relevant_complaints]).to.eq(['1'])
+        expect([document.id for document in pinboard.relevant_documents]).to.eq([1])
+        expect(PinboardRelevance.objects.get(pinboard=pinboard).crids).to.eq(['1'])
+
+        allegation_2 = AllegationFactory(crid='2', incident_date=datetime(2002, 2, 22, tzinfo=pytz.utc))
+        OfficerAllegationFactory(officer=pinned_officer, allegation=allegation_2)
+        AttachmentFileFactory(id=2, file_type='document', allegation=allegation_2, show=True)
+
+        expect([allegation.crid for allegation in pinboard.relevant_complaints]).to.eq(['1'])
+        expect([document.id for document in pinboard.relevant_documents]).to.eq([1])
+
+        CacheDataRunFactory()
+
+        expect([allegation.crid for allegation in pinboard.relevant_complaints]).to.eq(['2', '1'])
+        expect([document.id for document in pinboard.relevant_documents]).to.eq([2, 1])
+
+        pinboard.allegations.set([allegation_2])
+
+        expect([allegation.crid for allegation in pinboard.relevant_complaints]).to.eq(['1'])
+        expect(PinboardRelevance.objects.count()).to.eq(1)
+
+    def test_relevant_complaints_count_and_page_queries(self):
+        pinned_officer = OfficerFactory(id=1)
+        pinboard = PinboardFactory(officers=[pinned_officer])
+        for crid in range(1, 6):
+            allegation = AllegationFactory(crid=str(crid), incident_date=datetime(2002, 2, crid, tzinfo=pytz.utc))
+            OfficerAllegationFactory(officer=pinned_officer, allegation=allegation)
+
+        relevant_complaints = pinboard.relevant_complaints
+        with self.assertNumQueries(0):
+            expect(relevant_complaints.count()).to.eq(5)
+        # Page, its officer allegations and victims
+        with self.assertNumQueries(3):
+            page = relevant_complaints[3:5]
+        expect([allegation.crid for allegation in page]).to.eq(['2', '1'])
+
     def test_relevant_coaccusals(self):
         pinned_officer_1 = OfficerFactory(id=1)
         pinned_officer_2 = OfficerFactory(id=2)
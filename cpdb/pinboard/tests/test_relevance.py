@@ -0,0 +1,112 @@
+from django.test import TestCase, override_settings
+
+from mock import patch, Mock
+from robber import expect
+
+from data.factories import OfficerFactory, AllegationFactory, OfficerAllegationFactory, CacheDataRunFactory
+from pinboard.factories import PinboardFactory
+from pinboard.models import PinboardRelevance
+from pinboard.relevance import (
+    relevance_version, current_relevance, relevant_ids, refresh_relevance, RelevanceRefresher
+)
+
+
+class RelevanceTestCase(TestCase):
+    def test_relevance_version(self):
+        pinboard = PinboardFactory(officers=[OfficerFactory()])
+        version = relevance_version(pinboard)
+
+        expect(version).to.eq(f'{pinboard.content_digest}:0')
+
+        cache_data_run = CacheDataRunFactory()
+
+        expect(relevance_version(pinboard)).to.eq(f'{pinboard.content_digest}:{cache_data_run.id}')
+
+    def test_current_relevance(self):
+        pinboard = PinboardFactory(officers=[OfficerFactory()])
+
+        relevance = current_relevance(pinboard)
+
+        expect(relevance.version).to.eq(relevance_version(pinboard))
+        expect(relevance.coaccusals).to.be.none()
+        expect(relevance.crids).to.be.none()
+        expect(relevance.document_ids).to.be.none()
+
+    def test_current_relevance_reset_stale_version(self):
+        pinboard = PinboardFactory(officers=[OfficerFactory()])
+        PinboardRelevance.objects.create(pinboard=pinboard, version='old', coaccusals=[], crids=['1'], document_ids=[])
+
+        relevance = current_relevance(pinboard)
+
+        expect(PinboardRelevance.objects.count()).to.eq(1)
+        expect(relevance.version).to.eq(relevance_version(pinboard))
+        expect(relevance.crids).to.be.none()
+
+    def test_relevant_ids(self):
+        officer = OfficerFactory(id=1)
+        pinboard = PinboardFactory(officers=[officer])
+        allegation = AllegationFactory(crid='1')
+        OfficerAllegationFactory(officer=officer, allegation=allegation)
+        OfficerAllegationFactory(officer=OfficerFactory(id=2), allegation=allegation)
+
+        expect(relevant_ids(pinboard, 'crids')).to.eq(['1'])
+
+        relevance = PinboardRelevance.objects.get(pinboard=pinboard)
+        expect(relevance.crids).to.eq(['1'])
+        expect(relevance.coaccusals).to.be.none()
+
+        with patch.object(pinboard, 'relevant_complaint_crids') as relevant_complaint_crids:
+            expect(relevant_ids(pinboard, 'crids')).to.eq(['1'])
+            expect(relevant_complaint_crids).not_to.be.called()
+
+    def test_refresh_relevance(self):
+        officer = OfficerFactory(id=1)
+        pinboard = PinboardFactory(officers=[officer])
+        allegation = AllegationFactory(crid='1')
+        OfficerAllegationFactory(officer=officer, allegation=allegation)
+        OfficerAllegationFactory(officer=OfficerFactory(id=2), allegation=allegation)
+
+        refresh_relevance(pinboard)
+
+        relevance = PinboardRelevance.objects.get(pinboard=pinboard)
+        expect(relevance.coaccusals).to.eq([[2, 1]])
+        expect(relevance.crids).to.eq(['1'])
+        expect(relevance.document_ids).to.eq([])
+
+
+class RelevanceRefresherTestCase(TestCase):
+    def test_schedule_without_async_refresh(self):
+        refresher = RelevanceRefresher()
+        with patch('pinboard.relevance.transaction.on_commit') as on_commit:
+            refresher.schedule('abcd1234')
+        expect(on_commit).not_to.be.called()
+
+    @override_settings(PINBOARD_RELEVANCE_ASYNC_REFRESH=True)
+    @patch('pinboard.relevance.transaction.on_commit', side_effect=lambda func: func())
+    @patch('pinboard.relevance.threading.Thread')
+    def test_schedule(self, thread_class, _):
+        thread_class.return_value = Mock(is_alive=Mock(return_value=True))
+        refresher = RelevanceRefresher()
+
+        refresher.schedule('abcd1234')
+        refresher.schedule('abcd1234')
+        refresher.schedule('1234abcd')
+
+        expect(thread_class).to.be.called_once()
+        expect(thread_class.return_value.start).to.be.called_once()
+        expect(refresher._queue.qsize()).to.eq(2)
+        expect(refresher._queue.get()).to.eq('abcd1234')
+        expect(refresher._queue.get()).to.eq('1234abcd')
+
+    def test_refresh(self):
+        pinboard = PinboardFactory(officers=[OfficerFactory()])
+        refresher = RelevanceRefresher()
+        refresher._pending.add(pinboard.id)
+
+        refresher.refresh(pinboard.id)
+        refresher.refresh('notexist')
+
+        relevance = PinboardRelevance.objects.get(pinboard=pinboard)
+        expect(relevance.version).to.eq(relevance_version(pinboard))
+        expect(relevance.crids).to.eq([])
+        expect(refresher._pending).to.be.empty()
@@ -573,6 +573,27 @@ class PinboardDesktopViewSetTestCase(APITestCase):
         expect(set(duplicated_pinboard.crids)).to.eq({'1111'})
         expect(set(duplicated_pinboard.trr_ids)).to.eq({3, 4})
 
+    @patch('pinboard.views.relevance_refresher')
+    def test_create_and_update_pinboard_schedule_relevance_refresh(self, relevance_refresher):
+        OfficerFactory(id=1)
+        AllegationFactory(crid='123abc')
+
+        response = self.client.post(
+            reverse('api-v2:pinboards-list'),
+            json.dumps({'title': 'My Pinboard', 'officer_ids': [1], 'crids': [], 'trr_ids': []}),
+            content_type='application/json'
+        )
+        pinboard_id = response.data['id']
+        relevance_refresher.schedule.assert_called_once_with(pinboard_id)
+
+        self.client.put(
+            reverse('api-v2:pinboards-detail', kwargs={'pk': pinboard_id}),
+            json.dumps({'title': 'My Pinboard', 'officer_ids': [1], 'crids': ['123abc'], 'trr_ids': []}),
+            content_type='application/json'
+        )
+        expect(relevance_refresher.schedule.call_count).to.eq(2)
+        relevance_refresher.schedule.assert_called_with(pinboard_id)
+
     def test_selected_complaints(self):
         category1 = AllegationCategoryFactory(
             category='Use Of Force',
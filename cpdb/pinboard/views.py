@@ -40,6 +40,7 @@ from pinboard.serializers.mobile.relevant import (
 )
 from trr.models import ActionResponse
 from .models import Pinboard, ProxyAllegation as Allegation
+from .relevance import relevance_refresher
 
 
 @method_decorator(never_cache, name='dispatch')
@@ -66,6 +67,7 @@ class PinboardViewSet(
         source_pinboard = self._source_pinboard
         if source_pinboard:
             pinboard = source_pinboard.clone()
+            relevance_refresher.schedule(pinboard.id)
             self.update_owned_pinboards(request, pinboard.id)
             self.update_latest_retrieved_pinboard(request, pinboard.id)
             return Response(OrderedPinboardSerializer(pinboard).data)
@@ -85,6 +87,7 @@ class PinboardViewSet(
                 pinboard_serializer = PinboardDetailSerializer(pinboard, data=data)
                 pinboard_serializer.is_valid(raise_exception=True)
                 pinboard_serializer.save()
+                relevance_refresher.schedule(pinboard.id)
                 return Response(pinboard_serializer.data)
             else:
                 return super().update(request, pk)
@@ -101,11 +104,20 @@ class PinboardViewSet(
 
         if pinboard.id not in owned_pinboards:
             pinboard = pinboard.clone()
+            relevance_refresher.schedule(pinboard.id)
             self.update_owned_pinboards(request, pinboard.id)
         self.update_latest_retrieved_pinboard(request, pinboard.id)
 
         return Response(OrderedPinboardSerializer(pinboard).data)
 
+    def perform_create(self, serializer):
+        super().perform_create(serializer)
+        relevance_refresher.schedule(serializer.instance.id)
+
+    def perform_update(self, serializer):
+        super().perform_update(serializer)
+        relevance_refresher.schedule(serializer.instance.id)
+
     def update_owned_pinboards(self, request, pinboard_id):
         owned_pinboards = request.session.get('owned_pinboards', [])
         owned_pinboards.append(pinboard_id)
@@ -1,4 +1,6 @@
+import functools
 import re
+from datetime import datetime
 
 from dateparser.search import search_dates
 from dateparser import parse
@@ -13,6 +15,24 @@ DELIMITERS_PATTERN = r'[/\:\-\,\s\_\+\@]'
 COMPONENT_PATTERN = fr'({MONTHS_PATTERN}|{DIGITS_MODIFIER_PATTERN}|{DIGITS_PATTERN})\,?'
 DATE_PATTERN = f'^({COMPONENT_PATTERN})({DELIMITERS_PATTERN}({COMPONENT_PATTERN}))*$'
 SPLIT_DATE_TOKEN = 'SPLIT_DATE_TOKEN'
+DATE_CACHE_SIZE = 1024
+
+MONTHS = {
+    month: index % 12 + 1
+    for index, month in enumerate([
+        'january', 'february', 'march', 'april', 'may', 'june',
+        'july', 'august', 'september', 'october', 'november', 'december',
+        'jan', 'feb', 'mar', 'apr', 'may', 'jun', 'jul', 'aug', 'sep', 'oct', 'nov', 'dec',
+    ])
+}
+MONTHS['sept'] = 9
+MONTH_NAME_PATTERN = '|'.join(MONTHS.keys())
+DAY_PATTERN = r'(?P<day>\d{1,2})(?P<suffix>st|nd|rd|th)?'
+ISO_DATE_REGEX = re.compile(r'^(?P<year>[1-9]\d{3})[-/](?P<month>\d{1,2})[-/](?P<day>\d{1,2})$')
+US_DATE_REGEX = re.compile(r'^(?P<month>\d{1,2})/(?P<day>\d{1,2})/(?P<year>[1-9]\d{3})$')
+MONTH_DAY_YEAR_REGEX = re.compile(fr'^(?P<month>{MONTH_NAME_PATTERN}) {DAY_PATTERN} (?P<year>[1-9]\d{{3}})$')
+DAY_MONTH_YEAR_REGEX = re.compile(fr'^{DAY_PATTERN} (?P<month>{MONTH_NAME_PATTERN}) (?P<year>[1-9]\d{{3}})$')
+DIGITS_REGEX = re.compile(r'\d')
 
 
 def _remove_illegal_words(string):
@@ -36,9 +56,47 @@ def _search_first_date(string):
     return None, ''
 
 
-def find_dates_from_string(string):
-    string = _remove_illegal_words(string)
+def _ordinal_suffix(day):
+    if 10 <= day % 100 <= 20:
+        return 'th'
+    return {1: 'st', 2: 'nd', 3: 'rd'}.get(day % 10, 'th')
+
+
+def _match_date(match):
+    if match.groupdict().get('suffix') and match.group('suffix') != _ordinal_suffix(int(match.group('day'))):
+        return None
+
+    month = match.group('month')
+    month = MONTHS[month] if month in MONTHS else int(month)
+    try:
+        return datetime(int(match.group('year')), month, int(match.group('day')))
+    except ValueError:
+        return None
+
+
+def _fast_find_dates(string):
+    """
+    Decide the dates of a cleaned up search term without dateparser when the term is unambiguous.
+    :return: list of dates, or None when the term has to go through dateparser
+    """
+    if not DIGITS_REGEX.search(string):
+        # A complete date always has a numeric day or year
+        return []
+
+    segments = [segment.strip() for segment in string.split(SPLIT_DATE_TOKEN) if segment.strip()]
+    if len(segments) != 1:
+        return None
 
+    string = segments[0].replace(', ', ' ').replace(',', ' ')
+    for regex in [ISO_DATE_REGEX, US_DATE_REGEX, MONTH_DAY_YEAR_REGEX, DAY_MONTH_YEAR_REGEX]:
+        match = regex.match(string)
+        if match:
+            date = _match_date(match)
+            return [date] if date else None
+    return None
+
+
+def _search_dates(string):
     dates = []
     date, remaining = _search_first_date(string)
     if date:
@@ -50,3 +108,15 @@ def find_dates_from_string(string):
             dates.append(date)
 
     return dates
+
+
+@functools.lru_cache(maxsize=DATE_CACHE_SIZE)
+def _find_dates(string):
+    dates = _fast_find_dates(string)
+    if dates is None:
+        dates = _search_dates(string)
+    return tuple(dates)
+
+
+def find_dates_from_string(string):
+    return list(_find_dates(_remove_illegal_words(string)))
@@ -0,0 +1,77 @@
+from statistics import median
+from time import time
+
+from django.core.management.base import BaseCommand
+
+from search.workers import OfficerWorker
+
+
+class ScriptScoreOfficerWorker(OfficerWorker):
+    """
+    Officer search scored with painless scripts as it was before the weights were indexed, only kept to benchmark.
+    """
+    def query(self, term, **kwargs):
+        return self._searcher.query(
+            'function_score',
+            query={
+                'multi_match': {
+                    'query': term,
+                    'fields': self.fields
+                }
+            },
+            functions=[
+                {
+                    'filter': {'match': {'tags': term}},
+                    'script_score': {'script': '_score + 60000'}
+                },
+                {
+                    'filter': {'match': {'full_name': {'query': term, 'operator': 'and'}}},
+                    'script_score': {'script': '_score + 500'}
+                },
+                {
+                    'filter': {'match': {'full_name': term}},
+                    'script_score': {'script': '_score + doc[\'allegation_count\'].value * 3'}
+                }
+            ]
+        )
+
+
+class Command(BaseCommand):
+    help = 'Compare officer search latency with script scoring and with indexed weights on the same index'
+
+    default_terms = ['ja', 'jas', 'jason', 'jason van', 'mi', 'mich', 'michael smith', '12', '1234']
+
+    def add_arguments(self, parser):
+        parser.add_argument('terms', nargs='*')
+        parser.add_argument('--repeat', type=int, default=20)
+
+    def benchmark(self, worker, term, repeat):
+        took, elapsed = [], []
+        for _ in range(repeat):
+            start_time = time()
+            response = worker.search(term)
+            elapsed.append((time() - start_time) * 1000)
+            took.append(response.took)
+        return median(took), median(elapsed)
+
+    def handle(self, *args, **options):
+        terms = options['terms'] or self.default_terms
+        repeat = options['repeat']
+        workers = [('script score', ScriptScoreOfficerWorker()), ('indexed weight', OfficerWorker())]
+
+        for _, worker in workers:
+            # Warm up caches so the first worker is not penalized
+            for term in terms:
+                worker.search(term)
+
+        for name, worker in workers:
+            total_took, total_elapsed = 0, 0
+            for term in terms:
+                took, elapsed = self.benchmark(worker, term, repeat)
+                total_took += took
+                total_elapsed += elapsed
+                self.stdout.write(f'{name} - {term}: took {took}ms, round trip {elapsed:.1f}ms')
+            self.stdout.write(
+                f'{name}: median took {total_took / len(terms):.1f}ms, '
+                f'median round trip {total_elapsed / len(terms):.1f}ms on average'
+            )
@@ -1,5 +1,16 @@
-from es_index.pagination import ESQueryPagination
+from es_index.pagination import ESQueryPagination, ESQueryCursorPagination
 
 
 class SearchQueryPagination(ESQueryPagination):
     default_limit = 30
+
+    def paginate_search(self, search_manager, term, content_type, request):
+        self.limit = self.get_limit(request)
+        self.offset = self.get_offset(request)
+        self.request = request
+        self.count, results = search_manager.single_search(term, content_type, self.offset, self.limit)
+        return results
+
+
+class SearchQueryCursorPagination(ESQueryCursorPagination):
+    default_limit = 30
@@ -0,0 +1,68 @@
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import cache
+
+from es_index.index_version import index_version
+
+CACHE_KEY_PREFIX = 'search'
+
+# Search managers are built per request, the in-process LRU has to outlive them to ever be hit.
+# Keys hold the namespace so every SearchResultCache of the process can share it.
+_local_cache = OrderedDict()
+_local_cache_lock = threading.Lock()
+
+
+def normalize_term(term):
+    return ' '.join(term.lower().split())
+
+
+def clear_local_cache():
+    with _local_cache_lock:
+        _local_cache.clear()
+
+
+class SearchResultCache(object):
+    """
+    Search results kept in the shared cache behind a small in-process LRU. Every key holds the index version
+    so that swapping an alias or updating it in place drops all cached results.
+    """
+    def __init__(self, namespace):
+        self.namespace = namespace
+
+    def key(self, action_name, term, **params):
+        key_content = {
+            'namespace': self.namespace,
+            'action': action_name,
+            'term': normalize_term(term),
+            'params': sorted(params.items()),
+            'index_version': index_version(),
+        }
+        digest = hashlib.sha1(json.dumps(key_content).encode()).hexdigest()
+        return f'{CACHE_KEY_PREFIX}:{digest}'
+
+    def get_or_compute(self, key, compute):
+        with _local_cache_lock:
+            if key in _local_cache:
+                _local_cache.move_to_end(key)
+                return _local_cache[key]
+
+        value = cache.get(key)
+        if value is None:
+            value = compute()
+            cache.set(key, value, settings.SEARCH_RESULT_CACHE_TIMEOUT)
+        self._set_local(key, value)
+        return value
+
+    def _set_local(self, key, value):
+        local_cache_size = settings.SEARCH_RESULT_LOCAL_CACHE_SIZE
+        if local_cache_size <= 0:
+            return
+        with _local_cache_lock:
+            _local_cache[key] = value
+            _local_cache.move_to_end(key)
+            while len(_local_cache) > local_cache_size:
+                _local_cache.popitem(last=False)
@@ -1,3 +1,7 @@
+import logging
+
+from elasticsearch_dsl import MultiSearch
+
 from search.date_util import find_dates_from_string
 from search.workers import (
     DateWorker,
@@ -7,7 +11,9 @@ from search.workers import (
     NeighborhoodsWorker
 )
 from .formatters import SimpleFormatter
+from .result_cache import SearchResultCache
 
+logger = logging.getLogger(__name__)
 
 DEFAULT_SEARCH_WORKERS = {
     'OFFICER': OfficerWorker(),
@@ -17,28 +23,82 @@ DEFAULT_SEARCH_WORKERS = {
 }
 
 
+def multi_search(searches):
+    """
+    Execute searches in a single _msearch round trip.
+    :param searches: dict of key: elasticsearch_dsl Search
+    :return: dict of key: elasticsearch_dsl Response, or None for searches which failed
+    """
+    if not searches:
+        return {}
+
+    keys = list(searches.keys())
+    multi_search_request = MultiSearch()
+    for key in keys:
+        multi_search_request = multi_search_request.add(searches[key])
+
+    results = dict(zip(keys, multi_search_request.execute(raise_on_error=False)))
+    for key, result in results.items():
+        if result is None:
+            logger.warning(f'Search for {key} failed')
+    return results
+
+
 class SearchManager(object):
     def __init__(self, formatters=None, workers=None, hooks=None):
         self.formatters = formatters or {}
         self.workers = workers or DEFAULT_SEARCH_WORKERS
         self.hooks = hooks or []
+        self.result_cache = SearchResultCache(namespace=self._cache_namespace())
+
+    def _cache_namespace(self):
+        return sorted(
+            (content_type, worker.__class__.__name__, self._formatter_for(content_type).__name__)
+            for content_type, worker in self.workers.items()
+        )
 
     def search(self, term, content_type=None, limit=10):
+        key = self.result_cache.key('search', term, content_type=content_type, limit=limit)
+        response = self.result_cache.get_or_compute(key, lambda: self._search(term, content_type, limit))
+
+        for hook in self.hooks:
+            hook.execute(term, content_type, response)
+
+        return response
+
+    def _search(self, term, content_type, limit):
         response = {}
 
         _workers = {content_type: self.workers[content_type]} if content_type else self.workers
         search_with_dates = any([isinstance(worker, DateWorker) for worker in _workers.values()])
         dates = [date.strftime('%Y-%m-%d') for date in find_dates_from_string(term)] if search_with_dates else []
 
-        for _content_type, worker in _workers.items():
-            search_results = worker.search(term, size=limit, dates=dates)
-            response[_content_type] = self._formatter_for(_content_type)().format(search_results)
-
-        for hook in self.hooks:
-            hook.execute(term, content_type, response)
+        search_results = multi_search({
+            _content_type: worker.search_query(term, size=limit, dates=dates)
+            for _content_type, worker in _workers.items()
+        })
+        for _content_type in _workers.keys():
+            results = search_results[_content_type]
+            formatter = self._formatter_for(_content_type)()
+            response[_content_type] = formatter.format(results) if results is not None else []
 
         return response
 
+    def single_search(self, term, content_type, offset, limit):
+        """
+        :return: total count of hits and formatted results of one page of a single content type
+        """
+        key = self.result_cache.key('single_search', term, content_type=content_type, offset=offset, limit=limit)
+        return self.result_cache.get_or_compute(key, lambda: self._single_search(term, content_type, offset, limit))
+
+    def _single_search(self, term, content_type, offset, limit):
+        query = self.get_search_query_for_type(term, content_type)
+        response = query[offset: offset + limit].execute()
+        count = response.hits.total
+        if count == 0 or offset > count:
+            return count, []
+        return count, self.get_formatted_results(list(response), content_type)
+
     def get_search_query_for_type(self, term, content_type):
         worker = self.workers[content_type]
         dates = [
@@ -0,0 +1,21 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import SimpleTestCase
+
+from mock import Mock, patch
+from robber import expect
+
+
+class BenchmarkOfficerSearchCommandTestCase(SimpleTestCase):
+    @patch('search.management.commands.benchmark_officer_search.OfficerWorker.search', return_value=Mock(took=3))
+    def test_handle(self, search_mock):
+        out = StringIO()
+
+        call_command('benchmark_officer_search', 'jason', 'mi', repeat=2, stdout=out)
+
+        expect(search_mock.call_count).to.eq(12)
+        output = out.getvalue()
+        expect(output).to.contain('script score - jason: took 3ms')
+        expect(output).to.contain('indexed weight - mi: took 3ms')
+        expect(output).to.contain('indexed weight: median took 3.0ms')
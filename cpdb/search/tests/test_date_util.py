@@ -2,12 +2,47 @@ from datetime import datetime
 
 from django.test import SimpleTestCase
 
+from mock import patch
 from robber import expect
 
-from search.date_util import find_dates_from_string
+from search.date_util import (
+    find_dates_from_string, _find_dates, _fast_find_dates, _search_dates, _remove_illegal_words
+)
+
+EQUIVALENCE_CORPUS = [
+    'jason',
+    'jason van dyke',
+    'jan',
+    'june',
+    'sept may',
+    '2018-06-01',
+    '2018/06/01',
+    '1 Jun 2018',
+    '1 June 2018',
+    '21st June 2018',
+    'June 1st 2018',
+    'June 2nd 2018',
+    'June 3rd 2018',
+    'June 4th 2018',
+    'June 11th 2018',
+    'June 22nd 2018',
+    'June 1, 2018',
+    'Sept 1, 2018',
+    'Sep 30 2018',
+    '06/01/2018',
+    '12/31/2018',
+    'Dec 1, 2018',
+    'December 2, 2018',
+    'ke 2001-01-01',
+    'jason 2001-01-01 smith',
+    'officer June 1, 2018',
+]
 
 
 class DateUtilTestCase(SimpleTestCase):
+    def setUp(self):
+        _find_dates.cache_clear()
+
     def test_find_dates_from_string_single_date(self):
         test_cases = {
             '2018-06-01': [datetime(2018, 6, 1)],
@@ -95,3 +130,36 @@ class DateUtilTestCase(SimpleTestCase):
         ]
         for incomplete_date_string in incomplete_date_strings:
             expect(find_dates_from_string(incomplete_date_string)).to.eq([])
+
+    def test_fast_find_dates_equivalence(self):
+        for string in EQUIVALENCE_CORPUS:
+            cleaned_string = _remove_illegal_words(string)
+            expect(_fast_find_dates(cleaned_string)).not_to.be.none()
+            expect(_fast_find_dates(cleaned_string)).to.eq(_search_dates(cleaned_string))
+
+    def test_fast_find_dates_ambiguous_terms(self):
+        ambiguous_strings = [
+            '6/1/18',
+            '13/01/2018',
+            '2000-2-30',
+            'June 1th 2018',
+            '2001-01-01 1223',
+            '2001 Jan 12 2014 Oct 1st',
+            '2001-01-01 de 2014 Jan 12',
+        ]
+        for string in ambiguous_strings:
+            expect(_fast_find_dates(_remove_illegal_words(string))).to.be.none()
+
+    @patch('search.date_util.search_dates')
+    def test_find_dates_from_string_skip_dateparser_for_non_date_terms(self, search_dates_mock):
+        expect(find_dates_from_string('jason van dyke')).to.eq([])
+        expect(find_dates_from_string('jason 2018-06-01')).to.eq([datetime(2018, 6, 1)])
+
+        expect(search_dates_mock).not_to.be.called()
+
+    def test_find_dates_from_string_cache(self):
+        with patch('search.date_util.search_dates', return_value=None) as search_dates_mock:
+            find_dates_from_string('2001 Jan 12')
+            find_dates_from_string('2001 jan  12')
+
+        expect(search_dates_mock).to.be.called_once()
@@ -0,0 +1,91 @@
+from django.core.cache import cache
+from django.test import SimpleTestCase, override_settings
+
+from mock import Mock
+from robber import expect
+
+from es_index.index_version import bump_index_version
+from search import result_cache as result_cache_module
+from search.result_cache import SearchResultCache, clear_local_cache, normalize_term
+
+LOCMEM_CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    }
+}
+
+
+class NormalizeTermTestCase(SimpleTestCase):
+    def test_normalize_term(self):
+        expect(normalize_term('  Jason   VAN dyke ')).to.eq('jason van dyke')
+
+
+@override_settings(CACHES=LOCMEM_CACHES, SEARCH_RESULT_LOCAL_CACHE_SIZE=2)
+class SearchResultCacheTestCase(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        clear_local_cache()
+
+    def test_key(self):
+        result_cache = SearchResultCache(namespace='v1')
+
+        key = result_cache.key('search', 'Jason ', content_type='OFFICER', limit=10)
+
+        expect(result_cache.key('search', 'jason', limit=10, content_type='OFFICER')).to.eq(key)
+        expect(result_cache.key('search', 'jason', content_type='OFFICER', limit=20)).to.ne(key)
+        expect(result_cache.key('single_search', 'jason', content_type='OFFICER', limit=10)).to.ne(key)
+        expect(SearchResultCache(namespace='v2').key('search', 'jason', content_type='OFFICER', limit=10)).to.ne(key)
+
+    def test_key_changes_with_index_version(self):
+        result_cache = SearchResultCache(namespace='v1')
+        key = result_cache.key('search', 'jason')
+
+        expect(result_cache.key('search', 'jason')).to.eq(key)
+        bump_index_version()
+        expect(result_cache.key('search', 'jason')).to.ne(key)
+
+    def test_get_or_compute(self):
+        result_cache = SearchResultCache(namespace='v1')
+        compute = Mock(return_value={'OFFICER': []})
+
+        expect(result_cache.get_or_compute('key', compute)).to.eq({'OFFICER': []})
+        expect(result_cache.get_or_compute('key', compute)).to.eq({'OFFICER': []})
+
+        expect(compute).to.be.called_once()
+
+    def test_get_or_compute_from_shared_cache(self):
+        compute = Mock(return_value={'OFFICER': []})
+
+        SearchResultCache(namespace='v1').get_or_compute('key', compute)
+        value = SearchResultCache(namespace='v1').get_or_compute('key', compute)
+
+        expect(value).to.eq({'OFFICER': []})
+        expect(compute).to.be.called_once()
+
+    def test_get_or_compute_local_cache_shared_across_instances(self):
+        compute = Mock(return_value={'OFFICER': []})
+
+        SearchResultCache(namespace='v1').get_or_compute('key', compute)
+        cache.clear()
+        value = SearchResultCache(namespace='v1').get_or_compute('key', compute)
+
+        expect(value).to.eq({'OFFICER': []})
+        expect(compute).to.be.called_once()
+
+    def test_local_cache_eviction(self):
+        result_cache = SearchResultCache(namespace='v1')
+
+        result_cache.get_or_compute('key_1', lambda: 1)
+        result_cache.get_or_compute('key_2', lambda: 2)
+        result_cache.get_or_compute('key_1', lambda: 1)
+        result_cache.get_or_compute('key_3', lambda: 3)
+
+        expect(list(result_cache_module._local_cache.keys())).to.eq(['key_1', 'key_3'])
+
+    @override_settings(SEARCH_RESULT_LOCAL_CACHE_SIZE=0)
+    def test_local_cache_disabled(self):
+        result_cache = SearchResultCache(namespace='v1')
+
+        result_cache.get_or_compute('key', lambda: 1)
+
+        expect(result_cache_module._local_cache).to.be.empty()
@@ -1,8 +1,10 @@
-from django.test import TestCase
+from django.core.cache import cache
+from django.test import TestCase, override_settings
 
 from mock import Mock, patch
 from robber import expect
 
+from es_index import es_client
 from search.services import SearchManager
 from search.tests.utils import IndexMixin
 from search.workers import DateCRWorker, OfficerWorker
@@ -126,14 +128,64 @@ class SearchManagerTestCase(IndexMixin, TestCase):
             'full_name': u'John Mcdonald'
         }])
 
+    @patch('search.services.multi_search', return_value={'mock': Mock()})
     @patch('search.services.SimpleFormatter.format', return_value='formatter_results')
-    def test_hooks(self, _):
+    def test_hooks(self, _, __):
         mock_hook = Mock()
         mock_worker = Mock()
         term = 'whatever'
         SearchManager(hooks=[mock_hook], workers={'mock': mock_worker}).search(term)
         mock_hook.execute.assert_called_with(term, None, {'mock': 'formatter_results'})
 
+    @patch('search.services.es_client.msearch')
+    def test_search_send_single_multi_search(self, msearch_mock):
+        msearch_mock.return_value = {'responses': [
+            {'hits': {'total': 0, 'max_score': None, 'hits': []}},
+            {'hits': {'total': 0, 'max_score': None, 'hits': []}},
+        ]}
+        workers = {
+            'OFFICER': OfficerWorker(),
+            'DATE > CR': DateCRWorker(),
+        }
+
+        response = SearchManager(workers=workers).search('fu na 2017-12-27', limit=5)
+
+        expect(response).to.eq({'OFFICER': [], 'DATE > CR': []})
+        expect(msearch_mock).to.be.called_once()
+        body = msearch_mock.call_args[1]['body']
+        expect(body).to.have.length(4)
+        expect(body[0]['type']).to.eq([OfficerInfoDocType._doc_type.name])
+        expect(body[1]['size']).to.eq(5)
+        expect(body[1]['timeout']).to.eq('1s')
+        expect(body[2]['type']).to.eq([CrDocType._doc_type.name])
+
+    def test_search_with_failed_content_type(self):
+        OfficerInfoDocType(meta={'id': '1'}, full_name='full name', badge='123', url='url').save()
+        self.refresh_index()
+        raw_responses = es_client.msearch
+
+        def msearch(**kwargs):
+            result = raw_responses(**kwargs)
+            result['responses'][1] = {'error': {'type': 'search_phase_execution_exception'}}
+            return result
+
+        workers = {
+            'OFFICER': OfficerWorker(),
+            'DATE > CR': DateCRWorker(),
+        }
+        with patch('search.services.es_client.msearch', side_effect=msearch):
+            response = SearchManager(workers=workers).search('fu na 2017-12-27')
+
+        expect(response).to.eq({
+            'OFFICER': [{
+                'id': '1',
+                'url': 'url',
+                'badge': '123',
+                'full_name': u'full name'
+            }],
+            'DATE > CR': []
+        })
+
     @patch('search.services.OfficerWorker.query', return_value='abc')
     def test_get_search_query_for_type(self, patched_query):
         query = SearchManager().get_search_query_for_type('term', 'OFFICER')
@@ -162,3 +214,33 @@ class SearchManagerTestCase(IndexMixin, TestCase):
             'a': 'b',
             'id': 123
         }])
+
+    @override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+    @patch('search.services.SimpleFormatter.format', return_value='formatter_results')
+    def test_search_cached_results(self, _):
+        cache.clear()
+        mock_hook = Mock()
+        search_manager = SearchManager(hooks=[mock_hook], workers={'OFFICER': OfficerWorker()})
+
+        with patch('search.services.multi_search', return_value={'OFFICER': Mock()}) as multi_search_mock:
+            search_manager.search('Jason')
+            response = search_manager.search('jason ')
+
+        expect(response).to.eq({'OFFICER': 'formatter_results'})
+        expect(multi_search_mock).to.be.called_once()
+        expect(mock_hook.execute.call_count).to.eq(2)
+
+    def test_single_search(self):
+        OfficerInfoDocType(meta={'id': '1'}, full_name='full name', badge='123', url='url').save()
+        OfficerInfoDocType(meta={'id': '2'}, full_name='full name 2', badge='456', url='url').save()
+        self.refresh_index()
+
+        count, results = SearchManager().single_search('fu na', 'OFFICER', offset=1, limit=10)
+
+        expect(count).to.eq(2)
+        expect(results).to.have.length(1)
+
+        count, results = SearchManager().single_search('fu na', 'OFFICER', offset=3, limit=10)
+
+        expect(count).to.eq(2)
+        expect(results).to.eq([])
@@ -278,6 +278,32 @@ class SearchV1ViewSetTestCase(IndexMixin, APITestCase):
         expect(response.data['next']).to.ne(None)
         expect(len(response.data['results'])).to.eq(30)
 
+    def test_retrieve_single_with_cursor(self):
+        OfficerFactory.create_batch(40, first_name='Steve')
+
+        self.rebuild_index()
+        self.refresh_index()
+
+        retrieve_single_url = reverse('api:suggestion-single')
+        response = self.client.get(retrieve_single_url, {
+            'term': 'Ste',
+            'contentType': 'OFFICER',
+            'cursor': ''
+        })
+        expect(response.status_code).to.equal(status.HTTP_200_OK)
+        expect(response.data['count']).to.equal(40)
+        expect(response.data['next']).to.ne(None)
+        expect(len(response.data['results'])).to.eq(30)
+
+        next_response = self.client.get(response.data['next'])
+        expect(next_response.status_code).to.equal(status.HTTP_200_OK)
+        expect(next_response.data['count']).to.equal(40)
+        expect(next_response.data['next']).to.equal(None)
+        expect(len(next_response.data['results'])).to.eq(10)
+
+        ids = [result['id'] for result in response.data['results'] + next_response.data['results']]
+        expect(set(ids)).to.have.length(40)
+
     def test_retrieve_single_without_content_type(self):
         text = 'Ke'
         retrieve_single_url = reverse('api:suggestion-single')
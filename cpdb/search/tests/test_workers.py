@@ -1,8 +1,9 @@
 from datetime import datetime
 
 import pytz
-from django.test import SimpleTestCase, TestCase
+from django.test import SimpleTestCase, TestCase, override_settings
 
+from elasticsearch_dsl.query import Q
 from robber import expect
 
 from data.factories import OfficerFactory, OfficerAllegationFactory, OfficerHistoryFactory, PoliceUnitFactory, \
@@ -19,6 +20,7 @@ from search.doc_types import (
 )
 from officers.doc_types import OfficerInfoDocType
 from search.tests.utils import IndexMixin
+from search.management.commands.benchmark_officer_search import ScriptScoreOfficerWorker
 from search_terms.factories import SearchTermItemFactory, SearchTermCategoryFactory
 from trr.factories import TRRFactory
 
@@ -36,13 +38,29 @@ class ReportWorkerTestCase(IndexMixin, SimpleTestCase):
         expect(response.hits.total).to.be.equal(1)
 
 
+class WorkerTestCase(SimpleTestCase):
+    @override_settings(SEARCH_WORKER_TIMEOUT='2s')
+    def test_search_query(self):
+        query = ReportWorker().search_query('author', size=5, begin=2).to_dict()
+
+        expect(query['from']).to.eq(2)
+        expect(query['size']).to.eq(3)
+        expect(query['timeout']).to.eq('2s')
+
+    def test_search_query_with_worker_timeout(self):
+        worker = ReportWorker()
+        worker.timeout = '500ms'
+
+        expect(worker.search_query('author').to_dict()['timeout']).to.eq('500ms')
+
+
 class OfficerWorkerTestCase(IndexMixin, SimpleTestCase):
     def test_search_prioritizing_allegation_count(self):
         doc = OfficerInfoDocType(
-            full_name='full name', badge='123', allegation_count=10)
+            full_name='full name', badge='123', allegation_count=10, autocomplete_weight=31)
         doc.save()
         doc = OfficerInfoDocType(
-            full_name='funny naga', badge='456', allegation_count=20)
+            full_name='funny naga', badge='456', allegation_count=20, autocomplete_weight=61)
         doc.save()
 
         self.refresh_index()
@@ -128,6 +146,71 @@ class OfficerWorkerTestCase(IndexMixin, SimpleTestCase):
         expect(response.hits.hits[2]['_source']['full_name']).to.eq('Partial Badge-Matched Guy')
         expect(response.hits.hits[3]['_source']['full_name']).to.eq('Partial Historic-Badge-Matched Guy')
 
+    def _ids_matching(self, query):
+        return {hit.meta.id for hit in OfficerInfoDocType.search().query(query)[:100].execute()}
+
+    def _expected_scores(self, term, combine):
+        text_hits = OfficerInfoDocType.search().query('multi_match', query=term, fields=OfficerWorker.fields)[:100]
+        tag_matched_ids = self._ids_matching(Q('match', tags=term))
+        full_name_matched_ids = self._ids_matching(Q('match', full_name={'query': term, 'operator': 'and'}))
+        name_matched_ids = self._ids_matching(Q('match', full_name=term))
+
+        scores = {}
+        for hit in text_hits.execute():
+            officer_id, text_score, allegation_count = hit.meta.id, hit.meta.score, hit.allegation_count
+            score = text_score
+            if officer_id in tag_matched_ids:
+                score *= combine(text_score, 60000)
+            if officer_id in full_name_matched_ids:
+                score *= combine(text_score, 500)
+            if officer_id in name_matched_ids:
+                score *= combine(text_score, allegation_count * 3, allegation_count * 3 + 1)
+            scores[officer_id] = score
+        return scores
+
+    def _expect_scores(self, response, expected_scores):
+        expect({hit.meta.id for hit in response}).to.eq(set(expected_scores))
+        for hit in response:
+            expected_score = expected_scores[hit.meta.id]
+            expect(abs(hit.meta.score - expected_score) < expected_score * 1e-4).to.be.true()
+
+    def test_ranking_over_terms_compared_to_script_score(self):
+        for index, (full_name, badge, tags, allegation_count) in enumerate([
+            ('Jerome Finnigan', '5167', [], 0),
+            ('Jerome Turbyville', '15167', [], 12),
+            ('Jerome Brown', '2045', ['jerome'], 0),
+            ('Michael Flynn', '5160', [], 1),
+            ('Michael Glynn', '1234', ['flying squad'], 25),
+            ('Mike Glenn', '12345', [], 0),
+            ('Gerald Michaels', '51670', [], 4),
+        ]):
+            OfficerInfoDocType(
+                meta={'id': str(index)},
+                full_name=full_name,
+                badge=badge,
+                badge_keyword=badge,
+                tags=tags,
+                allegation_count=allegation_count,
+                autocomplete_weight=allegation_count * 3 + 1,
+            ).save()
+
+        self.refresh_index()
+
+        for term in ['jerome', 'jerome 5167', 'jerome finnigan', 'mich', 'michael flynn', 'fly', '5167', '123', '12']:
+            # The scripts multiply by text score + n, the indexed weights by n, with the allegation weight plus 1.
+            # An officer with no allegation but a much better text match can rank below a weaker match with
+            # allegations, the script scores ranked it first.
+            script_scores = self._expected_scores(term, lambda text_score, n, weight=None: text_score + n)
+            weight_scores = self._expected_scores(term, lambda text_score, n, weight=None: weight or n)
+
+            self._expect_scores(ScriptScoreOfficerWorker().search(term, size=20), script_scores)
+            self._expect_scores(OfficerWorker().search(term, size=20), weight_scores)
+
+    def test_query_without_script(self):
+        query = OfficerWorker().query('jason').to_dict()
+
+        expect(str(query)).not_to.contain('script')
+
     def test_search_officer_historic_badge(self):
         OfficerInfoDocType(full_name='John Doe', historic_badges=['100123', '123456']).save()
 
@@ -7,7 +7,7 @@ from search.formatters import AreaFormatter, ZipCodeFormatter
 from search.serializers import OfficerSerializer, AllegationSerializer, TRRSerializer
 from search.workers import ZipCodeWorker, DateOfficerWorker
 from .services import SearchManager
-from .pagination import SearchQueryPagination
+from .pagination import SearchQueryPagination, SearchQueryCursorPagination
 from .formatters import (
     OfficerFormatter, UnitFormatter, OfficerV2Formatter, NameV2Formatter, RankFormatter,
     ReportFormatter, CRFormatter, TRRFormatter, SearchTermFormatter
@@ -43,14 +43,17 @@ class SearchViewSet(viewsets.ViewSet):
         if not self._content_type:
             return Response(status=status.HTTP_400_BAD_REQUEST)
 
-        query = self.search_manager.get_search_query_for_type(
-            term, content_type=self._content_type
-        )
+        if SearchQueryCursorPagination.cursor_query_param in request.query_params:
+            query = self.search_manager.get_search_query_for_type(term, content_type=self._content_type)
+            paginator = SearchQueryCursorPagination()
+            documents = paginator.paginate_es_query(query, request)
+            return paginator.get_paginated_response(
+                self.search_manager.get_formatted_results(documents, self._content_type)
+            )
+
         paginator = SearchQueryPagination()
-        paginated_query = paginator.paginate_es_query(query, request)
-        return paginator.get_paginated_response(
-            self.search_manager.get_formatted_results(paginated_query, self._content_type)
-        )
+        results = paginator.paginate_search(self.search_manager, term, self._content_type, request)
+        return paginator.get_paginated_response(results)
 
     def list(self, request):
         term = self._search_term
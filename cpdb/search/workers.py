@@ -1,3 +1,4 @@
+from django.conf import settings
 from elasticsearch_dsl.query import Q
 
 from .doc_types import (
@@ -12,6 +13,8 @@ class Worker(object):
     fields = []
     sort_order = []
     name = ''
+    # Per worker search timeout (ES time unit), settings.SEARCH_WORKER_TIMEOUT is used when it is None
+    timeout = None
 
     @property
     def _searcher(self):
@@ -22,8 +25,11 @@ class Worker(object):
             .query('multi_match', query=term, operator='and', fields=self.fields) \
             .sort(*self.sort_order)
 
+    def search_query(self, term, size=10, begin=0, **kwargs):
+        return self.query(term, **kwargs)[begin:size].extra(timeout=self.timeout or settings.SEARCH_WORKER_TIMEOUT)
+
     def search(self, term, size=10, begin=0, **kwargs):
-        return self.query(term, **kwargs)[begin:size].execute()
+        return self.search_query(term, size=size, begin=begin, **kwargs).execute()
 
     def get_sample(self):
         query = self._searcher.query(
@@ -52,17 +58,20 @@ class ReportWorker(Worker):
 
 class OfficerWorker(Worker):
     doc_type_klass = OfficerInfoDocType
+    fields = [
+        'badge^2', 'historic_badges', 'full_name', 'tags', '_id',
+        'badge_keyword^4', 'historic_badges_keyword^3',
+    ]
 
     def query(self, term, **kwargs):
+        # The text score is multiplied by the weight of every matching function, and by the indexed
+        # autocomplete_weight (allegation count * 3 + 1) for name matches, so no script runs per document.
         _query = self._searcher.query(
             'function_score',
             query={
                 'multi_match': {
                     'query': term,
-                    'fields': [
-                        'badge^2', 'historic_badges', 'full_name', 'tags', '_id',
-                        'badge_keyword^4', 'historic_badges_keyword^3',
-                    ]
+                    'fields': self.fields
                 }
             },
             functions=[
@@ -72,9 +81,7 @@ class OfficerWorker(Worker):
                             'tags': term
                         }
                     },
-                    'script_score': {
-                        'script': '_score + 60000'
-                    }
+                    'weight': 60000
                 },
                 {
                     'filter': {
@@ -85,9 +92,7 @@ class OfficerWorker(Worker):
                             }
                         }
                     },
-                    'script_score': {
-                        'script': '_score + 500'
-                    }
+                    'weight': 500
                 },
                 {
                     'filter': {
@@ -95,11 +100,14 @@ class OfficerWorker(Worker):
                             'full_name': term
                         }
                     },
-                    'script_score': {
-                        'script': '_score + doc[\'allegation_count\'].value * 3'
+                    'field_value_factor': {
+                        'field': 'autocomplete_weight',
+                        'missing': 1
                     }
                 }
-            ]
+            ],
+            score_mode='multiply',
+            boost_mode='multiply'
         )
         return _query
 
@@ -2,14 +2,14 @@ import functools
 from django.db import connection
 
 from social_graph.serializers import OfficerSerializer, AccusedSerializer
-from data.models import Officer, Allegation
+from data.models import Officer, Allegation, OfficerPairAllegation
 from utils.raw_query_utils import dict_fetch_all
 
 
 DEFAULT_THRESHOLD = 2
 COMPLAINT_ORIGIN_FILTER_MAPPING = {
-    'OFFICER': 'AND data_allegation.is_officer_complaint IS TRUE',
-    'CIVILIAN': 'AND data_allegation.is_officer_complaint IS FALSE',
+    'OFFICER': 'AND P.is_officer_complaint IS TRUE',
+    'CIVILIAN': 'AND P.is_officer_complaint IS FALSE',
 }
 DEFAULT_COMPLAINT_ORIGIN = 'CIVILIAN'
 
@@ -31,25 +31,21 @@ class SocialGraphDataQuery(object):
         officer_ids_string = ", ".join([str(officer.id) for officer in self.officers])
         return f"""
             SELECT {select_fields}
-            FROM data_officerallegation AS A
-            INNER JOIN data_officerallegation AS B ON A.allegation_id = B.allegation_id
-            LEFT JOIN data_allegation ON data_allegation.crid = A.allegation_id
-            WHERE A.officer_id < B.officer_id
-            AND (
-                B.officer_id IN ({officer_ids_string})
-                {'OR' if self.show_connected_officers else 'AND'} A.officer_id IN ({officer_ids_string})
+            FROM {OfficerPairAllegation._meta.db_table} AS P
+            WHERE (
+                P.officer2_id IN ({officer_ids_string})
+                {'OR' if self.show_connected_officers else 'AND'} P.officer1_id IN ({officer_ids_string})
             )
-            AND data_allegation.incident_date IS NOT NULL
             {COMPLAINT_ORIGIN_FILTER_MAPPING.get(self.complaint_origin, '')}
         """
 
     def _coaccused_data_query(self):
         officer_allegation_query = self._officer_allegation_query(f"""
-            A.officer_id AS officer_id_1,
-            B.officer_id AS officer_id_2,
-            A.allegation_id AS allegation_id,
-            data_allegation.incident_date AS incident_date,
-            ROW_NUMBER() OVER (PARTITION BY A.officer_id, B.officer_id ORDER BY incident_date) AS accussed_count
+            P.officer1_id AS officer_id_1,
+            P.officer2_id AS officer_id_2,
+            P.allegation_id AS allegation_id,
+            P.incident_date AS incident_date,
+            ROW_NUMBER() OVER (PARTITION BY P.officer1_id, P.officer2_id ORDER BY P.incident_date) AS accussed_count
         """)
         return f"""
             SELECT * FROM ({officer_allegation_query}) coaccused_data WHERE accussed_count >= {self.threshold}
@@ -58,10 +54,10 @@ class SocialGraphDataQuery(object):
 
     def _allegation_id_query(self):
         officer_allegation_query = self._officer_allegation_query(f"""
-           A.officer_id AS officer_id_1,
-           B.officer_id AS officer_id_2,
-           A.allegation_id AS allegation_id,
-           COUNT(*) OVER (PARTITION BY A.officer_id, B.officer_id) AS total_accussed_count
+           P.officer1_id AS officer_id_1,
+           P.officer2_id AS officer_id_2,
+           P.allegation_id AS allegation_id,
+           COUNT(*) OVER (PARTITION BY P.officer1_id, P.officer2_id) AS total_accussed_count
         """)
         return f"""
             SELECT allegation_id FROM ({officer_allegation_query}) coaccused_data
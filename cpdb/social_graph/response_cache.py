@@ -0,0 +1,53 @@
+import functools
+import hashlib
+import json
+
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework import status
+from rest_framework.response import Response
+
+from data.models import CacheDataRun
+
+CACHE_KEY_PREFIX = 'social-graph'
+
+
+def data_version():
+    return CacheDataRun.data_version()
+
+
+def pinboard_digest(pinboard):
+    return pinboard.content_digest
+
+
+def response_cache_key(view, action_name):
+    """
+    Pinboard id is swapped for a digest of the pinboard's content so that editing a pinboard changes the key,
+    and every key holds the data version so that a data refresh drops all cached responses.
+    """
+    params = {key: value for key, value in view.request.query_params.items() if key != 'pinboard_id'}
+    pinboard = view._pinboard
+    key_content = {
+        'view': view.__class__.__name__,
+        'action': action_name,
+        'params': sorted(params.items()),
+        'pinboard': pinboard_digest(pinboard) if pinboard else None,
+        'data_version': data_version(),
+    }
+    digest = hashlib.sha1(json.dumps(key_content).encode()).hexdigest()
+    return f'{CACHE_KEY_PREFIX}:{digest}'
+
+
+def cached_response(func):
+    @functools.wraps(func)
+    def wrapper(view, request, *args, **kwargs):
+        key = response_cache_key(view, func.__name__)
+        data = cache.get(key)
+        if data is not None:
+            return Response(data)
+
+        response = func(view, request, *args, **kwargs)
+        if response.status_code == status.HTTP_200_OK:
+            cache.set(key, response.data, settings.SOCIAL_GRAPH_CACHE_TIMEOUT)
+        return response
+    return wrapper
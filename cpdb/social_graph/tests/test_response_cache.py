@@ -0,0 +1,104 @@
+from django.core.cache import cache
+from django.test import override_settings
+from django.urls import reverse
+
+from mock import patch
+from rest_framework import status
+from rest_framework.test import APITestCase
+from robber import expect
+
+from data.factories import OfficerFactory, AllegationFactory, CacheDataRunFactory
+from pinboard.factories import PinboardFactory
+from social_graph.response_cache import pinboard_digest, data_version
+
+LOCMEM_CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    }
+}
+
+
+class ResponseCacheTestCase(APITestCase):
+    def test_pinboard_digest(self):
+        officer_1 = OfficerFactory(id=1)
+        officer_2 = OfficerFactory(id=2)
+        allegation = AllegationFactory(crid='123')
+        pinboard_1 = PinboardFactory(officers=[officer_1, officer_2], allegations=[allegation])
+        pinboard_2 = PinboardFactory(officers=[officer_2, officer_1], allegations=[allegation])
+        pinboard_3 = PinboardFactory(officers=[officer_1])
+
+        expect(pinboard_digest(pinboard_1)).to.eq(pinboard_digest(pinboard_2))
+        expect(pinboard_digest(pinboard_1)).not_to.eq(pinboard_digest(pinboard_3))
+
+    def test_data_version(self):
+        expect(data_version()).to.eq(0)
+
+        cache_data_run = CacheDataRunFactory()
+
+        expect(data_version()).to.eq(cache_data_run.id)
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class CachedResponseTestCase(APITestCase):
+    def setUp(self):
+        cache.clear()
+
+    @patch('social_graph.views.SocialGraphDataQuery')
+    def test_network_response_is_cached(self, social_graph_data_query_mock):
+        social_graph_data_query_mock.return_value.graph_data.return_value = {'officers': []}
+        officer = OfficerFactory()
+        pinboard = PinboardFactory(officers=[officer])
+        url = reverse('api-v2:social-graph-network')
+
+        response_1 = self.client.get(url, {'pinboard_id': pinboard.id, 'threshold': 2})
+        response_2 = self.client.get(url, {'pinboard_id': pinboard.id, 'threshold': 2})
+
+        expect(response_1.status_code).to.eq(status.HTTP_200_OK)
+        expect(response_2.status_code).to.eq(status.HTTP_200_OK)
+        expect(response_2.data).to.eq({'officers': []})
+        expect(social_graph_data_query_mock.return_value.graph_data).to.be.called_once()
+
+    @patch('social_graph.views.SocialGraphDataQuery')
+    def test_network_cache_key_changes_with_params(self, social_graph_data_query_mock):
+        social_graph_data_query_mock.return_value.graph_data.return_value = {'officers': []}
+        officer = OfficerFactory()
+        pinboard = PinboardFactory(officers=[officer])
+        url = reverse('api-v2:social-graph-network')
+
+        self.client.get(url, {'pinboard_id': pinboard.id, 'threshold': 2})
+        self.client.get(url, {'pinboard_id': pinboard.id, 'threshold': 3})
+        self.client.get(url, {'pinboard_id': pinboard.id, 'threshold': 3, 'complaint_origin': 'ALL'})
+
+        expect(social_graph_data_query_mock.return_value.graph_data.call_count).to.eq(3)
+
+    @patch('social_graph.views.SocialGraphDataQuery')
+    def test_network_cache_invalidated_when_pinboard_changes(self, social_graph_data_query_mock):
+        social_graph_data_query_mock.return_value.graph_data.return_value = {'officers': []}
+        officer = OfficerFactory()
+        pinboard = PinboardFactory(officers=[officer])
+        url = reverse('api-v2:social-graph-network')
+
+        self.client.get(url, {'pinboard_id': pinboard.id})
+        pinboard.officers.add(OfficerFactory())
+        self.client.get(url, {'pinboard_id': pinboard.id})
+
+        expect(social_graph_data_query_mock.return_value.graph_data.call_count).to.eq(2)
+
+    @patch('social_graph.views.SocialGraphDataQuery')
+    def test_network_cache_invalidated_when_data_version_changes(self, social_graph_data_query_mock):
+        social_graph_data_query_mock.return_value.graph_data.return_value = {'officers': []}
+        officer = OfficerFactory()
+        url = reverse('api-v2:social-graph-network')
+
+        self.client.get(url, {'officer_ids': officer.id})
+        CacheDataRunFactory()
+        self.client.get(url, {'officer_ids': officer.id})
+
+        expect(social_graph_data_query_mock.return_value.graph_data.call_count).to.eq(2)
+
+    def test_not_found_pinboard_is_not_cached(self):
+        url = reverse('api-v2:social-graph-network')
+
+        response = self.client.get(url, {'pinboard_id': 'f00f00f0'})
+
+        expect(response.status_code).to.eq(status.HTTP_404_NOT_FOUND)
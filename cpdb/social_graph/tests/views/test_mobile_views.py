@@ -9,6 +9,7 @@ from rest_framework import status
 from robber import expect
 from mock import patch
 
+from data.cache_managers import officer_pair_allegation_cache_manager
 from data.factories import PoliceUnitFactory, OfficerFactory, AllegationFactory, \
     OfficerAllegationFactory, OfficerHistoryFactory, AttachmentFileFactory, AllegationCategoryFactory, VictimFactory
 from pinboard.factories import PinboardFactory
@@ -128,6 +129,7 @@ class SocialGraphMobileViewSetTestCase(APITestCase):
             ]
         }
 
+        officer_pair_allegation_cache_manager.cache_data()
         url = reverse('api-v2:social-graph-mobile-network', kwargs={})
         response = self.client.get(url, {
             'officer_ids': '8562, 8563, 8564',
@@ -257,6 +259,7 @@ class SocialGraphMobileViewSetTestCase(APITestCase):
             ]
         }
 
+        officer_pair_allegation_cache_manager.cache_data()
         url = reverse('api-v2:social-graph-mobile-network', kwargs={})
         response = self.client.get(url, {
             'unit_id': 123,
@@ -478,6 +481,7 @@ class SocialGraphMobileViewSetTestCase(APITestCase):
             'list_event': ['2007-12-31']
         }
 
+        officer_pair_allegation_cache_manager.cache_data()
         response = self.client.get(reverse('api-v2:social-graph-mobile-network'), {'pinboard_id': pinboard.id})
 
         expect(response.status_code).to.eq(status.HTTP_200_OK)
@@ -660,6 +664,7 @@ class SocialGraphMobileViewSetTestCase(APITestCase):
             'list_event': ['2007-12-31', '2008-12-31']
         }
 
+        officer_pair_allegation_cache_manager.cache_data()
         url = reverse('api-v2:social-graph-mobile-network', kwargs={})
         response = self.client.get(url, {
             'officer_ids': '8562,8563,8564,8565,8566',
@@ -838,6 +843,7 @@ class SocialGraphMobileViewSetTestCase(APITestCase):
             },
         ]
 
+        officer_pair_allegation_cache_manager.cache_data()
         url = reverse('api-v2:social-graph-mobile-officers', kwargs={})
         response = self.client.get(url, {
             'officer_ids': '8562, 8563, 8564',
@@ -1029,6 +1035,7 @@ class SocialGraphMobileViewSetTestCase(APITestCase):
         AttachmentFileFactory(id=4, tag='CR', allegation=allegation_2, show=False)
         AttachmentFileFactory(id=5, tag='CR', allegation=allegation_2, title='arrest report')
 
+        officer_pair_allegation_cache_manager.cache_data()
         url = reverse('api-v2:social-graph-mobile-allegations', kwargs={})
         response = self.client.get(url, {
             'officer_ids': '8562, 8563, 8564',
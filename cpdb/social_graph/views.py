@@ -12,6 +12,7 @@ from pinboard.models import Pinboard
 from data.utils.attachment_file import filter_attachments
 from social_graph.queries.social_graph_data_query import SocialGraphDataQuery
 from social_graph.queries.geographic_data_query import GeographyCrsDataQuery, GeographyTrrsDataQuery
+from social_graph.response_cache import cached_response
 from social_graph.serializers import (
     OfficerDetailSerializer,
     SocialGraphCRDetailSerializer,
@@ -27,10 +28,12 @@ DEFAULT_LIMIT = 500
 @method_decorator(never_cache, name='dispatch')
 class SocialGraphBaseViewSet(viewsets.ViewSet):
     @action(detail=False, methods=['get'], url_path='network')
+    @cached_response
     def network(self, _):
         return Response(self._social_graph_data_query.graph_data(self._static))
 
     @action(detail=False, methods=['get'], url_path='allegations')
+    @cached_response
     def allegations(self, _):
         allegations = self._social_graph_data_query.allegations().select_related(
             'most_common_category'
@@ -49,6 +52,7 @@ class SocialGraphBaseViewSet(viewsets.ViewSet):
         return Response(SocialGraphCRDetailSerializer(allegations, many=True).data)
 
     @action(detail=False, methods=['get'], url_path='officers')
+    @cached_response
     def officers(self, _):
         return Response(
             OfficerDetailSerializer(
@@ -58,6 +62,7 @@ class SocialGraphBaseViewSet(viewsets.ViewSet):
         )
 
     @action(detail=False, methods=['get'], url_path='geographic-crs')
+    @cached_response
     def geographic_crs(self, request):
         pinboard = self._pinboard
         crids = pinboard.crids if pinboard else []
@@ -87,6 +92,7 @@ class SocialGraphBaseViewSet(viewsets.ViewSet):
         })
 
     @action(detail=False, methods=['get'], url_path='geographic-trrs')
+    @cached_response
     def geographic_trrs(self, request):
         pinboard = self._pinboard
         trr_ids = pinboard.trr_ids if pinboard else []
@@ -1085,6 +1085,42 @@ class AttachmentAPITestCase(TrackerTestCaseMixin, APITestCase):
         expect(response.data['previous']).to.contain(f'{base_url}?limit=2&match=summary')
         expect(len(response.data['results'])).to.eq(1)
 
+    def test_attachments_full_text_search_with_cursor(self):
+        allegation = AllegationFactory(crid=111333)
+
+        AttachmentFileFactory(
+            id=11,
+            title='summary',
+            allegation=allegation
+        )
+        AttachmentFileFactory(
+            id=22,
+            title='summary report'
+        )
+        AttachmentFileFactory(
+            id=33,
+            title='summary report title',
+            text_content='document content'
+        )
+
+        base_url = reverse('api-v2:attachments-list')
+        self.refresh_index()
+
+        response = self.client.get(f'{base_url}?match=summary&limit=2&cursor=')
+        expect(response.status_code).to.eq(status.HTTP_200_OK)
+        expect(response.data['count']).to.eq(3)
+        expect(len(response.data['results'])).to.eq(2)
+        expect(response.data['next']).not_to.be.none()
+
+        next_response = self.client.get(response.data['next'])
+        expect(next_response.status_code).to.eq(status.HTTP_200_OK)
+        expect(next_response.data['count']).to.eq(3)
+        expect(next_response.data['next']).to.be.none()
+        expect(len(next_response.data['results'])).to.eq(1)
+
+        ids = [result['id'] for result in response.data['results'] + next_response.data['results']]
+        expect(sorted(ids)).to.eq([11, 22, 33])
+
     def test_attachments_full_text_search_as_admin(self):
         admin_user = AdminUserFactory()
         token, _ = Token.objects.get_or_create(user=admin_user)
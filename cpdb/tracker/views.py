@@ -13,7 +13,7 @@ from data.constants import MEDIA_TYPE_DOCUMENT
 from data.models import AttachmentFile
 from data.utils.subqueries import SQCount
 from document_cloud.models import DocumentCrawler
-from es_index.pagination import ESQuerysetPagination
+from es_index.pagination import ESQuerysetPagination, ESQuerysetCursorPagination
 from .doc_types import AttachmentFileDocType
 from .serializers import (
     AttachmentFileListSerializer,
@@ -59,7 +59,10 @@ class AttachmentViewSet(viewsets.ViewSet):
             if request.auth is None:
                 es_query = es_query.filter('term', show=True)
 
-            paginator = ESQuerysetPagination()
+            if ESQuerysetCursorPagination.cursor_query_param in request.query_params:
+                paginator = ESQuerysetCursorPagination()
+            else:
+                paginator = ESQuerysetPagination()
             page = paginator.paginate_es_query(es_query, request, queryset)
         else:
             if 'crid' in request.query_params:
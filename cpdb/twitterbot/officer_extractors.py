@@ -3,28 +3,41 @@ from twitterbot.serializers import OfficerSerializer
 
 
 class ElasticSearchOfficerExtractor:
+    rescore_window_size = 100
+
+    def query(self, name):
+        # Scores q * (q + allegation count * 3) like the replaced script did, where q is the name match score:
+        # hits are scored q + allegation count * 3 by an indexed field, then the top ones are multiplied by q.
+        name_query = {
+            'match': {
+                'full_name': {
+                    'query': name,
+                    'operator': 'and'
+                }
+            }
+        }
+        return OfficerInfoDocType().search().query(
+            'function_score',
+            query=name_query,
+            field_value_factor={
+                'field': 'allegation_count',
+                'factor': 3,
+                'missing': 0
+            },
+            boost_mode='sum'
+        ).extra(rescore={
+            'window_size': self.rescore_window_size,
+            'query': {
+                'rescore_query': name_query,
+                'score_mode': 'multiply'
+            }
+        })
+
     def get_officers(self, names):
         results = []
         seen_ids = []
         for (source, name) in names:
-            query = OfficerInfoDocType().search().query(
-                'function_score',
-                query={
-                    'match': {
-                        'full_name': {
-                            'query': name,
-                            'operator': 'and'
-                        }
-                    }
-                },
-                script_score={
-                    'script': {
-                        'lang': 'painless',
-                        'inline': '_score + doc[\'allegation_count\'].value * 3'
-                    }
-                }
-            )
-            search_result = query[:1].execute()
+            search_result = self.query(name)[:1].execute()
             results += [
                 (source, OfficerSerializer(obj).data)
                 for obj in search_result if obj['id'] not in seen_ids]
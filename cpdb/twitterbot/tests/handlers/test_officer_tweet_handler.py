@@ -68,8 +68,8 @@ class OfficerTweetHandlerTestCase(RebuildIndexMixin, TestCase):
         self.send_tweet_patcher = patch('twitterbot.handlers.officer_tweet_handler.send_tweet')
         self.send_tweet = self.send_tweet_patcher.start()
         self.percentile_patch = patch(
-            'officers.indexers.officers_indexer.officer_percentile.top_percentile',
-            return_value=[]
+            'data.cache_managers.officer_cache_manager.officer_percentile.yearly_top_percentile',
+            return_value={}
         )
         self.percentile_patch.start()
 
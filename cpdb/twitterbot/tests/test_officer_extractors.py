@@ -3,6 +3,7 @@ from django.test import TestCase
 from robber import expect
 
 from data.factories import OfficerFactory, OfficerAllegationFactory
+from officers.doc_types import OfficerInfoDocType
 from twitterbot.officer_extractors import ElasticSearchOfficerExtractor
 from twitterbot.tests.mixins import RebuildIndexMixin
 
@@ -68,6 +69,56 @@ class ElasticSearchOfficerExtractorTestCase(OfficerExtractorTestCase):
             [officer2]
         )
 
+    def test_ranking_parity_with_script_score(self):
+        for first_name, last_name, allegation_count in [
+            ('Al', 'Li', 0),
+            ('Alexander', 'Lichtenstein-Montgomery', 1),
+            ('Alan', 'Wu', 2),
+            ('Al', 'Brown', 5),
+            ('Bo', 'Wu', 0),
+            ('Bob', 'Alvarez', 12),
+        ]:
+            officer = OfficerFactory(first_name=first_name, last_name=last_name)
+            OfficerAllegationFactory.create_batch(allegation_count, officer=officer)
+
+        self.refresh_index()
+
+        for name in ['Al', 'Al Li', 'Alexander', 'Wu', 'Bo', 'Li']:
+            script_score_query = OfficerInfoDocType().search().query(
+                'function_score',
+                query={'match': {'full_name': {'query': name, 'operator': 'and'}}},
+                script_score={
+                    'script': {
+                        'lang': 'painless',
+                        'inline': '_score + doc[\'allegation_count\'].value * 3'
+                    }
+                }
+            )
+            expected_scores = {hit.meta.id: hit.meta.score for hit in script_score_query[:10].execute()}
+
+            hits = self.extractor.query(name)[:10].execute()
+
+            expect({hit.meta.id for hit in hits}).to.eq(set(expected_scores))
+            for hit in hits:
+                expected_score = expected_scores[hit.meta.id]
+                expect(abs(hit.meta.score - expected_score) < expected_score * 1e-4).to.be.true()
+
+    def test_find_officer_with_better_name_match_over_more_allegations(self):
+        # Text scores multiply each other, so the exact name match with no allegation still beats the longer
+        # name with one allegation. Multiplying the text score by the allegation weight alone can pick the other one.
+        short_name_officer = OfficerFactory(first_name='Al', last_name='Li')
+        long_name_officer = OfficerFactory(first_name='Alexander', last_name='Lichtenstein-Montgomery')
+        OfficerAllegationFactory(officer=long_name_officer)
+        for _ in range(3):
+            OfficerFactory(first_name='Bo', last_name='Wu')
+
+        self.refresh_index()
+
+        self.check_result_match_officer(
+            self.extractor.get_officers([('text', 'Al Li')]),
+            [short_name_officer]
+        )
+
     def test_find_officer_with_correct_match(self):
         officer = OfficerFactory(first_name='Michael', last_name='Flynn')
 
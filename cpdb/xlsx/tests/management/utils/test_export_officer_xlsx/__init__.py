@@ -4,6 +4,7 @@ from decimal import Decimal
 import pytz
 from robber import expect
 
+from data.cache_managers import coaccusal_cache_manager
 from data.factories import (
     OfficerFactory,
     AllegationFactory,
@@ -224,6 +225,7 @@ class ExportOfficerXlsxUtilTestCase(WriterBaseTestCase):
             allegation=allegation,
         )
 
+        coaccusal_cache_manager.cache_data()
         export_officer_xlsx(officer, self.test_output_dir)
 
         self.covert_xlsx_to_csv('accused.xlsx')
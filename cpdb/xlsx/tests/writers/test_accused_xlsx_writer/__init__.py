@@ -4,6 +4,7 @@ from decimal import Decimal
 import pytz
 from robber.expect import expect
 
+from data.cache_managers import coaccusal_cache_manager
 from data.factories import (
     OfficerFactory,
     AllegationFactory,
@@ -229,6 +230,7 @@ class AccusedXlsxWriterTestCase(WriterBaseTestCase):
             allegation=allegation,
         )
 
+        coaccusal_cache_manager.cache_data()
         writer = AccusedXlsxWriter(officer, self.test_output_dir)
         writer.export_xlsx()
 